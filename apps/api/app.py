@@ -12,26 +12,12 @@ import structlog
 from quart import Quart, g, jsonify, request
 from quart_cors import cors
 
+from shared.monitoring.structured_logging import configure_logging
+
 from .config import QuartConfig, get_config
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
-    ],
-    wrapper_class=structlog.stdlib.BoundLogger,
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=True,
-)
+configure_logging()
 
 logger = structlog.get_logger(__name__)
 
@@ -175,6 +161,22 @@ def register_error_handlers(app: Quart) -> None:
             429,
         )
 
+    from .services.password_hasher import HasherBusy
+
+    @app.errorhandler(HasherBusy)
+    async def hasher_busy(error):
+        return (
+            jsonify(
+                {
+                    "error": "Service Unavailable",
+                    "message": "Authentication is busy. Please try again shortly.",
+                    "status_code": 503,
+                }
+            ),
+            503,
+            {"Retry-After": str(error.retry_after)},
+        )
+
     @app.errorhandler(500)
     async def internal_error(error):
         logger.error("internal_server_error", error=str(error))
@@ -192,6 +194,14 @@ def register_error_handlers(app: Quart) -> None:
 
 def register_middleware(app: Quart) -> None:
     """Register request/response middleware"""
+    from .middleware.metrics import MetricsMiddleware
+    from .middleware.rate_limit import RateLimitMiddleware
+
+    # Request counts and latency by route template
+    MetricsMiddleware(app)
+
+    # Per-tenant rate limits (429 when a bucket is empty)
+    RateLimitMiddleware(app)
 
     @app.before_request
     async def before_request():
@@ -223,6 +233,20 @@ def register_middleware(app: Quart) -> None:
 
         return response
 
+    @app.teardown_request
+    async def teardown_request(exc):
+        """Return the request's database connection to the pool"""
+        from .models.database import release_db
+
+        await release_db()
+
+    @app.teardown_websocket
+    async def teardown_websocket(exc):
+        """Return the websocket's database connection to the pool"""
+        from .models.database import release_db
+
+        await release_db()
+
 
 def register_blueprints(app: Quart) -> None:
     """Register API blueprints"""
@@ -267,12 +291,62 @@ def register_lifecycle_hooks(app: Quart) -> None:
 
         await init_database(app)
 
+        # Initialize background audit log writer
+        from .services.audit_log import init_audit_log
+
+        await init_audit_log(app)
+
         # Initialize Redis
         from .services.redis_service import init_redis
 
         await init_redis(app)
 
-        # Initialize license client
+        # Initialize rate limiter (cluster-wide through Redis)
+        from .services.rate_limiter import init_rate_limiter
+
+        await init_rate_limiter(app)
+
+        # Initialize credential cache (needs Redis for invalidation)
+        from .services.credential_cache import init_credential_cache
+
+        await init_credential_cache(app)
+
+        # Initialize verified-token cache (syncs revocations from Redis)
+        from .services.token_cache import init_token_cache
+
+        await init_token_cache(app)
+
+        # Initialize password hasher worker pool (keeps bcrypt off the loop)
+        from .services.password_hasher import init_password_hasher
+
+        await init_password_hasher(app)
+
+        # Initialize sensor status index (warms from the database once)
+        from .services.status_index import init_status_index
+
+        await init_status_index(app)
+
+        # Initialize WebSocket fan-out hub (relays through Redis)
+        from .services.ws_hub import init_ws_hub
+
+        await init_ws_hub(app)
+
+        # Initialize live log tail (shared XREAD cursor on logs:raw)
+        from .services.log_tail import init_log_tail
+
+        await init_log_tail(app)
+
+        # Initialize Fleet inventory mirror (background incremental sync)
+        from .services.fleet_mirror import init_fleet_mirror
+
+        await init_fleet_mirror(app)
+
+        # Initialize Fleet live query jobs (results streamed through Redis)
+        from .services.live_query import init_live_queries
+
+        await init_live_queries(app)
+
+        # Initialize license client and validation cache
         from .services.license_service import init_license
 
         await init_license(app)
@@ -284,6 +358,51 @@ def register_lifecycle_hooks(app: Quart) -> None:
         """Application shutdown"""
         logger.info("application_stopping")
 
+        # Stop live log tail reader
+        from .services.log_tail import close_log_tail
+
+        await close_log_tail(app)
+
+        # Stop WebSocket client writers
+        from .services.ws_hub import close_ws_hub
+
+        await close_ws_hub(app)
+
+        # Stop Fleet mirror sync
+        from .services.fleet_mirror import close_fleet_mirror
+
+        await close_fleet_mirror(app)
+
+        # Cancel running live query jobs
+        from .services.live_query import close_live_queries
+
+        await close_live_queries(app)
+
+        # Persist the license cache snapshot
+        from .services.license_service import close_license
+
+        await close_license(app)
+
+        # Stop revoked token sync
+        from .services.token_cache import close_token_cache
+
+        await close_token_cache(app)
+
+        # Stop password hasher worker processes
+        from .services.password_hasher import close_password_hasher
+
+        await close_password_hasher(app)
+
+        # Flush coalesced credential usage before closing the database
+        from .services.credential_cache import close_credential_cache
+
+        await close_credential_cache(app)
+
+        # Write queued audit events before closing the database
+        from .services.audit_log import close_audit_log
+
+        await close_audit_log(app)
+
         # Close database connections
         from .models.database import close_database
 
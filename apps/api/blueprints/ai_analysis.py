@@ -12,7 +12,9 @@ from quart import Blueprint, g, jsonify, request
 
 from config import get_config
 from middleware.auth import require_auth, require_feature
-from models.database import get_db
+from models.database import db_run, get_db
+from services.audit_log import audit
+from shared.database.pagination import keyset_page, parse_limit
 
 logger = structlog.get_logger(__name__)
 
@@ -70,30 +72,44 @@ async def trigger_analysis():
 @require_feature("ai_analysis")
 async def list_analyses():
     """List AI analysis results"""
-    db = await get_db()
-    if not db:
+    limit = parse_limit(request.args.get("limit"), default=20)
+    cursor = request.args.get("cursor")
+
+    def _query(db):
+        rows, next_cursor = keyset_page(
+            db,
+            db.ai_analyses,
+            db.ai_analyses.timestamp,
+            db.ai_analyses.id,
+            limit,
+            cursor,
+        )
+        return rows.as_list(), next_cursor
+
+    try:
+        analyses, next_cursor = await db_run(_query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError:
         return jsonify({"error": "Database unavailable"}), 503
 
-    limit = int(request.args.get("limit", 20))
-
-    analyses = db(db.ai_analyses).select(
-        orderby=~db.ai_analyses.timestamp, limitby=(0, limit)
-    )
-
     return jsonify(
         {
             "analyses": [
                 {
-                    "analysis_id": a.analysis_id,
-                    "timestamp": a.timestamp.isoformat() if a.timestamp else None,
-                    "analysis_type": a.analysis_type,
-                    "severity": a.severity,
-                    "summary": a.summary,
-                    "is_acknowledged": a.is_acknowledged,
+                    "analysis_id": a["analysis_id"],
+                    "timestamp": (
+                        a["timestamp"].isoformat() if a["timestamp"] else None
+                    ),
+                    "analysis_type": a["analysis_type"],
+                    "severity": a["severity"],
+                    "summary": a["summary"],
+                    "is_acknowledged": a["is_acknowledged"],
                 }
                 for a in analyses
             ],
             "total": len(analyses),
+            "next_cursor": next_cursor,
         }
     )
 
@@ -168,6 +184,7 @@ async def acknowledge_analysis(analysis_id: str):
     db.commit()
 
     logger.info("analysis_acknowledged", analysis_id=analysis_id, by=username)
+    audit("ai_analysis.acknowledge", "ai_analysis", analysis_id)
 
     return jsonify({"message": "Analysis acknowledged"})
 
@@ -15,11 +15,13 @@ from middleware.auth import (
     generate_jwt_token,
     generate_refresh_token,
     hash_api_key,
-    hash_password,
     require_auth,
-    verify_password,
 )
 from models.database import get_db
+from services.audit_log import audit
+from services.credential_cache import get_credential_cache
+from services.password_hasher import get_password_hasher
+from services.token_cache import revoke_token
 
 logger = structlog.get_logger(__name__)
 
@@ -60,15 +62,31 @@ async def login():
 
     if not user:
         logger.warning("login_failed", reason="user_not_found", email=email)
+        audit("auth.login_failed", "user", details={"reason": "user_not_found"})
         return jsonify({"error": "Invalid credentials"}), 401
 
     if not user.is_active:
         logger.warning("login_failed", reason="user_inactive", email=email)
+        audit(
+            "auth.login_failed",
+            "user",
+            user.id,
+            {"reason": "user_inactive"},
+            user_id=user.id,
+        )
         return jsonify({"error": "Account is disabled"}), 401
 
-    # Verify password
-    if not verify_password(password, user.password_hash):
+    # Verify password off the event loop; HasherBusy becomes a 503
+    valid, new_hash = await get_password_hasher().verify(password, user.password_hash)
+    if not valid:
         logger.warning("login_failed", reason="invalid_password", email=email)
+        audit(
+            "auth.login_failed",
+            "user",
+            user.id,
+            {"reason": "invalid_password"},
+            user_id=user.id,
+        )
         return jsonify({"error": "Invalid credentials"}), 401
 
     # Generate tokens
@@ -90,11 +108,16 @@ async def login():
         + timedelta(seconds=config.JWT_REFRESH_TOKEN_EXPIRES),
     )
 
-    # Update last login
-    user.update_record(last_login=datetime.utcnow())
+    # Update last login, upgrading the stored hash if its cost changed
+    if new_hash:
+        user.update_record(last_login=datetime.utcnow(), password_hash=new_hash)
+        logger.info("password_rehashed", user_id=user.id)
+    else:
+        user.update_record(last_login=datetime.utcnow())
     db.commit()
 
     logger.info("login_success", user_id=user.id, username=user.username)
+    audit("auth.login", "user", user.id, user_id=user.id)
 
     return jsonify(
         {
@@ -162,10 +185,11 @@ async def register():
             return jsonify({"error": "Email already registered"}), 409
 
     # Create user
+    password_hash = await get_password_hasher().hash(password)
     user_id = db.users.insert(
         username=data.get("username"),
         email=data.get("email"),
-        password_hash=hash_password(password),
+        password_hash=password_hash,
         first_name=data.get("first_name", ""),
         last_name=data.get("last_name", ""),
         role="user",
@@ -174,6 +198,13 @@ async def register():
     db.commit()
 
     logger.info("user_registered", user_id=user_id, username=data.get("username"))
+    audit(
+        "user.register",
+        "user",
+        user_id,
+        {"username": data.get("username")},
+        user_id=user_id,
+    )
 
     return (
         jsonify(
@@ -250,6 +281,8 @@ async def logout():
     """
     Logout and revoke refresh tokens
 
+    The access token used for the request is revoked as well.
+
     Request body (optional):
         refresh_token: Specific token to revoke
         all: True to revoke all user tokens
@@ -257,6 +290,9 @@ async def logout():
     data = await request.get_json() or {}
     user_id = g.auth.get("user_id")
 
+    if g.auth.get("method") == "jwt":
+        await revoke_token(g.auth.get("jti"), g.auth.get("exp"))
+
     db = await get_db()
     if not db:
         return jsonify({"error": "Database unavailable"}), 503
@@ -279,6 +315,8 @@ async def logout():
         db.commit()
         logger.info("token_revoked", user_id=user_id)
 
+    audit("auth.logout", "user", user_id, {"all_sessions": bool(data.get("all"))})
+
     return jsonify({"message": "Logged out successfully"})
 
 
@@ -392,6 +430,7 @@ async def create_api_key():
     db.commit()
 
     logger.info("api_key_created", user_id=user_id, key_id=key_id)
+    audit("api_key.create", "api_key", key_id, {"name": data.get("name")})
 
     # Return the key only once - it cannot be retrieved later
     return (
@@ -427,6 +466,11 @@ async def delete_api_key(key_id: int):
     if not result:
         return jsonify({"error": "API key not found"}), 404
 
+    credential_cache = get_credential_cache()
+    if credential_cache:
+        await credential_cache.invalidate("api_key", record_id=key_id)
+
     logger.info("api_key_deleted", user_id=user_id, key_id=key_id)
+    audit("api_key.delete", "api_key", key_id)
 
     return jsonify({"message": "API key deleted"})
@@ -1,19 +1,28 @@
 """
 KillKrill API - Fleet Blueprint
-Fleet device management integration
+Fleet device management integration; host and policy reads are served from
+the local Fleet mirror
 """
 
 from datetime import datetime
 
 import httpx
 import structlog
-from quart import Blueprint, jsonify, request
+from quart import Blueprint, g, jsonify, make_response, request
 
 from config import get_config
 from middleware.auth import require_auth, require_feature
+from services.audit_log import audit
+from services.fleet_mirror import get_fleet_mirror
+from services.live_query import JobLimitReached, get_live_queries
+from shared.monitoring.fleet_inventory import DEFAULT_PER_PAGE, MAX_PER_PAGE
+from shared.monitoring.live_query import LiveQueryError
 
 logger = structlog.get_logger(__name__)
 
+# Most host results returned per live query results page
+MAX_RESULTS_PER_PAGE = 1000
+
 fleet_bp = Blueprint("fleet", __name__)
 
 
@@ -37,10 +46,81 @@ async def fleet_status():
         return jsonify({"error": str(e)}), 503
 
 
+def _int_arg(name: str):
+    """Optional integer query argument; raises ValueError if malformed"""
+    value = request.args.get(name)
+    return int(value) if value not in (None, "") else None
+
+
+def _can_read_job(job: dict) -> bool:
+    """Live query jobs are visible to the user who ran them and to admins"""
+    auth = g.auth or {}
+    if auth.get("role") == "admin":
+        return True
+    owner = job.get("user_id")
+    return bool(owner) and owner == str(auth.get("user_id") or "")
+
+
+def _ready_mirror():
+    """Fleet mirror if it has completed a full sync, else None"""
+    mirror = get_fleet_mirror()
+    if mirror is not None and mirror.inventory.ready:
+        return mirror
+    return None
+
+
+@fleet_bp.route("/mirror", methods=["GET"])
+@require_auth()
+async def mirror_status():
+    """Fleet mirror sync state and staleness"""
+    mirror = get_fleet_mirror()
+    if mirror is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **mirror.staleness()})
+
+
 @fleet_bp.route("/hosts", methods=["GET"])
 @require_auth()
 async def list_hosts():
-    """List Fleet hosts"""
+    """
+    List Fleet hosts
+
+    Served from the local mirror once it has synced, with optional filters
+    (status, platform, team_id, label_id, policy_id, policy_response,
+    query), sorting (order_key, order_direction) and paging (page,
+    per_page). Falls back to asking Fleet until the first sync completes.
+    """
+    mirror = _ready_mirror()
+    if mirror is not None:
+        try:
+            page = _int_arg("page") or 0
+            per_page = _int_arg("per_page") or DEFAULT_PER_PAGE
+            total, hosts = mirror.inventory.query_hosts(
+                status=request.args.get("status"),
+                platform=request.args.get("platform"),
+                team_id=_int_arg("team_id"),
+                label_id=_int_arg("label_id"),
+                policy_id=_int_arg("policy_id"),
+                policy_response=request.args.get("policy_response"),
+                query=request.args.get("query"),
+                order_key=request.args.get("order_key", "hostname"),
+                order_direction=request.args.get("order_direction", "asc"),
+                page=page,
+                per_page=per_page,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify(
+            {
+                "hosts": hosts,
+                "total": total,
+                "page": page,
+                "per_page": min(per_page, MAX_PER_PAGE),
+                "mirror": mirror.staleness(),
+            }
+        )
+
     config = get_config()
 
     try:
@@ -69,7 +149,19 @@ async def list_hosts():
 @fleet_bp.route("/hosts/<int:host_id>", methods=["GET"])
 @require_auth()
 async def get_host(host_id: int):
-    """Get Fleet host details"""
+    """
+    Get Fleet host details
+
+    Served from the mirror unless ?live=true asks for Fleet's full detail
+    record (software, users, disk encryption and so on).
+    """
+    mirror = _ready_mirror()
+    if mirror is not None and request.args.get("live", "").lower() != "true":
+        host = mirror.inventory.get_host(host_id)
+        if host is None:
+            return jsonify({"error": "Host not found"}), 404
+        return jsonify({"host": host, "mirror": mirror.staleness()})
+
     config = get_config()
 
     try:
@@ -120,37 +212,164 @@ async def list_queries():
 @require_auth()
 @require_feature("fleet_live_query")
 async def run_query():
-    """Run a live query on Fleet hosts"""
-    config = get_config()
-    data = await request.get_json()
+    """
+    Start a live query job on Fleet hosts
 
+    Returns 202 with the job as soon as Fleet has created the campaign.
+    Host results are collected in the background; read them page by page
+    from /queries/jobs/<job_id>/results or follow them as server-sent
+    events from /queries/jobs/<job_id>/events.
+    """
+    live_queries = get_live_queries()
+    if live_queries is None:
+        return jsonify({"error": "Live queries unavailable"}), 503
+
+    data = await request.get_json()
     if not data or not data.get("query"):
         return jsonify({"error": "Query required"}), 400
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{config.FLEET_SERVER_URL}/api/v1/fleet/queries/run",
-                headers={"Authorization": f"Bearer {config.FLEET_API_TOKEN}"},
-                json={
-                    "query": data.get("query"),
-                    "selected": {"hosts": data.get("host_ids", [])},
-                },
-                timeout=60.0,
-            )
-            return jsonify(
-                response.json()
-                if response.status_code == 200
-                else {"error": "Query failed"}
-            )
-    except Exception as e:
+        host_ids = [int(h) for h in data.get("host_ids") or []]
+        label_ids = [int(label) for label in data.get("label_ids") or []]
+    except (TypeError, ValueError):
+        return jsonify({"error": "host_ids and label_ids must be integers"}), 400
+
+    try:
+        job = await live_queries.submit(
+            data["query"],
+            host_ids=host_ids,
+            label_ids=label_ids,
+            user_id=getattr(g, "user_id", None),
+        )
+    except JobLimitReached:
+        return jsonify({"error": "Too many live queries running"}), 429
+    except (httpx.HTTPError, LiveQueryError) as e:
+        logger.warning("live_query_submit_failed", error=str(e))
         return jsonify({"error": str(e)}), 503
 
+    audit(
+        "fleet.live_query",
+        "fleet_campaign",
+        job["campaign_id"],
+        {"job_id": job["job_id"], "query": data["query"], "host_ids": host_ids},
+    )
+
+    job_url = f"{request.path.rsplit('/', 1)[0]}/jobs/{job['job_id']}"
+    return (
+        jsonify(
+            {
+                "job": job,
+                "links": {
+                    "job": job_url,
+                    "results": f"{job_url}/results",
+                    "events": f"{job_url}/events",
+                },
+            }
+        ),
+        202,
+    )
+
+
+@fleet_bp.route("/queries/jobs/<job_id>", methods=["GET"])
+@require_auth()
+@require_feature("fleet_live_query")
+async def get_query_job(job_id: str):
+    """Live query job status and progress"""
+    live_queries = get_live_queries()
+    if live_queries is None:
+        return jsonify({"error": "Live queries unavailable"}), 503
+
+    job = await live_queries.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not _can_read_job(job):
+        return jsonify({"error": "Access denied"}), 403
+    return jsonify({"job": job})
+
+
+@fleet_bp.route("/queries/jobs/<job_id>/results", methods=["GET"])
+@require_auth()
+@require_feature("fleet_live_query")
+async def get_query_results(job_id: str):
+    """
+    Page through a live query job's host results
+
+    Each result is one host's rows (or error). Pass the returned cursor
+    back to get the next page; while the job is running a page may come
+    back empty and fill in later.
+    """
+    live_queries = get_live_queries()
+    if live_queries is None:
+        return jsonify({"error": "Live queries unavailable"}), 503
+
+    job = await live_queries.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not _can_read_job(job):
+        return jsonify({"error": "Access denied"}), 403
+
+    try:
+        limit = max(1, min(_int_arg("limit") or 100, MAX_RESULTS_PER_PAGE))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results, cursor = await live_queries.results(
+        job_id, cursor=request.args.get("cursor") or None, limit=limit
+    )
+    return jsonify(
+        {"job": job, "results": results, "cursor": cursor, "count": len(results)}
+    )
+
+
+@fleet_bp.route("/queries/jobs/<job_id>/events", methods=["GET"])
+@require_auth()
+@require_feature("fleet_live_query")
+async def follow_query_job(job_id: str):
+    """
+    Follow a live query job as server-sent events
+
+    Emits a "result" event per host and "status" events as the job
+    changes state, ending after the final status. Reconnecting clients
+    resume from Last-Event-ID (or ?cursor=).
+    """
+    live_queries = get_live_queries()
+    if live_queries is None:
+        return jsonify({"error": "Live queries unavailable"}), 503
+
+    job = await live_queries.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not _can_read_job(job):
+        return jsonify({"error": "Access denied"}), 403
+
+    cursor = request.headers.get("Last-Event-ID") or request.args.get("cursor")
+    response = await make_response(
+        live_queries.follow(job_id, cursor=cursor or None),
+        {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+    response.timeout = None
+    return response
+
 
 @fleet_bp.route("/policies", methods=["GET"])
 @require_auth()
 async def list_policies():
-    """List Fleet policies"""
+    """List Fleet policies, from the mirror once it has synced"""
+    mirror = _ready_mirror()
+    if mirror is not None:
+        policies = list(mirror.inventory.policies.values())
+        return jsonify(
+            {
+                "policies": policies,
+                "total": len(policies),
+                "mirror": mirror.staleness(),
+            }
+        )
+
     config = get_config()
 
     try:
@@ -8,16 +8,95 @@ import uuid
 from datetime import datetime
 
 import structlog
+from py_libs.validation import IsFloatInRange, IsIntInRange, IsLength, Schema
 from quart import Blueprint, g, jsonify, request
 
 from middleware.auth import generate_api_key, hash_api_key, require_auth, require_role
-from models.database import get_db
+from models.database import db_run, get_db
+from services.audit_log import audit
+from services.credential_cache import get_credential_cache
 from services.redis_service import cache
+from services.status_index import get_status_index
+from services.ws_hub import get_ws_hub
+from shared.database.pagination import keyset_page, parse_limit
 
 logger = structlog.get_logger(__name__)
 
 sensors_bp = Blueprint("sensors", __name__)
 
+# Submitted results are validated as one batch; other fields pass through
+RESULT_SCHEMA = Schema(
+    {
+        "check_id": IsLength(1, 100),
+        "status": IsLength(1, 50),
+        "response_time_ms": IsFloatInRange(0),
+        "status_code": IsIntInRange(100, 599),
+    },
+    optional=["status", "response_time_ms", "status_code"],
+    keep_extra=True,
+)
+
+
+async def _authenticate_sensor(api_key: str, agent_id: str = None):
+    """
+    Resolve an active sensor agent from its API key
+
+    Lookups go through the credential cache; unknown keys are negatively
+    cached and heartbeats are coalesced into batched writes.
+
+    Args:
+        api_key: Raw API key from the X-API-Key header
+        agent_id: Agent ID the key must belong to (optional)
+
+    Returns:
+        Sensor dict, or None if the key is invalid or belongs to another agent
+
+    Raises:
+        RuntimeError: If the database is unavailable
+    """
+    api_key_hash = hash_api_key(api_key)
+    credential_cache = get_credential_cache()
+
+    hit = False
+    sensor = None
+    if credential_cache:
+        hit, sensor = credential_cache.get("sensor", api_key_hash)
+
+    if not hit:
+        db = await get_db()
+        if not db:
+            raise RuntimeError("Database unavailable")
+
+        row = (
+            db(
+                (db.sensor_agents.api_key_hash == api_key_hash)
+                & (db.sensor_agents.is_active == True)
+            )
+            .select(db.sensor_agents.id, db.sensor_agents.agent_id)
+            .first()
+        )
+        sensor = {"id": row.id, "agent_id": row.agent_id} if row else None
+        if credential_cache:
+            credential_cache.put("sensor", api_key_hash, sensor)
+
+    if not sensor or (agent_id is not None and sensor["agent_id"] != agent_id):
+        return None
+
+    return sensor
+
+
+async def _mark_sensor_seen(sensor) -> None:
+    """Record a sensor heartbeat (coalesced when the credential cache is active)"""
+    credential_cache = get_credential_cache()
+    if credential_cache:
+        credential_cache.mark_used("sensor", sensor["id"])
+        return
+
+    db = await get_db()
+    if db:
+        db(db.sensor_agents.id == sensor["id"]).update(last_heartbeat=datetime.utcnow())
+        db.commit()
+
 
 # ============== Sensor Agent Management ==============
 
@@ -87,6 +166,7 @@ async def create_sensor():
     db.commit()
 
     logger.info("sensor_created", agent_id=agent_id, by=g.auth.get("user_id"))
+    audit("sensor.create", "sensor_agent", agent_id, {"name": data.get("name")})
 
     return (
         jsonify(
@@ -152,13 +232,19 @@ async def delete_sensor(agent_id: str):
     if not db:
         return jsonify({"error": "Database unavailable"}), 503
 
-    result = db(db.sensor_agents.agent_id == agent_id).update(is_active=False)
+    sensor = db(db.sensor_agents.agent_id == agent_id).select().first()
+    if not sensor:
+        return jsonify({"error": "Sensor not found"}), 404
+
+    sensor.update_record(is_active=False)
     db.commit()
 
-    if not result:
-        return jsonify({"error": "Sensor not found"}), 404
+    credential_cache = get_credential_cache()
+    if credential_cache:
+        await credential_cache.invalidate("sensor", key_hash=sensor.api_key_hash)
 
     logger.info("sensor_deleted", agent_id=agent_id, by=g.auth.get("user_id"))
+    audit("sensor.deactivate", "sensor_agent", agent_id)
 
     return jsonify({"message": "Sensor deactivated"})
 
@@ -173,26 +259,15 @@ async def sensor_heartbeat(agent_id: str):
     if not api_key:
         return jsonify({"error": "API key required"}), 401
 
-    db = await get_db()
-    if not db:
+    try:
+        sensor = await _authenticate_sensor(api_key, agent_id)
+    except RuntimeError:
         return jsonify({"error": "Database unavailable"}), 503
 
-    api_key_hash = hash_api_key(api_key)
-    sensor = (
-        db(
-            (db.sensor_agents.agent_id == agent_id)
-            & (db.sensor_agents.api_key_hash == api_key_hash)
-            & (db.sensor_agents.is_active == True)
-        )
-        .select()
-        .first()
-    )
-
     if not sensor:
         return jsonify({"error": "Invalid sensor or API key"}), 401
 
-    sensor.update_record(last_heartbeat=datetime.utcnow())
-    db.commit()
+    await _mark_sensor_seen(sensor)
 
     return jsonify({"status": "ok", "timestamp": datetime.utcnow().isoformat()})
 
@@ -287,6 +362,7 @@ async def create_check():
     db.commit()
 
     logger.info("check_created", check_id=check_id, by=g.auth.get("user_id"))
+    audit("check.create", "sensor_check", check_id, {"name": data.get("name")})
 
     return jsonify({"check_id": check_id, "message": "Check created"}), 201
 
@@ -380,6 +456,9 @@ async def update_check(check_id: str):
     if update_fields:
         check.update_record(**update_fields)
         db.commit()
+        audit(
+            "check.update", "sensor_check", check_id, {"fields": sorted(update_fields)}
+        )
 
     return jsonify({"message": "Check updated"})
 
@@ -399,6 +478,12 @@ async def delete_check(check_id: str):
     if not result:
         return jsonify({"error": "Check not found"}), 404
 
+    status_index = get_status_index()
+    if status_index:
+        await status_index.forget_check(check_id)
+
+    audit("check.delete", "sensor_check", check_id)
+
     return jsonify({"message": "Check deleted"})
 
 
@@ -419,108 +504,145 @@ async def submit_results():
     if not data:
         return jsonify({"error": "Results data required"}), 400
 
-    db = await get_db()
-    if not db:
-        return jsonify({"error": "Database unavailable"}), 503
-
     # Validate sensor
-    api_key_hash = hash_api_key(api_key)
-    sensor = (
-        db(
-            (db.sensor_agents.api_key_hash == api_key_hash)
-            & (db.sensor_agents.is_active == True)
-        )
-        .select()
-        .first()
-    )
+    try:
+        sensor = await _authenticate_sensor(api_key)
+    except RuntimeError:
+        return jsonify({"error": "Database unavailable"}), 503
 
     if not sensor:
         return jsonify({"error": "Invalid API key"}), 401
 
-    agent_id = sensor.agent_id
+    agent_id = sensor["agent_id"]
 
     # Process results (can be single result or batch)
     results = data.get("results", [data]) if "results" in data else [data]
+    if not isinstance(results, list):
+        return jsonify({"error": "results must be a list"}), 400
 
-    for result in results:
-        db.sensor_results.insert(
-            agent_id=agent_id,
-            check_id=result.get("check_id"),
-            status=result.get("status", "unknown"),
-            response_time_ms=result.get("response_time_ms"),
-            status_code=result.get("status_code"),
-            error_message=result.get("error_message"),
-            ssl_expiry=result.get("ssl_expiry"),
-            ssl_valid=result.get("ssl_valid"),
-        )
+    report = RESULT_SCHEMA.validate_batch(results)
+    if not report.valid:
+        return jsonify({"error": "No valid results", "rejected": report.to_dict()}), 400
+    results = report.valid
 
-    # Update heartbeat
-    sensor.update_record(last_heartbeat=datetime.utcnow())
-    db.commit()
+    now = datetime.utcnow()
+    rows = [
+        {
+            "agent_id": agent_id,
+            "check_id": result.get("check_id"),
+            "timestamp": now,
+            "status": result.get("status", "unknown"),
+            "response_time_ms": result.get("response_time_ms"),
+            "status_code": result.get("status_code"),
+            "error_message": result.get("error_message"),
+            "ssl_expiry": result.get("ssl_expiry"),
+            "ssl_valid": result.get("ssl_valid"),
+        }
+        for result in results
+    ]
+    indexed = [
+        {
+            "check_id": row["check_id"],
+            "status": row["status"],
+            "response_time_ms": row["response_time_ms"],
+            "timestamp": now,
+        }
+        for row in rows
+    ]
 
-    # Broadcast via WebSocket
-    # TODO: Implement WebSocket broadcast
+    try:
+        await db_run(lambda db: db.sensor_results.bulk_insert(rows))
+    except RuntimeError:
+        return jsonify({"error": "Database unavailable"}), 503
+
+    # Keep the latest-status index and rolling counters current
+    status_index = get_status_index()
+    if status_index:
+        await status_index.record_results(agent_id, indexed)
+
+    # Update heartbeat
+    await _mark_sensor_seen(sensor)
+
+    # Broadcast via WebSocket; newer results for a check replace queued ones
+    hub = get_ws_hub()
+    if hub:
+        await hub.publish_many(
+            "sensors",
+            [
+                (
+                    {
+                        "type": "sensor_result",
+                        "result": dict(result, agent_id=agent_id),
+                    },
+                    f"sensor_result:{result['check_id']}:{agent_id}",
+                )
+                for result in indexed
+            ],
+        )
 
     logger.debug("results_submitted", agent_id=agent_id, count=len(results))
 
-    return jsonify({"status": "ok", "processed": len(results)})
+    response = {"status": "ok", "processed": len(results)}
+    if report.errors:
+        response["rejected"] = report.to_dict()
+    return jsonify(response)
 
 
 @sensors_bp.route("/results", methods=["GET"])
 @require_auth()
 async def query_results():
     """Query check results with filters"""
-    db = await get_db()
-    if not db:
-        return jsonify({"error": "Database unavailable"}), 503
-
     # Parse query params
     check_id = request.args.get("check_id")
     agent_id = request.args.get("agent_id")
     status = request.args.get("status")
-    limit = int(request.args.get("limit", 100))
-
-    query = db.sensor_results
-
-    if check_id:
-        query = query.check_id == check_id
-    if agent_id:
-        query = (
-            query.agent_id == agent_id
-            if not check_id
-            else query & (db.sensor_results.agent_id == agent_id)
-        )
-    if status:
-        query = (
-            query.status == status
-            if not check_id and not agent_id
-            else query & (db.sensor_results.status == status)
+    limit = parse_limit(request.args.get("limit"))
+    cursor = request.args.get("cursor")
+
+    def _query(db):
+        query = db.sensor_results.id > 0
+        if check_id:
+            query &= db.sensor_results.check_id == check_id
+        if agent_id:
+            query &= db.sensor_results.agent_id == agent_id
+        if status:
+            query &= db.sensor_results.status == status
+
+        rows, next_cursor = keyset_page(
+            db,
+            query,
+            db.sensor_results.timestamp,
+            db.sensor_results.id,
+            limit,
+            cursor,
         )
+        return rows.as_list(), next_cursor
 
-    if check_id or agent_id or status:
-        results = db(query).select(
-            orderby=~db.sensor_results.timestamp, limitby=(0, limit)
-        )
-    else:
-        results = db(db.sensor_results).select(
-            orderby=~db.sensor_results.timestamp, limitby=(0, limit)
-        )
+    try:
+        results, next_cursor = await db_run(_query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError:
+        return jsonify({"error": "Database unavailable"}), 503
 
     return jsonify(
         {
             "results": [
                 {
-                    "agent_id": r.agent_id,
-                    "check_id": r.check_id,
-                    "status": r.status,
-                    "response_time_ms": r.response_time_ms,
-                    "status_code": r.status_code,
-                    "error_message": r.error_message,
-                    "timestamp": r.timestamp.isoformat() if r.timestamp else None,
+                    "agent_id": r["agent_id"],
+                    "check_id": r["check_id"],
+                    "status": r["status"],
+                    "response_time_ms": r["response_time_ms"],
+                    "status_code": r["status_code"],
+                    "error_message": r["error_message"],
+                    "timestamp": (
+                        r["timestamp"].isoformat() if r["timestamp"] else None
+                    ),
                 }
                 for r in results
             ],
             "total": len(results),
+            "next_cursor": next_cursor,
         }
     )
 
@@ -545,29 +667,38 @@ async def get_status_summary():
         "checks": [],
     }
 
+    status_index = get_status_index()
+    latest_by_check = await status_index.latest_by_check() if status_index else None
+
     for check in checks:
         # Get latest result for this check
-        latest = (
-            db(db.sensor_results.check_id == check.check_id)
-            .select(orderby=~db.sensor_results.timestamp, limitby=(0, 1))
-            .first()
-        )
+        if latest_by_check is not None:
+            latest = latest_by_check.get(check.check_id)
+        else:
+            row = (
+                db(db.sensor_results.check_id == check.check_id)
+                .select(orderby=~db.sensor_results.timestamp, limitby=(0, 1))
+                .first()
+            )
+            latest = row.as_dict() if row else None
 
         check_status = {
             "check_id": check.check_id,
             "name": check.name,
             "target": check.target,
-            "status": latest.status if latest else "unknown",
+            "status": latest["status"] if latest else "unknown",
             "last_check": (
-                latest.timestamp.isoformat() if latest and latest.timestamp else None
+                latest["timestamp"].isoformat()
+                if latest and latest["timestamp"]
+                else None
             ),
-            "response_time_ms": latest.response_time_ms if latest else None,
+            "response_time_ms": latest["response_time_ms"] if latest else None,
         }
 
         if latest:
-            if latest.status == "up":
+            if latest["status"] == "up":
                 status_summary["checks_up"] += 1
-            elif latest.status in ["down", "error", "timeout"]:
+            elif latest["status"] in ["down", "error", "timeout"]:
                 status_summary["checks_down"] += 1
             else:
                 status_summary["checks_unknown"] += 1
@@ -576,6 +707,9 @@ async def get_status_summary():
 
         status_summary["checks"].append(check_status)
 
+    if status_index:
+        status_summary["last_24h"] = await status_index.rolling_counters()
+
     return jsonify(status_summary)
 
 
@@ -589,25 +723,19 @@ async def get_agent_config(agent_id: str):
     if not api_key:
         return jsonify({"error": "API key required"}), 401
 
-    db = await get_db()
-    if not db:
-        return jsonify({"error": "Database unavailable"}), 503
-
     # Validate sensor
-    api_key_hash = hash_api_key(api_key)
-    sensor = (
-        db(
-            (db.sensor_agents.agent_id == agent_id)
-            & (db.sensor_agents.api_key_hash == api_key_hash)
-            & (db.sensor_agents.is_active == True)
-        )
-        .select()
-        .first()
-    )
+    try:
+        sensor = await _authenticate_sensor(api_key, agent_id)
+    except RuntimeError:
+        return jsonify({"error": "Database unavailable"}), 503
 
     if not sensor:
         return jsonify({"error": "Invalid sensor or API key"}), 401
 
+    db = await get_db()
+    if not db:
+        return jsonify({"error": "Database unavailable"}), 503
+
     # Get all active checks (all sensors run all checks)
     checks = db(db.sensor_checks.is_active == True).select()
 
@@ -8,8 +8,10 @@ from datetime import datetime
 import structlog
 from quart import Blueprint, g, jsonify, request
 
-from middleware.auth import hash_password, require_auth, require_role
+from middleware.auth import require_auth, require_role
 from models.database import get_db
+from services.audit_log import audit
+from services.password_hasher import get_password_hasher
 
 logger = structlog.get_logger(__name__)
 
@@ -116,10 +118,11 @@ async def create_user():
     if existing:
         return jsonify({"error": "Username or email already exists"}), 409
 
+    password_hash = await get_password_hasher().hash(data.get("password"))
     user_id = db.users.insert(
         username=data.get("username"),
         email=data.get("email"),
-        password_hash=hash_password(data.get("password")),
+        password_hash=password_hash,
         first_name=data.get("first_name", ""),
         last_name=data.get("last_name", ""),
         role=data.get("role", "user"),
@@ -128,6 +131,12 @@ async def create_user():
     db.commit()
 
     logger.info("user_created", user_id=user_id, by=g.auth.get("user_id"))
+    audit(
+        "user.create",
+        "user",
+        user_id,
+        {"username": data.get("username"), "role": data.get("role", "user")},
+    )
 
     return jsonify({"id": user_id, "message": "User created"}), 201
 
@@ -168,12 +177,16 @@ async def update_user(user_id: int):
 
     # Password update
     if data.get("password"):
-        update_fields["password_hash"] = hash_password(data["password"])
+        update_fields["password_hash"] = await get_password_hasher().hash(
+            data["password"]
+        )
 
     if update_fields:
         user.update_record(**update_fields)
         db.commit()
         logger.info("user_updated", user_id=user_id, by=g.auth.get("user_id"))
+        # Field names only; values may be credentials
+        audit("user.update", "user", user_id, {"fields": sorted(update_fields)})
 
     return jsonify({"message": "User updated"})
 
@@ -200,5 +213,6 @@ async def delete_user(user_id: int):
     db.commit()
 
     logger.info("user_deleted", user_id=user_id, by=g.auth.get("user_id"))
+    audit("user.deactivate", "user", user_id)
 
     return jsonify({"message": "User deactivated"})
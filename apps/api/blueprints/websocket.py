@@ -6,26 +6,45 @@ Real-time updates via WebSocket
 import asyncio
 import json
 from datetime import datetime
-from typing import Any, Dict, Set
+from typing import Any, Dict, Optional
 
 import structlog
 from quart import Blueprint, websocket
 
+from middleware.auth import AuthMiddleware
+from services.log_tail import get_log_tail
+from services.ws_hub import get_ws_hub
+
 logger = structlog.get_logger(__name__)
 
 websocket_bp = Blueprint("websocket", __name__)
 
-# Connected clients per channel
-_clients: Dict[str, Set] = {
-    "dashboard": set(),
-    "logs": set(),
-    "metrics": set(),
-    "sensors": set(),
-    "alerts": set(),
-}
 
-# Lock for client management
-_lock = asyncio.Lock()
+def _frame(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload)
+
+
+def _subscribe_logs(client, message: Dict[str, Any]) -> Optional[str]:
+    """
+    Subscribe a client to the live log tail
+
+    Returns:
+        Error message, or None on success
+    """
+    log_tail = get_log_tail()
+    if log_tail is None:
+        return "Live log tail unavailable"
+
+    try:
+        log_tail.subscribe(
+            client,
+            message.get("filter"),
+            sample_rate=float(message.get("sample_rate", 1.0)),
+            max_per_second=message.get("max_per_second"),
+        )
+    except (TypeError, ValueError) as e:
+        return str(e)
+    return None
 
 
 @websocket_bp.websocket("/connect")
@@ -33,8 +52,17 @@ async def ws_connect():
     """
     WebSocket connection handler
 
+    Clients authenticate on connect with an Authorization or X-API-Key
+    header, or with a JWT in the ``token`` query parameter
+    (/ws/connect?token=...); unauthenticated connections are closed with
+    1008 before any subscription.
+
     Client messages:
         {"type": "subscribe", "channel": "dashboard"}
+        {"type": "subscribe", "channel": "logs",
+         "filter": {"source": "...", "min_level": "warning", "contains": "...",
+                    "glob": "timed*out"},
+         "sample_rate": 0.1, "max_per_second": 50}
         {"type": "unsubscribe", "channel": "dashboard"}
         {"type": "ping"}
 
@@ -44,22 +72,35 @@ async def ws_connect():
         {"type": "pong", "timestamp": "..."}
         {"type": "message", "channel": "dashboard", "data": {...}, "timestamp": "..."}
     """
-    client = websocket._get_current_object()
-    subscribed_channels: Set[str] = set()
-
-    logger.info("websocket_connected", client_id=id(client))
+    auth = await AuthMiddleware.authenticate_websocket()
+    if auth is None:
+        logger.warning("websocket_unauthenticated")
+        await websocket.close(1008)
+        return
+
+    hub = get_ws_hub()
+    if hub is None:
+        await websocket.close(1013)
+        return
+
+    # All writes go through the client's queue so a slow socket only
+    # delays its own messages
+    ws = websocket._get_current_object()
+    client = hub.register(ws.send, ws.close)
+
+    logger.info(
+        "websocket_connected", client_id=id(client), user_id=auth.get("user_id")
+    )
 
     try:
-        while True:
+        while not client.closed:
             # Receive message from client
             data = await websocket.receive()
 
             try:
                 message = json.loads(data)
             except json.JSONDecodeError:
-                await websocket.send(
-                    json.dumps({"type": "error", "message": "Invalid JSON"})
-                )
+                client.enqueue(_frame({"type": "error", "message": "Invalid JSON"}))
                 continue
 
             msg_type = message.get("type")
@@ -67,13 +108,15 @@ async def ws_connect():
             # Handle subscription
             if msg_type == "subscribe":
                 channel = message.get("channel")
-                if channel in _clients:
-                    async with _lock:
-                        _clients[channel].add(client)
-                        subscribed_channels.add(channel)
-
-                    await websocket.send(
-                        json.dumps(
+                error = None
+                if channel == "logs":
+                    error = _subscribe_logs(client, message)
+                elif not hub.subscribe(client, channel):
+                    error = f"Unknown channel: {channel}"
+
+                if error is None:
+                    client.enqueue(
+                        _frame(
                             {
                                 "type": "subscribed",
                                 "channel": channel,
@@ -83,30 +126,22 @@ async def ws_connect():
                     )
                     logger.debug("websocket_subscribed", channel=channel)
                 else:
-                    await websocket.send(
-                        json.dumps(
-                            {"type": "error", "message": f"Unknown channel: {channel}"}
-                        )
-                    )
+                    client.enqueue(_frame({"type": "error", "message": error}))
 
             # Handle unsubscription
             elif msg_type == "unsubscribe":
                 channel = message.get("channel")
-                if channel in _clients:
-                    async with _lock:
-                        _clients[channel].discard(client)
-                        subscribed_channels.discard(channel)
-
-                    await websocket.send(
-                        json.dumps({"type": "unsubscribed", "channel": channel})
-                    )
+                log_tail = get_log_tail()
+                if channel == "logs" and log_tail is not None:
+                    log_tail.unsubscribe(client)
+                    client.enqueue(_frame({"type": "unsubscribed", "channel": channel}))
+                elif hub.unsubscribe(client, channel):
+                    client.enqueue(_frame({"type": "unsubscribed", "channel": channel}))
 
             # Handle ping
             elif msg_type == "ping":
-                await websocket.send(
-                    json.dumps(
-                        {"type": "pong", "timestamp": datetime.utcnow().isoformat()}
-                    )
+                client.enqueue(
+                    _frame({"type": "pong", "timestamp": datetime.utcnow().isoformat()})
                 )
 
     except asyncio.CancelledError:
@@ -114,68 +149,54 @@ async def ws_connect():
     except Exception as e:
         logger.error("websocket_error", error=str(e))
     finally:
-        # Cleanup: remove from all channels
-        async with _lock:
-            for channel in subscribed_channels:
-                _clients[channel].discard(client)
+        # Cleanup: remove from all channels and stop the writer
+        log_tail = get_log_tail()
+        if log_tail is not None:
+            log_tail.unsubscribe(client)
+        await hub.unregister(client)
 
         logger.info("websocket_disconnected", client_id=id(client))
 
 
-async def broadcast(channel: str, data: Dict[str, Any]) -> int:
+async def broadcast(
+    channel: str, data: Dict[str, Any], coalesce_key: Optional[str] = None
+) -> int:
     """
     Broadcast message to all clients subscribed to a channel
 
+    The message is queued per client and relayed to the other API
+    instances; this never waits on a client socket.
+
     Args:
         channel: Channel name
         data: Data to broadcast
+        coalesce_key: Newer messages with the same key replace queued ones
 
     Returns:
-        Number of clients message was sent to
+        Number of local clients the message was queued for
     """
-    if channel not in _clients:
+    hub = get_ws_hub()
+    if hub is None:
         return 0
-
-    message = json.dumps(
-        {
-            "type": "message",
-            "channel": channel,
-            "data": data,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-    )
-
-    dead_clients = set()
-    sent_count = 0
-
-    async with _lock:
-        for client in _clients[channel]:
-            try:
-                await client.send(message)
-                sent_count += 1
-            except Exception:
-                dead_clients.add(client)
-
-        # Remove dead clients
-        for client in dead_clients:
-            _clients[channel].discard(client)
-
-    if dead_clients:
-        logger.debug(
-            "websocket_dead_clients_removed", channel=channel, count=len(dead_clients)
-        )
-
-    return sent_count
+    return await hub.publish(channel, data, coalesce_key)
 
 
 async def broadcast_service_status(status: Dict[str, Any]) -> None:
     """Broadcast service status update"""
-    await broadcast("dashboard", {"type": "service_status", "services": status})
+    await broadcast(
+        "dashboard",
+        {"type": "service_status", "services": status},
+        coalesce_key="service_status",
+    )
 
 
 async def broadcast_sensor_result(result: Dict[str, Any]) -> None:
     """Broadcast sensor check result"""
-    await broadcast("sensors", {"type": "sensor_result", "result": result})
+    await broadcast(
+        "sensors",
+        {"type": "sensor_result", "result": result},
+        coalesce_key=f"sensor_result:{result.get('check_id')}:{result.get('agent_id')}",
+    )
 
 
 async def broadcast_alert(alert: Dict[str, Any]) -> None:
@@ -185,4 +206,7 @@ async def broadcast_alert(alert: Dict[str, Any]) -> None:
 
 def get_connected_clients() -> Dict[str, int]:
     """Get count of connected clients per channel"""
-    return {channel: len(clients) for channel, clients in _clients.items()}
+    hub = get_ws_hub()
+    if hub is None:
+        return {}
+    return {channel: stats["clients"] for channel, stats in hub.stats().items()}
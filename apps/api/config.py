@@ -35,9 +35,50 @@ class QuartConfig:
     DB_POOL_SIZE: int = field(
         default_factory=lambda: config("DB_POOL_SIZE", default=10, cast=int)
     )
+    # Seconds to wait for a free connection, max connection age, and idle
+    # time after which a connection is pinged before reuse
+    DB_POOL_TIMEOUT: float = field(
+        default_factory=lambda: config("DB_POOL_TIMEOUT", default=5.0, cast=float)
+    )
+    DB_POOL_RECYCLE: float = field(
+        default_factory=lambda: config("DB_POOL_RECYCLE", default=1800.0, cast=float)
+    )
+    DB_POOL_VALIDATE_IDLE: float = field(
+        default_factory=lambda: config(
+            "DB_POOL_VALIDATE_IDLE", default=30.0, cast=float
+        )
+    )
     DB_MIGRATE: bool = field(
         default_factory=lambda: config("DB_MIGRATE", default=True, cast=bool)
     )
+    # Worker threads running PyDAL work off the event loop (one connection each)
+    DB_EXECUTOR_WORKERS: int = field(
+        default_factory=lambda: config("DB_EXECUTOR_WORKERS", default=8, cast=int)
+    )
+    # Use asyncpg for raw read queries when installed and on PostgreSQL
+    DB_ASYNCPG: bool = field(
+        default_factory=lambda: config("DB_ASYNCPG", default=True, cast=bool)
+    )
+
+    # Audit log: events are queued and written in background batches
+    AUDIT_QUEUE_SIZE: int = field(
+        default_factory=lambda: config("AUDIT_QUEUE_SIZE", default=10000, cast=int)
+    )
+    AUDIT_BATCH_SIZE: int = field(
+        default_factory=lambda: config("AUDIT_BATCH_SIZE", default=500, cast=int)
+    )
+    AUDIT_FLUSH_INTERVAL: float = field(
+        default_factory=lambda: config("AUDIT_FLUSH_INTERVAL", default=1.0, cast=float)
+    )
+    # Events written later than this after being queued count as late
+    AUDIT_LATE_SECONDS: float = field(
+        default_factory=lambda: config("AUDIT_LATE_SECONDS", default=5.0, cast=float)
+    )
+    AUDIT_SHUTDOWN_TIMEOUT: float = field(
+        default_factory=lambda: config(
+            "AUDIT_SHUTDOWN_TIMEOUT", default=10.0, cast=float
+        )
+    )
 
     # Redis
     REDIS_URL: str = field(
@@ -47,6 +88,69 @@ class QuartConfig:
         default_factory=lambda: config("REDIS_MAX_CONNECTIONS", default=20, cast=int)
     )
 
+    # Credential cache (API keys and sensor agent keys)
+    CREDENTIAL_CACHE_TTL: int = field(
+        default_factory=lambda: config("CREDENTIAL_CACHE_TTL", default=60, cast=int)
+    )
+    CREDENTIAL_CACHE_NEGATIVE_TTL: int = field(
+        default_factory=lambda: config(
+            "CREDENTIAL_CACHE_NEGATIVE_TTL", default=10, cast=int
+        )
+    )
+    CREDENTIAL_CACHE_MAX_ENTRIES: int = field(
+        default_factory=lambda: config(
+            "CREDENTIAL_CACHE_MAX_ENTRIES", default=10000, cast=int
+        )
+    )
+    CREDENTIAL_FLUSH_INTERVAL: float = field(
+        default_factory=lambda: config(
+            "CREDENTIAL_FLUSH_INTERVAL", default=5.0, cast=float
+        )
+    )
+
+    # Verified JWT cache and revoked token ID sync
+    TOKEN_CACHE_MAX_ENTRIES: int = field(
+        default_factory=lambda: config(
+            "TOKEN_CACHE_MAX_ENTRIES", default=10000, cast=int
+        )
+    )
+    TOKEN_REVOCATION_SYNC_INTERVAL: float = field(
+        default_factory=lambda: config(
+            "TOKEN_REVOCATION_SYNC_INTERVAL", default=2.0, cast=float
+        )
+    )
+
+    # WebSocket fan-out (per-client send queue bound and send timeout)
+    WS_CLIENT_QUEUE_SIZE: int = field(
+        default_factory=lambda: config("WS_CLIENT_QUEUE_SIZE", default=256, cast=int)
+    )
+    WS_SEND_TIMEOUT: float = field(
+        default_factory=lambda: config("WS_SEND_TIMEOUT", default=10.0, cast=float)
+    )
+
+    # Live log tail (Redis stream and per-subscriber delivery cap)
+    LOG_TAIL_STREAM: str = field(
+        default_factory=lambda: config("LOG_TAIL_STREAM", default="logs:raw")
+    )
+    LOG_TAIL_MAX_PER_SECOND: float = field(
+        default_factory=lambda: config(
+            "LOG_TAIL_MAX_PER_SECOND", default=100.0, cast=float
+        )
+    )
+
+    # Password hashing (bcrypt in a bounded process pool)
+    PASSWORD_HASH_WORKERS: int = field(
+        default_factory=lambda: config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+    )
+    PASSWORD_HASH_MAX_PENDING: int = field(
+        default_factory=lambda: config(
+            "PASSWORD_HASH_MAX_PENDING", default=64, cast=int
+        )
+    )
+    PASSWORD_BCRYPT_ROUNDS: int = field(
+        default_factory=lambda: config("PASSWORD_BCRYPT_ROUNDS", default=12, cast=int)
+    )
+
     # JWT Authentication
     JWT_SECRET: str = field(
         default_factory=lambda: config(
@@ -74,6 +178,54 @@ class QuartConfig:
             "LICENSE_SERVER_URL", default="https://license.penguintech.io"
         )
     )
+    # License validation cache: fresh TTL, stale-while-revalidate window,
+    # TTL for rejected keys, and snapshot file for warm restarts ("" disables)
+    LICENSE_CACHE_TTL: float = field(
+        default_factory=lambda: config("LICENSE_CACHE_TTL", default=300.0, cast=float)
+    )
+    LICENSE_CACHE_STALE_TTL: float = field(
+        default_factory=lambda: config(
+            "LICENSE_CACHE_STALE_TTL", default=3600.0, cast=float
+        )
+    )
+    LICENSE_CACHE_NEGATIVE_TTL: float = field(
+        default_factory=lambda: config(
+            "LICENSE_CACHE_NEGATIVE_TTL", default=30.0, cast=float
+        )
+    )
+    LICENSE_CACHE_SNAPSHOT: str = field(
+        default_factory=lambda: config(
+            "LICENSE_CACHE_SNAPSHOT", default="/tmp/killkrill/license_cache.json"
+        )
+    )
+
+    # Rate limiting (token buckets; shared across instances through Redis)
+    RATE_LIMIT_ENABLED: bool = field(
+        default_factory=lambda: config("RATE_LIMIT_ENABLED", default=True, cast=bool)
+    )
+    RATE_LIMIT_REDIS: bool = field(
+        default_factory=lambda: config("RATE_LIMIT_REDIS", default=True, cast=bool)
+    )
+    RATE_LIMIT_PER_MINUTE: int = field(
+        default_factory=lambda: config("RATE_LIMIT_PER_MINUTE", default=1200, cast=int)
+    )
+    RATE_LIMIT_BURST: int = field(
+        default_factory=lambda: config("RATE_LIMIT_BURST", default=200, cast=int)
+    )
+    RATE_LIMIT_INGEST_PER_MINUTE: int = field(
+        default_factory=lambda: config(
+            "RATE_LIMIT_INGEST_PER_MINUTE", default=6000, cast=int
+        )
+    )
+    RATE_LIMIT_INGEST_BURST: int = field(
+        default_factory=lambda: config(
+            "RATE_LIMIT_INGEST_BURST", default=1000, cast=int
+        )
+    )
+    # Proxies whose X-Forwarded-For is trusted (comma-separated CIDRs)
+    RATE_LIMIT_TRUSTED_PROXIES: str = field(
+        default_factory=lambda: config("RATE_LIMIT_TRUSTED_PROXIES", default="")
+    )
 
     # CORS
     CORS_ORIGINS: str = field(
@@ -116,6 +268,46 @@ class QuartConfig:
         default_factory=lambda: config("FLEET_API_TOKEN", default="")
     )
 
+    # Fleet inventory mirror (incremental background sync)
+    FLEET_MIRROR_ENABLED: bool = field(
+        default_factory=lambda: config("FLEET_MIRROR_ENABLED", default=True, cast=bool)
+    )
+    FLEET_SYNC_INTERVAL: float = field(
+        default_factory=lambda: config("FLEET_SYNC_INTERVAL", default=30.0, cast=float)
+    )
+    FLEET_FULL_SYNC_INTERVAL: float = field(
+        default_factory=lambda: config(
+            "FLEET_FULL_SYNC_INTERVAL", default=900.0, cast=float
+        )
+    )
+    FLEET_SYNC_PAGE_SIZE: int = field(
+        default_factory=lambda: config("FLEET_SYNC_PAGE_SIZE", default=500, cast=int)
+    )
+    FLEET_MIRROR_MAX_STALENESS: float = field(
+        default_factory=lambda: config(
+            "FLEET_MIRROR_MAX_STALENESS", default=300.0, cast=float
+        )
+    )
+    # Live query jobs: per-job Redis results stream, TTL after completion
+    FLEET_LIVE_QUERY_TIMEOUT: float = field(
+        default_factory=lambda: config(
+            "FLEET_LIVE_QUERY_TIMEOUT", default=300.0, cast=float
+        )
+    )
+    FLEET_LIVE_QUERY_TTL: int = field(
+        default_factory=lambda: config("FLEET_LIVE_QUERY_TTL", default=3600, cast=int)
+    )
+    FLEET_LIVE_QUERY_MAX_JOBS: int = field(
+        default_factory=lambda: config(
+            "FLEET_LIVE_QUERY_MAX_JOBS", default=20, cast=int
+        )
+    )
+    FLEET_LIVE_QUERY_MAX_RESULTS: int = field(
+        default_factory=lambda: config(
+            "FLEET_LIVE_QUERY_MAX_RESULTS", default=100000, cast=int
+        )
+    )
+
     # Internal Services
     LOG_RECEIVER_URL: str = field(
         default_factory=lambda: config(
@@ -4,9 +4,13 @@ Request/response processing middleware
 """
 
 from .auth import AuthMiddleware, require_auth, require_feature, require_role
+from .metrics import MetricsMiddleware
+from .rate_limit import RateLimitMiddleware
 
 __all__ = [
     "AuthMiddleware",
+    "MetricsMiddleware",
+    "RateLimitMiddleware",
     "require_auth",
     "require_feature",
     "require_role",
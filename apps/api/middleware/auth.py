@@ -12,7 +12,8 @@ from typing import Any, Callable, Dict, List, Optional
 import jwt
 import structlog
 from passlib.hash import bcrypt
-from quart import g, jsonify, request
+from py_libs.security.token_cache import TokenRevoked
+from quart import g, jsonify, request, websocket
 
 from config import get_config
 
@@ -51,27 +52,13 @@ class AuthMiddleware:
             g.auth = None
             return
 
-        auth_result = None
-        config = get_config()
-
-        # Try API Key authentication first
-        api_key = request.headers.get("X-API-Key")
-        if api_key:
-            auth_result = await AuthMiddleware._authenticate_api_key(api_key)
-
-        # Try JWT Bearer token
-        if not auth_result:
-            auth_header = request.headers.get("Authorization", "")
-            if auth_header.startswith("Bearer "):
-                token = auth_header[7:]
-                # Check if it's a license key (PENG- prefix)
-                if token.startswith("PENG-"):
-                    auth_result = await AuthMiddleware._authenticate_license(token)
-                else:
-                    auth_result = await AuthMiddleware._authenticate_jwt(token)
+        auth_result = await AuthMiddleware._authenticate_credentials(
+            request.headers.get("X-API-Key"),
+            AuthMiddleware._bearer_token(request.headers),
+        )
 
         # Store auth result
-        if auth_result and auth_result.get("authenticated"):
+        if auth_result:
             g.authenticated = True
             g.auth = auth_result
             g.user_id = auth_result.get("user_id")
@@ -80,23 +67,73 @@ class AuthMiddleware:
             g.auth = None
             g.user_id = None
 
+    @staticmethod
+    async def authenticate_websocket() -> Optional[Dict[str, Any]]:
+        """
+        Authenticate a WebSocket handshake
+
+        Before-request hooks do not run for WebSockets, so handlers call
+        this before accepting. Browsers cannot set headers on WebSocket
+        connections, so the token may also be sent as the ``token`` query
+        parameter.
+
+        Returns:
+            Auth context, or None if the client is not authenticated
+        """
+        token = AuthMiddleware._bearer_token(websocket.headers)
+        return await AuthMiddleware._authenticate_credentials(
+            websocket.headers.get("X-API-Key"),
+            token or websocket.args.get("token"),
+        )
+
+    @staticmethod
+    def _bearer_token(headers) -> Optional[str]:
+        auth_header = headers.get("Authorization", "")
+        if auth_header.startswith("Bearer "):
+            return auth_header[7:]
+        return None
+
+    @staticmethod
+    async def _authenticate_credentials(
+        api_key: Optional[str], token: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Try an API key, then a Bearer token (license key or JWT)"""
+        auth_result = None
+
+        # Try API Key authentication first
+        if api_key:
+            auth_result = await AuthMiddleware._authenticate_api_key(api_key)
+
+        # Try JWT Bearer token
+        if not auth_result and token:
+            # Check if it's a license key (PENG- prefix)
+            if token.startswith("PENG-"):
+                auth_result = await AuthMiddleware._authenticate_license(token)
+            else:
+                auth_result = await AuthMiddleware._authenticate_jwt(token)
+
+        if auth_result and auth_result.get("authenticated"):
+            return auth_result
+        return None
+
     @staticmethod
     async def _authenticate_api_key(api_key: str) -> Optional[Dict[str, Any]]:
         """Authenticate via API key"""
-        from models.database import get_db
+        from services.credential_cache import get_credential_cache
 
         try:
-            db = await get_db()
-            if not db:
-                return None
-
             key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+            credential_cache = get_credential_cache()
 
-            api_key_record = (
-                db((db.api_keys.key_hash == key_hash) & (db.api_keys.is_active == True))
-                .select()
-                .first()
-            )
+            hit = False
+            api_key_record = None
+            if credential_cache:
+                hit, api_key_record = credential_cache.get("api_key", key_hash)
+
+            if not hit:
+                api_key_record = await AuthMiddleware._load_api_key(key_hash)
+                if credential_cache:
+                    credential_cache.put("api_key", key_hash, api_key_record)
 
             if not api_key_record:
                 logger.warning("api_key_not_found")
@@ -104,47 +141,95 @@ class AuthMiddleware:
 
             # Check expiration
             if (
-                api_key_record.expires_at
-                and api_key_record.expires_at < datetime.utcnow()
+                api_key_record["expires_at"]
+                and api_key_record["expires_at"] < datetime.utcnow()
             ):
-                logger.warning("api_key_expired", key_name=api_key_record.name)
+                logger.warning("api_key_expired", key_name=api_key_record["name"])
                 return None
 
-            # Update last used
-            api_key_record.update_record(last_used=datetime.utcnow())
-            db.commit()
-
-            # Parse permissions
-            permissions = []
-            if api_key_record.permissions:
-                import json
-
-                try:
-                    permissions = json.loads(api_key_record.permissions)
-                except json.JSONDecodeError:
-                    permissions = api_key_record.permissions.split(",")
+            # Update last used (coalesced and flushed in batches when cached)
+            if credential_cache:
+                credential_cache.mark_used("api_key", api_key_record["id"])
+            else:
+                await AuthMiddleware._touch_api_key(api_key_record["id"])
 
-            logger.info("api_key_authenticated", key_name=api_key_record.name)
+            logger.info("api_key_authenticated", key_name=api_key_record["name"])
 
             return {
                 "method": "api_key",
                 "authenticated": True,
-                "user_id": api_key_record.user_id,
-                "api_key_id": api_key_record.id,
-                "permissions": permissions,
+                "user_id": api_key_record["user_id"],
+                "api_key_id": api_key_record["id"],
+                "permissions": list(api_key_record["permissions"]),
             }
 
         except Exception as e:
             logger.error("api_key_auth_error", error=str(e))
             return None
 
+    @staticmethod
+    async def _load_api_key(key_hash: str) -> Optional[Dict[str, Any]]:
+        """Load an active API key record as a plain dict for caching"""
+        from models.database import get_db
+
+        db = await get_db()
+        if not db:
+            raise RuntimeError("Database unavailable")
+
+        row = (
+            db((db.api_keys.key_hash == key_hash) & (db.api_keys.is_active == True))
+            .select()
+            .first()
+        )
+
+        if not row:
+            return None
+
+        # Parse permissions
+        permissions = []
+        if row.permissions:
+            import json
+
+            try:
+                permissions = json.loads(row.permissions)
+            except json.JSONDecodeError:
+                permissions = row.permissions.split(",")
+
+        return {
+            "id": row.id,
+            "user_id": row.user_id,
+            "name": row.name,
+            "expires_at": row.expires_at,
+            "permissions": tuple(permissions),
+        }
+
+    @staticmethod
+    async def _touch_api_key(api_key_id: int) -> None:
+        """Update API key last_used immediately (no credential cache)"""
+        from models.database import get_db
+
+        db = await get_db()
+        if db:
+            db(db.api_keys.id == api_key_id).update(last_used=datetime.utcnow())
+            db.commit()
+
     @staticmethod
     async def _authenticate_jwt(token: str) -> Optional[Dict[str, Any]]:
         """Authenticate via JWT token"""
+        from services.token_cache import get_token_cache
+
         config = get_config()
 
+        def decode(token: str) -> Dict[str, Any]:
+            return jwt.decode(token, config.JWT_SECRET, algorithms=["HS256"])
+
         try:
-            payload = jwt.decode(token, config.JWT_SECRET, algorithms=["HS256"])
+            # Signature is verified once per token; later requests hit the cache
+            cache = get_token_cache()
+            if cache is not None:
+                payload = cache.verify(token, decode, namespace=config.JWT_SECRET)
+            else:
+                payload = decode(token)
 
             logger.debug("jwt_authenticated", user_id=payload.get("user_id"))
 
@@ -156,61 +241,47 @@ class AuthMiddleware:
                 "role": payload.get("role", "user"),
                 "permissions": payload.get("permissions", []),
                 "exp": payload.get("exp"),
+                "jti": payload.get("jti"),
             }
 
         except jwt.ExpiredSignatureError:
             logger.warning("jwt_expired")
             return None
+        except TokenRevoked:
+            logger.warning("jwt_revoked")
+            return None
         except jwt.InvalidTokenError as e:
             logger.warning("jwt_invalid", error=str(e))
             return None
 
     @staticmethod
     async def _authenticate_license(license_key: str) -> Optional[Dict[str, Any]]:
-        """Authenticate via PenguinTech license key"""
-        config = get_config()
+        """Authenticate via PenguinTech license key (cached, single-flight)"""
+        from services.license_service import get_license_validation
 
         try:
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{config.LICENSE_SERVER_URL}/api/v2/validate",
-                    headers={"Authorization": f"Bearer {license_key}"},
-                    json={"product": config.PRODUCT_NAME},
-                    timeout=10.0,
-                )
-
-                if response.status_code != 200:
-                    logger.warning(
-                        "license_validation_failed", status=response.status_code
-                    )
-                    return None
-
-                data = response.json()
-
-                if not data.get("valid", False):
-                    logger.warning("license_invalid", message=data.get("message"))
-                    return None
+            data = await get_license_validation(license_key)
+            if data is None:
+                return None
 
-                # Extract feature entitlements
-                features = {f["name"]: f["entitled"] for f in data.get("features", [])}
+            # Extract feature entitlements
+            features = {f["name"]: f["entitled"] for f in data.get("features", [])}
 
-                logger.info(
-                    "license_authenticated",
-                    customer=data.get("customer"),
-                    tier=data.get("tier"),
-                )
+            logger.info(
+                "license_authenticated",
+                customer=data.get("customer"),
+                tier=data.get("tier"),
+            )
 
-                return {
-                    "method": "license",
-                    "authenticated": True,
-                    "customer": data.get("customer"),
-                    "tier": data.get("tier"),
-                    "features": features,
-                    "limits": data.get("limits", {}),
-                    "expires_at": data.get("expires_at"),
-                }
+            return {
+                "method": "license",
+                "authenticated": True,
+                "customer": data.get("customer"),
+                "tier": data.get("tier"),
+                "features": features,
+                "limits": data.get("limits", {}),
+                "expires_at": data.get("expires_at"),
+            }
 
         except Exception as e:
             logger.error("license_auth_error", error=str(e))
@@ -383,6 +454,7 @@ def generate_jwt_token(
         "permissions": permissions or [],
         "iat": datetime.utcnow(),
         "exp": datetime.utcnow() + timedelta(hours=expires_hours),
+        "jti": secrets.token_urlsafe(16),
     }
 
     return jwt.encode(payload, config.JWT_SECRET, algorithm="HS256")
@@ -0,0 +1,55 @@
+"""
+KillKrill API - Metrics Middleware
+Per-request Prometheus metrics labelled by matched route template
+"""
+
+import time
+
+import structlog
+from prometheus_client import REGISTRY
+from quart import Quart, g, request
+
+from shared.monitoring.metrics import UNMATCHED_ENDPOINT, RequestMetrics
+
+logger = structlog.get_logger(__name__)
+
+# killkrill_api_requests_total / killkrill_api_request_duration_seconds,
+# aggregated in memory and merged into the default registry on scrape
+request_metrics = RequestMetrics("killkrill_api")
+REGISTRY.register(request_metrics)
+
+
+class MetricsMiddleware:
+    """
+    Request metrics for Quart
+
+    Endpoints are labelled with the route rule (e.g.
+    /api/v1/sensors/checks/<check_id>) rather than the raw path, so IDs in
+    URLs do not create new series. Recording is a dict update with no
+    locking or registry lookups.
+    """
+
+    def __init__(self, app: Quart, metrics: RequestMetrics = request_metrics):
+        self.metrics = metrics
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    async def before_request(self) -> None:
+        """Start the request timer"""
+        g.metrics_start = time.perf_counter()
+
+    async def after_request(self, response):
+        """Record the request"""
+        start = g.get("metrics_start")
+        if start is not None:
+            rule = request.url_rule
+            try:
+                self.metrics.observe(
+                    request.method,
+                    rule.rule if rule is not None else UNMATCHED_ENDPOINT,
+                    str(response.status_code),
+                    time.perf_counter() - start,
+                )
+            except Exception as e:
+                logger.error("metrics_collection_error", error=str(e))
+        return response
@@ -0,0 +1,89 @@
+"""
+KillKrill API - Rate Limit Middleware
+Per-tenant token bucket limits, with a separate quota for ingestion
+endpoints
+"""
+
+from typing import Optional
+
+import structlog
+from py_libs.security.ratelimit import (
+    acquire_async,
+    client_address,
+    too_many_requests,
+)
+from quart import Quart, g, jsonify, request
+
+from services.rate_limiter import (
+    get_rate_limiter,
+    get_rate_limits,
+    get_trusted_proxies,
+)
+
+logger = structlog.get_logger(__name__)
+
+
+class RateLimitMiddleware:
+    """
+    Before-request rate limiting for Quart
+
+    Requests are keyed by tenant: the authenticated user, license customer
+    or API key when available, otherwise the client address. Only
+    credentials the auth middleware has validated count, and
+    X-Forwarded-For is only honoured from RATE_LIMIT_TRUSTED_PROXIES, so
+    rotating headers cannot mint fresh buckets. Ingestion
+    endpoints draw from their own, larger bucket so dashboards and sensors
+    do not starve each other.
+    """
+
+    # Never limited
+    EXEMPT_PATHS = {"/healthz", "/metrics"}
+
+    # Endpoints that use the ingestion quota
+    INGEST_ENDPOINTS = {"sensors.submit_results"}
+
+    def __init__(self, app: Quart):
+        app.before_request(self.before_request)
+
+    @staticmethod
+    def tenant_key() -> str:
+        """Bucket key for the current request"""
+        auth = g.get("auth")
+        if auth:
+            if auth.get("user_id") is not None:
+                return f"user:{auth['user_id']}"
+            if auth.get("customer"):
+                return f"license:{auth['customer']}"
+            if auth.get("api_key_id") is not None:
+                return f"key:{auth['api_key_id']}"
+
+        address = client_address(
+            request.remote_addr,
+            request.headers.get("X-Forwarded-For"),
+            get_trusted_proxies(),
+        )
+        return f"ip:{address}"
+
+    async def before_request(self) -> Optional[tuple]:
+        """Reject the request with 429 when its bucket is empty"""
+        limiter = get_rate_limiter()
+        if (
+            limiter is None
+            or request.method == "OPTIONS"
+            or request.path in self.EXEMPT_PATHS
+        ):
+            return None
+
+        default_limit, ingest_limit = get_rate_limits()
+        key = self.tenant_key()
+        limit = default_limit
+        if request.endpoint in self.INGEST_ENDPOINTS:
+            key, limit = f"ingest:{key}", ingest_limit
+
+        result = await acquire_async(limiter, key, limit=limit)
+        if result.allowed:
+            return None
+
+        logger.warning("rate_limited", key=key, retry_after=result.retry_after)
+        body, status, headers = too_many_requests(result)
+        return jsonify(body), status, headers
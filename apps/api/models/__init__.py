@@ -3,12 +3,22 @@ KillKrill API - Database Models
 PyDAL-based database models and utilities
 """
 
-from .database import DatabaseManager, close_database, get_db, init_database, release_db
+from .database import (
+    DatabaseManager,
+    close_database,
+    db_fetch,
+    db_run,
+    get_db,
+    init_database,
+    release_db,
+)
 
 __all__ = [
     "init_database",
     "close_database",
     "get_db",
     "release_db",
+    "db_run",
+    "db_fetch",
     "DatabaseManager",
 ]
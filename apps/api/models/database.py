@@ -4,87 +4,61 @@ Async-compatible connection pooling for Quart
 """
 
 import asyncio
+import copy
+import time
 from contextvars import ContextVar
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import structlog
+from prometheus_client import Counter, Gauge, Histogram
 from pydal import DAL, Field
 from quart import Quart
 
 from config import get_config
+from models.executor import DatabaseExecutor
+from shared.database.models import ensure_index
 
 logger = structlog.get_logger(__name__)
 
 # Context variable for async-safe database access
 _db_context: ContextVar[Optional[DAL]] = ContextVar("db", default=None)
 
+db_pool_connections = Gauge(
+    "killkrill_api_db_pool_connections",
+    "Pooled database connections",
+    ["state"],
+)
+db_pool_wait_seconds = Histogram(
+    "killkrill_api_db_pool_wait_seconds",
+    "Time spent checking out a pooled database connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+db_pool_timeouts = Counter(
+    "killkrill_api_db_pool_timeouts_total",
+    "Connection checkouts that timed out",
+)
+
 # Global database manager
 _db_manager: Optional["DatabaseManager"] = None
 
 
-class DatabaseManager:
-    """
-    Manages PyDAL connections in async context with connection pooling
-    """
-
-    def __init__(self, config=None):
-        self.config = config or get_config()
-        self._pool: List[DAL] = []
-        self._pool_size = self.config.DB_POOL_SIZE
-        self._lock = asyncio.Lock()
-        self._initialized = False
-
-    async def initialize(self) -> None:
-        """Initialize connection pool"""
-        if self._initialized:
-            return
-
-        # Convert PostgreSQL URL for PyDAL compatibility
-        db_url = self.config.DATABASE_URL
-        if db_url.startswith("postgresql://"):
-            db_url = db_url.replace("postgresql://", "postgres://")
-
-        logger.info("initializing_database", pool_size=self._pool_size)
-
-        # Create initial connections
-        for i in range(self._pool_size):
-            try:
-                db = DAL(
-                    db_url,
-                    pool_size=1,
-                    migrate=self.config.DB_MIGRATE,
-                    fake_migrate=False,
-                    lazy_tables=True,
-                )
-                self._define_tables(db)
-                self._pool.append(db)
-                logger.debug("database_connection_created", connection_id=i)
-            except Exception as e:
-                logger.error(
-                    "database_connection_failed", error=str(e), connection_id=i
-                )
-                raise
-
-        self._initialized = True
-        logger.info("database_initialized", connections=len(self._pool))
-
-    def _define_tables(self, db: DAL) -> None:
-        """Define all database tables"""
-
-        # Health checks table
-        db.define_table(
-            "health_checks",
+# Table definitions, built once and shared by every connection
+SCHEMA: Tuple[Tuple[str, Tuple[Field, ...]], ...] = (
+    # Health checks table
+    (
+        "health_checks",
+        (
             Field("timestamp", "datetime", default=datetime.utcnow),
             Field("status", "string", length=50, default="ok"),
             Field("component", "string", length=100),
             Field("details", "text"),
-            migrate=True,
-        )
-
-        # Users table
-        db.define_table(
-            "users",
+        ),
+    ),
+    # Users table
+    (
+        "users",
+        (
             Field("username", "string", length=100, unique=True, notnull=True),
             Field("email", "string", length=255, unique=True, notnull=True),
             Field("password_hash", "string", length=255, notnull=True),
@@ -100,12 +74,12 @@ class DatabaseManager:
                 update=datetime.utcnow,
             ),
             Field("last_login", "datetime"),
-            migrate=True,
-        )
-
-        # API Keys table
-        db.define_table(
-            "api_keys",
+        ),
+    ),
+    # API Keys table
+    (
+        "api_keys",
+        (
             Field("user_id", "reference users", notnull=True),
             Field("name", "string", length=100, notnull=True),
             Field("key_hash", "string", length=255, notnull=True),
@@ -114,34 +88,34 @@ class DatabaseManager:
             Field("created_at", "datetime", default=datetime.utcnow),
             Field("expires_at", "datetime"),
             Field("last_used", "datetime"),
-            migrate=True,
-        )
-
-        # Refresh tokens table
-        db.define_table(
-            "refresh_tokens",
+        ),
+    ),
+    # Refresh tokens table
+    (
+        "refresh_tokens",
+        (
             Field("user_id", "reference users", notnull=True),
             Field("token_hash", "string", length=255, unique=True, notnull=True),
             Field("created_at", "datetime", default=datetime.utcnow),
             Field("expires_at", "datetime", notnull=True),
             Field("revoked", "boolean", default=False),
             Field("revoked_at", "datetime"),
-            migrate=True,
-        )
-
-        # License usage tracking
-        db.define_table(
-            "license_usage",
+        ),
+    ),
+    # License usage tracking
+    (
+        "license_usage",
+        (
             Field("feature_name", "string", length=100, notnull=True),
             Field("user_id", "reference users"),
             Field("usage_count", "integer", default=1),
             Field("last_used", "datetime", default=datetime.utcnow),
-            migrate=True,
-        )
-
-        # Sensor agents table
-        db.define_table(
-            "sensor_agents",
+        ),
+    ),
+    # Sensor agents table
+    (
+        "sensor_agents",
+        (
             Field("agent_id", "string", length=100, unique=True, notnull=True),
             Field("name", "string", length=200, notnull=True),
             Field("location", "string", length=200),
@@ -150,12 +124,12 @@ class DatabaseManager:
             Field("last_heartbeat", "datetime"),
             Field("created_at", "datetime", default=datetime.utcnow),
             Field("metadata", "text"),  # JSON additional metadata
-            migrate=True,
-        )
-
-        # Sensor checks configuration
-        db.define_table(
-            "sensor_checks",
+        ),
+    ),
+    # Sensor checks configuration
+    (
+        "sensor_checks",
+        (
             Field("check_id", "string", length=100, unique=True, notnull=True),
             Field("name", "string", length=200, notnull=True),
             Field(
@@ -176,12 +150,12 @@ class DatabaseManager:
                 default=datetime.utcnow,
                 update=datetime.utcnow,
             ),
-            migrate=True,
-        )
-
-        # Sensor results
-        db.define_table(
-            "sensor_results",
+        ),
+    ),
+    # Sensor results
+    (
+        "sensor_results",
+        (
             Field("agent_id", "string", length=100, notnull=True),
             Field("check_id", "string", length=100, notnull=True),
             Field("timestamp", "datetime", default=datetime.utcnow),
@@ -193,12 +167,12 @@ class DatabaseManager:
             Field("error_message", "text"),
             Field("ssl_expiry", "datetime"),
             Field("ssl_valid", "boolean"),
-            migrate=True,
-        )
-
-        # AI analyses (enterprise feature)
-        db.define_table(
-            "ai_analyses",
+        ),
+    ),
+    # AI analyses (enterprise feature)
+    (
+        "ai_analyses",
+        (
             Field("analysis_id", "string", length=100, unique=True, notnull=True),
             Field("timestamp", "datetime", default=datetime.utcnow),
             Field("analysis_type", "string", length=100),
@@ -211,12 +185,12 @@ class DatabaseManager:
             Field("is_acknowledged", "boolean", default=False),
             Field("acknowledged_by", "string", length=100),
             Field("acknowledged_at", "datetime"),
-            migrate=True,
-        )
-
-        # Audit log
-        db.define_table(
-            "audit_log",
+        ),
+    ),
+    # Audit log
+    (
+        "audit_log",
+        (
             Field("timestamp", "datetime", default=datetime.utcnow),
             Field("user_id", "reference users"),
             Field("action", "string", length=100, notnull=True),
@@ -225,44 +199,269 @@ class DatabaseManager:
             Field("details", "text"),  # JSON
             Field("ip_address", "string", length=45),
             Field("user_agent", "text"),
-            migrate=True,
+        ),
+    ),
+)
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no pooled connection became available in time"""
+
+
+class DatabaseManager:
+    """
+    Manages PyDAL connections in async context with a bounded, lazy pool
+
+    Tables are migrated once at startup; further connections are opened on
+    demand (up to DB_POOL_SIZE) with migrations off and lazy tables.
+    Checkout waits up to DB_POOL_TIMEOUT when the pool is exhausted,
+    validates connections that sat idle, and recycles old ones.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self._max_size = self.config.DB_POOL_SIZE
+        self._timeout = self.config.DB_POOL_TIMEOUT
+        self._recycle = self.config.DB_POOL_RECYCLE
+        self._validate_idle = self.config.DB_POOL_VALIDATE_IDLE
+        self._idle: List[DAL] = []
+        # id(db) -> (created_at, last_released_at) on the monotonic clock
+        self._meta: Dict[int, List[float]] = {}
+        self._size = 0
+        self._cond = asyncio.Condition()
+        self._initialized = False
+        self.executor: Optional[DatabaseExecutor] = None
+
+    def _db_url(self) -> str:
+        """Database URL in PyDAL form"""
+        db_url = self.config.DATABASE_URL
+        if db_url.startswith("postgresql://"):
+            db_url = db_url.replace("postgresql://", "postgres://")
+        return db_url
+
+    def _open(self, migrate: bool = False) -> DAL:
+        """
+        Open a connection with all tables defined
+
+        Only the startup connection migrates, and it defines tables eagerly
+        so every table is created; migrate_enabled=False keeps every other
+        connection from touching the schema.
+        """
+        db = DAL(
+            self._db_url(),
+            pool_size=1,
+            migrate=migrate,
+            migrate_enabled=migrate,
+            fake_migrate=False,
+            lazy_tables=not migrate,
+        )
+        self._define_tables(db)
+        return db
+
+    def _open_detached(self) -> Tuple[DAL, Any]:
+        """
+        Open a connection on a helper thread and unbind it from that thread
+
+        PyDAL keeps the driver connection in a thread local, so it is
+        handed back to be rebound on the event loop thread.
+        """
+        db = self._open()
+        connection = db._adapter.connection
+        db._adapter.set_connection(None)
+        return db, connection
+
+    async def initialize(self) -> None:
+        """Migrate tables and open the first pooled connection"""
+        if self._initialized:
+            return
+
+        logger.info("initializing_database", max_pool_size=self._max_size)
+
+        try:
+            db = self._open(migrate=self.config.DB_MIGRATE)
+            if self.config.DB_MIGRATE:
+                self._create_indexes(db)
+        except Exception as e:
+            logger.error("database_connection_failed", error=str(e))
+            raise
+
+        now = time.monotonic()
+        self._meta[id(db)] = [now, now]
+        self._idle.append(db)
+        self._size = 1
+        self._update_gauges()
+
+        # Worker threads for blocking queries, each with its own connection
+        asyncpg_dsn = None
+        if self.config.DB_ASYNCPG and self._db_url().startswith("postgres://"):
+            asyncpg_dsn = self.config.DATABASE_URL
+        self.executor = DatabaseExecutor(
+            self._open,
+            max_workers=self.config.DB_EXECUTOR_WORKERS,
+            asyncpg_dsn=asyncpg_dsn,
+            recycle=self._recycle,
+            validate_idle=self._validate_idle,
         )
 
+        self._initialized = True
+        logger.info("database_initialized")
+
+    def _define_tables(self, db: DAL) -> None:
+        """Define all database tables from the shared schema"""
+        for tablename, fields in SCHEMA:
+            # Copies keep the shared Field templates unbound
+            db.define_table(tablename, *(copy.copy(field) for field in fields))
         db.commit()
 
+    def _create_indexes(self, db: DAL) -> None:
+        """Create composite indexes backing keyset pagination"""
+        results = db.sensor_results
+        ensure_index(
+            db,
+            results,
+            "idx_sensor_results_check_ts",
+            results.check_id,
+            results.timestamp,
+        )
+        ensure_index(
+            db,
+            results,
+            "idx_sensor_results_agent_ts",
+            results.agent_id,
+            results.timestamp,
+        )
+        ensure_index(db, db.ai_analyses, "idx_ai_analyses_ts", db.ai_analyses.timestamp)
+
     async def get_connection(self) -> DAL:
-        """Get a database connection from pool"""
-        async with self._lock:
-            if self._pool:
-                return self._pool.pop()
-            else:
-                # Create new connection if pool exhausted
-                logger.warning("database_pool_exhausted", creating_new=True)
-                db_url = self.config.DATABASE_URL
-                if db_url.startswith("postgresql://"):
-                    db_url = db_url.replace("postgresql://", "postgres://")
-                db = DAL(db_url, pool_size=1, migrate=False)
-                self._define_tables(db)
-                return db
+        """
+        Check out a connection, opening one if the pool is below its limit
+
+        Raises:
+            PoolTimeout: If the pool stayed exhausted for DB_POOL_TIMEOUT
+        """
+        started = time.monotonic()
+        deadline = started + self._timeout
+
+        while True:
+            db = None
+            async with self._cond:
+                while not self._idle and self._size >= self._max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        db_pool_timeouts.inc()
+                        logger.warning("database_pool_timeout", size=self._size)
+                        raise PoolTimeout("Timed out waiting for a database connection")
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        continue
+
+                if self._idle:
+                    db = self._idle.pop()
+                else:
+                    # Reserve the slot before connecting outside the lock
+                    self._size += 1
+
+            if db is None:
+                try:
+                    db, connection = await asyncio.to_thread(self._open_detached)
+                except Exception:
+                    await self._discard(None)
+                    raise
+                db._adapter.set_connection(connection)
+                now = time.monotonic()
+                self._meta[id(db)] = [now, now]
+                logger.debug("database_connection_created", size=self._size)
+            elif not self._usable(db):
+                await self._discard(db)
+                continue
+
+            db_pool_wait_seconds.observe(time.monotonic() - started)
+            self._update_gauges()
+            return db
+
+    def _usable(self, db: DAL) -> bool:
+        """Recycle old connections and ping ones that sat idle"""
+        created_at, released_at = self._meta.get(id(db), (0.0, 0.0))
+        now = time.monotonic()
+        if now - created_at > self._recycle:
+            logger.debug("database_connection_recycled")
+            return False
+        if now - released_at > self._validate_idle:
+            try:
+                db.executesql("SELECT 1")
+            except Exception as e:
+                logger.warning("database_connection_invalid", error=str(e))
+                return False
+        return True
+
+    async def _discard(self, db: Optional[DAL]) -> None:
+        """Close a connection and free its pool slot"""
+        if db is not None:
+            self._meta.pop(id(db), None)
+            try:
+                db.close()
+            except Exception as e:
+                logger.debug("database_close_error", error=str(e))
+
+        async with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        self._update_gauges()
 
     async def release_connection(self, db: DAL) -> None:
-        """Return connection to pool"""
-        async with self._lock:
-            if len(self._pool) < self._pool_size:
-                self._pool.append(db)
-            else:
-                db.close()
+        """Return a connection to the pool, ending any open transaction"""
+        try:
+            db.rollback()
+        except Exception as e:
+            logger.warning("database_connection_broken", error=str(e))
+            await self._discard(db)
+            return
+
+        if not self._initialized:
+            await self._discard(db)
+            return
+
+        meta = self._meta.get(id(db))
+        if meta is not None:
+            meta[1] = time.monotonic()
+
+        async with self._cond:
+            self._idle.append(db)
+            self._cond.notify()
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        db_pool_connections.labels(state="idle").set(len(self._idle))
+        db_pool_connections.labels(state="in_use").set(self._size - len(self._idle))
+
+    def stats(self) -> Dict[str, int]:
+        """Get pool size, idle and in-use counts"""
+        return {
+            "max_size": self._max_size,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._size - len(self._idle),
+        }
 
     async def close_all(self) -> None:
-        """Close all connections"""
-        async with self._lock:
-            for db in self._pool:
-                try:
-                    db.close()
-                except Exception as e:
-                    logger.error("database_close_error", error=str(e))
-            self._pool.clear()
+        """Close idle connections; checked-out ones close when released"""
+        async with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
             self._initialized = False
+
+        for db in idle:
+            self._meta.pop(id(db), None)
+            try:
+                db.close()
+            except Exception as e:
+                logger.error("database_close_error", error=str(e))
+        self._update_gauges()
+
+        if self.executor is not None:
+            await self.executor.close()
+            self.executor = None
         logger.info("database_connections_closed")
 
 
@@ -289,7 +488,10 @@ async def get_db() -> Optional[DAL]:
 
     db = _db_context.get()
     if db is None:
-        db = await _db_manager.get_connection()
+        try:
+            db = await _db_manager.get_connection()
+        except PoolTimeout:
+            return None
         _db_context.set(db)
     return db
 
@@ -301,3 +503,32 @@ async def release_db() -> None:
     if db is not None and _db_manager is not None:
         await _db_manager.release_connection(db)
         _db_context.set(None)
+
+
+async def db_run(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run blocking PyDAL work off the event loop
+
+    fn is called as fn(db, *args, **kwargs) on a database worker thread
+    and committed on success. Example:
+
+        rows = await db_run(lambda db: db(db.users).select().as_list())
+
+    Raises:
+        RuntimeError: If the database is not initialized
+    """
+    if _db_manager is None or _db_manager.executor is None:
+        raise RuntimeError("Database not initialized")
+    return await _db_manager.executor.run(fn, *args, **kwargs)
+
+
+async def db_fetch(sql: str, *params) -> List[Dict[str, Any]]:
+    """
+    Run a raw read query ($1, $2, ... parameters) and return dict rows
+
+    Raises:
+        RuntimeError: If the database is not initialized
+    """
+    if _db_manager is None or _db_manager.executor is None:
+        raise RuntimeError("Database not initialized")
+    return await _db_manager.executor.fetch(sql, *params)
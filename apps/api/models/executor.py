@@ -0,0 +1,186 @@
+"""
+KillKrill API - Database Executor
+Runs blocking PyDAL work on worker threads so queries never block the
+event loop, with an optional asyncpg fast path for raw read queries
+"""
+
+import asyncio
+import functools
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+from pydal import DAL
+
+try:
+    import asyncpg
+except ImportError:  # asyncpg is optional; raw queries fall back to PyDAL
+    asyncpg = None
+
+logger = structlog.get_logger(__name__)
+
+# Positional parameters in raw SQL are written asyncpg style ($1, $2, ...)
+_PARAM_RE = re.compile(r"\$(\d+)")
+
+
+class DatabaseExecutor:
+    """
+    Sized thread pool where every worker owns one PyDAL connection
+
+    PyDAL connections are bound to the thread that opened them, so each
+    worker lazily creates its own DAL on first use and reuses it. Like the
+    request pool, a worker reconnects once its connection is older than
+    recycle seconds, pings it after validate_idle seconds unused, and drops
+    it when a failed call cannot even be rolled back. The pool size bounds
+    both concurrency and the number of connections used for offloaded work.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], DAL],
+        max_workers: int = 8,
+        asyncpg_dsn: Optional[str] = None,
+        recycle: float = 1800.0,
+        validate_idle: float = 30.0,
+    ):
+        self._connect = connect
+        self.max_workers = max_workers
+        self._recycle = recycle
+        self._validate_idle = validate_idle
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="killkrill-db"
+        )
+        self._local = threading.local()
+        self._asyncpg_dsn = asyncpg_dsn if asyncpg is not None else None
+        self._asyncpg_pool = None
+        self._asyncpg_lock = asyncio.Lock()
+
+    # ============== PyDAL on worker threads ==============
+
+    def _thread_db(self) -> DAL:
+        db = getattr(self._local, "db", None)
+        if db is not None and not self._usable(db):
+            self._drop(db)
+            db = None
+        if db is None:
+            db = self._connect()
+            self._local.db = db
+            self._local.created_at = self._local.used_at = time.monotonic()
+            logger.debug(
+                "database_worker_connected", thread=threading.current_thread().name
+            )
+        return db
+
+    def _usable(self, db: DAL) -> bool:
+        """Recycle old connections and ping ones that sat idle"""
+        now = time.monotonic()
+        if now - self._local.created_at > self._recycle:
+            logger.debug("database_worker_connection_recycled")
+            return False
+        if now - self._local.used_at > self._validate_idle:
+            try:
+                db.executesql("SELECT 1")
+            except Exception as e:
+                logger.warning("database_worker_connection_invalid", error=str(e))
+                return False
+        return True
+
+    def _drop(self, db: DAL) -> None:
+        """Close this worker's connection; the next call opens a new one"""
+        self._local.db = None
+        try:
+            db.close()
+        except Exception as e:
+            logger.debug("database_close_error", error=str(e))
+
+    def _call(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]):
+        db = self._thread_db()
+        try:
+            result = fn(db, *args, **kwargs)
+            db.commit()
+            return result
+        except Exception:
+            try:
+                db.rollback()
+            except Exception as e:
+                # The connection itself is gone; fn's error is re-raised below
+                logger.warning("database_worker_connection_broken", error=str(e))
+                self._drop(db)
+            raise
+        finally:
+            self._local.used_at = time.monotonic()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(db, *args, **kwargs) on a worker thread
+
+        The transaction is committed when fn returns and rolled back if it
+        raises. Return plain data (e.g. rows.as_list()) rather than lazy
+        PyDAL objects.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self._call, fn, args, kwargs)
+        )
+
+    # ============== Raw read queries ==============
+
+    async def fetch(self, sql: str, *params) -> List[Dict[str, Any]]:
+        """
+        Run a raw read query and return rows as dicts
+
+        Uses asyncpg when available, otherwise PyDAL executesql on a worker
+        thread. Parameters are written as $1, $2, ... in either case.
+        """
+        pool = await self._get_asyncpg_pool()
+        if pool is not None:
+            rows = await pool.fetch(sql, *params)
+            return [dict(row) for row in rows]
+
+        return await self.run(_executesql, sql, params)
+
+    async def _get_asyncpg_pool(self):
+        if self._asyncpg_dsn is None:
+            return None
+        if self._asyncpg_pool is None:
+            async with self._asyncpg_lock:
+                if self._asyncpg_pool is None:
+                    try:
+                        self._asyncpg_pool = await asyncpg.create_pool(
+                            self._asyncpg_dsn, min_size=1, max_size=self.max_workers
+                        )
+                        logger.info("asyncpg_pool_created", size=self.max_workers)
+                    except Exception as e:
+                        logger.warning("asyncpg_pool_failed", error=str(e))
+                        self._asyncpg_dsn = None
+                        return None
+        return self._asyncpg_pool
+
+    # ============== Lifecycle ==============
+
+    async def close(self) -> None:
+        """Close the asyncpg pool and stop worker threads"""
+        if self._asyncpg_pool is not None:
+            await self._asyncpg_pool.close()
+            self._asyncpg_pool = None
+
+        # Worker connections are thread-bound; they close with their threads
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
+
+
+def _executesql(db: DAL, sql: str, params: tuple) -> List[Dict[str, Any]]:
+    """Execute $n-parameterized SQL through PyDAL's driver"""
+    placeholder = "?" if db._adapter.dbengine == "sqlite" else "%s"
+    ordered = []
+
+    def substitute(match):
+        ordered.append(params[int(match.group(1)) - 1])
+        return placeholder
+
+    converted = _PARAM_RE.sub(substitute, sql)
+    return db.executesql(converted, placeholders=ordered, as_dict=True)
@@ -3,14 +3,83 @@ KillKrill API - Services
 Business logic and external service integrations
 """
 
-from .license_service import check_feature, get_license_info, init_license
+from .audit_log import audit, close_audit_log, get_audit_writer, init_audit_log
+from .credential_cache import (
+    close_credential_cache,
+    get_credential_cache,
+    init_credential_cache,
+)
+from .fleet_mirror import close_fleet_mirror, get_fleet_mirror, init_fleet_mirror
+from .license_service import (
+    check_feature,
+    close_license,
+    get_license_info,
+    get_license_validation,
+    init_license,
+)
+from .live_query import (
+    JobLimitReached,
+    close_live_queries,
+    get_live_queries,
+    init_live_queries,
+)
+from .log_tail import close_log_tail, get_log_tail, init_log_tail
+from .password_hasher import (
+    HasherBusy,
+    close_password_hasher,
+    get_password_hasher,
+    init_password_hasher,
+)
+from .rate_limiter import get_rate_limiter, init_rate_limiter
 from .redis_service import close_redis, get_redis, init_redis
+from .status_index import get_status_index, init_status_index
+from .token_cache import (
+    close_token_cache,
+    get_token_cache,
+    init_token_cache,
+    revoke_token,
+)
+from .ws_hub import close_ws_hub, get_ws_hub, init_ws_hub
 
 __all__ = [
     "init_redis",
     "close_redis",
     "get_redis",
+    "init_audit_log",
+    "close_audit_log",
+    "get_audit_writer",
+    "audit",
+    "init_rate_limiter",
+    "get_rate_limiter",
+    "init_credential_cache",
+    "close_credential_cache",
+    "get_credential_cache",
+    "init_password_hasher",
+    "close_password_hasher",
+    "get_password_hasher",
+    "HasherBusy",
+    "init_token_cache",
+    "close_token_cache",
+    "get_token_cache",
+    "revoke_token",
+    "init_status_index",
+    "get_status_index",
+    "init_ws_hub",
+    "close_ws_hub",
+    "get_ws_hub",
+    "init_log_tail",
+    "close_log_tail",
+    "get_log_tail",
+    "init_fleet_mirror",
+    "close_fleet_mirror",
+    "get_fleet_mirror",
+    "init_live_queries",
+    "close_live_queries",
+    "get_live_queries",
+    "JobLimitReached",
     "init_license",
+    "close_license",
+    "get_license_validation",
     "check_feature",
     "get_license_info",
 ]
@@ -0,0 +1,273 @@
+"""
+KillKrill API - Audit Log Writer
+Handlers queue audit events and return; a background task writes them to
+the audit_log table in multi-row batches
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+import structlog
+from prometheus_client import Counter, Gauge, Histogram
+from py_libs.security.ratelimit import client_address
+from quart import Quart, g, has_request_context, request
+
+from services.rate_limiter import get_trusted_proxies
+from shared.database.audit import AuditEvent
+from shared.database.models import insert_many
+
+logger = structlog.get_logger(__name__)
+
+audit_events = Counter(
+    "killkrill_api_audit_events_total",
+    "Audit events by outcome (written, dropped when the queue is full, "
+    "failed when the batch write failed)",
+    ["result"],
+)
+audit_events_late = Counter(
+    "killkrill_api_audit_events_late_total",
+    "Audit events written later than AUDIT_LATE_SECONDS after being queued",
+)
+audit_event_lag = Histogram(
+    "killkrill_api_audit_event_lag_seconds",
+    "Time from queueing an audit event to committing it",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+audit_queue_depth = Gauge(
+    "killkrill_api_audit_queue_depth", "Audit events waiting to be written"
+)
+
+# Global audit writer
+_audit_writer: Optional["AuditWriter"] = None
+
+
+def _row(event: AuditEvent) -> Dict[str, Any]:
+    return {
+        "timestamp": event.timestamp,
+        "user_id": event.user_id,
+        "action": event.action,
+        "resource_type": event.resource_type,
+        "resource_id": event.resource_id,
+        "details": json.dumps(event.details, default=str) if event.details else None,
+        "ip_address": event.ip_address,
+        "user_agent": event.user_agent,
+    }
+
+
+async def _write_rows(rows: List[Dict[str, Any]]) -> None:
+    from models.database import db_run
+
+    await db_run(lambda db: insert_many(db, db.audit_log, rows))
+
+
+class AuditWriter:
+    """
+    Bounded audit event queue drained by one background writer
+
+    ``record`` never waits: when ``max_queue`` events are pending the event
+    is dropped and counted. The writer commits up to ``batch_size`` events
+    per INSERT, waiting at most ``flush_interval`` seconds to fill a batch.
+    ``stop`` writes whatever is still queued before returning.
+    """
+
+    def __init__(
+        self,
+        write=_write_rows,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        late_after: float = 5.0,
+    ):
+        self._write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.late_after = late_after
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        # Events taken off the queue but not yet handed to a write, and the
+        # write in progress; stop() finishes both
+        self._gathering: List[AuditEvent] = []
+        self._inflight: Optional[asyncio.Task] = None
+
+    def record(self, event: AuditEvent) -> bool:
+        """
+        Queue an event for writing
+
+        Returns:
+            False if the queue was full and the event was dropped
+        """
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            audit_events.labels(result="dropped").inc()
+            logger.warning("audit_event_dropped", action=event.action)
+            return False
+        audit_queue_depth.set(self._queue.qsize())
+        return True
+
+    async def _next_batch(self) -> List[AuditEvent]:
+        """Wait for one event, then gather more until full or flush_interval"""
+        loop = asyncio.get_running_loop()
+        batch = self._gathering = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        self._gathering = []
+        return batch
+
+    async def _flush(self, batch: List[AuditEvent]) -> None:
+        """Write one batch; a failed batch is logged and counted, not retried"""
+        try:
+            await self._write([_row(event) for event in batch])
+        except Exception as e:
+            audit_events.labels(result="failed").inc(len(batch))
+            logger.error("audit_batch_write_failed", events=len(batch), error=str(e))
+            return
+
+        audit_events.labels(result="written").inc(len(batch))
+        for event in batch:
+            lag = event.lag()
+            audit_event_lag.observe(lag)
+            if lag > self.late_after:
+                audit_events_late.inc()
+        audit_queue_depth.set(self._queue.qsize())
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            # Shielded so cancelling the writer never abandons a write
+            self._inflight = asyncio.create_task(self._flush(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    async def _flush_all(self, events: List[AuditEvent]) -> None:
+        for start in range(0, len(events), self.batch_size):
+            await self._flush(events[start : start + self.batch_size])
+
+    def start(self) -> None:
+        """Start the background writer"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> int:
+        """
+        Stop the writer and write every event still queued
+
+        Returns:
+            Number of events that were still queued
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+
+        pending, self._gathering = self._gathering, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+
+        try:
+            await asyncio.wait_for(self._flush_all(pending), timeout)
+        except asyncio.TimeoutError:
+            logger.error("audit_shutdown_flush_timeout", pending=len(pending))
+        return len(pending)
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and capacity"""
+        return {"queued": self._queue.qsize(), "max_queue": self._queue.maxsize}
+
+
+def audit(
+    action: str,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[Any] = None,
+    details: Optional[Dict[str, Any]] = None,
+    user_id: Optional[Any] = None,
+) -> bool:
+    """
+    Queue an audit event for the current request
+
+    The acting user, client IP and user agent are taken from the request
+    when called inside one; user_id overrides the authenticated user. The
+    client IP is resolved like the rate limiter's, so clients cannot
+    write a spoofed address into the trail.
+
+    Returns:
+        False if the event was not queued
+    """
+    if _audit_writer is None:
+        return False
+
+    event = AuditEvent(
+        action=action,
+        user_id=user_id,
+        resource_type=resource_type,
+        resource_id=None if resource_id is None else str(resource_id),
+        details=details,
+    )
+    if has_request_context():
+        auth = g.get("auth") or {}
+        if event.user_id is None:
+            event.user_id = auth.get("user_id")
+        # X-Forwarded-For only counts when set by a trusted proxy
+        event.ip_address = client_address(
+            request.remote_addr,
+            request.headers.get("X-Forwarded-For"),
+            get_trusted_proxies(),
+        )
+        event.user_agent = request.headers.get("User-Agent")
+    return _audit_writer.record(event)
+
+
+async def init_audit_log(app: Quart) -> None:
+    """Initialize the background audit log writer"""
+    global _audit_writer
+
+    config = app.killkrill_config
+    _audit_writer = AuditWriter(
+        max_queue=config.AUDIT_QUEUE_SIZE,
+        batch_size=config.AUDIT_BATCH_SIZE,
+        flush_interval=config.AUDIT_FLUSH_INTERVAL,
+        late_after=config.AUDIT_LATE_SECONDS,
+    )
+    _audit_writer.start()
+    app.audit_writer = _audit_writer
+    logger.info(
+        "audit_log_initialized",
+        max_queue=config.AUDIT_QUEUE_SIZE,
+        batch_size=config.AUDIT_BATCH_SIZE,
+    )
+
+
+async def close_audit_log(app: Quart) -> None:
+    """Write queued audit events and stop the writer"""
+    global _audit_writer
+
+    if _audit_writer:
+        flushed = await _audit_writer.stop(app.killkrill_config.AUDIT_SHUTDOWN_TIMEOUT)
+        _audit_writer = None
+        logger.info("audit_log_closed", flushed=flushed)
+
+
+def get_audit_writer() -> Optional[AuditWriter]:
+    """Get audit log writer"""
+    return _audit_writer
@@ -0,0 +1,315 @@
+"""
+KillKrill API - Credential Cache
+In-process TTL/LRU cache for API-key and sensor-key lookups
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from prometheus_client import Counter
+from quart import Quart
+
+logger = structlog.get_logger(__name__)
+
+# Redis pub/sub channel used to evict revoked credentials on every API instance
+INVALIDATION_CHANNEL = "killkrill:credentials:invalidate"
+
+# Credential kinds and the (table, timestamp field) their usage is written to
+CREDENTIAL_KINDS: Dict[str, Tuple[str, str]] = {
+    "api_key": ("api_keys", "last_used"),
+    "sensor": ("sensor_agents", "last_heartbeat"),
+}
+
+credential_cache_lookups = Counter(
+    "killkrill_api_credential_cache_lookups_total",
+    "Credential cache lookups",
+    ["kind", "result"],
+)
+
+# Global credential cache
+_credential_cache: Optional["CredentialCache"] = None
+
+
+class CredentialCache:
+    """
+    TTL/LRU cache of credential records keyed by key hash
+
+    Valid credentials are cached for ``ttl`` seconds, unknown or inactive
+    key hashes are cached as ``None`` for ``negative_ttl`` seconds so that
+    repeated bad keys do not reach the database. Usage timestamps are
+    coalesced in memory and written in batched UPDATEs every
+    ``flush_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 60,
+        negative_ttl: int = 10,
+        max_entries: int = 10000,
+        flush_interval: float = 5.0,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+
+        # (kind, key_hash) -> (expires_at, record or None)
+        self._entries: (
+            "OrderedDict[Tuple[str, str], Tuple[float, Optional[Dict[str, Any]]]]"
+        ) = OrderedDict()
+        # (kind, record_id) -> key_hash, so revocations by ID can evict entries
+        self._by_record: Dict[Tuple[str, Any], str] = {}
+        # kind -> {record_id: last seen timestamp}
+        self._pending_usage: Dict[str, Dict[Any, datetime]] = {
+            kind: {} for kind in CREDENTIAL_KINDS
+        }
+
+        self._redis = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listen_task: Optional[asyncio.Task] = None
+
+    # ============== Lookup ==============
+
+    def get(self, kind: str, key_hash: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a cached credential
+
+        Returns:
+            (hit, record) - record is None for a negatively cached key
+        """
+        cache_key = (kind, key_hash)
+        entry = self._entries.get(cache_key)
+
+        if entry is None:
+            credential_cache_lookups.labels(kind=kind, result="miss").inc()
+            return False, None
+
+        expires_at, record = entry
+        if expires_at < time.monotonic():
+            self._evict(cache_key)
+            credential_cache_lookups.labels(kind=kind, result="expired").inc()
+            return False, None
+
+        self._entries.move_to_end(cache_key)
+        credential_cache_lookups.labels(
+            kind=kind, result="hit" if record else "negative_hit"
+        ).inc()
+        return True, record
+
+    def put(self, kind: str, key_hash: str, record: Optional[Dict[str, Any]]) -> None:
+        """Cache a credential record, or None to negatively cache the key"""
+        cache_key = (kind, key_hash)
+        ttl = self.ttl if record else self.negative_ttl
+
+        if cache_key in self._entries:
+            self._evict(cache_key)
+
+        self._entries[cache_key] = (time.monotonic() + ttl, record)
+        if record and record.get("id") is not None:
+            self._by_record[(kind, record["id"])] = key_hash
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._evict(oldest)
+
+    def _evict(self, cache_key: Tuple[str, str]) -> None:
+        """Remove an entry and its record index"""
+        entry = self._entries.pop(cache_key, None)
+        if entry and entry[1] and entry[1].get("id") is not None:
+            self._by_record.pop((cache_key[0], entry[1]["id"]), None)
+
+    # ============== Invalidation ==============
+
+    def invalidate_local(
+        self, kind: str, key_hash: Optional[str] = None, record_id: Any = None
+    ) -> None:
+        """Evict a credential from this process only"""
+        if key_hash is None and record_id is not None:
+            key_hash = self._by_record.get((kind, record_id))
+        if key_hash is not None:
+            self._evict((kind, key_hash))
+
+        # Drop pending usage so a revoked key is not touched after the fact
+        if record_id is not None:
+            self._pending_usage.get(kind, {}).pop(record_id, None)
+
+    async def invalidate(
+        self, kind: str, key_hash: Optional[str] = None, record_id: Any = None
+    ) -> None:
+        """Evict a credential locally and on every other API instance"""
+        self.invalidate_local(kind, key_hash=key_hash, record_id=record_id)
+
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps(
+                    {"kind": kind, "key_hash": key_hash, "record_id": record_id}
+                ),
+            )
+        except Exception as e:
+            logger.warning("credential_invalidation_publish_failed", error=str(e))
+
+    async def _listen(self) -> None:
+        """Apply invalidations published by other API instances"""
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                except (TypeError, json.JSONDecodeError):
+                    continue
+                self.invalidate_local(
+                    data.get("kind"),
+                    key_hash=data.get("key_hash"),
+                    record_id=data.get("record_id"),
+                )
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("credential_invalidation_listener_error", error=str(e))
+        finally:
+            try:
+                await pubsub.unsubscribe(INVALIDATION_CHANNEL)
+                await pubsub.close()
+            except Exception:
+                pass
+
+    # ============== Usage coalescing ==============
+
+    def mark_used(self, kind: str, record_id: Any) -> None:
+        """Record credential usage; written to the database on the next flush"""
+        if record_id is None:
+            return
+        # Whole seconds, so records seen in the same second share an UPDATE
+        self._pending_usage[kind][record_id] = datetime.utcnow().replace(microsecond=0)
+
+    async def flush(self) -> int:
+        """
+        Write coalesced usage timestamps, each record getting its own
+
+        Records are grouped by timestamp, so a flush issues one UPDATE per
+        distinct second seen rather than one per record.
+
+        Returns:
+            Number of records touched
+        """
+        pending = self._pending_usage
+        if not any(pending.values()):
+            return 0
+        self._pending_usage = {kind: {} for kind in CREDENTIAL_KINDS}
+
+        from models.database import get_db, release_db
+
+        touched = 0
+        try:
+            db = await get_db()
+            if not db:
+                return 0
+
+            for kind, usage in pending.items():
+                if not usage:
+                    continue
+                table_name, field_name = CREDENTIAL_KINDS[kind]
+                table = db[table_name]
+                by_time: Dict[datetime, List[Any]] = {}
+                for record_id, seen_at in usage.items():
+                    by_time.setdefault(seen_at, []).append(record_id)
+                for seen_at, record_ids in by_time.items():
+                    db(table.id.belongs(record_ids)).update(**{field_name: seen_at})
+                touched += len(usage)
+            db.commit()
+        except Exception as e:
+            logger.error("credential_usage_flush_failed", error=str(e))
+        finally:
+            await release_db()
+
+        return touched
+
+    async def _flush_loop(self) -> None:
+        """Periodically flush coalesced usage timestamps"""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    # ============== Lifecycle ==============
+
+    async def start(self, redis_client=None) -> None:
+        """Start the flush loop and, if Redis is available, the invalidation listener"""
+        self._redis = redis_client
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        if redis_client is not None:
+            self._listen_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop background tasks and write any outstanding usage"""
+        for task in (self._flush_task, self._listen_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._flush_task = None
+        self._listen_task = None
+
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache size and pending usage counts"""
+        return {
+            "entries": len(self._entries),
+            "pending_usage": sum(len(u) for u in self._pending_usage.values()),
+        }
+
+
+async def init_credential_cache(app: Quart) -> None:
+    """Initialize credential cache for application"""
+    global _credential_cache
+
+    from services.redis_service import get_redis
+
+    config = app.killkrill_config
+    _credential_cache = CredentialCache(
+        ttl=config.CREDENTIAL_CACHE_TTL,
+        negative_ttl=config.CREDENTIAL_CACHE_NEGATIVE_TTL,
+        max_entries=config.CREDENTIAL_CACHE_MAX_ENTRIES,
+        flush_interval=config.CREDENTIAL_FLUSH_INTERVAL,
+    )
+    await _credential_cache.start(await get_redis())
+    app.credential_cache = _credential_cache
+
+    logger.info(
+        "credential_cache_initialized",
+        ttl=config.CREDENTIAL_CACHE_TTL,
+        max_entries=config.CREDENTIAL_CACHE_MAX_ENTRIES,
+    )
+
+
+async def close_credential_cache(app: Quart) -> None:
+    """Flush pending usage and stop credential cache"""
+    global _credential_cache
+
+    if _credential_cache:
+        await _credential_cache.stop()
+        _credential_cache = None
+        logger.info("credential_cache_closed")
+
+
+def get_credential_cache() -> Optional[CredentialCache]:
+    """Get credential cache"""
+    return _credential_cache
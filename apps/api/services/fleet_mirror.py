@@ -0,0 +1,243 @@
+"""
+KillKrill API - Fleet Mirror
+Background sync of Fleet hosts, labels and policy results into a local
+indexed inventory, so host queries never wait on the Fleet server
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import structlog
+from prometheus_client import Counter, Gauge
+from quart import Quart
+
+from shared.monitoring.fleet_inventory import FleetInventory
+
+logger = structlog.get_logger(__name__)
+
+fleet_mirror_syncs = Counter(
+    "killkrill_api_fleet_mirror_syncs_total",
+    "Fleet mirror sync runs",
+    ["kind", "result"],
+)
+fleet_mirror_hosts = Gauge(
+    "killkrill_api_fleet_mirror_hosts", "Hosts held in the Fleet mirror"
+)
+
+# Global Fleet mirror
+_fleet_mirror: Optional["FleetMirror"] = None
+
+
+class FleetMirror:
+    """
+    Keeps a FleetInventory in step with the Fleet server
+
+    Every ``interval`` seconds hosts updated since the inventory's
+    ``updated_at`` cursor are fetched and merged, together with the policy
+    list. Every ``full_interval`` seconds all hosts, label membership and
+    failing-policy hosts are re-read, which also drops deleted hosts.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        interval: float = 30.0,
+        full_interval: float = 900.0,
+        page_size: int = 500,
+        timeout: float = 30.0,
+        max_staleness: float = 300.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.interval = interval
+        self.full_interval = full_interval
+        self.page_size = page_size
+        self.max_staleness = max_staleness
+        self.inventory = FleetInventory()
+
+        self._client = httpx.AsyncClient(
+            base_url=f"{self.base_url}/api/v1/fleet",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=timeout,
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    # ============== Fleet reads ==============
+
+    async def _get(self, path: str, **params) -> Dict[str, Any]:
+        response = await self._client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def _pages(self, path: str, key: str, **params) -> List[Dict[str, Any]]:
+        """Read every page of a paginated Fleet list"""
+        items: List[Dict[str, Any]] = []
+        page = 0
+        while True:
+            data = await self._get(path, page=page, per_page=self.page_size, **params)
+            batch = data.get(key) or []
+            items.extend(batch)
+            if len(batch) < self.page_size:
+                return items
+            page += 1
+
+    async def _host_ids(self, path: str, **params) -> List[int]:
+        hosts = await self._pages(path, "hosts", **params)
+        return [host["id"] for host in hosts if "id" in host]
+
+    # ============== Sync ==============
+
+    async def sync_incremental(self) -> int:
+        """
+        Merge hosts updated since the cursor and refresh the policy list
+
+        Returns:
+            Number of hosts merged
+        """
+        inventory = self.inventory
+        params = {"order_key": "updated_at", "order_direction": "asc"}
+        merged = 0
+        while True:
+            cursor = inventory.cursor
+            if cursor:
+                params["after"] = cursor
+            data = await self._get("/hosts", per_page=self.page_size, **params)
+            batch = data.get("hosts") or []
+            merged += inventory.upsert_hosts(batch)
+            # A full page that did not move the cursor would repeat forever
+            if len(batch) < self.page_size or inventory.cursor == cursor:
+                break
+
+        policies = await self._get("/global/policies")
+        inventory.set_policies(policies.get("policies") or [])
+        inventory.mark_synced()
+        return merged
+
+    async def sync_full(self) -> int:
+        """
+        Re-read all hosts, labels and failing-policy hosts
+
+        Returns:
+            Number of hosts in the mirror
+        """
+        inventory = self.inventory
+        hosts = await self._pages("/hosts", "hosts", order_key="id")
+
+        labels = (await self._get("/labels")).get("labels") or []
+        membership = {}
+        for label in labels:
+            membership[label["id"]] = await self._host_ids(
+                f"/labels/{label['id']}/hosts"
+            )
+
+        policies = (await self._get("/global/policies")).get("policies") or []
+        failing = {}
+        for policy in policies:
+            failing[policy["id"]] = await self._host_ids(
+                "/hosts", policy_id=policy["id"], policy_response="failing"
+            )
+
+        inventory.upsert_hosts(hosts)
+        inventory.retain_hosts(host["id"] for host in hosts if "id" in host)
+        inventory.set_labels(labels, membership)
+        inventory.set_policies(policies, failing)
+        inventory.mark_synced(full=True)
+        return len(inventory)
+
+    async def _run(self) -> None:
+        """Sync loop; failures are recorded and retried next interval"""
+        try:
+            while True:
+                inventory = self.inventory
+                full = (
+                    inventory.full_synced_at is None
+                    or time.time() - inventory.full_synced_at >= self.full_interval
+                )
+                kind = "full" if full else "incremental"
+                started = time.perf_counter()
+                try:
+                    if full:
+                        count = await self.sync_full()
+                    else:
+                        count = await self.sync_incremental()
+                    fleet_mirror_syncs.labels(kind=kind, result="ok").inc()
+                    fleet_mirror_hosts.set(len(inventory))
+                    logger.debug(
+                        "fleet_mirror_synced",
+                        kind=kind,
+                        hosts=count,
+                        duration_ms=round((time.perf_counter() - started) * 1000),
+                    )
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    inventory.last_error = str(e) or type(e).__name__
+                    fleet_mirror_syncs.labels(kind=kind, result="error").inc()
+                    logger.warning("fleet_mirror_sync_failed", kind=kind, error=str(e))
+                await asyncio.sleep(self.interval)
+        except asyncio.CancelledError:
+            pass
+
+    # ============== Lifecycle ==============
+
+    def start(self) -> None:
+        """Start the background sync loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop syncing and close the Fleet client"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._client.aclose()
+
+    def staleness(self) -> Dict[str, Any]:
+        """Mirror age and sync state"""
+        return self.inventory.staleness(self.max_staleness)
+
+
+async def init_fleet_mirror(app: Quart) -> None:
+    """Initialize Fleet mirror for application"""
+    global _fleet_mirror
+
+    config = app.killkrill_config
+    if not config.FLEET_MIRROR_ENABLED:
+        logger.info("fleet_mirror_disabled")
+        return
+
+    _fleet_mirror = FleetMirror(
+        base_url=config.FLEET_SERVER_URL,
+        token=config.FLEET_API_TOKEN,
+        interval=config.FLEET_SYNC_INTERVAL,
+        full_interval=config.FLEET_FULL_SYNC_INTERVAL,
+        page_size=config.FLEET_SYNC_PAGE_SIZE,
+        max_staleness=config.FLEET_MIRROR_MAX_STALENESS,
+    )
+    _fleet_mirror.start()
+    app.fleet_mirror = _fleet_mirror
+
+    logger.info(
+        "fleet_mirror_initialized",
+        interval=config.FLEET_SYNC_INTERVAL,
+        full_interval=config.FLEET_FULL_SYNC_INTERVAL,
+    )
+
+
+async def close_fleet_mirror(app: Quart) -> None:
+    """Stop Fleet mirror sync"""
+    global _fleet_mirror
+
+    if _fleet_mirror:
+        await _fleet_mirror.stop()
+        _fleet_mirror = None
+        logger.info("fleet_mirror_closed")
+
+
+def get_fleet_mirror() -> Optional[FleetMirror]:
+    """Get Fleet mirror"""
+    return _fleet_mirror
@@ -12,6 +12,7 @@ from quart import Quart
 
 from config import get_config
 from services.redis_service import cache
+from shared.licensing.cache import LicenseCache
 
 logger = structlog.get_logger(__name__)
 
@@ -19,22 +20,41 @@ logger = structlog.get_logger(__name__)
 _license_info: Optional[Dict[str, Any]] = None
 _license_valid: bool = False
 
+# Shared license server client and validation cache
+_http_client: Optional[httpx.AsyncClient] = None
+_license_cache: Optional[LicenseCache] = None
+
 
 async def init_license(app: Quart) -> None:
     """Initialize license validation"""
-    global _license_info, _license_valid
+    global _license_info, _license_valid, _http_client, _license_cache
 
     config = app.killkrill_config
 
+    _http_client = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+    _license_cache = LicenseCache(
+        lambda key: _fetch_validation(key, config.PRODUCT_NAME),
+        ttl=config.LICENSE_CACHE_TTL,
+        stale_ttl=config.LICENSE_CACHE_STALE_TTL,
+        negative_ttl=config.LICENSE_CACHE_NEGATIVE_TTL,
+        snapshot_path=config.LICENSE_CACHE_SNAPSHOT or None,
+    )
+    loaded = _license_cache.load_snapshot()
+    if loaded:
+        logger.info("license_snapshot_loaded", entries=loaded)
+
     if not config.LICENSE_KEY:
         logger.warning("no_license_key", message="Running without license validation")
         _license_valid = False
         return
 
     try:
-        validation = await validate_license(config.LICENSE_KEY, config.PRODUCT_NAME)
+        validation = await _license_cache.get(config.LICENSE_KEY)
 
-        if validation.get("valid"):
+        if validation:
             _license_info = validation
             _license_valid = True
             logger.info(
@@ -45,17 +65,104 @@ async def init_license(app: Quart) -> None:
             )
         else:
             _license_valid = False
-            logger.error("license_invalid", message=validation.get("message"))
+            logger.error("license_invalid", message="License validation failed")
 
     except Exception as e:
         logger.error("license_init_failed", error=str(e))
         _license_valid = False
 
 
+async def close_license(app: Quart) -> None:
+    """Persist the license cache and close the license server client"""
+    global _http_client, _license_cache
+
+    if _license_cache:
+        await _license_cache.close()
+        _license_cache = None
+
+    if _http_client:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _validation_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "valid": data.get("valid", False),
+        "customer": data.get("customer"),
+        "tier": data.get("tier"),
+        "expires_at": data.get("expires_at"),
+        "features": data.get("features", []),
+        "limits": data.get("limits", {}),
+        "message": data.get("message"),
+    }
+
+
+async def _post_validate(
+    client: httpx.AsyncClient, license_key: str, product: str
+) -> httpx.Response:
+    return await client.post(
+        f"{get_config().LICENSE_SERVER_URL}/api/v2/validate",
+        headers={"Authorization": f"Bearer {license_key}"},
+        json={"product": product},
+        timeout=10.0,
+    )
+
+
+async def _fetch_validation(license_key: str, product: str) -> Optional[Dict[str, Any]]:
+    """
+    License cache fetcher
+
+    Returns None for keys the license server rejects so they are cached
+    negatively; raises on timeouts and server errors so they are not.
+    """
+    response = await _post_validate(_http_client, license_key, product)
+
+    if response.status_code in (400, 401, 403, 404):
+        logger.warning("license_validation_failed", status=response.status_code)
+        return None
+    response.raise_for_status()
+
+    data = response.json()
+    if not data.get("valid", False):
+        logger.warning("license_invalid", message=data.get("message"))
+        return None
+
+    return _validation_result(data)
+
+
+async def get_license_validation(license_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the cached validation payload for a license key
+
+    Concurrent lookups for the same key share one license server call, and
+    expired results are served while a background refresh runs.
+
+    Args:
+        license_key: License key (PENG-XXXX-XXXX-XXXX-XXXX-ABCD)
+
+    Returns:
+        Validation payload, or None if the key is invalid or could not be
+        validated
+    """
+    if _license_cache is None:
+        validation = await validate_license(license_key, get_config().PRODUCT_NAME)
+        return validation if validation.get("valid") else None
+
+    return await _license_cache.get(license_key)
+
+
+def get_license_cache() -> Optional[LicenseCache]:
+    """Get the license validation cache"""
+    return _license_cache
+
+
 async def validate_license(license_key: str, product: str) -> Dict[str, Any]:
     """
     Validate license with PenguinTech License Server
 
+    Always calls the license server; use get_license_validation() on hot
+    paths.
+
     Args:
         license_key: License key (PENG-XXXX-XXXX-XXXX-XXXX-ABCD)
         product: Product identifier
@@ -63,33 +170,20 @@ async def validate_license(license_key: str, product: str) -> Dict[str, Any]:
     Returns:
         Validation response dict
     """
-    config = get_config()
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{config.LICENSE_SERVER_URL}/api/v2/validate",
-                headers={"Authorization": f"Bearer {license_key}"},
-                json={"product": product},
-                timeout=10.0,
-            )
+        if _http_client is not None:
+            response = await _post_validate(_http_client, license_key, product)
+        else:
+            async with httpx.AsyncClient() as client:
+                response = await _post_validate(client, license_key, product)
 
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "valid": data.get("valid", False),
-                    "customer": data.get("customer"),
-                    "tier": data.get("tier"),
-                    "expires_at": data.get("expires_at"),
-                    "features": data.get("features", []),
-                    "limits": data.get("limits", {}),
-                    "message": data.get("message"),
-                }
-            else:
-                return {
-                    "valid": False,
-                    "message": f"Validation failed: HTTP {response.status_code}",
-                }
+        if response.status_code == 200:
+            return _validation_result(response.json())
+        else:
+            return {
+                "valid": False,
+                "message": f"Validation failed: HTTP {response.status_code}",
+            }
 
     except httpx.TimeoutException:
         return {"valid": False, "message": "License server timeout"}
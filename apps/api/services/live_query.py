@@ -0,0 +1,379 @@
+"""
+KillKrill API - Fleet Live Query Jobs
+Runs Fleet live queries as background jobs. Per-host results are read from
+Fleet's results websocket as hosts answer and appended to a Redis stream
+per job, which any API instance can page through or follow over SSE.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+import websockets
+from prometheus_client import Counter, Gauge
+from quart import Quart
+from redis.exceptions import RedisError
+
+from shared.monitoring.live_query import (
+    RUNNING,
+    TERMINAL_STATUSES,
+    CampaignProgress,
+    LiveQueryError,
+    decode_job,
+    job_key,
+    page_results,
+    results_key,
+    sse_event,
+    status_fields,
+)
+
+logger = structlog.get_logger(__name__)
+
+live_query_jobs = Counter(
+    "killkrill_api_live_query_jobs_total",
+    "Fleet live query jobs by final status",
+    ["status"],
+)
+live_query_results = Counter(
+    "killkrill_api_live_query_results_total",
+    "Host results streamed from Fleet live queries",
+)
+live_query_running = Gauge(
+    "killkrill_api_live_query_jobs_running",
+    "Fleet live query jobs running on this instance",
+)
+
+# Global live query service
+_live_queries: Optional["LiveQueryService"] = None
+
+
+class JobLimitReached(Exception):
+    """Too many live query jobs are running on this instance"""
+
+
+class LiveQueryService:
+    """
+    Submits Fleet live query campaigns and streams their results to Redis
+
+    Jobs run on the instance that accepted them, for at most ``timeout``
+    seconds. Job metadata and results expire ``ttl`` seconds after the job
+    finishes, and each results stream is trimmed to about ``max_results``
+    entries.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        base_url: str,
+        token: str,
+        timeout: float = 300.0,
+        ttl: int = 3600,
+        max_jobs: int = 20,
+        max_results: int = 100000,
+        block_ms: int = 15000,
+    ):
+        self.redis = redis_client
+        self.token = token
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.max_results = max_results
+        self.block_ms = block_ms
+
+        base_url = base_url.rstrip("/")
+        parts = urlsplit(base_url)
+        scheme = "wss" if parts.scheme == "https" else "ws"
+        self.ws_url = (
+            f"{scheme}://{parts.netloc}{parts.path}/api/v1/fleet/results/websocket"
+        )
+
+        self._client = httpx.AsyncClient(
+            base_url=f"{base_url}/api/v1/fleet",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=30.0,
+        )
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Slots held by submits still waiting on Fleet or Redis
+        self._reserved = 0
+
+    # ============== Jobs ==============
+
+    async def submit(
+        self,
+        query: str,
+        host_ids: Optional[List[int]] = None,
+        label_ids: Optional[List[int]] = None,
+        user_id: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Start a live query campaign and return its job
+
+        Raises:
+            JobLimitReached: If max_jobs are already running here
+            LiveQueryError: If Fleet did not create a campaign
+            httpx.HTTPError: If Fleet could not be reached
+        """
+        if len(self._tasks) + self._reserved >= self.max_jobs:
+            raise JobLimitReached()
+
+        # Hold the slot across the awaits so concurrent submits see it
+        self._reserved += 1
+        try:
+            return await self._start(query, host_ids, label_ids, user_id)
+        finally:
+            self._reserved -= 1
+
+    async def _start(
+        self,
+        query: str,
+        host_ids: Optional[List[int]],
+        label_ids: Optional[List[int]],
+        user_id: Optional[Any],
+    ) -> Dict[str, Any]:
+        """Create the Fleet campaign, record the job and start its task"""
+        response = await self._client.post(
+            "/queries/run",
+            json={
+                "query": query,
+                "selected": {"hosts": host_ids or [], "labels": label_ids or []},
+            },
+        )
+        response.raise_for_status()
+        campaign = response.json().get("campaign") or {}
+        if "id" not in campaign:
+            raise LiveQueryError("Fleet did not create a live query campaign")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        meta = {
+            "job_id": job_id,
+            "campaign_id": str(campaign["id"]),
+            "query": query,
+            "status": RUNNING,
+            "user_id": str(user_id or ""),
+            "created_at": str(now),
+            "deadline": str(now + self.timeout),
+            **CampaignProgress().meta(),
+        }
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(job_key(job_id), mapping=meta)
+        pipe.xadd(results_key(job_id), status_fields(RUNNING))
+        pipe.expire(job_key(job_id), self.ttl)
+        pipe.expire(results_key(job_id), self.ttl)
+        await pipe.execute()
+
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id, campaign["id"]))
+        live_query_running.set(len(self._tasks))
+        logger.info("live_query_submitted", job_id=job_id, campaign_id=campaign["id"])
+        return decode_job(meta, now)
+
+    async def _stream(
+        self, job_id: str, campaign_id: int, progress: CampaignProgress
+    ) -> None:
+        """Append Fleet campaign messages to the job until Fleet finishes it"""
+        async with websockets.connect(self.ws_url, open_timeout=30) as ws:
+            await ws.send(json.dumps({"type": "auth", "data": {"token": self.token}}))
+            await ws.send(
+                json.dumps(
+                    {"type": "select_campaign", "data": {"campaign_id": campaign_id}}
+                )
+            )
+
+            async for raw in ws:
+                entry = progress.apply(json.loads(raw))
+                pipe = self.redis.pipeline(transaction=False)
+                if entry is not None:
+                    pipe.xadd(
+                        results_key(job_id),
+                        entry,
+                        maxlen=self.max_results,
+                        approximate=True,
+                    )
+                pipe.hset(job_key(job_id), mapping=progress.meta())
+                await pipe.execute()
+
+                if entry is not None:
+                    live_query_results.inc()
+                if progress.finished:
+                    return
+
+    async def _run(self, job_id: str, campaign_id: int) -> None:
+        """Run one job and record how it ended"""
+        progress = CampaignProgress()
+        status, error = "failed", None
+        try:
+            await asyncio.wait_for(
+                self._stream(job_id, campaign_id, progress), self.timeout
+            )
+            status = "completed"
+        except asyncio.TimeoutError:
+            status = "timed_out"
+        except asyncio.CancelledError:
+            status = "cancelled"
+        except (
+            LiveQueryError,
+            websockets.WebSocketException,
+            RedisError,
+            OSError,
+            ValueError,
+        ) as e:
+            error = str(e) or type(e).__name__
+        finally:
+            # Free the job slot however the job ended
+            self._tasks.pop(job_id, None)
+            live_query_running.set(len(self._tasks))
+            live_query_jobs.labels(status=status).inc()
+            await self._finish(job_id, progress, status, error)
+
+    async def _finish(
+        self,
+        job_id: str,
+        progress: CampaignProgress,
+        status: str,
+        error: Optional[str],
+    ) -> None:
+        """Record the final job status and start the TTL on its keys"""
+        meta = {**progress.meta(), "status": status, "finished_at": str(time.time())}
+        if error:
+            meta["error"] = error
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(job_key(job_id), mapping=meta)
+            pipe.xadd(results_key(job_id), status_fields(status, error))
+            # Keep finished jobs readable for a full TTL
+            pipe.expire(job_key(job_id), self.ttl)
+            pipe.expire(results_key(job_id), self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("live_query_finalize_failed", job_id=job_id, error=str(e))
+
+        logger.info(
+            "live_query_finished",
+            job_id=job_id,
+            status=status,
+            hosts=progress.responded,
+            error=error,
+        )
+
+    # ============== Reads ==============
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job metadata and progress, or None if unknown or expired"""
+        fields = await self.redis.hgetall(job_key(job_id))
+        return decode_job(fields) if fields else None
+
+    async def results(
+        self, job_id: str, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of host results after cursor
+
+        Returns:
+            (host results, cursor for the next page)
+        """
+        entries = await self.redis.xrange(
+            results_key(job_id),
+            min=f"({cursor}" if cursor else "-",
+            max="+",
+            count=limit,
+        )
+        return page_results(entries, cursor)
+
+    async def follow(
+        self, job_id: str, cursor: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Server-sent events for results after cursor until the job ends
+
+        Idle reads emit a keepalive comment; a job that expired or whose
+        instance stopped ends the stream with its decoded status.
+        """
+        last_id = cursor or "0-0"
+        while True:
+            response = await self.redis.xread(
+                {results_key(job_id): last_id}, count=500, block=self.block_ms
+            )
+            if not response:
+                job = await self.get_job(job_id)
+                if job is None:
+                    return
+                if job["status"] != RUNNING:
+                    data = json.dumps({"status": job["status"]})
+                    yield f"event: status\ndata: {data}\n\n"
+                    return
+                yield ": keepalive\n\n"
+                continue
+
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    yield sse_event(entry_id, fields)
+                    if (
+                        fields.get("type") == "status"
+                        and fields.get("status") in TERMINAL_STATUSES
+                    ):
+                        return
+
+    # ============== Lifecycle ==============
+
+    async def stop(self) -> None:
+        """Cancel running jobs (recorded as cancelled) and close the client"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        """Running job count"""
+        return {"running": len(self._tasks), "max_jobs": self.max_jobs}
+
+
+async def init_live_queries(app: Quart) -> None:
+    """Initialize Fleet live query jobs (requires Redis)"""
+    global _live_queries
+
+    from services.redis_service import get_redis
+
+    redis_client = await get_redis()
+    if redis_client is None:
+        logger.warning("live_queries_disabled", reason="redis unavailable")
+        return
+
+    config = app.killkrill_config
+    _live_queries = LiveQueryService(
+        redis_client,
+        base_url=config.FLEET_SERVER_URL,
+        token=config.FLEET_API_TOKEN,
+        timeout=config.FLEET_LIVE_QUERY_TIMEOUT,
+        ttl=config.FLEET_LIVE_QUERY_TTL,
+        max_jobs=config.FLEET_LIVE_QUERY_MAX_JOBS,
+        max_results=config.FLEET_LIVE_QUERY_MAX_RESULTS,
+    )
+    app.live_queries = _live_queries
+    logger.info(
+        "live_queries_initialized",
+        timeout=config.FLEET_LIVE_QUERY_TIMEOUT,
+        max_jobs=config.FLEET_LIVE_QUERY_MAX_JOBS,
+    )
+
+
+async def close_live_queries(app: Quart) -> None:
+    """Cancel running live query jobs"""
+    global _live_queries
+
+    if _live_queries:
+        await _live_queries.stop()
+        _live_queries = None
+        logger.info("live_queries_closed")
+
+
+def get_live_queries() -> Optional[LiveQueryService]:
+    """Get Fleet live query service"""
+    return _live_queries
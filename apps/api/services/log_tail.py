@@ -0,0 +1,221 @@
+"""
+KillKrill API - Live Log Tail
+Streams logs:raw entries to WebSocket subscribers through one shared XREAD
+cursor per API instance
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import structlog
+from quart import Quart
+
+from services.ws_hub import ClientConnection
+from shared.monitoring.log_tail import LogFilter, TailSampler
+
+logger = structlog.get_logger(__name__)
+
+# Global log tail service
+_log_tail: Optional["LogTailService"] = None
+
+
+class LogTailService:
+    """
+    Fans a Redis log stream out to filtered WebSocket subscribers
+
+    Subscribers are grouped by filter, so every entry is matched once per
+    distinct filter. Each subscriber has its own sampler and receives
+    frames through its send queue. The reader only runs while someone is
+    subscribed.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        stream: str = "logs:raw",
+        block_ms: int = 5000,
+        batch_size: int = 500,
+        max_per_second: float = 100.0,
+    ):
+        self.redis = redis_client
+        self.stream = stream
+        self.block_ms = block_ms
+        self.batch_size = batch_size
+        self.max_per_second = max_per_second
+        self._groups: Dict[
+            str, Tuple[LogFilter, Dict[ClientConnection, TailSampler]]
+        ] = {}
+        self._client_groups: Dict[ClientConnection, str] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+
+    # ============== Subscriptions ==============
+
+    def subscribe(
+        self,
+        client: ClientConnection,
+        spec: Optional[Mapping[str, Any]] = None,
+        sample_rate: float = 1.0,
+        max_per_second: Optional[float] = None,
+    ) -> LogFilter:
+        """
+        Subscribe a client, replacing any previous log subscription
+
+        Args:
+            client: WebSocket client
+            spec: Filter spec (source, level, min_level, contains, glob)
+            sample_rate: Fraction of matching entries to deliver
+            max_per_second: Delivery cap (defaults to, and is capped at,
+                the service limit)
+
+        Returns:
+            Compiled filter
+
+        Raises:
+            ValueError: If the filter or sampling settings are invalid
+        """
+        log_filter = LogFilter.from_spec(spec)
+        rate = min(float(max_per_second or self.max_per_second), self.max_per_second)
+        sampler = TailSampler(sample_rate, rate)
+
+        self.unsubscribe(client)
+        _, subscribers = self._groups.setdefault(log_filter.key, (log_filter, {}))
+        subscribers[client] = sampler
+        self._client_groups[client] = log_filter.key
+
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.create_task(self._read_loop())
+        return log_filter
+
+    def unsubscribe(self, client: ClientConnection) -> bool:
+        """Remove a client's log subscription"""
+        key = self._client_groups.pop(client, None)
+        if key is None:
+            return False
+
+        _, subscribers = self._groups[key]
+        subscribers.pop(client, None)
+        if not subscribers:
+            del self._groups[key]
+        return True
+
+    # ============== Dispatch ==============
+
+    def dispatch(self, entry_id: str, fields: Mapping[str, Any]) -> int:
+        """
+        Deliver one stream entry to matching subscribers
+
+        Returns:
+            Number of clients the entry was queued for
+        """
+        frame = None
+        delivered = 0
+
+        for log_filter, subscribers in list(self._groups.values()):
+            if not log_filter.matches(fields):
+                continue
+
+            if frame is None:
+                frame = json.dumps(
+                    {
+                        "type": "message",
+                        "channel": "logs",
+                        "data": {"type": "log", "id": entry_id, "entry": fields},
+                        "timestamp": datetime.utcnow().isoformat(),
+                    }
+                )
+
+            for client, sampler in list(subscribers.items()):
+                if not sampler.allow():
+                    continue
+                if client.enqueue(frame):
+                    delivered += 1
+                else:
+                    self.unsubscribe(client)
+
+        return delivered
+
+    async def _start_id(self) -> str:
+        """ID of the newest entry, so tailing starts from now without gaps"""
+        newest = await self.redis.xrevrange(self.stream, count=1)
+        return newest[0][0] if newest else "0-0"
+
+    async def _read_loop(self) -> None:
+        """Shared XREAD cursor; exits when the last subscriber leaves"""
+        last_id = None
+        logger.info("log_tail_reader_started", stream=self.stream)
+
+        while self._groups:
+            try:
+                if last_id is None:
+                    last_id = await self._start_id()
+
+                response = await self.redis.xread(
+                    {self.stream: last_id}, count=self.batch_size, block=self.block_ms
+                )
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        last_id = entry_id
+                        self.dispatch(entry_id, fields)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("log_tail_read_failed", error=str(e))
+                await asyncio.sleep(1)
+
+        logger.info("log_tail_reader_stopped", stream=self.stream)
+
+    async def stop(self) -> None:
+        """Drop all subscriptions and stop the reader"""
+        self._groups.clear()
+        self._client_groups.clear()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+
+    def stats(self) -> Dict[str, int]:
+        """Get subscriber and distinct filter counts"""
+        return {
+            "subscribers": len(self._client_groups),
+            "filters": len(self._groups),
+        }
+
+
+async def init_log_tail(app: Quart) -> None:
+    """Initialize live log tail (requires Redis)"""
+    global _log_tail
+
+    from services.redis_service import get_redis
+
+    redis_client = await get_redis()
+    if redis_client is None:
+        logger.warning("log_tail_disabled", reason="redis unavailable")
+        return
+
+    config = app.killkrill_config
+    _log_tail = LogTailService(
+        redis_client,
+        stream=config.LOG_TAIL_STREAM,
+        max_per_second=config.LOG_TAIL_MAX_PER_SECOND,
+    )
+    app.log_tail = _log_tail
+
+
+async def close_log_tail(app: Quart) -> None:
+    """Stop live log tail"""
+    global _log_tail
+
+    if _log_tail:
+        await _log_tail.stop()
+        _log_tail = None
+        logger.info("log_tail_closed")
+
+
+def get_log_tail() -> Optional[LogTailService]:
+    """Get live log tail service"""
+    return _log_tail
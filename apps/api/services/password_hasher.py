@@ -0,0 +1,178 @@
+"""
+KillKrill API - Password Hasher
+Runs bcrypt work in a bounded process pool so logins never block the event loop
+"""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import structlog
+from passlib.hash import bcrypt
+from prometheus_client import Counter, Histogram
+from quart import Quart
+
+logger = structlog.get_logger(__name__)
+
+password_hash_operations = Counter(
+    "killkrill_api_password_hash_operations_total",
+    "Password hashing operations",
+    ["operation", "result"],
+)
+password_hash_seconds = Histogram(
+    "killkrill_api_password_hash_seconds",
+    "Time from submission to result for password hashing operations",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# Global password hasher
+_password_hasher: Optional["PasswordHasher"] = None
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should retry later"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+# Worker-side functions; module level so they pickle by reference
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify_and_update(
+    password: str, password_hash: str, rounds: int
+) -> Tuple[bool, Optional[str]]:
+    """Verify, and re-hash when the stored hash uses other cost parameters"""
+    hasher = bcrypt.using(rounds=rounds)
+    try:
+        if not hasher.verify(password, password_hash):
+            return False, None
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        return False, None
+    if hasher.needs_update(password_hash):
+        return True, hasher.hash(password)
+    return True, None
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for bcrypt hashing and verification
+
+    At most ``max_pending`` operations are queued or running at once; past
+    that, calls fail immediately with HasherBusy instead of piling up behind
+    a login storm. Verification reports a replacement hash when the stored
+    one was made with a different cost, so callers can rehash on login.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64, rounds: int = 12):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        """Operations queued or running"""
+        return self._pending
+
+    def start(self) -> None:
+        """Create the worker pool"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def stop(self) -> None:
+        """Shut down the worker pool, cancelling queued work"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, operation: str, fn, *args):
+        if self._pending >= self.max_pending:
+            password_hash_operations.labels(operation=operation, result="busy").inc()
+            raise HasherBusy()
+
+        self.start()
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            password_hash_seconds.labels(operation=operation).observe(
+                time.perf_counter() - started
+            )
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured cost"""
+        result = await self._submit("hash", _hash, password, self.rounds)
+        password_hash_operations.labels(operation="hash", result="ok").inc()
+        return result
+
+    async def verify(
+        self, password: str, password_hash: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password against its stored hash
+
+        Returns:
+            (valid, new_hash) - new_hash is set when the password is valid
+            and the stored hash should be replaced
+        """
+        valid, new_hash = await self._submit(
+            "verify", _verify_and_update, password, password_hash, self.rounds
+        )
+        password_hash_operations.labels(
+            operation="verify",
+            result="rehash" if new_hash else ("ok" if valid else "invalid"),
+        ).inc()
+        return valid, new_hash
+
+
+async def init_password_hasher(app: Quart) -> None:
+    """Initialize password hasher for application"""
+    global _password_hasher
+
+    config = app.killkrill_config
+    _password_hasher = PasswordHasher(
+        workers=config.PASSWORD_HASH_WORKERS,
+        max_pending=config.PASSWORD_HASH_MAX_PENDING,
+        rounds=config.PASSWORD_BCRYPT_ROUNDS,
+    )
+    _password_hasher.start()
+    app.password_hasher = _password_hasher
+
+    logger.info(
+        "password_hasher_initialized",
+        workers=config.PASSWORD_HASH_WORKERS,
+        max_pending=config.PASSWORD_HASH_MAX_PENDING,
+        rounds=config.PASSWORD_BCRYPT_ROUNDS,
+    )
+
+
+async def close_password_hasher(app: Quart) -> None:
+    """Stop password hasher worker processes"""
+    global _password_hasher
+
+    if _password_hasher:
+        await asyncio.to_thread(_password_hasher.stop)
+        _password_hasher = None
+        logger.info("password_hasher_closed")
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get password hasher, creating a default one if the app has not"""
+    global _password_hasher
+
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher()
+    return _password_hasher
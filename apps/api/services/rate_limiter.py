@@ -0,0 +1,80 @@
+"""
+KillKrill API - Rate Limiter
+Token bucket limiter shared by every API instance through Redis, with
+per-process buckets as the fallback
+"""
+
+from typing import Optional, Tuple, Union
+
+import structlog
+from py_libs.security.ratelimit import (
+    RateLimit,
+    RedisTokenBucketLimiter,
+    TokenBucketLimiter,
+    parse_networks,
+)
+from quart import Quart
+
+logger = structlog.get_logger(__name__)
+
+RATE_LIMIT_PREFIX = "killkrill:ratelimit:"
+
+# Global rate limiter and limits
+_rate_limiter: Optional[Union[RedisTokenBucketLimiter, TokenBucketLimiter]] = None
+_default_limit: Optional[RateLimit] = None
+_ingest_limit: Optional[RateLimit] = None
+_trusted_proxies: Tuple = ()
+
+
+async def init_rate_limiter(app: Quart) -> None:
+    """Initialize the rate limiter (cluster-wide when Redis is available)"""
+    global _rate_limiter, _default_limit, _ingest_limit, _trusted_proxies
+
+    config = app.killkrill_config
+    _trusted_proxies = parse_networks(config.RATE_LIMIT_TRUSTED_PROXIES)
+    if not config.RATE_LIMIT_ENABLED:
+        logger.info("rate_limiter_disabled")
+        return
+
+    _default_limit = RateLimit.per_minute(
+        config.RATE_LIMIT_PER_MINUTE, config.RATE_LIMIT_BURST
+    )
+    _ingest_limit = RateLimit.per_minute(
+        config.RATE_LIMIT_INGEST_PER_MINUTE, config.RATE_LIMIT_INGEST_BURST
+    )
+    local = TokenBucketLimiter(_default_limit)
+
+    redis_client = None
+    if config.RATE_LIMIT_REDIS:
+        from services.redis_service import get_redis
+
+        redis_client = await get_redis()
+
+    if redis_client is not None:
+        _rate_limiter = RedisTokenBucketLimiter(
+            redis_client, _default_limit, prefix=RATE_LIMIT_PREFIX, fallback=local
+        )
+    else:
+        _rate_limiter = local
+
+    logger.info(
+        "rate_limiter_initialized",
+        backend="redis" if redis_client is not None else "local",
+        per_minute=config.RATE_LIMIT_PER_MINUTE,
+        ingest_per_minute=config.RATE_LIMIT_INGEST_PER_MINUTE,
+    )
+
+
+def get_rate_limiter() -> Optional[Union[RedisTokenBucketLimiter, TokenBucketLimiter]]:
+    """Get the rate limiter (None if rate limiting is disabled)"""
+    return _rate_limiter
+
+
+def get_rate_limits() -> tuple:
+    """Get the (default, ingest) limits"""
+    return _default_limit, _ingest_limit
+
+
+def get_trusted_proxies() -> Tuple:
+    """Get the networks whose X-Forwarded-For header is honoured"""
+    return _trusted_proxies
@@ -0,0 +1,324 @@
+"""
+KillKrill API - Sensor Status Index Service
+Latest result per (check, agent) and rolling 24h counters, kept in Redis
+so every API instance shares them, with an in-process fallback and a
+one-time warm-up from PostgreSQL.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import structlog
+from quart import Quart
+
+from shared.monitoring.status_index import (
+    FAILED_STATUSES,
+    HourBucket,
+    SensorStatusIndex,
+    hour_bucket,
+    summarize_buckets,
+)
+
+logger = structlog.get_logger(__name__)
+
+LATEST_KEY = "killkrill:sensor_status:latest"
+BUCKET_KEY_PREFIX = "killkrill:sensor_status:hour:"
+WARM_MARKER_KEY = "killkrill:sensor_status:warm"
+
+# Seconds one instance holds the warm-up marker while rebuilding
+WARM_MARKER_TTL = 300
+
+# Global status index service
+_status_index: Optional["StatusIndexService"] = None
+
+
+def _encode_entry(entry: Dict[str, Any]) -> str:
+    return json.dumps(
+        {
+            "check_id": entry["check_id"],
+            "agent_id": entry["agent_id"],
+            "status": entry["status"],
+            "response_time_ms": entry["response_time_ms"],
+            "timestamp": entry["timestamp"].isoformat(),
+        }
+    )
+
+
+def _decode_entry(raw: str) -> Dict[str, Any]:
+    entry = json.loads(raw)
+    entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+    return entry
+
+
+class StatusIndexService:
+    """
+    Maintains the sensor status index in Redis, or in-process without Redis
+    """
+
+    def __init__(self, redis_client=None, window_hours: int = 24):
+        self.redis = redis_client
+        self.window_hours = window_hours
+        self.local = SensorStatusIndex(window_hours)
+
+    async def record_results(
+        self, agent_id: str, results: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Apply submitted results to the index
+
+        Args:
+            agent_id: Reporting sensor agent
+            results: Result dicts with check_id, status, response_time_ms, timestamp
+        """
+        # The local copy also serves reads if Redis becomes unavailable
+        for result in results:
+            self.local.record(
+                result["check_id"],
+                agent_id,
+                result["status"],
+                result.get("response_time_ms"),
+                result["timestamp"],
+            )
+
+        if self.redis is None:
+            return
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            ttl = (self.window_hours + 1) * 3600
+            for result in results:
+                entry = dict(result, agent_id=agent_id)
+                pipe.hset(
+                    LATEST_KEY,
+                    f"{result['check_id']}|{agent_id}",
+                    _encode_entry(entry),
+                )
+
+                bucket_key = f"{BUCKET_KEY_PREFIX}{hour_bucket(result['timestamp'])}"
+                pipe.hincrby(bucket_key, "total", 1)
+                if result["status"] in FAILED_STATUSES:
+                    pipe.hincrby(bucket_key, "failed", 1)
+                if result.get("response_time_ms") is not None:
+                    pipe.hincrbyfloat(
+                        bucket_key, "response_time_sum", result["response_time_ms"]
+                    )
+                    pipe.hincrby(bucket_key, "response_time_count", 1)
+                pipe.expire(bucket_key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("status_index_update_failed", error=str(e))
+
+    async def latest_by_check(self) -> Dict[str, Dict[str, Any]]:
+        """Get the latest result for every check across all agents"""
+        if self.redis is None:
+            return self.local.latest_by_check()
+
+        try:
+            raw = await self.redis.hgetall(LATEST_KEY)
+        except Exception as e:
+            logger.warning("status_index_read_failed", error=str(e))
+            return self.local.latest_by_check()
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        for value in raw.values():
+            entry = _decode_entry(value)
+            current = latest.get(entry["check_id"])
+            if current is None or current["timestamp"] <= entry["timestamp"]:
+                latest[entry["check_id"]] = entry
+        return latest
+
+    async def rolling_counters(self) -> Dict[str, Any]:
+        """Get rolling window result counters"""
+        if self.redis is None:
+            return self.local.rolling_counters()
+
+        current = hour_bucket(datetime.utcnow())
+        hours = range(current - self.window_hours + 1, current + 1)
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for hour in hours:
+                pipe.hgetall(f"{BUCKET_KEY_PREFIX}{hour}")
+            raw_buckets = await pipe.execute()
+        except Exception as e:
+            logger.warning("status_index_read_failed", error=str(e))
+            return self.local.rolling_counters()
+
+        return summarize_buckets(
+            HourBucket(
+                total=int(raw.get("total", 0)),
+                failed=int(raw.get("failed", 0)),
+                response_time_sum=float(raw.get("response_time_sum", 0)),
+                response_time_count=int(raw.get("response_time_count", 0)),
+            )
+            for raw in raw_buckets
+            if raw
+        )
+
+    async def forget_check(self, check_id: str) -> None:
+        """Remove a deleted check from the index"""
+        self.local.forget_check(check_id)
+        if self.redis is None:
+            return
+
+        try:
+            fields = [
+                f
+                async for f in self.redis.hscan_iter(LATEST_KEY, match=f"{check_id}|*")
+            ]
+            if fields:
+                await self.redis.hdel(LATEST_KEY, *[f[0] for f in fields])
+        except Exception as e:
+            logger.warning("status_index_forget_failed", error=str(e))
+
+    async def warm(self, db) -> None:
+        """
+        Seed the index from PostgreSQL if it has not been built yet
+
+        Runs one DISTINCT ON query for latest results and one grouped
+        aggregate for the hourly counters.
+        """
+        if self.redis is not None:
+            try:
+                # The shared index is warm while it has latest entries;
+                # the expiring marker lets one instance at a time rebuild it
+                if await self.redis.exists(LATEST_KEY):
+                    return
+                if not await self.redis.set(
+                    WARM_MARKER_KEY, "1", nx=True, ex=WARM_MARKER_TTL
+                ):
+                    return
+            except Exception as e:
+                logger.warning("status_index_warm_check_failed", error=str(e))
+                self.redis = None
+
+        since = datetime.utcnow() - timedelta(hours=self.window_hours)
+        index = SensorStatusIndex(self.window_hours)
+
+        for row in self._load_latest(db):
+            index.record(
+                row["check_id"],
+                row["agent_id"],
+                row["status"],
+                row["response_time_ms"],
+                row["timestamp"],
+                count=False,
+            )
+        for hour, bucket in self._load_buckets(db, since):
+            index.add_bucket(hour, bucket)
+
+        if self.redis is None:
+            self.local = index
+        else:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for entry in index.entries():
+                    pipe.hset(
+                        LATEST_KEY,
+                        f"{entry['check_id']}|{entry['agent_id']}",
+                        _encode_entry(entry),
+                    )
+                ttl = (self.window_hours + 1) * 3600
+                for hour, bucket in index.buckets().items():
+                    key = f"{BUCKET_KEY_PREFIX}{hour}"
+                    pipe.hset(
+                        key,
+                        mapping={
+                            "total": bucket.total,
+                            "failed": bucket.failed,
+                            "response_time_sum": bucket.response_time_sum,
+                            "response_time_count": bucket.response_time_count,
+                        },
+                    )
+                    pipe.expire(key, ttl)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning("status_index_warm_write_failed", error=str(e))
+                await self.redis.delete(WARM_MARKER_KEY)
+
+        logger.info("status_index_warmed", entries=len(index))
+
+    @staticmethod
+    def _load_latest(db) -> List[Dict[str, Any]]:
+        """Latest result per (check, agent) straight from sensor_results"""
+        if db._adapter.dbengine == "postgres":
+            rows = db.executesql(
+                "SELECT DISTINCT ON (check_id, agent_id) "
+                "check_id, agent_id, status, response_time_ms, timestamp "
+                "FROM sensor_results "
+                "ORDER BY check_id, agent_id, timestamp DESC",
+                as_dict=True,
+            )
+            return list(rows)
+
+        # Portable fallback for development databases
+        latest: Dict[tuple, Dict[str, Any]] = {}
+        for r in db(db.sensor_results).select(
+            db.sensor_results.check_id,
+            db.sensor_results.agent_id,
+            db.sensor_results.status,
+            db.sensor_results.response_time_ms,
+            db.sensor_results.timestamp,
+            orderby=db.sensor_results.timestamp,
+        ):
+            latest[(r.check_id, r.agent_id)] = r.as_dict()
+        return list(latest.values())
+
+    @staticmethod
+    def _load_buckets(db, since: datetime):
+        """Hourly result counters since a point in time"""
+        t = db.sensor_results
+        year, month, day, hour = (
+            t.timestamp.year(),
+            t.timestamp.month(),
+            t.timestamp.day(),
+            t.timestamp.hour(),
+        )
+        total = t.id.count()
+        rt_sum = t.response_time_ms.sum()
+        rt_count = t.response_time_ms.count()
+
+        groupby = year | month | day | hour
+
+        grouped = db(t.timestamp >= since).select(
+            year, month, day, hour, total, rt_sum, rt_count, groupby=groupby
+        )
+        failed_rows = db(
+            (t.timestamp >= since) & t.status.belongs(list(FAILED_STATUSES))
+        ).select(year, month, day, hour, total, groupby=groupby)
+        failed = {(r[year], r[month], r[day], r[hour]): r[total] for r in failed_rows}
+
+        for r in grouped:
+            key = (r[year], r[month], r[day], r[hour])
+            yield hour_bucket(datetime(*key)), HourBucket(
+                total=r[total] or 0,
+                failed=failed.get(key, 0),
+                response_time_sum=float(r[rt_sum] or 0),
+                response_time_count=r[rt_count] or 0,
+            )
+
+
+async def init_status_index(app: Quart) -> None:
+    """Initialize sensor status index and warm it from the database"""
+    global _status_index
+
+    from models.database import get_db, release_db
+    from services.redis_service import get_redis
+
+    _status_index = StatusIndexService(await get_redis())
+    app.status_index = _status_index
+
+    try:
+        db = await get_db()
+        if db:
+            await _status_index.warm(db)
+    except Exception as e:
+        logger.error("status_index_warm_failed", error=str(e))
+    finally:
+        await release_db()
+
+
+def get_status_index() -> Optional[StatusIndexService]:
+    """Get sensor status index service"""
+    return _status_index
@@ -0,0 +1,116 @@
+"""
+KillKrill API - Token Cache
+Verified JWT claims cached until expiry, with a Redis-synced revocation set
+"""
+
+import asyncio
+from typing import Optional
+
+import structlog
+from prometheus_client import Counter
+from py_libs.security.token_cache import RevocationSet, VerifiedTokenCache
+from quart import Quart
+
+logger = structlog.get_logger(__name__)
+
+token_revocations = Counter(
+    "killkrill_api_token_revocations_total",
+    "Access tokens revoked",
+    ["scope"],
+)
+
+# Global token cache and revocation sync task
+_token_cache: Optional[VerifiedTokenCache] = None
+_sync_task: Optional[asyncio.Task] = None
+
+
+async def _sync_loop(cache: VerifiedTokenCache, redis_client) -> None:
+    """Reload revoked token IDs from Redis every sync interval"""
+    revocations = cache.revocations
+    try:
+        while True:
+            try:
+                await revocations.sync_async(redis_client)
+            except Exception as e:
+                logger.warning("token_revocation_sync_failed", error=str(e))
+                revocations.prune()
+            await asyncio.sleep(revocations.sync_interval)
+    except asyncio.CancelledError:
+        pass
+
+
+async def revoke_token(jti: Optional[str], expires_at: Optional[float]) -> bool:
+    """
+    Revoke an access token by ID until it expires
+
+    Takes effect locally at once and on other API instances at their next
+    revocation sync. Falls back to local-only when Redis is unavailable.
+
+    Returns:
+        True if the token was revoked
+    """
+    from services.redis_service import get_redis
+
+    if _token_cache is None or not jti or not expires_at:
+        return False
+
+    revocations = _token_cache.revocations
+    redis_client = await get_redis()
+    if redis_client is None:
+        revocations.add(jti, float(expires_at))
+        token_revocations.labels(scope="local").inc()
+        return True
+
+    try:
+        await revocations.revoke_async(redis_client, jti, float(expires_at))
+        token_revocations.labels(scope="cluster").inc()
+    except Exception as e:
+        logger.warning("token_revocation_publish_failed", jti=jti, error=str(e))
+        token_revocations.labels(scope="local").inc()
+    return True
+
+
+async def init_token_cache(app: Quart) -> None:
+    """Initialize verified-token cache for application"""
+    global _token_cache, _sync_task
+
+    from services.redis_service import get_redis
+
+    config = app.killkrill_config
+    _token_cache = VerifiedTokenCache(
+        max_entries=config.TOKEN_CACHE_MAX_ENTRIES,
+        revocations=RevocationSet(sync_interval=config.TOKEN_REVOCATION_SYNC_INTERVAL),
+    )
+
+    redis_client = await get_redis()
+    if redis_client is not None:
+        _sync_task = asyncio.create_task(_sync_loop(_token_cache, redis_client))
+    app.token_cache = _token_cache
+
+    logger.info(
+        "token_cache_initialized",
+        max_entries=config.TOKEN_CACHE_MAX_ENTRIES,
+        revocation_sync=redis_client is not None,
+    )
+
+
+async def close_token_cache(app: Quart) -> None:
+    """Stop revocation sync and drop cached tokens"""
+    global _token_cache, _sync_task
+
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
+
+    if _token_cache:
+        _token_cache = None
+        logger.info("token_cache_closed")
+
+
+def get_token_cache() -> Optional[VerifiedTokenCache]:
+    """Get verified-token cache"""
+    return _token_cache
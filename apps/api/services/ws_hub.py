@@ -0,0 +1,387 @@
+"""
+KillKrill API - WebSocket Fan-out Hub
+Channel fan-out with per-client bounded send queues and a Redis relay
+"""
+
+import asyncio
+import itertools
+import json
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import structlog
+from prometheus_client import Counter
+from quart import Quart
+
+logger = structlog.get_logger(__name__)
+
+# Redis pub/sub channel used to relay broadcasts between API instances
+RELAY_CHANNEL = "killkrill:ws:relay"
+
+# Seconds between relay resubscription attempts, doubling up to the cap
+RELAY_RETRY_INITIAL = 1.0
+RELAY_RETRY_MAX = 30.0
+
+# Channels clients may subscribe to
+CHANNELS = ("dashboard", "logs", "metrics", "sensors", "alerts")
+
+ws_frames_dropped = Counter(
+    "killkrill_api_ws_frames_dropped_total",
+    "WebSocket frames dropped or coalesced for slow clients",
+    ["reason"],
+)
+
+# Global fan-out hub
+_ws_hub: Optional["FanoutHub"] = None
+
+
+class ClientConnection:
+    """
+    One WebSocket client with a bounded send queue and a writer task
+
+    Frames are queued without blocking the publisher. Frames published with
+    a coalesce key replace a still-queued frame with the same key (newest
+    state wins); when the queue is full the oldest frame is dropped.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        close: Optional[Callable[..., Awaitable[None]]] = None,
+        max_queue: int = 256,
+        send_timeout: float = 10.0,
+    ):
+        self._send = send
+        self._close = close
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.channels: Set[str] = set()
+        self.closed = False
+        self.dropped = 0
+        self._queue: "OrderedDict[Any, str]" = OrderedDict()
+        self._seq = itertools.count()
+        self._ready = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the writer task"""
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def enqueue(self, frame: str, coalesce_key: Optional[str] = None) -> bool:
+        """
+        Queue a pre-serialized frame for this client
+
+        Args:
+            frame: Serialized message
+            coalesce_key: Replace a queued frame with the same key (optional)
+
+        Returns:
+            False if the client is closed
+        """
+        if self.closed:
+            return False
+
+        if coalesce_key is not None and coalesce_key in self._queue:
+            self._queue[coalesce_key] = frame
+            ws_frames_dropped.labels(reason="coalesced").inc()
+            return True
+
+        key = coalesce_key if coalesce_key is not None else next(self._seq)
+        self._queue[key] = frame
+        if len(self._queue) > self.max_queue:
+            self._queue.popitem(last=False)
+            self.dropped += 1
+            ws_frames_dropped.labels(reason="queue_full").inc()
+
+        self._ready.set()
+        return True
+
+    def pending(self) -> int:
+        """Get number of queued frames"""
+        return len(self._queue)
+
+    async def _writer(self) -> None:
+        """Drain the queue to the socket, one frame at a time"""
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    _, frame = self._queue.popitem(last=False)
+                    await asyncio.wait_for(self._send(frame), self.send_timeout)
+                self._ready.clear()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # Send failed or timed out: the client is gone or too slow
+            logger.debug("websocket_client_write_failed", error=repr(e))
+            self.closed = True
+            self._queue.clear()
+            if self._close is not None:
+                try:
+                    await self._close(1011)
+                except Exception:
+                    pass
+
+    async def stop(self) -> None:
+        """Stop the writer task"""
+        self.closed = True
+        self._queue.clear()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
+
+class FanoutHub:
+    """
+    Fans channel messages out to subscribed WebSocket clients
+
+    Each message is serialized once and handed to every subscriber's
+    queue, so publishing never waits on a client socket. With Redis, every
+    publish is also relayed to the other API instances.
+    """
+
+    def __init__(self, max_queue: int = 256, send_timeout: float = 10.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.instance_id = uuid.uuid4().hex
+        self._channels: Dict[str, Set[ClientConnection]] = {c: set() for c in CHANNELS}
+        self._redis = None
+        self._listen_task: Optional[asyncio.Task] = None
+
+    # ============== Clients ==============
+
+    def register(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        close: Optional[Callable[..., Awaitable[None]]] = None,
+    ) -> ClientConnection:
+        """Register a connected client and start its writer"""
+        client = ClientConnection(send, close, self.max_queue, self.send_timeout)
+        client.start()
+        return client
+
+    async def unregister(self, client: ClientConnection) -> None:
+        """Remove a client from all channels and stop its writer"""
+        for channel in client.channels:
+            self._channels[channel].discard(client)
+        client.channels.clear()
+        await client.stop()
+
+    def subscribe(self, client: ClientConnection, channel: str) -> bool:
+        """Subscribe a client to a channel; False for unknown channels"""
+        if channel not in self._channels:
+            return False
+        self._channels[channel].add(client)
+        client.channels.add(channel)
+        return True
+
+    def unsubscribe(self, client: ClientConnection, channel: str) -> bool:
+        """Unsubscribe a client from a channel; False for unknown channels"""
+        if channel not in self._channels:
+            return False
+        self._channels[channel].discard(client)
+        client.channels.discard(channel)
+        return True
+
+    # ============== Publishing ==============
+
+    async def publish(
+        self, channel: str, data: Dict[str, Any], coalesce_key: Optional[str] = None
+    ) -> int:
+        """
+        Publish a message to a channel on every API instance
+
+        Args:
+            channel: Channel name
+            data: Message payload
+            coalesce_key: Key under which newer messages replace queued ones
+
+        Returns:
+            Number of local clients the message was queued for
+        """
+        return await self.publish_many(channel, [(data, coalesce_key)])
+
+    async def publish_many(
+        self,
+        channel: str,
+        messages: List[Tuple[Dict[str, Any], Optional[str]]],
+    ) -> int:
+        """
+        Publish a batch of (data, coalesce_key) messages to a channel
+
+        The whole batch is relayed to other API instances in one Redis
+        publish.
+
+        Returns:
+            Number of local frames queued
+        """
+        if channel not in self._channels or not messages:
+            return 0
+
+        timestamp = datetime.utcnow().isoformat()
+        frames = [
+            (
+                coalesce_key,
+                json.dumps(
+                    {
+                        "type": "message",
+                        "channel": channel,
+                        "data": data,
+                        "timestamp": timestamp,
+                    },
+                    default=str,
+                ),
+            )
+            for data, coalesce_key in messages
+        ]
+
+        if self._redis is not None:
+            try:
+                await self._redis.publish(
+                    RELAY_CHANNEL,
+                    json.dumps(
+                        {
+                            "origin": self.instance_id,
+                            "channel": channel,
+                            "frames": frames,
+                        }
+                    ),
+                )
+            except Exception as e:
+                logger.warning("websocket_relay_publish_failed", error=str(e))
+
+        return sum(
+            self.deliver_local(channel, frame, coalesce_key)
+            for coalesce_key, frame in frames
+        )
+
+    def deliver_local(
+        self, channel: str, frame: str, coalesce_key: Optional[str] = None
+    ) -> int:
+        """Queue a serialized frame for this instance's subscribers"""
+        clients = self._channels.get(channel)
+        if not clients:
+            return 0
+
+        queued = 0
+        dead = []
+        for client in clients:
+            if client.enqueue(frame, coalesce_key):
+                queued += 1
+            else:
+                dead.append(client)
+
+        for client in dead:
+            clients.discard(client)
+        if dead:
+            logger.debug(
+                "websocket_dead_clients_removed", channel=channel, count=len(dead)
+            )
+
+        return queued
+
+    async def _listen(self) -> None:
+        """Deliver broadcasts relayed from other API instances"""
+        delay = RELAY_RETRY_INITIAL
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(RELAY_CHANNEL)
+                delay = RELAY_RETRY_INITIAL
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        data = json.loads(message["data"])
+                    except (TypeError, json.JSONDecodeError):
+                        continue
+                    if data.get("origin") == self.instance_id:
+                        continue
+                    for coalesce_key, frame in data.get("frames") or []:
+                        self.deliver_local(data.get("channel"), frame, coalesce_key)
+                logger.warning("websocket_relay_listener_ended", retry_in=delay)
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error(
+                    "websocket_relay_listener_error", error=str(e), retry_in=delay
+                )
+            finally:
+                try:
+                    await pubsub.unsubscribe(RELAY_CHANNEL)
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+            # Keep resubscribing; publishes carry on meanwhile
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RELAY_RETRY_MAX)
+
+    # ============== Lifecycle ==============
+
+    async def start(self, redis_client=None) -> None:
+        """Start relaying through Redis if it is available"""
+        self._redis = redis_client
+        if redis_client is not None:
+            self._listen_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop the relay listener and all client writers"""
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+
+        clients = {c for subscribers in self._channels.values() for c in subscribers}
+        for client in clients:
+            await self.unregister(client)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get subscriber and queued-frame counts per channel"""
+        return {
+            channel: {
+                "clients": len(clients),
+                "queued": sum(c.pending() for c in clients),
+            }
+            for channel, clients in self._channels.items()
+        }
+
+
+async def init_ws_hub(app: Quart) -> None:
+    """Initialize WebSocket fan-out hub for application"""
+    global _ws_hub
+
+    from services.redis_service import get_redis
+
+    config = app.killkrill_config
+    _ws_hub = FanoutHub(
+        max_queue=config.WS_CLIENT_QUEUE_SIZE,
+        send_timeout=config.WS_SEND_TIMEOUT,
+    )
+    await _ws_hub.start(await get_redis())
+    app.ws_hub = _ws_hub
+    logger.info("ws_hub_initialized", instance_id=_ws_hub.instance_id)
+
+
+async def close_ws_hub(app: Quart) -> None:
+    """Stop WebSocket fan-out hub"""
+    global _ws_hub
+
+    if _ws_hub:
+        await _ws_hub.stop()
+        _ws_hub = None
+        logger.info("ws_hub_closed")
+
+
+def get_ws_hub() -> Optional[FanoutHub]:
+    """Get WebSocket fan-out hub"""
+    return _ws_hub
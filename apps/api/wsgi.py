@@ -22,28 +22,34 @@ from quart_cors import cors
 # Import with absolute imports
 from config import QuartConfig, get_config
 from middleware.auth import AuthMiddleware
-from models.database import close_database, get_db, init_database
-from services.license_service import check_feature, get_license_info, init_license
+from middleware.metrics import MetricsMiddleware
+from middleware.rate_limit import RateLimitMiddleware
+from models.database import close_database, get_db, init_database, release_db
+from services.audit_log import close_audit_log, init_audit_log
+from services.credential_cache import close_credential_cache, init_credential_cache
+from services.fleet_mirror import close_fleet_mirror, init_fleet_mirror
+from services.license_service import (
+    check_feature,
+    close_license,
+    get_license_info,
+    init_license,
+)
+from services.live_query import close_live_queries, init_live_queries
+from services.log_tail import close_log_tail, init_log_tail
+from services.password_hasher import (
+    HasherBusy,
+    close_password_hasher,
+    init_password_hasher,
+)
+from services.rate_limiter import init_rate_limiter
 from services.redis_service import close_redis, get_redis, init_redis
+from services.status_index import init_status_index
+from services.token_cache import close_token_cache, init_token_cache
+from services.ws_hub import close_ws_hub, init_ws_hub
+from shared.monitoring.structured_logging import configure_logging
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
-    ],
-    wrapper_class=structlog.stdlib.BoundLogger,
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=True,
-)
+configure_logging()
 
 logger = structlog.get_logger(__name__)
 
@@ -80,12 +86,17 @@ def create_app(config_name: str = None) -> Quart:
     register_error_handlers(app)
 
     # Register middleware
+    MetricsMiddleware(app)
+
     @app.before_request
     async def before_request():
         g.request_start_time = datetime.utcnow()
         g.request_id = request.headers.get("X-Request-ID", str(id(request)))
         await AuthMiddleware.authenticate()
 
+    # Rate limits are keyed by the authenticated tenant, so run after auth
+    RateLimitMiddleware(app)
+
     @app.after_request
     async def after_request(response):
         response.headers["X-Request-ID"] = g.get("request_id", "unknown")
@@ -94,6 +105,15 @@ def create_app(config_name: str = None) -> Quart:
             response.headers["X-Response-Time"] = f"{duration:.3f}s"
         return response
 
+    # Return each request's database connection to the pool
+    @app.teardown_request
+    async def teardown_request(exc):
+        await release_db()
+
+    @app.teardown_websocket
+    async def teardown_websocket(exc):
+        await release_db()
+
     # Register blueprints
     register_blueprints(app)
 
@@ -102,13 +122,32 @@ def create_app(config_name: str = None) -> Quart:
     async def startup():
         logger.info("application_starting")
         await init_database(app)
+        await init_audit_log(app)
         await init_redis(app)
+        await init_rate_limiter(app)
+        await init_credential_cache(app)
+        await init_token_cache(app)
+        await init_password_hasher(app)
+        await init_status_index(app)
+        await init_ws_hub(app)
+        await init_log_tail(app)
+        await init_fleet_mirror(app)
+        await init_live_queries(app)
         await init_license(app)
         logger.info("application_started")
 
     @app.after_serving
     async def shutdown():
         logger.info("application_stopping")
+        await close_log_tail(app)
+        await close_ws_hub(app)
+        await close_fleet_mirror(app)
+        await close_live_queries(app)
+        await close_license(app)
+        await close_token_cache(app)
+        await close_password_hasher(app)
+        await close_credential_cache(app)
+        await close_audit_log(app)
         await close_database(app)
         await close_redis(app)
         logger.info("application_stopped")
@@ -163,6 +202,14 @@ def register_error_handlers(app: Quart) -> None:
     async def internal_error(error):
         return jsonify({"error": "Internal Server Error", "status_code": 500}), 500
 
+    @app.errorhandler(HasherBusy)
+    async def hasher_busy(error):
+        return (
+            jsonify({"error": "Service Unavailable", "status_code": 503}),
+            503,
+            {"Retry-After": str(error.retry_after)},
+        )
+
 
 def register_blueprints(app: Quart) -> None:
     from blueprints.ai_analysis import ai_analysis_bp
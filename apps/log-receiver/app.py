@@ -14,27 +14,19 @@ from quart import Quart
 from quart_cors import cors
 
 # Import shared ReceiverClient
+from shared.ingest import BodyLimits
 from shared.receiver_client import ReceiverClient
+from shared.monitoring.structured_logging import configure_logging
 
 from config import get_config
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
-    ],
-    wrapper_class=structlog.stdlib.BoundLogger,
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=True,
+configure_logging(
+    sample_overrides={
+        "log_submitted": 1.0,
+        "grpc_logs_submitted": 1.0,
+        "rest_logs_submitted": 1.0,
+    }
 )
 
 logger = structlog.get_logger(__name__)
@@ -53,6 +45,9 @@ def create_app() -> Quart:
     # Apply configuration to app
     app.config["DEBUG"] = config.DEBUG
 
+    # Ingestion streams bodies in bounded memory; allow uploads up to its limit
+    app.config["MAX_CONTENT_LENGTH"] = BodyLimits.from_env().max_body_bytes
+
     # Enable CORS
     app = cors(
         app,
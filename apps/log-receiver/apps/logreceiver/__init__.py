@@ -12,6 +12,8 @@ from prometheus_client import Counter, generate_latest
 from py4web import DAL, HTTP, Field, action, request, response
 from py4web.utils.cors import CORS
 
+from shared.ingest import BodyError, BodyReader, iter_batches, read_chunks
+
 # Application name
 __version__ = "1.0.0"
 
@@ -95,54 +97,104 @@ def metrics():
     return generate_latest()
 
 
+def _log_row(log_data):
+    """Database row for one submitted log; raises ValueError if unusable"""
+    if not isinstance(log_data, dict) or not log_data:
+        raise ValueError("Log record must be a non-empty object")
+
+    timestamp = log_data.get("timestamp")
+    if timestamp:
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    else:
+        timestamp = datetime.utcnow()
+
+    return {
+        "timestamp": timestamp,
+        "level": log_data.get("log_level", log_data.get("level", "info")),
+        "message": log_data.get("message", str(log_data)),
+        "source": log_data.get("service_name", log_data.get("source", "unknown")),
+    }
+
+
+def _store_logs(records):
+    """Store one batch of logs; returns (row ids, rejected count)"""
+    rows = []
+    for record in records:
+        try:
+            rows.append(_log_row(record))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    rejected = len(records) - len(rows)
+    if not rows:
+        return [], rejected
+
+    # Store in database, one commit per batch
+    log_ids = db.logs.bulk_insert(rows)
+    db.commit()
+
+    # Send to Redis stream
+    pipe = redis_client.pipeline(transaction=False)
+    for log_id, row in zip(log_ids, rows):
+        pipe.xadd(
+            "logs",
+            {
+                "id": str(log_id),
+                "timestamp": row["timestamp"].isoformat(),
+                "level": row["level"],
+                "message": row["message"],
+                "source": row["source"],
+            },
+        )
+    pipe.execute()
+
+    # Update metrics
+    for row in rows:
+        logs_received.labels(level=row["level"], source=row["source"]).inc()
+
+    return log_ids, rejected
+
+
 # Log ingestion endpoint
 @action("api/v1/logs", method=["POST"])
 @action.uses(CORS())
 def ingest_logs():
-    """Simple log ingestion endpoint"""
-    try:
-        log_data = request.json
+    """
+    Log ingestion endpoint
 
-        # Basic validation
-        if not log_data:
+    Accepts a single log object, a JSON array of logs or newline-delimited
+    logs, optionally gzip or deflate compressed, decoded in batches as the
+    body is read.
+    """
+    accepted = rejected = 0
+    log_id = None
+    try:
+        reader = BodyReader.from_headers(request.headers)
+        for batch in iter_batches(read_chunks(request.body), reader):
+            log_ids, skipped = _store_logs(batch)
+            accepted += len(log_ids)
+            rejected += skipped
+            log_id = log_ids[0] if log_ids else log_id
+
+        if not accepted:
             response.status = 400
+            if rejected:
+                return {"error": "No valid logs provided", "rejected": rejected}
             return {"error": "No JSON data provided"}
 
-        # Extract log fields
-        timestamp = log_data.get("timestamp")
-        if timestamp:
-            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-        else:
-            timestamp = datetime.utcnow()
-
-        level = log_data.get("log_level", log_data.get("level", "info"))
-        message = log_data.get("message", str(log_data))
-        source = log_data.get("service_name", log_data.get("source", "unknown"))
-
-        # Store in database
-        log_id = db.logs.insert(
-            timestamp=timestamp, level=level, message=message, source=source
-        )
-        db.commit()
-
-        # Send to Redis stream
-        stream_data = {
-            "id": str(log_id),
-            "timestamp": timestamp.isoformat(),
-            "level": level,
-            "message": message,
-            "source": source,
-        }
-        redis_client.xadd("logs", stream_data)
-
-        # Update metrics
-        logs_received.labels(level=level, source=source).inc()
-
-        return {
+        result = {
             "status": "accepted",
-            "log_id": log_id,
+            "accepted": accepted,
             "timestamp": datetime.utcnow().isoformat(),
         }
+        if accepted == 1:
+            result["log_id"] = log_id
+        if rejected:
+            result["rejected"] = rejected
+        return result
+
+    except BodyError as e:
+        response.status = e.status
+        return {"error": str(e), "accepted": accepted}
 
     except Exception as e:
         response.status = 500
@@ -3,11 +3,14 @@ KillKrill Log Receiver - Log Ingestion Endpoint
 """
 
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 import structlog
 from prometheus_client import Counter
 from quart import Blueprint, current_app, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
 
+from shared.ingest import BodyError, BodyReader, aiter_batches
 from shared.receiver_client import AuthenticationError, ConnectionError
 
 logger = structlog.get_logger(__name__)
@@ -20,75 +23,125 @@ logs_received = Counter(
 )
 
 
-@ingest_bp.route("/api/v1/logs", methods=["POST"])
-async def ingest_logs():
-    """Log ingestion endpoint with ReceiverClient submission"""
-    try:
-        log_data = await request.get_json()
+def _log_row(log_data: Any) -> Dict[str, Any]:
+    """Database row for one submitted log; raises ValueError if unusable"""
+    if not isinstance(log_data, dict) or not log_data:
+        raise ValueError("Log record must be a non-empty object")
+
+    timestamp = log_data.get("timestamp")
+    if timestamp:
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    else:
+        timestamp = datetime.utcnow()
+
+    return {
+        "timestamp": timestamp,
+        "level": log_data.get("log_level", log_data.get("level", "info")),
+        "message": log_data.get("message", str(log_data)),
+        "source": log_data.get("service_name", log_data.get("source", "unknown")),
+    }
+
+
+async def _store_logs(records: List[Any]) -> Tuple[int, int, Optional[int]]:
+    """
+    Store one batch in the database and Redis and submit it to the backend
+
+    Returns:
+        Accepted and rejected record counts, and the row id when the batch
+        was a single log
+    """
+    rows = []
+    for record in records:
+        try:
+            rows.append(_log_row(record))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    rejected = len(records) - len(rows)
+    if not rows:
+        return 0, rejected, None
+
+    # Store in database, one commit per batch
+    db = current_app.db
+    log_ids = db.logs.bulk_insert(rows)
+    db.commit()
+
+    payloads = [
+        {
+            "timestamp": row["timestamp"].isoformat(),
+            "level": row["level"],
+            "message": row["message"],
+            "source": row["source"],
+        }
+        for row in rows
+    ]
 
-        # Basic validation
-        if not log_data:
-            return jsonify({"error": "No JSON data provided"}), 400
+    # Send to Redis stream
+    pipe = current_app.redis_client.pipeline(transaction=False)
+    for log_id, payload in zip(log_ids, payloads):
+        pipe.xadd("logs", {"id": str(log_id), **payload})
+    pipe.execute()
 
-        db = current_app.db
-        redis_client = current_app.redis_client
-        receiver_client = current_app.receiver_client
+    # Submit to backend via ReceiverClient (gRPC with REST fallback)
+    receiver_client = current_app.receiver_client
+    if receiver_client:
+        try:
+            await receiver_client.submit_logs(payloads)
+            logger.info("log_submitted", count=len(payloads))
+        except (AuthenticationError, ConnectionError) as e:
+            # Log submission error but continue (non-fatal)
+            logger.warning("receiver_submission_error", error=str(e))
 
-        # Extract log fields
-        timestamp = log_data.get("timestamp")
-        if timestamp:
-            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-        else:
-            timestamp = datetime.utcnow()
+    # Update metrics
+    for row in rows:
+        logs_received.labels(level=row["level"]).inc()
 
-        level = log_data.get("log_level", log_data.get("level", "info"))
-        message = log_data.get("message", str(log_data))
-        source = log_data.get("service_name", log_data.get("source", "unknown"))
+    return len(rows), rejected, log_ids[0] if len(log_ids) == 1 else None
 
-        # Store in database
-        log_id = db.logs.insert(
-            timestamp=timestamp, level=level, message=message, source=source
-        )
-        db.commit()
-
-        # Send to Redis stream
-        stream_data = {
-            "id": str(log_id),
-            "timestamp": timestamp.isoformat(),
-            "level": level,
-            "message": message,
-            "source": source,
-        }
-        redis_client.xadd("logs", stream_data)
-
-        # Submit to backend via ReceiverClient (gRPC with REST fallback)
-        if receiver_client:
-            try:
-                log_payload = {
-                    "timestamp": timestamp.isoformat(),
-                    "level": level,
-                    "message": message,
-                    "source": source,
-                }
-                await receiver_client.submit_logs([log_payload])
-                logger.info("log_submitted", log_id=log_id)
-            except (AuthenticationError, ConnectionError) as e:
-                # Log submission error but continue (non-fatal)
-                logger.warning("receiver_submission_error", error=str(e))
-
-        # Update metrics
-        logs_received.labels(level=level).inc()
 
-        return (
-            jsonify(
-                {
-                    "status": "accepted",
-                    "log_id": log_id,
-                    "timestamp": datetime.utcnow().isoformat(),
-                }
-            ),
-            200,
-        )
+@ingest_bp.route("/api/v1/logs", methods=["POST"])
+async def ingest_logs():
+    """
+    Log ingestion endpoint with ReceiverClient submission
+
+    Accepts a single log object, a JSON array of logs or newline-delimited
+    logs, optionally gzip or deflate compressed. The body is decoded as it
+    streams in and stored in batches, so large uploads use bounded memory.
+    """
+    accepted = rejected = 0
+    log_id = None
+    try:
+        reader = BodyReader.from_headers(request.headers)
+        async for batch in aiter_batches(request.body, reader):
+            stored, skipped, batch_log_id = await _store_logs(batch)
+            log_id = batch_log_id or log_id
+            accepted += stored
+            rejected += skipped
+
+        if not accepted and not rejected:
+            return jsonify({"error": "No JSON data provided"}), 400
+        if not accepted:
+            return (
+                jsonify({"error": "No valid logs provided", "rejected": rejected}),
+                400,
+            )
+
+        result = {
+            "status": "accepted",
+            "accepted": accepted,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        if accepted == 1 and log_id:
+            result["log_id"] = log_id
+        if rejected:
+            result["rejected"] = rejected
+        return jsonify(result), 200
+
+    except BodyError as e:
+        logger.warning("log_body_rejected", error=str(e), accepted=accepted)
+        return jsonify({"error": str(e), "accepted": accepted}), e.status
+
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Request body too large", "accepted": accepted}), 413
 
     except Exception as e:
         logger.error("log_ingestion_error", error=str(e))
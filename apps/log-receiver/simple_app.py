@@ -20,6 +20,8 @@ from py4web import DAL, action, request, response
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../shared"))
 from receiver_client import AuthenticationError, ConnectionError, ReceiverClient
 
+from shared.ingest import BodyError, BodyReader, iter_batches, read_chunks
+
 logger = structlog.get_logger(__name__)
 
 # Configuration
@@ -165,73 +167,117 @@ def metrics():
     return generate_latest()
 
 
-@action("api/v1/logs", method=["POST"])
-async def ingest_logs():
-    """Log ingestion endpoint with ReceiverClient submission"""
-    try:
-        log_data = request.json
+def _log_row(log_data):
+    """Database row for one submitted log; raises ValueError if unusable"""
+    if not isinstance(log_data, dict) or not log_data:
+        raise ValueError("Log record must be a non-empty object")
 
-        # Basic validation
-        if not log_data:
-            response.status = 400
-            return {"error": "No JSON data provided"}
+    timestamp = log_data.get("timestamp")
+    if timestamp:
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    else:
+        timestamp = datetime.utcnow()
 
-        # Extract log fields
-        timestamp = log_data.get("timestamp")
-        if timestamp:
-            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-        else:
-            timestamp = datetime.utcnow()
+    return {
+        "timestamp": timestamp,
+        "level": log_data.get("log_level", log_data.get("level", "info")),
+        "message": log_data.get("message", str(log_data)),
+        "source": log_data.get("service_name", log_data.get("source", "unknown")),
+    }
 
-        level = log_data.get("log_level", log_data.get("level", "info"))
-        message = log_data.get("message", str(log_data))
-        source = log_data.get("service_name", log_data.get("source", "unknown"))
 
-        # Store in database
-        log_id = db.logs.insert(
-            timestamp=timestamp, level=level, message=message, source=source
-        )
-        db.commit()
-
-        # Send to Redis stream
-        stream_data = {
-            "id": str(log_id),
-            "timestamp": timestamp.isoformat(),
-            "level": level,
-            "message": message,
-            "source": source,
+async def _store_logs(records):
+    """Store and submit one batch of logs; returns (row ids, rejected count)"""
+    rows = []
+    for record in records:
+        try:
+            rows.append(_log_row(record))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    rejected = len(records) - len(rows)
+    if not rows:
+        return [], rejected
+
+    # Store in database, one commit per batch
+    log_ids = db.logs.bulk_insert(rows)
+    db.commit()
+
+    payloads = [
+        {
+            "timestamp": row["timestamp"].isoformat(),
+            "level": row["level"],
+            "message": row["message"],
+            "source": row["source"],
         }
-        redis_client.xadd("logs", stream_data)
+        for row in rows
+    ]
 
-        # Submit to backend via ReceiverClient (gRPC with REST fallback)
-        if receiver_client:
-            try:
-                log_payload = {
-                    "timestamp": timestamp.isoformat(),
-                    "level": level,
-                    "message": message,
-                    "source": source,
-                }
-                await receiver_client.submit_logs([log_payload])
-                logger.info("log_submitted", log_id=log_id)
-            except (AuthenticationError, ConnectionError) as e:
-                # Log submission error but continue (non-fatal)
-                logger.warning("receiver_submission_error", error=str(e))
-
-        # Update metrics
-        logs_received.labels(level=level).inc()
+    # Send to Redis stream
+    pipe = redis_client.pipeline(transaction=False)
+    for log_id, payload in zip(log_ids, payloads):
+        pipe.xadd("logs", {"id": str(log_id), **payload})
+    pipe.execute()
 
-        response.headers["Content-Type"] = "application/json"
-        return {
+    # Submit to backend via ReceiverClient (gRPC with REST fallback)
+    if receiver_client:
+        try:
+            await receiver_client.submit_logs(payloads)
+            logger.info("log_submitted", count=len(payloads))
+        except (AuthenticationError, ConnectionError) as e:
+            # Log submission error but continue (non-fatal)
+            logger.warning("receiver_submission_error", error=str(e))
+
+    # Update metrics
+    for row in rows:
+        logs_received.labels(level=row["level"]).inc()
+
+    return log_ids, rejected
+
+
+@action("api/v1/logs", method=["POST"])
+async def ingest_logs():
+    """
+    Log ingestion endpoint with ReceiverClient submission
+
+    Accepts a single log object, a JSON array of logs or newline-delimited
+    logs, optionally gzip or deflate compressed, decoded in batches as the
+    body is read.
+    """
+    response.headers["Content-Type"] = "application/json"
+    accepted = rejected = 0
+    log_id = None
+    try:
+        reader = BodyReader.from_headers(request.headers)
+        for batch in iter_batches(read_chunks(request.body), reader):
+            log_ids, skipped = await _store_logs(batch)
+            accepted += len(log_ids)
+            rejected += skipped
+            log_id = log_ids[0] if log_ids else log_id
+
+        if not accepted:
+            response.status = 400
+            if rejected:
+                return {"error": "No valid logs provided", "rejected": rejected}
+            return {"error": "No JSON data provided"}
+
+        result = {
             "status": "accepted",
-            "log_id": log_id,
+            "accepted": accepted,
             "timestamp": datetime.utcnow().isoformat(),
         }
+        if accepted == 1:
+            result["log_id"] = log_id
+        if rejected:
+            result["rejected"] = rejected
+        return result
+
+    except BodyError as e:
+        response.status = e.status
+        return {"error": str(e), "accepted": accepted}
 
     except Exception as e:
         logger.error("log_ingestion_error", error=str(e))
         response.status = 500
-        response.headers["Content-Type"] = "application/json"
         return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
 
 
@@ -7,16 +7,23 @@
 #include <bpf/bpf_helpers.h>
 #include <bpf/bpf_endian.h>
 
-#define MAX_CIDR_RULES 1024
+#define MAX_CIDR_RULES 16384    // Compiled prefixes per rule set generation
 #define MAX_PORT_RULES 64
 
-// CIDR rule structure
-struct cidr_rule {
-    __u32 network;      // Network address in network byte order
-    __u32 mask;         // Subnet mask
-    __u16 port;         // Port number (0 = any port)
-    __u8 enabled;       // Rule enabled flag
-    __u8 reserved;      // Padding
+// Bits of cidr_key matched before the address: generation + port
+#define CIDR_KEY_HEADER_BITS 32
+
+#define NS_PER_SEC 1000000000ULL
+#define RATE_LIMIT_SOURCES 65536
+
+// LPM trie key for allowed source networks. Userspace compiles rules into
+// (port, prefix) entries, writes them under the inactive generation and
+// then flips cidr_generation, so a new rule set takes effect atomically.
+struct cidr_key {
+    __u32 prefixlen;    // CIDR_KEY_HEADER_BITS + network prefix length
+    __u16 generation;   // Rule set generation the entry belongs to
+    __u16 port;         // Destination port (0 = any port)
+    __u8 addr[4];       // Source network in network byte order
 };
 
 // XDP statistics structure
@@ -31,15 +38,39 @@ struct xdp_stats {
     __u64 udp_packets;
     __u64 syslog_packets;
     __u64 api_packets;
+    __u64 packets_rate_limited;
+    __u64 bytes_rate_limited;
+};
+
+// Per-source token bucket. Tokens are counted in units of 1/NS_PER_SEC of a
+// packet, so refilling is elapsed_ns * rate_pps with no division.
+struct rate_bucket {
+    __u64 tokens;
+    __u64 last_ns;
+};
+
+// Per-source UDP rate limit, written by userspace (rate_pps 0 = disabled)
+struct rate_limit_config {
+    __u64 rate_pps;      // Sustained packets per second per source
+    __u64 max_tokens;    // Burst size in packets * NS_PER_SEC
+    __u64 refill_ns;     // Idle time after which a bucket is full again
 };
 
 // BPF maps for CIDR rules and statistics
+struct {
+    __uint(type, BPF_MAP_TYPE_LPM_TRIE);
+    __uint(max_entries, MAX_CIDR_RULES * 2);
+    __uint(map_flags, BPF_F_NO_PREALLOC);
+    __type(key, struct cidr_key);
+    __type(value, __u8);
+} cidr_rules SEC(".maps");
+
 struct {
     __uint(type, BPF_MAP_TYPE_ARRAY);
-    __uint(max_entries, MAX_CIDR_RULES);
+    __uint(max_entries, 1);
     __type(key, __u32);
-    __type(value, struct cidr_rule);
-} cidr_rules SEC(".maps");
+    __type(value, __u32);
+} cidr_generation SEC(".maps");
 
 struct {
     __uint(type, BPF_MAP_TYPE_ARRAY);
@@ -55,17 +86,39 @@ struct {
     __type(value, struct xdp_stats);
 } xdp_statistics SEC(".maps");
 
-// Helper function to check if IP matches CIDR rule
-static __always_inline int check_cidr_match(__u32 ip, struct cidr_rule *rule) {
-    if (!rule->enabled) {
-        return 0;
-    }
+struct {
+    __uint(type, BPF_MAP_TYPE_LRU_HASH);
+    __uint(max_entries, RATE_LIMIT_SOURCES);
+    __type(key, __u32);
+    __type(value, struct rate_bucket);
+} rate_buckets SEC(".maps");
+
+struct {
+    __uint(type, BPF_MAP_TYPE_ARRAY);
+    __uint(max_entries, 1);
+    __type(key, __u32);
+    __type(value, struct rate_limit_config);
+} rate_limit_config SEC(".maps");
 
-    // Apply subnet mask to both IP and network
-    __u32 masked_ip = ip & rule->mask;
-    __u32 masked_network = rule->network & rule->mask;
+// Helper function to check if a source IP is allowed to reach a port.
+// Two trie lookups (port-specific, then any-port) regardless of rule count.
+static __always_inline int check_cidr_allowed(__u32 src_ip, __u16 port) {
+    __u32 zero = 0;
+    __u32 *generation = bpf_map_lookup_elem(&cidr_generation, &zero);
 
-    return masked_ip == masked_network;
+    struct cidr_key key = {
+        .prefixlen = CIDR_KEY_HEADER_BITS + 32,
+        .generation = generation ? *generation : 0,
+        .port = port,
+    };
+    __builtin_memcpy(key.addr, &src_ip, sizeof(key.addr));
+
+    if (port != 0 && bpf_map_lookup_elem(&cidr_rules, &key)) {
+        return 1;
+    }
+
+    key.port = 0;
+    return bpf_map_lookup_elem(&cidr_rules, &key) ? 1 : 0;
 }
 
 // Helper function to check if port is allowed
@@ -82,8 +135,49 @@ static __always_inline int check_port_allowed(__u16 port) {
     return 0;
 }
 
+// Helper function to take a token from the source's bucket. Buckets are
+// shared by all CPUs without locking, so a source spread over several
+// CPUs may briefly get slightly more than its rate.
+static __always_inline int check_rate_limit(__u32 src_ip) {
+    __u32 zero = 0;
+    struct rate_limit_config *cfg = bpf_map_lookup_elem(&rate_limit_config, &zero);
+    if (!cfg || cfg->rate_pps == 0) {
+        return 1;
+    }
+
+    __u64 now = bpf_ktime_get_ns();
+    struct rate_bucket *bucket = bpf_map_lookup_elem(&rate_buckets, &src_ip);
+    if (!bucket) {
+        // A new source starts with a full bucket, less this packet
+        struct rate_bucket fresh = {
+            .tokens = cfg->max_tokens - NS_PER_SEC,
+            .last_ns = now,
+        };
+        bpf_map_update_elem(&rate_buckets, &src_ip, &fresh, BPF_ANY);
+        return 1;
+    }
+
+    __u64 elapsed = now > bucket->last_ns ? now - bucket->last_ns : 0;
+    __u64 tokens = cfg->max_tokens;
+    if (elapsed < cfg->refill_ns) {
+        // elapsed * rate_pps < max_tokens + rate_pps here, so no overflow
+        tokens = bucket->tokens + elapsed * cfg->rate_pps;
+        if (tokens > cfg->max_tokens) {
+            tokens = cfg->max_tokens;
+        }
+    }
+    bucket->last_ns = now;
+
+    if (tokens < NS_PER_SEC) {
+        bucket->tokens = tokens;
+        return 0;
+    }
+    bucket->tokens = tokens - NS_PER_SEC;
+    return 1;
+}
+
 // Helper function to update statistics
-static __always_inline void update_stats(__u64 packet_size, int allowed, int is_tcp, int is_udp, int is_syslog, int is_api) {
+static __always_inline void update_stats(__u64 packet_size, int allowed, int rate_limited, int is_tcp, int is_udp, int is_syslog, int is_api) {
     __u32 key = 0;
     struct xdp_stats *stats = bpf_map_lookup_elem(&xdp_statistics, &key);
     if (!stats) {
@@ -99,6 +193,10 @@ static __always_inline void update_stats(__u64 packet_size, int allowed, int is_
     } else {
         __sync_fetch_and_add(&stats->packets_blocked, 1);
         __sync_fetch_and_add(&stats->bytes_blocked, packet_size);
+        if (rate_limited) {
+            __sync_fetch_and_add(&stats->packets_rate_limited, 1);
+            __sync_fetch_and_add(&stats->bytes_rate_limited, packet_size);
+        }
     }
 
     if (is_tcp) {
@@ -178,30 +276,21 @@ int xdp_filter_func(struct xdp_md *ctx) {
 
     // Check if port is allowed
     if (!check_port_allowed(dest_port)) {
-        update_stats(packet_size, 0, is_tcp, is_udp, is_syslog, is_api);
+        update_stats(packet_size, 0, 0, is_tcp, is_udp, is_syslog, is_api);
         return XDP_DROP;
     }
 
     // Check CIDR rules
-    int ip_allowed = 0;
-    for (__u32 i = 0; i < MAX_CIDR_RULES; i++) {
-        struct cidr_rule *rule = bpf_map_lookup_elem(&cidr_rules, &i);
-        if (!rule || !rule->enabled) {
-            continue;
-        }
-
-        // If rule has a specific port, check if it matches
-        if (rule->port != 0 && rule->port != dest_port) {
-            continue;
-        }
+    int ip_allowed = check_cidr_allowed(src_ip, dest_port);
 
-        if (check_cidr_match(src_ip, rule)) {
-            ip_allowed = 1;
-            break;
-        }
+    // Shed floods from single UDP senders; TCP senders back off on their own
+    int rate_limited = 0;
+    if (ip_allowed && is_udp && !check_rate_limit(src_ip)) {
+        rate_limited = 1;
+        ip_allowed = 0;
     }
 
-    update_stats(packet_size, ip_allowed, is_tcp, is_udp, is_syslog, is_api);
+    update_stats(packet_size, ip_allowed, rate_limited, is_tcp, is_udp, is_syslog, is_api);
 
     if (ip_allowed) {
         return XDP_PASS;
@@ -2,20 +2,44 @@
 """
 KillKrill XDP Filter Manager
 Manages XDP packet filtering with CIDR support and metrics collection
+
+CIDR rules are compiled in userspace into the minimal set of (port, prefix)
+entries for the filter's LPM trie. The module also includes kernel-free
+matchers for the compiled and the raw rules, so a compiled rule set can be
+checked against packet traces (see verify_rules and benchmark_rules).
+
+UDP sources can be rate limited per IP with token buckets in the filter.
+XDPStatsExporter publishes the filter's counters to Prometheus, and
+XDPSimulator models the whole filter in userspace for tests.
 """
 
 import ctypes
 import json
 import logging
 import os
-import socket
-import struct
+import random
 import subprocess
 import sys
+import threading
 import time
+from collections import OrderedDict, defaultdict
 from ctypes import Structure, c_uint8, c_uint16, c_uint32, c_uint64
-from ipaddress import IPv4Address, IPv4Network
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from ipaddress import IPv4Address, IPv4Network, collapse_addresses
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge
 
 # Try to import BPF libraries
 try:
@@ -35,16 +59,326 @@ except ImportError:
     logging.warning("Pyroute2 library not available, limited XDP functionality")
 
 
-class CIDRRule(Structure):
-    """CIDR rule structure matching the C struct"""
+# Must match MAX_CIDR_RULES in xdp_filter.c (prefixes per generation)
+MAX_CIDR_RULES = 16384
+
+# Bits of the trie key matched before the address: generation + port
+CIDR_KEY_HEADER_BITS = 32
+
+# Must match MAX_PORT_RULES, NS_PER_SEC and RATE_LIMIT_SOURCES in xdp_filter.c
+MAX_PORT_RULES = 64
+NS_PER_SEC = 1_000_000_000
+RATE_LIMIT_SOURCES = 65536
+
+# Keeps max_tokens well inside the filter's 64-bit token arithmetic
+MAX_RATE_LIMIT_BURST = 1_000_000
+
+_MASKS = [(0xFFFFFFFF << (32 - plen)) & 0xFFFFFFFF for plen in range(33)]
+
+logger = logging.getLogger(__name__)
+
+
+class CIDRKey(Structure):
+    """LPM trie key matching struct cidr_key in the C program"""
 
     _fields_ = [
-        ("network", c_uint32),
-        ("mask", c_uint32),
+        ("prefixlen", c_uint32),
+        ("generation", c_uint16),
         ("port", c_uint16),
-        ("enabled", c_uint8),
-        ("reserved", c_uint8),
+        ("addr", c_uint8 * 4),
+    ]
+
+
+class CIDREntry(NamedTuple):
+    """One compiled trie entry: source prefix allowed to reach a port"""
+
+    port: int  # 0 = any port
+    network: int  # Network address as a host-order integer
+    prefixlen: int
+
+    def key(self, generation: int) -> CIDRKey:
+        """Trie key for this entry under a rule set generation"""
+        return CIDRKey(
+            CIDR_KEY_HEADER_BITS + self.prefixlen,
+            generation,
+            self.port,
+            (c_uint8 * 4)(*self.network.to_bytes(4, "big")),
+        )
+
+    def __str__(self) -> str:
+        cidr = f"{IPv4Address(self.network)}/{self.prefixlen}"
+        return f"{cidr} port={self.port}" if self.port else cidr
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """
+    CIDR rules compiled for the LPM trie
+
+    Attributes:
+        entries: Deduplicated, merged trie entries
+        rules: Enabled, valid rules that were compiled
+        invalid: Rules skipped because they could not be parsed
+    """
+
+    entries: FrozenSet[CIDREntry]
+    rules: int
+    invalid: int
+
+    def diff(self, installed: Set[CIDREntry]) -> Tuple[Set[CIDREntry], Set[CIDREntry]]:
+        """Entries to add and to remove to turn installed into this set"""
+        return set(self.entries - installed), set(installed - self.entries)
+
+
+def _parse_rules(rules: Iterable[Dict]) -> Tuple[List[Tuple[IPv4Network, int]], int]:
+    """Enabled rules as (network, port) pairs, plus the count of invalid rules"""
+    parsed = []
+    invalid = 0
+    for rule in rules:
+        if not rule.get("enabled", True):
+            continue
+        try:
+            network = IPv4Network(rule["cidr"], strict=False)
+            port = int(rule.get("port") or 0)
+            if not 0 <= port <= 0xFFFF:
+                raise ValueError(f"port out of range: {port}")
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Invalid CIDR rule {rule}: {e}")
+            invalid += 1
+            continue
+        parsed.append((network, port))
+    return parsed, invalid
+
+
+def _covered(network: IPv4Network, prefixes: Set[Tuple[int, int]]) -> bool:
+    """Whether network lies inside any (address, prefixlen) in prefixes"""
+    address = int(network.network_address)
+    return any(
+        (address & _MASKS[plen], plen) in prefixes
+        for plen in range(network.prefixlen, -1, -1)
+    )
+
+
+def compile_cidr_rules(rules: Iterable[Dict]) -> CompiledRules:
+    """
+    Compile CIDR rules into LPM trie entries
+
+    Overlapping and adjacent networks are merged per port, and
+    port-specific networks already allowed for any port are dropped,
+    so the entry count never exceeds the rule count.
+
+    Args:
+        rules: Rule dicts with "cidr", optional "port" (0 = any) and
+            optional "enabled"
+
+    Returns:
+        CompiledRules ready to install
+    """
+    parsed, invalid = _parse_rules(rules)
+
+    by_port: Dict[int, List[IPv4Network]] = defaultdict(list)
+    for network, port in parsed:
+        by_port[port].append(network)
+
+    any_port = list(collapse_addresses(by_port.pop(0, [])))
+    covered = {(int(n.network_address), n.prefixlen) for n in any_port}
+    entries = {CIDREntry(0, int(n.network_address), n.prefixlen) for n in any_port}
+
+    for port, networks in by_port.items():
+        for network in collapse_addresses(networks):
+            if not _covered(network, covered):
+                entries.add(
+                    CIDREntry(port, int(network.network_address), network.prefixlen)
+                )
+
+    return CompiledRules(frozenset(entries), len(parsed), invalid)
+
+
+def _ip_int(ip: Union[str, int]) -> int:
+    return ip if isinstance(ip, int) else int(IPv4Address(ip))
+
+
+class ReferenceMatcher:
+    """Userspace model of the original filter: a linear scan over raw rules"""
+
+    def __init__(self, rules: Iterable[Dict]):
+        parsed, _ = _parse_rules(rules)
+        self._rules = [
+            (int(network.network_address), _MASKS[network.prefixlen], port)
+            for network, port in parsed
+        ]
+
+    def allows(self, src_ip: Union[str, int], port: int) -> bool:
+        """Whether a packet from src_ip to port would pass"""
+        src = _ip_int(src_ip)
+        return any(
+            (rule_port == 0 or rule_port == port) and src & mask == network
+            for network, mask, rule_port in self._rules
+        )
+
+
+class LPMMatcher:
+    """
+    Userspace model of the XDP program's trie lookups
+
+    Performs the same two longest-prefix lookups as check_cidr_allowed(),
+    (port, source) then (any port, source), against compiled entries.
+    """
+
+    def __init__(self, compiled: CompiledRules):
+        self._entries = set(compiled.entries)
+        self._prefixlens = sorted({e.prefixlen for e in self._entries}, reverse=True)
+
+    def allows(self, src_ip: Union[str, int], port: int) -> bool:
+        """Whether a packet from src_ip to port would pass"""
+        src = _ip_int(src_ip)
+        entries = self._entries
+        for lookup_port in (port, 0) if port else (0,):
+            for plen in self._prefixlens:
+                if (lookup_port, src & _MASKS[plen], plen) in entries:
+                    return True
+        return False
+
+
+def load_trace(path: str) -> List[Tuple[int, int]]:
+    """
+    Read a packet trace: one "source_ip port" pair per line
+
+    Blank lines and lines starting with # are ignored.
+    """
+    trace = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            src_ip, port = line.split()[:2]
+            trace.append((_ip_int(src_ip), int(port)))
+    return trace
+
+
+def load_timed_trace(path: str) -> List[Tuple[int, int, int, int]]:
+    """
+    Read a timed packet trace: "seconds source_ip port [size]" per line
+
+    Returns:
+        (time_ns, source_ip, port, size) tuples; size defaults to 64 bytes
+    """
+    trace = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split()
+            size = int(fields[3]) if len(fields) > 3 else 64
+            trace.append(
+                (
+                    int(float(fields[0]) * NS_PER_SEC),
+                    _ip_int(fields[1]),
+                    int(fields[2]),
+                    size,
+                )
+            )
+    return trace
+
+
+def verify_rules(
+    rules: List[Dict], trace: Iterable[Tuple[Union[str, int], int]]
+) -> Dict:
+    """
+    Check compiled rules against the raw rules on a packet trace
+
+    Args:
+        rules: Raw CIDR rule dicts
+        trace: (source_ip, destination_port) pairs
+
+    Returns:
+        Packet and entry counts plus up to 20 mismatching packets
+    """
+    compiled = compile_cidr_rules(rules)
+    reference = ReferenceMatcher(rules)
+    lpm = LPMMatcher(compiled)
+
+    packets = allowed = 0
+    mismatches = []
+    for src_ip, port in trace:
+        packets += 1
+        expected = reference.allows(src_ip, port)
+        allowed += expected
+        if lpm.allows(src_ip, port) != expected:
+            mismatches.append(
+                {"src_ip": str(IPv4Address(_ip_int(src_ip))), "port": port}
+            )
+
+    return {
+        "rules": compiled.rules,
+        "invalid_rules": compiled.invalid,
+        "entries": len(compiled.entries),
+        "packets": packets,
+        "allowed": allowed,
+        "mismatch_count": len(mismatches),
+        "mismatches": mismatches[:20],
+    }
+
+
+def benchmark_rules(
+    rule_count: int = 1000, packet_count: int = 100000, seed: int = 0
+) -> Dict:
+    """
+    Compare linear-scan and LPM matching on a random rule set and trace
+
+    Half the packets are drawn from inside rule networks so both paths see
+    allowed and blocked traffic. Every packet's verdict is cross-checked.
+
+    Returns:
+        Rule/entry counts, timings, packets per second and mismatch count
+    """
+    rng = random.Random(seed)
+    ports = [514, 10514, 8081]
+    rules = [
+        {
+            "cidr": f"{IPv4Address(rng.getrandbits(32))}/{rng.choice((8, 16, 20, 24, 28, 32))}",
+            "port": rng.choice([0, 0, *ports]),
+        }
+        for _ in range(rule_count)
     ]
+    networks = [IPv4Network(r["cidr"], strict=False) for r in rules]
+
+    trace = []
+    for _ in range(packet_count):
+        if networks and rng.random() < 0.5:
+            net = rng.choice(networks)
+            src = int(net.network_address) + rng.randrange(net.num_addresses)
+        else:
+            src = rng.getrandbits(32)
+        trace.append((src, rng.choice(ports)))
+
+    start = time.perf_counter()
+    compiled = compile_cidr_rules(rules)
+    compile_seconds = time.perf_counter() - start
+
+    reference = ReferenceMatcher(rules)
+    lpm = LPMMatcher(compiled)
+
+    start = time.perf_counter()
+    expected = [reference.allows(src, port) for src, port in trace]
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [lpm.allows(src, port) for src, port in trace]
+    lpm_seconds = time.perf_counter() - start
+
+    return {
+        "rules": rule_count,
+        "entries": len(compiled.entries),
+        "packets": packet_count,
+        "allowed": sum(expected),
+        "mismatch_count": sum(a != e for a, e in zip(actual, expected)),
+        "compile_ms": round(compile_seconds * 1000, 2),
+        "reference_pps": round(packet_count / reference_seconds),
+        "lpm_pps": round(packet_count / lpm_seconds),
+    }
 
 
 class XDPStats(Structure):
@@ -61,8 +395,293 @@ class XDPStats(Structure):
         ("udp_packets", c_uint64),
         ("syslog_packets", c_uint64),
         ("api_packets", c_uint64),
+        ("packets_rate_limited", c_uint64),
+        ("bytes_rate_limited", c_uint64),
+    ]
+
+
+STAT_FIELDS = [name for name, _ in XDPStats._fields_]
+
+
+def sum_stats(percpu: Iterable[XDPStats]) -> XDPStats:
+    """Add up per-CPU statistics"""
+    total = XDPStats()
+    for stats in percpu:
+        for name in STAT_FIELDS:
+            setattr(total, name, getattr(total, name) + getattr(stats, name))
+    return total
+
+
+class RateLimitConfig(Structure):
+    """Per-source rate limit settings matching struct rate_limit_config"""
+
+    _fields_ = [
+        ("rate_pps", c_uint64),
+        ("max_tokens", c_uint64),
+        ("refill_ns", c_uint64),
     ]
 
+    @classmethod
+    def from_limits(
+        cls, packets_per_second: int, burst: Optional[int] = None
+    ) -> "RateLimitConfig":
+        """
+        Build the settings for a sustained rate and burst size
+
+        Args:
+            packets_per_second: Packets per second allowed per source IP,
+                0 to disable rate limiting
+            burst: Packets a source may send at once (default: one
+                second's worth)
+        """
+        rate = int(packets_per_second)
+        if rate < 0:
+            raise ValueError("packets_per_second must not be negative")
+        if rate == 0:
+            return cls(0, 0, 0)
+
+        burst = rate if burst is None else int(burst)
+        if not 1 <= burst <= MAX_RATE_LIMIT_BURST:
+            raise ValueError(f"burst must be between 1 and {MAX_RATE_LIMIT_BURST}")
+        max_tokens = burst * NS_PER_SEC
+        return cls(rate, max_tokens, -(-max_tokens // rate))
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_pps > 0
+
+
+class TokenBucketModel:
+    """
+    Userspace model of check_rate_limit() in the XDP program
+
+    Uses the same integer arithmetic and a bounded LRU of sources, so
+    verdicts match the kernel for a single CPU.
+    """
+
+    def __init__(self, config: RateLimitConfig, max_sources: int = RATE_LIMIT_SOURCES):
+        self.config = config
+        self.max_sources = max_sources
+        # src_ip -> [tokens, last_ns]
+        self._buckets: "OrderedDict[int, List[int]]" = OrderedDict()
+
+    def allow(self, src_ip: Union[str, int], now_ns: int) -> bool:
+        """Take a token for one packet; False if the source is over its rate"""
+        cfg = self.config
+        if not cfg.enabled:
+            return True
+
+        src = _ip_int(src_ip)
+        bucket = self._buckets.get(src)
+        if bucket is None:
+            self._buckets[src] = [cfg.max_tokens - NS_PER_SEC, now_ns]
+            if len(self._buckets) > self.max_sources:
+                self._buckets.popitem(last=False)
+            return True
+        self._buckets.move_to_end(src)
+
+        elapsed = max(now_ns - bucket[1], 0)
+        tokens = cfg.max_tokens
+        if elapsed < cfg.refill_ns:
+            tokens = min(bucket[0] + elapsed * cfg.rate_pps, cfg.max_tokens)
+        bucket[1] = now_ns
+
+        if tokens < NS_PER_SEC:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - NS_PER_SEC
+        return True
+
+    @property
+    def sources(self) -> int:
+        return len(self._buckets)
+
+
+class XDPSimulator:
+    """
+    Userspace simulation of the XDP filter for tests and dry runs
+
+    Applies the same port, CIDR and rate limit checks as xdp_filter_func()
+    and keeps per-CPU statistics the same way, so exporters and dashboards
+    can be exercised without a kernel. Takes the same configuration as
+    XDPFilterManager.reload_config().
+    """
+
+    def __init__(self, config: Optional[Dict] = None, cpus: int = 1):
+        self.cpus = cpus
+        self.configure(config or {})
+
+    def configure(self, config: Dict) -> None:
+        """Load rules, ports and rate limit, resetting rate limit state"""
+        ports = []
+        for port in config.get("allowed_ports", [])[:MAX_PORT_RULES]:
+            if not port:
+                break  # The filter stops at the first empty slot
+            ports.append(int(port))
+        self.allowed_ports = frozenset(ports)
+        self.matcher = LPMMatcher(compile_cidr_rules(config.get("cidr_rules", [])))
+        self.rate_limiter = TokenBucketModel(_rate_limit_config(config))
+        self._stats = [XDPStats() for _ in range(self.cpus)]
+
+    def process(
+        self,
+        src_ip: Union[str, int],
+        dest_port: int,
+        now_ns: int,
+        size: int = 64,
+        protocol: str = "udp",
+        cpu: int = 0,
+    ) -> bool:
+        """
+        Run one TCP or UDP packet through the filter
+
+        Returns:
+            True if the packet would pass (XDP_PASS)
+        """
+        is_tcp = protocol == "tcp"
+        is_udp = protocol == "udp"
+        rate_limited = False
+
+        allowed = dest_port in self.allowed_ports and self.matcher.allows(
+            src_ip, dest_port
+        )
+        if allowed and is_udp and not self.rate_limiter.allow(src_ip, now_ns):
+            allowed = False
+            rate_limited = True
+
+        stats = self._stats[cpu % self.cpus]
+        stats.packets_total += 1
+        stats.bytes_total += size
+        if allowed:
+            stats.packets_allowed += 1
+            stats.bytes_allowed += size
+        else:
+            stats.packets_blocked += 1
+            stats.bytes_blocked += size
+            if rate_limited:
+                stats.packets_rate_limited += 1
+                stats.bytes_rate_limited += size
+
+        if is_tcp:
+            stats.tcp_packets += 1
+            if dest_port in (80, 443, 8081, 8082):
+                stats.api_packets += 1
+        elif is_udp:
+            stats.udp_packets += 1
+            if 10000 <= dest_port <= 11000:
+                stats.syslog_packets += 1
+        return allowed
+
+    def read_percpu_stats(self) -> List[XDPStats]:
+        """Copies of the per-CPU statistics, as read from the kernel map"""
+        return [XDPStats.from_buffer_copy(stats) for stats in self._stats]
+
+
+def _rate_limit_config(config: Dict) -> RateLimitConfig:
+    """Rate limit settings from a config dict's optional "rate_limit" section"""
+    limits = config.get("rate_limit") or {}
+    return RateLimitConfig.from_limits(
+        limits.get("packets_per_second", 0), limits.get("burst")
+    )
+
+
+class XDPStatsExporter:
+    """
+    Publishes XDP statistics to Prometheus from a background thread
+
+    Every interval the per-CPU counters are summed and exported as
+    killkrill_xdp_<counter> gauges, with killkrill_xdp_<counter>_per_second
+    gauges holding the rate since the previous read. Counters that go
+    backwards (the program was reloaded) restart the rate calculation.
+
+    Args:
+        read_percpu: Returns per-CPU XDPStats, e.g.
+            XDPFilterManager.read_percpu_stats or XDPSimulator.read_percpu_stats
+    """
+
+    def __init__(
+        self,
+        read_percpu: Callable[[], List[XDPStats]],
+        registry: CollectorRegistry = REGISTRY,
+        interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.read_percpu = read_percpu
+        self.interval = interval
+        self._clock = clock
+        self._last: Optional[Tuple[float, XDPStats]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.logger = logging.getLogger(__name__)
+
+        self._totals = {
+            name: Gauge(f"killkrill_xdp_{name}", f"XDP {name}", registry=registry)
+            for name in STAT_FIELDS
+        }
+        self._rates = {
+            name: Gauge(
+                f"killkrill_xdp_{name}_per_second",
+                f"XDP {name} per second",
+                registry=registry,
+            )
+            for name in STAT_FIELDS
+        }
+        self._errors = Counter(
+            "killkrill_xdp_export_errors_total",
+            "Failed reads of the XDP statistics map",
+            registry=registry,
+        )
+
+    def collect_once(self) -> Dict[str, Dict[str, float]]:
+        """
+        Read, sum and export the counters once
+
+        Returns:
+            {"totals": counter -> value, "rates": counter -> per second};
+            rates are empty on the first read
+        """
+        now = self._clock()
+        total = sum_stats(self.read_percpu())
+        totals = {name: getattr(total, name) for name in STAT_FIELDS}
+        for name, value in totals.items():
+            self._totals[name].set(value)
+
+        rates: Dict[str, float] = {}
+        if self._last is not None:
+            last_time, last = self._last
+            elapsed = now - last_time
+            if elapsed > 0 and total.packets_total >= last.packets_total:
+                rates = {
+                    name: max(value - getattr(last, name), 0) / elapsed
+                    for name, value in totals.items()
+                }
+                for name, rate in rates.items():
+                    self._rates[name].set(rate)
+        self._last = (now, total)
+        return {"totals": totals, "rates": rates}
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.collect_once()
+            except Exception as e:
+                self._errors.inc()
+                self.logger.error(f"Failed to export XDP statistics: {e}")
+
+    def start(self) -> None:
+        """Take a first reading and start exporting every interval"""
+        self.collect_once()
+        self._thread = threading.Thread(
+            target=self._run, name="xdp-stats-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+
 
 class XDPFilterManager:
     """Manages XDP packet filtering with CIDR support"""
@@ -74,6 +693,10 @@ class XDPFilterManager:
         self.logger = logging.getLogger(__name__)
         self.enabled = HAS_BCC and HAS_PYROUTE2
 
+        # Active rule set generation and the trie entries installed per generation
+        self._generation = 0
+        self._installed: List[Set[CIDREntry]] = [set(), set()]
+
         if not self.enabled:
             self.logger.warning("XDP filtering disabled due to missing dependencies")
 
@@ -144,6 +767,8 @@ class XDPFilterManager:
                 program_text = f.read()
 
             self.bpf = BPF(text=program_text)
+            self._generation = 0
+            self._installed = [set(), set()]
 
             # Get the function
             fn = self.bpf.load_func("xdp_filter_func", BPF.XDP)
@@ -172,56 +797,53 @@ class XDPFilterManager:
             self.logger.error(f"Failed to unload XDP program: {e}")
             return False
 
-    def _ip_to_uint32(self, ip_str: str) -> int:
-        """Convert IP address string to uint32 in network byte order"""
-        return struct.unpack("!I", socket.inet_aton(ip_str))[0]
-
-    def _cidr_to_mask(self, prefix_len: int) -> int:
-        """Convert CIDR prefix length to subnet mask"""
-        return (0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF
-
     def update_cidr_rules(self, cidr_rules: List[Dict]) -> bool:
-        """Update CIDR rules in the XDP program"""
+        """
+        Update CIDR rules in the XDP program
+
+        The compiled entries are written under the inactive generation,
+        which is then made active with a single array update, so packets
+        never see a partially written rule set. Only entries that differ
+        from what that generation last held are added or removed.
+        """
         if not self.enabled or not self.bpf:
             self.logger.warning("XDP not available, skipping CIDR rule update")
             return False
 
+        compiled = compile_cidr_rules(cidr_rules)
+        if len(compiled.entries) > MAX_CIDR_RULES:
+            self.logger.error(
+                f"{len(compiled.entries)} compiled CIDR entries exceed the "
+                f"limit of {MAX_CIDR_RULES}, keeping the current rules"
+            )
+            return False
+
         try:
             cidr_map = self.bpf["cidr_rules"]
+            target = self._generation ^ 1
+            installed = self._installed[target]
+            added, removed = compiled.diff(installed)
 
-            # Clear existing rules
-            for i in range(1024):  # MAX_CIDR_RULES
-                rule = CIDRRule()
-                rule.enabled = 0
-                cidr_map[ctypes.c_uint32(i)] = rule
-
-            # Add new rules
-            for idx, rule_data in enumerate(cidr_rules[:1024]):
-                if idx >= 1024:
-                    break
-
+            for entry in removed:
                 try:
-                    network = IPv4Network(rule_data["cidr"], strict=False)
-                    port = rule_data.get("port", 0)
-                    enabled = rule_data.get("enabled", True)
-
-                    rule = CIDRRule()
-                    rule.network = self._ip_to_uint32(str(network.network_address))
-                    rule.mask = self._cidr_to_mask(network.prefixlen)
-                    rule.port = port
-                    rule.enabled = 1 if enabled else 0
-
-                    cidr_map[ctypes.c_uint32(idx)] = rule
-
-                    self.logger.debug(
-                        f"Added CIDR rule {idx}: {rule_data['cidr']} port={port}"
-                    )
-
-                except Exception as e:
-                    self.logger.error(f"Invalid CIDR rule {rule_data}: {e}")
-                    continue
-
-            self.logger.info(f"Updated {len(cidr_rules)} CIDR rules")
+                    del cidr_map[entry.key(target)]
+                except KeyError:
+                    pass
+                installed.discard(entry)
+
+            for entry in added:
+                cidr_map[entry.key(target)] = c_uint8(1)
+                installed.add(entry)
+                self.logger.debug(f"Added CIDR entry: {entry}")
+
+            self.bpf["cidr_generation"][ctypes.c_uint32(0)] = ctypes.c_uint32(target)
+            self._generation = target
+
+            self.logger.info(
+                f"Updated CIDR rules: {compiled.rules} rules compiled to "
+                f"{len(compiled.entries)} entries (+{len(added)} -{len(removed)}), "
+                f"generation {target}"
+            )
             return True
 
         except Exception as e:
@@ -254,6 +876,61 @@ class XDPFilterManager:
             self.logger.error(f"Failed to update allowed ports: {e}")
             return False
 
+    def update_rate_limit(
+        self, packets_per_second: int, burst: Optional[int] = None
+    ) -> bool:
+        """
+        Set the per-source-IP UDP rate limit in the XDP program
+
+        Args:
+            packets_per_second: Sustained packets per second per source,
+                0 to disable
+            burst: Packets a source may send at once (default: one
+                second's worth)
+        """
+        if not self.enabled or not self.bpf:
+            self.logger.warning("XDP not available, skipping rate limit update")
+            return False
+
+        try:
+            limit = RateLimitConfig.from_limits(packets_per_second, burst)
+        except (TypeError, ValueError) as e:
+            self.logger.error(f"Invalid rate limit: {e}")
+            return False
+
+        try:
+            self.bpf["rate_limit_config"][ctypes.c_uint32(0)] = limit
+            if limit.enabled:
+                self.logger.info(
+                    f"Rate limiting UDP sources to {limit.rate_pps} pps "
+                    f"(burst {limit.max_tokens // NS_PER_SEC})"
+                )
+            else:
+                self.logger.info("UDP source rate limiting disabled")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to update rate limit: {e}")
+            return False
+
+    def read_percpu_stats(self) -> List[XDPStats]:
+        """Read the per-CPU statistics from the XDP program"""
+        if not self.enabled or not self.bpf:
+            return []
+        stats_array = self.bpf["xdp_statistics"].getvalue(ctypes.c_uint32(0))
+        return [
+            ctypes.cast(cpu_stats, ctypes.POINTER(XDPStats)).contents
+            for cpu_stats in stats_array
+        ]
+
+    def start_exporter(
+        self, registry: CollectorRegistry = REGISTRY, interval: float = 5.0
+    ) -> XDPStatsExporter:
+        """Start exporting statistics to Prometheus every interval seconds"""
+        exporter = XDPStatsExporter(self.read_percpu_stats, registry, interval)
+        exporter.start()
+        return exporter
+
     def get_statistics(self) -> Dict:
         """Get XDP filtering statistics"""
         if not self.enabled or not self.bpf:
@@ -269,30 +946,15 @@ class XDPFilterManager:
                 "udp_packets": 0,
                 "syslog_packets": 0,
                 "api_packets": 0,
+                "packets_rate_limited": 0,
+                "bytes_rate_limited": 0,
                 "block_rate": 0.0,
                 "throughput_mbps": 0.0,
             }
 
         try:
-            stats_map = self.bpf["xdp_statistics"]
-            key = ctypes.c_uint32(0)
-
             # Get per-CPU stats and sum them
-            stats_array = stats_map.getvalue(key)
-            total_stats = XDPStats()
-
-            for cpu_stats in stats_array:
-                stats = ctypes.cast(cpu_stats, ctypes.POINTER(XDPStats)).contents
-                total_stats.packets_total += stats.packets_total
-                total_stats.packets_allowed += stats.packets_allowed
-                total_stats.packets_blocked += stats.packets_blocked
-                total_stats.bytes_total += stats.bytes_total
-                total_stats.bytes_allowed += stats.bytes_allowed
-                total_stats.bytes_blocked += stats.bytes_blocked
-                total_stats.tcp_packets += stats.tcp_packets
-                total_stats.udp_packets += stats.udp_packets
-                total_stats.syslog_packets += stats.syslog_packets
-                total_stats.api_packets += stats.api_packets
+            total_stats = sum_stats(self.read_percpu_stats())
 
             # Calculate rates
             block_rate = 0.0
@@ -325,6 +987,8 @@ class XDPFilterManager:
                 "udp_packets": total_stats.udp_packets,
                 "syslog_packets": total_stats.syslog_packets,
                 "api_packets": total_stats.api_packets,
+                "packets_rate_limited": total_stats.packets_rate_limited,
+                "bytes_rate_limited": total_stats.bytes_rate_limited,
                 "block_rate": round(block_rate, 2),
                 "throughput_mbps": round(throughput_mbps, 2),
             }
@@ -347,6 +1011,12 @@ class XDPFilterManager:
             allowed_ports = config.get("allowed_ports", [])
             self.update_allowed_ports(allowed_ports)
 
+            # Update the per-source rate limit (absent = disabled)
+            limits = config.get("rate_limit") or {}
+            self.update_rate_limit(
+                limits.get("packets_per_second", 0), limits.get("burst")
+            )
+
             self.logger.info("XDP configuration reloaded successfully")
             return True
 
@@ -379,6 +1049,27 @@ def main():
     parser.add_argument("--stats", action="store_true", help="Show statistics")
     parser.add_argument("--status", action="store_true", help="Show status")
     parser.add_argument("--config", help="Configuration file")
+    parser.add_argument(
+        "--trace",
+        help="Check the --config CIDR rules against a packet trace "
+        "(one 'source_ip port' per line) without loading XDP",
+    )
+    parser.add_argument(
+        "--simulate",
+        metavar="TRACE",
+        help="Replay a timed packet trace ('seconds source_ip port [size]' "
+        "per line) through a userspace model of the filter using --config",
+    )
+    parser.add_argument(
+        "--export-port",
+        type=int,
+        help="Serve XDP statistics for Prometheus on this port until interrupted",
+    )
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Benchmark compiled vs linear CIDR matching on random rules",
+    )
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
 
     args = parser.parse_args()
@@ -388,6 +1079,35 @@ def main():
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
+    if args.bench:
+        print(json.dumps(benchmark_rules(), indent=2))
+        return
+
+    if args.trace:
+        if not args.config:
+            parser.error("--trace requires --config")
+        with open(args.config, "r") as f:
+            config = json.load(f)
+        result = verify_rules(config.get("cidr_rules", []), load_trace(args.trace))
+        print(json.dumps(result, indent=2))
+        if result["mismatch_count"]:
+            sys.exit(1)
+        return
+
+    if args.simulate:
+        config = {}
+        if args.config:
+            with open(args.config, "r") as f:
+                config = json.load(f)
+        simulator = XDPSimulator(config)
+        for now_ns, src_ip, port, size in load_timed_trace(args.simulate):
+            simulator.process(src_ip, port, now_ns, size)
+        total = sum_stats(simulator.read_percpu_stats())
+        print(
+            json.dumps({name: getattr(total, name) for name in STAT_FIELDS}, indent=2)
+        )
+        return
+
     manager = XDPFilterManager(interface=args.interface)
 
     if args.status:
@@ -423,6 +1143,18 @@ def main():
             print("Failed to reload configuration")
             sys.exit(1)
 
+    if args.export_port:
+        from prometheus_client import start_http_server
+
+        start_http_server(args.export_port)
+        exporter = manager.start_exporter()
+        print(f"Exporting XDP statistics on port {args.export_port}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            exporter.stop()
+
 
 if __name__ == "__main__":
     main()
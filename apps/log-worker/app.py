@@ -39,25 +39,10 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 
 from shared.config.settings import get_config
 from shared.licensing.client import PenguinTechLicenseClient
+from shared.monitoring.structured_logging import configure_logging
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+configure_logging(sample_overrides={"Processed and acknowledged message batch": 1.0})
 
 logger = structlog.get_logger()
 
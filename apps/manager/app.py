@@ -7,10 +7,19 @@ import os
 from datetime import datetime
 
 import redis.asyncio as redis
+from health_monitor import HealthMonitor
+from proxy import AssetCache, ProxyEngine, Upstream
 from pydal import DAL, Field
 from quart import Quart
 from quart_cors import cors
-from routes import dashboard_bp, embeds_bp, health_bp, infrastructure_bp, services_bp
+from routes import (
+    dashboard_bp,
+    embeds_bp,
+    health_bp,
+    infrastructure_bp,
+    proxy_bp,
+    services_bp,
+)
 
 from config import config
 
@@ -36,6 +45,8 @@ def create_app():
     app.config["REDIS_URL"] = config.REDIS_URL
     app.config["LICENSE_KEY"] = config.LICENSE_KEY
     app.config["LOG_LEVEL"] = config.LOG_LEVEL
+    app.config["JWT_SECRET"] = config.JWT_SECRET
+    app.config["SESSION_COOKIE"] = config.SESSION_COOKIE
 
     # Initialize PyDAL database connection
     db = DAL(config.pydal_database_url, migrate=True, fake_migrate=False)
@@ -60,6 +71,50 @@ def create_app():
     app.config["db"] = db
     app.config["redis_client"] = redis_client
 
+    # Pooled reverse proxy for the embedded infrastructure UIs
+    app.config["proxy_engine"] = ProxyEngine(
+        {
+            "prometheus": Upstream("prometheus", config.PROMETHEUS_URL),
+            "grafana": Upstream(
+                "grafana",
+                config.GRAFANA_URL,
+                config.GRAFANA_USER,
+                config.GRAFANA_PASSWORD,
+            ),
+            "kibana": Upstream("kibana", config.KIBANA_URL),
+            "elasticsearch": Upstream(
+                "elasticsearch", config.ELASTICSEARCH_URL, read_only=True
+            ),
+            "alertmanager": Upstream("alertmanager", config.ALERTMANAGER_URL),
+        },
+        timeout=config.PROXY_TIMEOUT,
+        max_connections=config.PROXY_MAX_CONNECTIONS,
+        cache=AssetCache(max_bytes=config.PROXY_CACHE_MB * 1024 * 1024),
+    )
+
+    # Background health probing for the dashboard and /healthz
+    async def check_redis():
+        await redis_client.ping()
+
+    def check_database():
+        db.executesql("SELECT 1")
+
+    app.config["health_monitor"] = HealthMonitor(
+        components={"database": check_database, "redis": check_redis},
+        host=config.HEALTH_PROBE_HOST,
+        interval=config.HEALTH_PROBE_INTERVAL,
+        timeout=config.HEALTH_PROBE_TIMEOUT,
+    )
+
+    @app.before_serving
+    async def start_health_monitor():
+        await app.config["health_monitor"].start()
+
+    @app.after_serving
+    async def shutdown():
+        await app.config["health_monitor"].stop()
+        await app.config["proxy_engine"].close()
+
     print("✓ KillKrill Manager (Quart) initialized")
 
     # Register blueprints
@@ -68,6 +123,7 @@ def create_app():
     app.register_blueprint(infrastructure_bp)
     app.register_blueprint(services_bp)
     app.register_blueprint(embeds_bp)
+    app.register_blueprint(proxy_bp)
 
     return app
 
@@ -43,6 +43,12 @@ except Exception as table_error:
 
 print(f"✓ KillKrill Manager py4web app initialized")
 
+
+def get_db():
+    """Database connection shared by the app's modules"""
+    return db
+
+
 # Metrics
 health_checks = Counter(
     "killkrill_manager_health_checks_total", "Health checks", ["status"]
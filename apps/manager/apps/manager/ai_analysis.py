@@ -4,10 +4,14 @@ Integrates with OpenAI-compatible endpoints to analyze metrics and performance i
 """
 
 import asyncio
+import hashlib
 import json
+import math
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
 import requests
@@ -37,6 +41,53 @@ ANALYSIS_LOOKBACK_HOURS = int(
     os.environ.get("AI_ANALYSIS_LOOKBACK", "24")
 )  # Look back 24 hours
 
+# Prometheus collection: concurrent queries, cached briefly
+PROMETHEUS_QUERY_CONCURRENCY = int(os.environ.get("PROMETHEUS_QUERY_CONCURRENCY", "4"))
+PROMETHEUS_QUERY_TIMEOUT = float(os.environ.get("PROMETHEUS_QUERY_TIMEOUT", "10"))
+PROMETHEUS_CACHE_SECONDS = float(os.environ.get("PROMETHEUS_CACHE_SECONDS", "30"))
+
+# Reuse an analysis for an unchanged (quantized) system state this long
+AI_ANALYSIS_CACHE_SECONDS = float(
+    os.environ.get("AI_ANALYSIS_CACHE_SECONDS", str(ANALYSIS_INTERVAL_HOURS * 3600))
+)
+AI_ANALYSIS_CACHE_SIZE = 32
+
+METRICS_QUERIES = {
+    "cpu_usage": 'avg(100 - (avg by(instance) (irate(node_cpu_seconds_total{mode="idle"}[5m])) * 100))',
+    "memory_usage": "avg((1 - (node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes)) * 100)",
+    "disk_usage": 'avg(100 - (node_filesystem_avail_bytes{fstype!="tmpfs"} / node_filesystem_size_bytes * 100))',
+    "network_errors": "sum(rate(node_network_receive_errs_total[5m]) + rate(node_network_transmit_errs_total[5m]))",
+    "container_restarts": "sum(rate(kube_pod_container_status_restarts_total[1h]))",
+    "fleet_agents_online": "count(fleet_host_status == 1)",
+    "elasticsearch_health": "elasticsearch_cluster_health_status",
+    "redis_memory_usage": "redis_memory_used_bytes / redis_memory_max_bytes * 100",
+    "log_ingestion_rate": "sum(rate(killkrill_logs_received_total[5m]))",
+    "metrics_ingestion_rate": "sum(rate(killkrill_metrics_received_total[5m]))",
+}
+
+# Percentages are compared in 5-point steps, everything else to two
+# significant figures
+PERCENT_METRICS = {"cpu_usage", "memory_usage", "disk_usage", "redis_memory_usage"}
+
+
+def quantize_metric(name: str, value: float) -> float:
+    """Round a metric so small fluctuations map to the same system state"""
+    if value == 0 or not math.isfinite(value):
+        return value
+    if name in PERCENT_METRICS:
+        return round(value / 5.0) * 5.0
+    return round(value, 1 - int(math.floor(math.log10(abs(value)))))
+
+
+def metrics_digest(metrics_data: Dict[str, Any]) -> str:
+    """Digest of the quantized metric vector plus the model that analyzes it"""
+    state = {name: quantize_metric(name, value) for name, value in metrics_data.items()}
+    payload = json.dumps(
+        [AI_PROVIDER, AI_MODEL, sorted(state.items())], separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
 # Metrics
 ai_analysis_requests = Counter(
     "killkrill_ai_analysis_requests_total",
@@ -46,6 +97,10 @@ ai_analysis_requests = Counter(
 ai_analysis_duration = Histogram(
     "killkrill_ai_analysis_duration_seconds", "AI analysis duration"
 )
+ai_analysis_cache_hits = Counter(
+    "killkrill_ai_analysis_cache_hits_total",
+    "AI analyses reused for an unchanged system state",
+)
 
 
 class AIMetricsAnalyzer:
@@ -53,6 +108,12 @@ class AIMetricsAnalyzer:
 
     def __init__(self, db):
         self.db = db
+        # (collected_at, metrics) from the last Prometheus collection
+        self._metrics_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        # metrics digest -> (analyzed_at, analysis result)
+        self._analysis_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
         self._setup_tables()
 
     def _setup_tables(self):
@@ -119,42 +180,72 @@ class AIMetricsAnalyzer:
             return False
 
     async def collect_prometheus_metrics(self) -> Dict[str, Any]:
-        """Collect metrics from Prometheus for analysis"""
+        """Collect metrics from Prometheus for analysis
+
+        Queries run concurrently (bounded by PROMETHEUS_QUERY_CONCURRENCY)
+        and the result is reused for PROMETHEUS_CACHE_SECONDS.
+        """
+        if self._metrics_cache is not None:
+            collected_at, cached = self._metrics_cache
+            if time.monotonic() - collected_at < PROMETHEUS_CACHE_SECONDS:
+                return dict(cached)
+
         prometheus_url = os.environ.get("PROMETHEUS_URL", "http://prometheus:9090")
-        metrics_queries = {
-            "cpu_usage": 'avg(100 - (avg by(instance) (irate(node_cpu_seconds_total{mode="idle"}[5m])) * 100))',
-            "memory_usage": "avg((1 - (node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes)) * 100)",
-            "disk_usage": 'avg(100 - (node_filesystem_avail_bytes{fstype!="tmpfs"} / node_filesystem_size_bytes * 100))',
-            "network_errors": "sum(rate(node_network_receive_errs_total[5m]) + rate(node_network_transmit_errs_total[5m]))",
-            "container_restarts": "sum(rate(kube_pod_container_status_restarts_total[1h]))",
-            "fleet_agents_online": "count(fleet_host_status == 1)",
-            "elasticsearch_health": "elasticsearch_cluster_health_status",
-            "redis_memory_usage": "redis_memory_used_bytes / redis_memory_max_bytes * 100",
-            "log_ingestion_rate": "sum(rate(killkrill_logs_received_total[5m]))",
-            "metrics_ingestion_rate": "sum(rate(killkrill_metrics_received_total[5m]))",
-        }
+        url = f"{prometheus_url}/api/v1/query"
+        semaphore = asyncio.Semaphore(PROMETHEUS_QUERY_CONCURRENCY)
+
+        async def query_metric(session, metric_name, query):
+            async with semaphore:
+                try:
+                    async with session.get(url, params={"query": query}) as response:
+                        if response.status != 200:
+                            return None
+                        data = await response.json()
+                        if data["data"]["result"]:
+                            return float(data["data"]["result"][0]["value"][1])
+                except Exception as e:
+                    print(f"Error collecting {metric_name}: {e}")
+                return None
 
         collected_metrics = {}
         try:
-            async with aiohttp.ClientSession() as session:
-                for metric_name, query in metrics_queries.items():
-                    try:
-                        url = f"{prometheus_url}/api/v1/query"
-                        params = {"query": query}
-
-                        async with session.get(url, params=params) as response:
-                            if response.status == 200:
-                                data = await response.json()
-                                if data["data"]["result"]:
-                                    value = float(data["data"]["result"][0]["value"][1])
-                                    collected_metrics[metric_name] = value
-                    except Exception as e:
-                        print(f"Error collecting {metric_name}: {e}")
-
+            timeout = aiohttp.ClientTimeout(total=PROMETHEUS_QUERY_TIMEOUT)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                values = await asyncio.gather(
+                    *(
+                        query_metric(session, metric_name, query)
+                        for metric_name, query in METRICS_QUERIES.items()
+                    )
+                )
+            collected_metrics = {
+                metric_name: value
+                for metric_name, value in zip(METRICS_QUERIES, values)
+                if value is not None
+            }
         except Exception as e:
             print(f"Error collecting Prometheus metrics: {e}")
 
-        return collected_metrics
+        if collected_metrics:
+            self._metrics_cache = (time.monotonic(), collected_metrics)
+        return dict(collected_metrics)
+
+    def _cached_analysis(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Previous analysis of the same system state, if still fresh"""
+        entry = self._analysis_cache.get(digest)
+        if entry is None:
+            return None
+        analyzed_at, result = entry
+        if time.monotonic() - analyzed_at >= AI_ANALYSIS_CACHE_SECONDS:
+            del self._analysis_cache[digest]
+            return None
+        self._analysis_cache.move_to_end(digest)
+        return result
+
+    def _remember_analysis(self, digest: str, result: Dict[str, Any]) -> None:
+        self._analysis_cache[digest] = (time.monotonic(), result)
+        self._analysis_cache.move_to_end(digest)
+        while len(self._analysis_cache) > AI_ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
 
     async def analyze_with_ai(
         self, metrics_data: Dict[str, Any]
@@ -360,11 +451,16 @@ Focus on actionable insights that a system administrator can implement.
                 if not metrics_data:
                     return None
 
-                # Analyze with AI
-                analysis_result = await self.analyze_with_ai(metrics_data)
-
-                if not analysis_result:
-                    return None
+                # Analyze with AI, unless this system state was just analyzed
+                digest = metrics_digest(metrics_data)
+                analysis_result = self._cached_analysis(digest)
+                if analysis_result is not None:
+                    ai_analysis_cache_hits.inc()
+                else:
+                    analysis_result = await self.analyze_with_ai(metrics_data)
+                    if not analysis_result:
+                        return None
+                    self._remember_analysis(digest, analysis_result)
 
                 # Store results
                 analysis_id = f"ai_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
@@ -25,6 +25,35 @@ class Config:
     # License
     LICENSE_KEY: str = os.environ.get("LICENSE_KEY", "PENG-DEMO-DEMO-DEMO-DEMO-DEMO")
 
+    # Authentication (tokens issued by the API service)
+    JWT_SECRET: str = os.environ.get(
+        "JWT_SECRET", "killkrill-jwt-secret-change-in-production"
+    )
+    SESSION_COOKIE: str = os.environ.get("SESSION_COOKIE", "killkrill_token")
+
+    # Embedded infrastructure UIs (served through /proxy/<service>/)
+    PROMETHEUS_URL: str = os.environ.get("PROMETHEUS_URL", "http://prometheus:9090")
+    GRAFANA_URL: str = os.environ.get("GRAFANA_URL", "http://grafana:3000")
+    GRAFANA_USER: str = os.environ.get("GRAFANA_USER", "admin")
+    GRAFANA_PASSWORD: str = os.environ.get("GRAFANA_PASSWORD", "admin")
+    KIBANA_URL: str = os.environ.get("KIBANA_URL", "http://kibana:5601")
+    ELASTICSEARCH_URL: str = os.environ.get(
+        "ELASTICSEARCH_URL", "http://elasticsearch:9200"
+    )
+    ALERTMANAGER_URL: str = os.environ.get(
+        "ALERTMANAGER_URL", "http://alertmanager:9093"
+    )
+
+    # Proxy
+    PROXY_TIMEOUT: float = float(os.environ.get("PROXY_TIMEOUT", "30"))
+    PROXY_MAX_CONNECTIONS: int = int(os.environ.get("PROXY_MAX_CONNECTIONS", "20"))
+    PROXY_CACHE_MB: int = int(os.environ.get("PROXY_CACHE_MB", "64"))
+
+    # Health monitor
+    HEALTH_PROBE_HOST: str = os.environ.get("HEALTH_PROBE_HOST", "localhost")
+    HEALTH_PROBE_INTERVAL: float = float(os.environ.get("HEALTH_PROBE_INTERVAL", "15"))
+    HEALTH_PROBE_TIMEOUT: float = float(os.environ.get("HEALTH_PROBE_TIMEOUT", "2"))
+
     # Logging
     LOG_LEVEL: str = os.environ.get("LOG_LEVEL", "INFO")
 
@@ -0,0 +1,185 @@
+"""
+Background health probing for the manager dashboard
+
+Probes every KillKrill service concurrently on an interval, samples system
+stats without blocking, and keeps the results in a snapshot that the
+dashboard and /healthz read instantly.
+"""
+
+import asyncio
+import inspect
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Union
+
+import psutil
+
+# Services shown on the dashboard
+SERVICES = {
+    "postgres": {"port": 5432, "type": "database"},
+    "redis": {"port": 6379, "type": "cache"},
+    "elasticsearch": {"port": 9200, "type": "search"},
+    "kibana": {"port": 5601, "type": "visualization"},
+    "logstash": {"port": 9600, "type": "processing"},
+    "prometheus": {"port": 9090, "type": "monitoring"},
+    "grafana": {"port": 3000, "type": "visualization"},
+    "alertmanager": {"port": 9093, "type": "alerting"},
+    "fleet-server": {"port": 8084, "type": "device_management"},
+    "fleet-mysql": {"port": 3307, "type": "database"},
+    "log-receiver": {"port": 8081, "type": "receiver"},
+    "metrics-receiver": {"port": 8082, "type": "receiver"},
+}
+
+ComponentCheck = Callable[[], Union[Awaitable[Any], Any]]
+
+
+def sample_system_metrics() -> Dict[str, float]:
+    """
+    Sample system stats without sleeping
+
+    ``cpu_percent(interval=None)`` reports usage since the previous call,
+    so with the monitor calling it every interval it measures the whole
+    interval instead of blocking for one second.
+    """
+    try:
+        return {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": psutil.virtual_memory().percent,
+            "disk_percent": psutil.disk_usage("/").percent,
+            "uptime": psutil.boot_time(),
+        }
+    except Exception:
+        return {"cpu_percent": 0, "memory_percent": 0, "disk_percent": 0, "uptime": 0}
+
+
+class HealthMonitor:
+    """
+    Periodic, concurrent health prober with a cached snapshot
+
+    Args:
+        services: Service name -> {"port", "type"} to probe over TCP
+        components: Component name -> check callable (sync or async) that
+            raises on failure, e.g. Redis ping or a database query
+        host: Host the service ports are probed on
+        interval: Seconds between probe rounds
+        timeout: Per-probe timeout in seconds
+    """
+
+    def __init__(
+        self,
+        services: Mapping[str, Dict[str, Any]] = SERVICES,
+        components: Optional[Mapping[str, ComponentCheck]] = None,
+        host: str = "localhost",
+        interval: float = 15.0,
+        timeout: float = 2.0,
+    ):
+        self.services = dict(services)
+        self.components = dict(components or {})
+        self.host = host
+        self.interval = interval
+        self.timeout = timeout
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def _probe_port(self, port: int) -> str:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, port), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return "down"
+        except Exception:
+            return "error"
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return "healthy"
+
+    async def _check_component(self, check: ComponentCheck) -> Dict[str, str]:
+        try:
+            result = check()
+            if inspect.isawaitable(result):
+                await asyncio.wait_for(result, self.timeout)
+            return {"status": "ok"}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Run one probe round and replace the snapshot"""
+        async with self._lock:
+            names = list(self.services)
+            component_names = list(self.components)
+            results = await asyncio.gather(
+                *(self._probe_port(self.services[name]["port"]) for name in names),
+                *(
+                    self._check_component(self.components[name])
+                    for name in component_names
+                ),
+                asyncio.to_thread(sample_system_metrics),
+            )
+
+            statuses = results[: len(names)]
+            checks = results[len(names) : len(names) + len(component_names)]
+            self._snapshot = {
+                "services": {
+                    name: {
+                        "status": status,
+                        "port": self.services[name]["port"],
+                        "type": self.services[name]["type"],
+                    }
+                    for name, status in zip(names, statuses)
+                },
+                "components": dict(zip(component_names, checks)),
+                "system": results[-1],
+                "checked_at": datetime.utcnow().isoformat(),
+            }
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Latest results, probing once if no round has completed yet"""
+        if self._snapshot is None:
+            return await self.refresh()
+        return self._snapshot
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last completed probe round"""
+        if self._snapshot is None:
+            return float("inf")
+        return time.monotonic() - self._checked_at
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the scheduler has missed several rounds"""
+        return self.age > self.interval * 3 + self.timeout
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Health probe round failed: {e}")
+
+    async def start(self) -> None:
+        """Prime CPU sampling, run the first round and start the scheduler"""
+        psutil.cpu_percent(interval=None)
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduler"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
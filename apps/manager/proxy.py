@@ -0,0 +1,496 @@
+"""
+Reverse proxy engine for embedded infrastructure UIs
+
+Keeps one pooled keep-alive client per upstream, streams request and
+response bodies, rewrites HTML on the fly (base tag and iframe styles) and
+serves static assets from an LRU cache revalidated with ETags.
+"""
+
+import base64
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Mapping, Optional, Tuple
+
+import httpx
+
+# Hop-by-hop headers (RFC 7230) plus headers the proxy recomputes
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+        "host",
+        "content-length",
+    }
+)
+
+# Methods allowed to read-only upstreams
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Static assets worth caching across users
+CACHEABLE_EXTENSIONS = (
+    ".js",
+    ".mjs",
+    ".css",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".eot",
+    ".otf",
+    ".svg",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".ico",
+    ".map",
+)
+
+IFRAME_STYLES = b"""<style>
+/* Hide elements that don't work well in iframes */
+.navbar-nav .nav-link[href*="logout"] { display: none !important; }
+.navbar-brand { pointer-events: none; }
+/* Ensure content fits in iframe */
+body { margin: 0 !important; padding: 10px !important; overflow-x: auto !important; }
+/* Fix Grafana iframe issues */
+.sidemenu { position: relative !important; }
+.main-view { margin-left: 0 !important; }
+/* Fix Kibana iframe issues */
+.kbnTopNavMenu { position: relative !important; }
+/* Fix Prometheus iframe issues */
+.navbar-fixed-top { position: relative !important; }
+</style>"""
+
+
+@dataclass(slots=True, frozen=True)
+class Upstream:
+    """Proxied service"""
+
+    name: str
+    base_url: str
+    username: Optional[str] = None
+    password: Optional[str] = None
+    read_only: bool = False
+
+    def allows(self, method: str) -> bool:
+        """Whether requests with this method may be forwarded"""
+        return not self.read_only or method.upper() in READ_METHODS
+
+    @property
+    def auth_header(self) -> Optional[str]:
+        """Basic auth header injected into upstream requests"""
+        if not self.username:
+            return None
+        token = base64.b64encode(f"{self.username}:{self.password or ''}".encode())
+        return f"Basic {token.decode()}"
+
+
+class HTMLRewriter:
+    """
+    Incremental HTML rewriter
+
+    Inserts a ``<base>`` tag right after ``<head>`` and the iframe styles
+    right before ``</head>`` while the document streams through. Only a
+    small tail is held back between chunks so tags split across chunk
+    boundaries are still found; once both insertions are done the rest of
+    the document passes through untouched.
+    """
+
+    HEAD_OPEN = re.compile(rb"<head(?:\s[^>]*)?>", re.IGNORECASE)
+    HEAD_CLOSE = re.compile(rb"</head\s*>", re.IGNORECASE)
+    BODY_OPEN = re.compile(rb"<body[\s>]", re.IGNORECASE)
+
+    # Longest tag we expect to see split across chunks
+    HOLDBACK = 512
+    # Give up looking for <head> after this much output
+    MAX_SCAN = 64 * 1024
+
+    def __init__(self, base_href: str, styles: bytes = IFRAME_STYLES):
+        self.base_tag = f'<base href="{base_href}" target="_self">'.encode()
+        self.styles = styles
+        self._buffer = b""
+        self._scanned = 0
+        self._state = "head"  # head -> styles -> done
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Rewrite the next chunk; returns the bytes that are ready to send"""
+        if self._state == "done":
+            return chunk
+
+        self._buffer += chunk
+        out = []
+
+        if self._state == "head":
+            match = self.HEAD_OPEN.search(self._buffer)
+            body = self.BODY_OPEN.search(self._buffer)
+            if match and (body is None or match.start() < body.start()):
+                out.append(self._buffer[: match.end()] + self.base_tag)
+                self._buffer = self._buffer[match.end() :]
+                self._state = "styles"
+            elif body or self._scanned + len(self._buffer) > self.MAX_SCAN:
+                # No <head>: add one before <body> (or at the start)
+                at = body.start() if body else 0
+                out.append(
+                    self._buffer[:at]
+                    + b"<head>"
+                    + self.base_tag
+                    + self.styles
+                    + b"</head>"
+                )
+                self._buffer = self._buffer[at:]
+                self._state = "done"
+            else:
+                out.append(self._release())
+
+        if self._state == "styles":
+            match = self.HEAD_CLOSE.search(self._buffer)
+            body = self.BODY_OPEN.search(self._buffer)
+            if match or body:
+                at = match.start() if match else body.start()
+                out.append(self._buffer[:at] + self.styles)
+                self._buffer = self._buffer[at:]
+                self._state = "done"
+            else:
+                out.append(self._release())
+
+        if self._state == "done":
+            out.append(self._buffer)
+            self._buffer = b""
+
+        return b"".join(out)
+
+    def _release(self) -> bytes:
+        """Emit all but the held-back tail"""
+        cut = max(0, len(self._buffer) - self.HOLDBACK)
+        released, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        self._scanned += len(released)
+        return released
+
+    def flush(self) -> bytes:
+        """Emit whatever is left at the end of the document"""
+        rest, self._buffer = self._buffer, b""
+        if self._state == "head":
+            rest = self.base_tag + self.styles + rest
+        elif self._state == "styles":
+            rest += self.styles
+        self._state = "done"
+        return rest
+
+
+@dataclass(slots=True)
+class CachedAsset:
+    """Cached static asset"""
+
+    status: int
+    headers: Tuple[Tuple[str, str], ...]
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    validated_at: float
+
+
+class AssetCache:
+    """
+    Byte-bounded LRU cache of static assets
+
+    Entries are served without contacting the upstream for ``fresh_for``
+    seconds, then revalidated with If-None-Match / If-Modified-Since.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 4 * 1024 * 1024,
+        fresh_for: float = 60.0,
+    ):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.fresh_for = fresh_for
+        self._entries: "OrderedDict[str, CachedAsset]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedAsset]:
+        """Look up an asset and mark it recently used"""
+        asset = self._entries.get(key)
+        if asset is not None:
+            self._entries.move_to_end(key)
+        return asset
+
+    def is_fresh(self, asset: CachedAsset) -> bool:
+        """Whether the asset can be served without revalidation"""
+        return time.monotonic() - asset.validated_at < self.fresh_for
+
+    def put(self, key: str, asset: CachedAsset) -> bool:
+        """Store an asset, evicting least recently used entries"""
+        if len(asset.body) > self.max_entry_bytes:
+            return False
+        self.discard(key)
+        self._entries[key] = asset
+        self._size += len(asset.body)
+        while self._size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+        return True
+
+    def discard(self, key: str) -> None:
+        """Remove an asset"""
+        asset = self._entries.pop(key, None)
+        if asset is not None:
+            self._size -= len(asset.body)
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters and size"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+        }
+
+
+@dataclass(slots=True)
+class ProxyResponse:
+    """Upstream response ready to stream to the client"""
+
+    status: int
+    headers: Dict[str, str]
+    body: AsyncIterator[bytes]
+
+
+async def _once(data: bytes) -> AsyncIterator[bytes]:
+    if data:
+        yield data
+
+
+def _is_cacheable(method: str, path: str) -> bool:
+    return method == "GET" and path.lower().endswith(CACHEABLE_EXTENSIONS)
+
+
+def _response_headers(headers: httpx.Headers, drop=()) -> Dict[str, str]:
+    return {
+        key: value
+        for key, value in headers.items()
+        if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() not in drop
+    }
+
+
+class ProxyEngine:
+    """
+    Streaming reverse proxy with one connection pool per upstream
+
+    Request bodies are streamed upstream as they arrive, responses are
+    streamed back chunk by chunk, and only cacheable assets up to the
+    cache's entry limit are ever held in memory.
+    """
+
+    def __init__(
+        self,
+        upstreams: Mapping[str, Upstream],
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        cache: Optional[AssetCache] = None,
+        prefix: str = "/proxy",
+    ):
+        self.upstreams = dict(upstreams)
+        self.prefix = prefix.rstrip("/")
+        self.cache = cache if cache is not None else AssetCache()
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0,
+        )
+        self._clients = {
+            name: httpx.AsyncClient(
+                base_url=upstream.base_url.rstrip("/"),
+                timeout=httpx.Timeout(timeout, connect=5.0),
+                limits=limits,
+                follow_redirects=False,
+            )
+            for name, upstream in self.upstreams.items()
+        }
+
+    async def forward(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        query_string: bytes,
+        headers: Mapping[str, str],
+        body: Optional[AsyncIterator[bytes]] = None,
+    ) -> ProxyResponse:
+        """
+        Forward one request to an upstream
+
+        Args:
+            name: Upstream name
+            method: HTTP method
+            path: Path below the upstream base URL
+            query_string: Raw query string
+            headers: Client request headers
+            body: Async iterator over the request body
+
+        Returns:
+            ProxyResponse with a streaming body
+
+        Raises:
+            KeyError: If the upstream is unknown
+            httpx.HTTPError: If the upstream cannot be reached
+        """
+        upstream = self.upstreams[name]
+        client = self._clients[name]
+
+        url = "/" + path.lstrip("/")
+        if query_string:
+            url += "?" + query_string.decode("latin-1")
+
+        forward_headers = {
+            key: value
+            for key, value in headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS
+        }
+        if upstream.auth_header:
+            forward_headers["Authorization"] = upstream.auth_header
+
+        cache_key = f"{name}:{url}"
+        cacheable = _is_cacheable(method, path)
+        cached = self.cache.get(cache_key) if cacheable else None
+        if cached is not None:
+            if self.cache.is_fresh(cached):
+                self.cache.hits += 1
+                return self._from_cache(cached, headers)
+            # Revalidate our copy rather than the browser's
+            forward_headers.pop("If-None-Match", None)
+            forward_headers.pop("If-Modified-Since", None)
+            if cached.etag:
+                forward_headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                forward_headers["If-Modified-Since"] = cached.last_modified
+        elif cacheable:
+            self.cache.misses += 1
+            # Fetch the full asset so it can be stored
+            forward_headers.pop("If-None-Match", None)
+            forward_headers.pop("If-Modified-Since", None)
+
+        request = client.build_request(
+            method,
+            url,
+            headers=forward_headers,
+            content=body if method not in ("GET", "HEAD") else None,
+        )
+        response = await client.send(request, stream=True)
+
+        if cached is not None and response.status_code == 304:
+            await response.aclose()
+            cached.validated_at = time.monotonic()
+            self.cache.revalidated += 1
+            return self._from_cache(cached, headers)
+
+        content_type = response.headers.get("content-type", "").lower()
+        if "text/html" in content_type:
+            base_href = f"{self.prefix}/{name}/"
+            return ProxyResponse(
+                response.status_code,
+                _response_headers(response.headers, drop=("content-encoding", "etag")),
+                self._rewrite_html(response, HTMLRewriter(base_href)),
+            )
+
+        if cacheable and response.status_code == 200:
+            return ProxyResponse(
+                response.status_code,
+                _response_headers(response.headers),
+                self._tee_to_cache(response, cache_key),
+            )
+
+        return ProxyResponse(
+            response.status_code,
+            _response_headers(response.headers),
+            self._stream_raw(response),
+        )
+
+    def _from_cache(
+        self, asset: CachedAsset, client_headers: Mapping[str, str]
+    ) -> ProxyResponse:
+        headers = dict(asset.headers)
+        if asset.etag and client_headers.get("If-None-Match") == asset.etag:
+            return ProxyResponse(304, headers, _once(b""))
+        return ProxyResponse(asset.status, headers, _once(asset.body))
+
+    @staticmethod
+    async def _stream_raw(response: httpx.Response) -> AsyncIterator[bytes]:
+        """Pass the body through still encoded"""
+        try:
+            async for chunk in response.aiter_raw():
+                yield chunk
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    async def _rewrite_html(
+        response: httpx.Response, rewriter: HTMLRewriter
+    ) -> AsyncIterator[bytes]:
+        """Decode and rewrite HTML as it streams"""
+        try:
+            async for chunk in response.aiter_bytes():
+                out = rewriter.feed(chunk)
+                if out:
+                    yield out
+            tail = rewriter.flush()
+            if tail:
+                yield tail
+        finally:
+            await response.aclose()
+
+    async def _tee_to_cache(
+        self, response: httpx.Response, cache_key: str
+    ) -> AsyncIterator[bytes]:
+        """Stream an asset to the client and store it once complete"""
+        parts = []
+        size = 0
+        keep = bool(
+            response.headers.get("etag") or response.headers.get("last-modified")
+        ) and "no-store" not in response.headers.get("cache-control", "")
+        try:
+            async for chunk in response.aiter_raw():
+                if keep:
+                    size += len(chunk)
+                    if size > self.cache.max_entry_bytes:
+                        keep, parts = False, []
+                    else:
+                        parts.append(chunk)
+                yield chunk
+        finally:
+            await response.aclose()
+
+        if keep:
+            self.cache.put(
+                cache_key,
+                CachedAsset(
+                    status=response.status_code,
+                    # Cached assets are replayed to every user
+                    headers=tuple(
+                        _response_headers(
+                            response.headers, drop=("set-cookie",)
+                        ).items()
+                    ),
+                    body=b"".join(parts),
+                    etag=response.headers.get("etag"),
+                    last_modified=response.headers.get("last-modified"),
+                    validated_at=time.monotonic(),
+                ),
+            )
+
+    async def close(self) -> None:
+        """Close all upstream connection pools"""
+        for client in self._clients.values():
+            await client.aclose()
@@ -6,6 +6,14 @@ from .dashboard import bp as dashboard_bp
 from .embeds import bp as embeds_bp
 from .health import bp as health_bp
 from .infrastructure import bp as infrastructure_bp
+from .proxy import bp as proxy_bp
 from .services import bp as services_bp
 
-__all__ = ["health_bp", "dashboard_bp", "infrastructure_bp", "services_bp", "embeds_bp"]
+__all__ = [
+    "health_bp",
+    "dashboard_bp",
+    "infrastructure_bp",
+    "services_bp",
+    "embeds_bp",
+    "proxy_bp",
+]
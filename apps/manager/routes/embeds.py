@@ -7,8 +7,13 @@ from quart import Blueprint, render_template_string
 bp = Blueprint("embeds", __name__)
 
 
-def generate_iframe_page(title, url, icon):
-    """Generate a consistent iframe page for sub-services"""
+def generate_iframe_page(title, url, icon, proxy_path=None):
+    """Generate a consistent iframe page for sub-services
+
+    When ``proxy_path`` is given the iframe loads the service through the
+    manager's reverse proxy; "Open Direct" still links to ``url``.
+    """
+    frame_src = proxy_path or url
     return f"""
     <!DOCTYPE html>
     <html>
@@ -46,7 +51,7 @@ def generate_iframe_page(title, url, icon):
                 <a href="{url}" class="nav-btn" target="_blank">Open Direct</a>
             </div>
         </div>
-        <iframe src="{url}" title="{title}"
+        <iframe src="{frame_src}" title="{title}"
                 onerror="this.style.display='none'; document.querySelector('.error-msg').style.display='block';">
         </iframe>
         <div class="error-msg" style="display: none;">
@@ -65,7 +70,10 @@ async def prometheus_ui():
     """Embedded Prometheus interface"""
     return await render_template_string(
         generate_iframe_page(
-            "Prometheus Metrics Dashboard", "http://localhost:9090", "📊"
+            "Prometheus Metrics Dashboard",
+            "http://localhost:9090",
+            "📊",
+            proxy_path="/proxy/prometheus/",
         )
     )
 
@@ -74,7 +82,12 @@ async def prometheus_ui():
 async def grafana_ui():
     """Embedded Grafana interface"""
     return await render_template_string(
-        generate_iframe_page("Grafana Dashboards", "http://localhost:3000", "📈")
+        generate_iframe_page(
+            "Grafana Dashboards",
+            "http://localhost:3000",
+            "📈",
+            proxy_path="/proxy/grafana/",
+        )
     )
 
 
@@ -90,7 +103,12 @@ async def fleet_ui():
 async def kibana_ui():
     """Embedded Kibana interface"""
     return await render_template_string(
-        generate_iframe_page("Kibana Log Analysis", "http://localhost:5601", "📋")
+        generate_iframe_page(
+            "Kibana Log Analysis",
+            "http://localhost:5601",
+            "📋",
+            proxy_path="/proxy/kibana/",
+        )
     )
 
 
@@ -98,7 +116,12 @@ async def kibana_ui():
 async def alertmanager_ui():
     """Embedded AlertManager interface"""
     return await render_template_string(
-        generate_iframe_page("AlertManager", "http://localhost:9093", "🚨")
+        generate_iframe_page(
+            "AlertManager",
+            "http://localhost:9093",
+            "🚨",
+            proxy_path="/proxy/alertmanager/",
+        )
     )
 
 
@@ -106,7 +129,12 @@ async def alertmanager_ui():
 async def elasticsearch_ui():
     """Embedded Elasticsearch interface"""
     return await render_template_string(
-        generate_iframe_page("Elasticsearch Cluster", "http://localhost:9200", "🔍")
+        generate_iframe_page(
+            "Elasticsearch Cluster",
+            "http://localhost:9200",
+            "🔍",
+            proxy_path="/proxy/elasticsearch/",
+        )
     )
 
 
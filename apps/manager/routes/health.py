@@ -17,42 +17,48 @@ health_checks = Counter(
 
 @bp.route("/healthz", methods=["GET"])
 async def healthz():
-    """Health check endpoint"""
+    """Health check endpoint, served from the health monitor's snapshot"""
     from quart import current_app
 
-    try:
-        # Test Redis
-        redis_client = current_app.config["redis_client"]
-        await redis_client.ping()
-
-        # Test database
-        db = current_app.config["db"]
-        db.health_checks.insert(status="ok", component="manager")
-        db.commit()
-
-        health_checks.labels(status="ok").inc()
-
-        return jsonify(
-            {
-                "status": "healthy",
-                "timestamp": datetime.utcnow().isoformat(),
-                "service": "killkrill-manager",
-                "components": {"database": "ok", "redis": "ok"},
-            }
-        )
-    except Exception as e:
+    monitor = current_app.config["health_monitor"]
+    snapshot = await monitor.snapshot()
+    components = {
+        name: result["status"] for name, result in snapshot["components"].items()
+    }
+    errors = {
+        name: result["error"]
+        for name, result in snapshot["components"].items()
+        if result["status"] != "ok"
+    }
+    if monitor.is_stale:
+        errors["monitor"] = f"last probe {monitor.age:.0f}s ago"
+
+    if errors:
         health_checks.labels(status="error").inc()
         return (
             jsonify(
                 {
                     "status": "unhealthy",
-                    "error": str(e),
+                    "error": "; ".join(f"{k}: {v}" for k, v in errors.items()),
+                    "components": components,
+                    "checked_at": snapshot["checked_at"],
                     "timestamp": datetime.utcnow().isoformat(),
                 }
             ),
             503,
         )
 
+    health_checks.labels(status="ok").inc()
+    return jsonify(
+        {
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "service": "killkrill-manager",
+            "components": components,
+            "checked_at": snapshot["checked_at"],
+        }
+    )
+
 
 @bp.route("/metrics", methods=["GET"])
 async def metrics():
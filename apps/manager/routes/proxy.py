@@ -0,0 +1,96 @@
+"""
+Reverse proxy routes for embedded infrastructure UIs (/proxy/<service>/...)
+"""
+
+from datetime import datetime
+from http.cookies import SimpleCookie
+
+import httpx
+from quart import Blueprint, Response, current_app, jsonify, request
+
+from shared.auth.quart_auth import AuthenticationError, verify_jwt_token
+from shared.auth.token_cache import TokenRevoked, verify_cached
+
+bp = Blueprint("proxy", __name__)
+
+PROXY_METHODS = ["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"]
+
+
+def _session_claims():
+    """
+    Claims of the caller's session token, or None if unauthenticated
+
+    The token comes from the Authorization header or, since iframes cannot
+    send headers, from the session cookie.
+    """
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        token = auth_header[7:]
+    else:
+        token = request.cookies.get(current_app.config["SESSION_COOKIE"])
+    if not token:
+        return None
+    try:
+        return verify_cached(token, current_app.config["JWT_SECRET"], verify_jwt_token)
+    except (AuthenticationError, TokenRevoked):
+        return None
+
+
+def _upstream_headers():
+    """Client headers minus the manager's own credentials"""
+    headers = {
+        key: value
+        for key, value in request.headers.items()
+        if key.lower() not in ("authorization", "cookie")
+    }
+    cookies = SimpleCookie()
+    cookies.load(request.headers.get("Cookie", ""))
+    cookies.pop(current_app.config["SESSION_COOKIE"], None)
+    if cookies:
+        headers["Cookie"] = "; ".join(
+            f"{name}={morsel.coded_value}" for name, morsel in cookies.items()
+        )
+    return headers
+
+
+@bp.route("/proxy/<service>/", defaults={"path": ""}, methods=PROXY_METHODS)
+@bp.route("/proxy/<service>/<path:path>", methods=PROXY_METHODS)
+async def proxy(service, path):
+    """Stream a request to an infrastructure service and its response back"""
+    if _session_claims() is None:
+        return jsonify({"error": "Authentication required"}), 401
+    engine = current_app.config["proxy_engine"]
+    if service not in engine.upstreams:
+        return jsonify({"error": f"Unknown service: {service}"}), 404
+    if not engine.upstreams[service].allows(request.method):
+        return jsonify({"error": f"{service} is read-only through the proxy"}), 405
+
+    try:
+        upstream = await engine.forward(
+            service,
+            request.method,
+            path,
+            request.query_string,
+            _upstream_headers(),
+            body=request.body,
+        )
+    except httpx.TimeoutException:
+        return jsonify({"error": f"{service} service timeout"}), 504
+    except httpx.HTTPError as e:
+        return (
+            jsonify(
+                {
+                    "error": f"{service} service unavailable",
+                    "details": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            ),
+            502,
+        )
+
+    response = Response(upstream.body, status=upstream.status)
+    response.headers.clear()
+    response.headers.update(upstream.headers)
+    # Allow the UI to be framed by the dashboard
+    response.headers.pop("X-Frame-Options", None)
+    return response
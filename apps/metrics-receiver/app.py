@@ -11,6 +11,7 @@ from quart import Quart
 from quart_cors import cors
 
 from config import Config
+from shared.ingest import BodyLimits
 from shared.receiver_client import ReceiverClient
 
 logger = structlog.get_logger(__name__)
@@ -68,6 +69,9 @@ def create_app(config: Config = None) -> Quart:
     # Store config
     app.config.from_object(config)
 
+    # Ingestion streams bodies in bounded memory; allow uploads up to its limit
+    app.config["MAX_CONTENT_LENGTH"] = BodyLimits.from_env().max_body_bytes
+
     # Register blueprints
     from routes import health, ingest, metrics
 
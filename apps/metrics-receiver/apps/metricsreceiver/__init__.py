@@ -12,6 +12,8 @@ from prometheus_client import Counter, generate_latest
 from py4web import DAL, HTTP, Field, action, request, response
 from py4web.utils.cors import CORS
 
+from shared.ingest import BodyError, BodyReader, iter_batches, read_chunks
+
 # Application name
 __version__ = "1.0.0"
 
@@ -136,54 +138,100 @@ def metrics():
     return generate_latest()
 
 
+def _store_metrics(records, client_ip):
+    """Store one batch of metrics; returns (row ids, rejected count)"""
+    timestamp = datetime.utcnow()
+    rows = []
+    for data in records:
+        if not isinstance(data, dict) or not data:
+            continue
+        try:
+            metric_value = float(data.get("value", 0))
+        except (TypeError, ValueError):
+            continue
+        rows.append(
+            {
+                "metric_name": data.get("name", "unknown"),
+                "metric_type": data.get("type", "gauge"),
+                "metric_value": metric_value,
+                "labels": json.dumps(data.get("labels", {})),
+                "timestamp": timestamp,
+                "source_ip": client_ip,
+            }
+        )
+    rejected = len(records) - len(rows)
+    if not rows:
+        return [], rejected
+
+    # Store in database, one commit per batch
+    metric_ids = db.received_metrics.bulk_insert(rows)
+    db.commit()
+
+    # Send to Redis stream
+    pipe = redis_client.pipeline(transaction=False)
+    for metric_id, row in zip(metric_ids, rows):
+        pipe.xadd(
+            "metrics:raw",
+            {
+                "id": str(metric_id),
+                "metric_name": row["metric_name"],
+                "metric_type": row["metric_type"],
+                "metric_value": str(row["metric_value"]),
+                "labels": row["labels"],
+                "timestamp": timestamp.isoformat(),
+                "client_ip": client_ip,
+            },
+        )
+    pipe.execute()
+
+    # Update counter
+    for row in rows:
+        received_metrics_counter.labels(metric_type=row["metric_type"]).inc()
+
+    return metric_ids, rejected
+
+
 @action("api/v1/metrics", method=["POST"])
 @action.uses(CORS())
 def ingest_metrics():
-    """Standard metrics ingestion endpoint"""
+    """
+    Standard metrics ingestion endpoint
+
+    Accepts a single metric object, a JSON array of metrics or
+    newline-delimited metrics, optionally gzip or deflate compressed,
+    decoded in batches as the body is read.
+    """
+    accepted = rejected = 0
+    metric_id = None
     try:
-        data = request.json
-        if not data:
+        client_ip = request.environ.get("REMOTE_ADDR", "127.0.0.1")
+        reader = BodyReader.from_headers(request.headers)
+        for batch in iter_batches(read_chunks(request.body), reader):
+            metric_ids, skipped = _store_metrics(batch, client_ip)
+            accepted += len(metric_ids)
+            rejected += skipped
+            metric_id = metric_ids[0] if metric_ids else metric_id
+
+        if not accepted:
             response.status = 400
+            if rejected:
+                return {"error": "No valid metrics provided", "rejected": rejected}
             return {"error": "No JSON data provided"}
 
-        # Simple processing - just store the metric
-        metric_name = data.get("name", "unknown")
-        metric_type = data.get("type", "gauge")
-        metric_value = float(data.get("value", 0))
-        labels = json.dumps(data.get("labels", {}))
-        client_ip = request.environ.get("REMOTE_ADDR", "127.0.0.1")
-
-        # Store in database
-        metric_id = db.received_metrics.insert(
-            metric_name=metric_name,
-            metric_type=metric_type,
-            metric_value=metric_value,
-            labels=labels,
-            timestamp=datetime.utcnow(),
-            source_ip=client_ip,
-        )
-        db.commit()
-
-        # Send to Redis stream
-        stream_data = {
-            "id": str(metric_id),
-            "metric_name": metric_name,
-            "metric_type": metric_type,
-            "metric_value": str(metric_value),
-            "labels": labels,
-            "timestamp": datetime.utcnow().isoformat(),
-            "client_ip": client_ip,
-        }
-        redis_client.xadd("metrics:raw", stream_data)
-
-        # Update counter
-        received_metrics_counter.labels(metric_type=metric_type).inc()
-
-        return {
+        result = {
             "status": "accepted",
-            "metric_id": metric_id,
+            "accepted": accepted,
             "timestamp": datetime.utcnow().isoformat(),
         }
+        if accepted == 1:
+            result["metric_id"] = metric_id
+        if rejected:
+            result["rejected"] = rejected
+        return result
+
+    except BodyError as e:
+        response.status = e.status
+        return {"error": str(e), "accepted": accepted}
 
     except Exception as e:
         response.status = 500
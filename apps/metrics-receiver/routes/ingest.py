@@ -2,77 +2,143 @@
 
 import json
 from datetime import datetime
+from typing import Any, Dict, List, Tuple
 
 import structlog
 from quart import Blueprint, current_app, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from shared.ingest import BodyError, BodyReader, aiter_batches
 
 logger = structlog.get_logger(__name__)
 bp = Blueprint("ingest", __name__)
 
 
+def _metric_row(data: Any, client_ip: str, timestamp: datetime) -> Dict[str, Any]:
+    """Database row for one submitted metric; raises ValueError if unusable."""
+    if not isinstance(data, dict) or not data:
+        raise ValueError("Metric must be a non-empty object")
+
+    return {
+        "metric_name": data.get("name", "unknown"),
+        "metric_type": data.get("type", "gauge"),
+        "metric_value": float(data.get("value", 0)),
+        "labels": json.dumps(data.get("labels", {})),
+        "timestamp": timestamp,
+        "source_ip": client_ip,
+    }
+
+
+async def _store_metrics(records: List[Any], client_ip: str) -> Tuple[int, int]:
+    """
+    Store one batch in the database and Redis and submit it to the backend.
+
+    Returns:
+        Accepted and rejected record counts
+    """
+    timestamp = datetime.utcnow()
+    rows = []
+    for record in records:
+        try:
+            rows.append(_metric_row(record, client_ip, timestamp))
+        except (TypeError, ValueError):
+            continue
+    rejected = len(records) - len(rows)
+    if not rows:
+        return 0, rejected
+
+    # Store in database, one commit per batch
+    current_app.db.received_metrics.bulk_insert(rows)
+    current_app.db.commit()
+
+    # Send to Redis stream
+    pipe = current_app.redis_client.pipeline(transaction=False)
+    for row in rows:
+        pipe.xadd(
+            "metrics:raw",
+            {
+                "metric_name": row["metric_name"],
+                "metric_type": row["metric_type"],
+                "metric_value": str(row["metric_value"]),
+                "labels": row["labels"],
+                "timestamp": timestamp.isoformat(),
+                "client_ip": client_ip,
+            },
+        )
+    await pipe.execute()
+
+    # Submit via ReceiverClient with retry logic
+    if current_app.receiver_client:
+        try:
+            metric_entries = [
+                {
+                    "name": row["metric_name"],
+                    "type": row["metric_type"],
+                    "value": row["metric_value"],
+                    "labels": json.loads(row["labels"]),
+                    "timestamp": timestamp.isoformat(),
+                    "source": client_ip,
+                }
+                for row in rows
+            ]
+            await current_app.receiver_client.submit_metrics(metric_entries)
+            logger.info("metric_submitted", count=len(metric_entries))
+        except Exception as e:
+            logger.error("metric_submission_failed", error=str(e), count=len(rows))
+            # Don't fail the request - metrics are already stored locally
+
+    # Update counter
+    for row in rows:
+        current_app.received_metrics_counter.labels(
+            metric_type=row["metric_type"]
+        ).inc()
+
+    return len(rows), rejected
+
+
 @bp.route("/api/v1/metrics", methods=["POST"])
 async def receive_metrics():
-    """Metrics ingestion endpoint with gRPC/REST fallback submission."""
-    try:
-        data = await request.get_json()
-        if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
+    """
+    Metrics ingestion endpoint with gRPC/REST fallback submission.
 
-        # Process metric
-        metric_name = data.get("name", "unknown")
-        metric_type = data.get("type", "gauge")
-        metric_value = float(data.get("value", 0))
-        labels = json.dumps(data.get("labels", {}))
+    Accepts a single metric object, a JSON array of metrics or
+    newline-delimited metrics, optionally gzip or deflate compressed. The
+    body is decoded as it streams in and stored in batches.
+    """
+    accepted = rejected = 0
+    try:
         client_ip = request.headers.get(
             "X-Forwarded-For", request.remote_addr or "127.0.0.1"
         )
-        timestamp = datetime.utcnow()
-
-        # Store in database
-        current_app.db.received_metrics.insert(
-            metric_name=metric_name,
-            metric_type=metric_type,
-            metric_value=metric_value,
-            labels=labels,
-            timestamp=timestamp,
-            source_ip=client_ip,
-        )
-        current_app.db.commit()
-
-        # Send to Redis stream
-        stream_data = {
-            "metric_name": metric_name,
-            "metric_type": metric_type,
-            "metric_value": str(metric_value),
-            "labels": labels,
-            "timestamp": timestamp.isoformat(),
-            "client_ip": client_ip,
+        reader = BodyReader.from_headers(request.headers)
+        async for batch in aiter_batches(request.body, reader):
+            stored, skipped = await _store_metrics(batch, client_ip)
+            accepted += stored
+            rejected += skipped
+
+        if not accepted and not rejected:
+            return jsonify({"error": "No JSON data provided"}), 400
+        if not accepted:
+            return (
+                jsonify({"error": "No valid metrics provided", "rejected": rejected}),
+                400,
+            )
+
+        result = {
+            "status": "success",
+            "accepted": accepted,
+            "timestamp": datetime.utcnow().isoformat(),
         }
-        await current_app.redis_client.xadd("metrics:raw", stream_data)
-
-        # Submit via ReceiverClient with retry logic
-        if current_app.receiver_client:
-            try:
-                metric_entry = {
-                    "name": metric_name,
-                    "type": metric_type,
-                    "value": metric_value,
-                    "labels": json.loads(labels),
-                    "timestamp": timestamp.isoformat(),
-                    "source": client_ip,
-                }
-                await current_app.receiver_client.submit_metrics([metric_entry])
-                logger.info("metric_submitted", metric_name=metric_name)
-            except Exception as e:
-                logger.error(
-                    "metric_submission_failed", error=str(e), metric_name=metric_name
-                )
-                # Don't fail the request - metric is already stored locally
-
-        # Update counter
-        current_app.received_metrics_counter.labels(metric_type=metric_type).inc()
-
-        return jsonify({"status": "success", "timestamp": timestamp.isoformat()}), 200
+        if rejected:
+            result["rejected"] = rejected
+        return jsonify(result), 200
+
+    except BodyError as e:
+        logger.warning("metrics_body_rejected", error=str(e), accepted=accepted)
+        return jsonify({"error": str(e), "accepted": accepted}), e.status
+
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Request body too large", "accepted": accepted}), 413
 
     except Exception as e:
         logger.error("metrics_ingestion_error", error=str(e))
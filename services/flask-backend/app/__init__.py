@@ -11,6 +11,7 @@ database connections, metrics collection, and error handling.
 
 import logging
 import os
+import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -45,25 +46,15 @@ from shared.auth.middleware import (
 
 # Import shared modules
 from shared.config.settings import KillKrillConfig, get_config
-from shared.monitoring.metrics import MetricsCollector, export_metrics
+from shared.monitoring.metrics import (
+    UNMATCHED_ENDPOINT,
+    MetricsCollector,
+    export_metrics,
+)
+from shared.monitoring.structured_logging import configure_logging
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=True,
-)
+configure_logging()
 
 logger = structlog.get_logger()
 
@@ -160,22 +151,30 @@ class AuthenticationMiddleware:
 
 
 class MetricsMiddleware:
-    """Middleware for collecting request metrics"""
+    """Middleware for collecting request metrics, labelled by route template"""
 
     def __init__(self, app: Flask, metrics_collector: MetricsCollector):
         self.app = app
         self.metrics_collector = metrics_collector
+        app.before_request(self.before_request)
         app.after_request(self.after_request)
 
+    def before_request(self):
+        """Start the request timer"""
+        g.metrics_start = time.perf_counter()
+
     def after_request(self, response):
         """Collect metrics for request"""
         try:
-            method = request.method
-            endpoint = request.path
-            status = str(response.status_code)
-            duration = (datetime.utcnow() - g.start_time).total_seconds()
-
-            self.metrics_collector.record_request(method, endpoint, status, duration)
+            start = g.get("metrics_start")
+            if start is not None:
+                rule = request.url_rule
+                self.metrics_collector.record_request(
+                    request.method,
+                    rule.rule if rule is not None else UNMATCHED_ENDPOINT,
+                    str(response.status_code),
+                    time.perf_counter() - start,
+                )
         except Exception as e:
             logger.error("metrics_collection_error", error=str(e))
 
@@ -651,6 +650,11 @@ def create_app(env: str = None) -> Flask:
     metrics_collector = setup_metrics(app)
     app.metrics_collector = metrics_collector
 
+    # Start the background audit log writer (flushed at exit)
+    from app.services.audit_log import init_audit_writer
+
+    init_audit_writer(metrics_collector.registry)
+
     # Setup authentication middleware
     auth_middleware = MultiAuthMiddleware(app_config.jwt_secret)
 
@@ -12,18 +12,33 @@ License required for:
 - Multiple Ollama endpoints
 """
 
+import itertools
 import logging
 import os
 from datetime import datetime
 from functools import wraps
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Union
 
 import httpx
-from flask import Blueprint, g, jsonify, request
+from flask import Blueprint, Response, g, jsonify, request
 from pydantic import BaseModel, Field, ValidationError
 
 from app.api.v1.schemas import APIResponse, ErrorResponse
 from app.models.database import get_pydal_connection
+from app.services.ai_gateway import (
+    ChatRequest,
+    GatewayBusy,
+    ProviderSpec,
+    UnsupportedProvider,
+    get_ai_gateway,
+    sse_event,
+)
+from app.services.anomaly_detection import (
+    SYNC_MAX_CELLS,
+    complete_analysis,
+    count_scan_cells,
+    submit_anomaly_job,
+)
 from shared.licensing.client import PenguinTechLicenseClient
 
 logger = logging.getLogger(__name__)
@@ -86,6 +101,12 @@ class AIChatRequest(BaseModel):
     system_prompt: Optional[str] = Field(
         default=None, max_length=4000, description="System prompt"
     )
+    stream: bool = Field(
+        default=False, description="Stream tokens as server-sent events"
+    )
+    use_cache: bool = Field(
+        default=True, description="Reuse a cached response to the same prompt"
+    )
 
 
 class AIAnalyzeRequest(BaseModel):
@@ -103,6 +124,36 @@ class AIAnalyzeRequest(BaseModel):
     provider_id: Optional[int] = Field(default=None, description="Provider ID to use")
 
 
+class AnomalySeries(BaseModel):
+    """Inline series for anomaly detection"""
+
+    name: str = Field(min_length=1, max_length=255, description="Series name")
+    values: List[float] = Field(
+        min_length=1, max_length=100000, description="Values, oldest first"
+    )
+
+
+class AIAnomalyRequest(BaseModel):
+    """Schema for anomaly detection request"""
+
+    metrics: List[Union[str, AnomalySeries]] = Field(
+        min_length=1,
+        max_length=10000,
+        description="Rollup metric names and/or inline series",
+    )
+    threshold: float = Field(
+        default=3.5, gt=0, le=100, description="Anomaly score threshold"
+    )
+    detectors: Optional[List[Literal["zscore", "ewma", "seasonal"]]] = Field(
+        default=None, description="Detectors to run (default: all)"
+    )
+    period: Optional[int] = Field(
+        default=None, ge=2, le=10000, description="Points per season"
+    )
+    interval: str = Field(default="5m", max_length=16, description="Rollup interval")
+    hours: int = Field(default=24, ge=1, le=24 * 90, description="Lookback window")
+
+
 # =============================================================================
 # License Client
 # =============================================================================
@@ -237,97 +288,6 @@ def validate_provider_access(provider_type: str, model: str) -> tuple[bool, str]
     return True, ""
 
 
-async def call_ollama(
-    endpoint_url: str,
-    model: str,
-    prompt: str,
-    max_tokens: int,
-    temperature: float,
-    system_prompt: str = None,
-) -> dict:
-    """Call Ollama API for completion"""
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "num_predict": max_tokens,
-            "temperature": temperature,
-        },
-    }
-
-    if system_prompt:
-        payload["system"] = system_prompt
-
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.post(
-            f"{endpoint_url.rstrip('/')}/api/generate", json=payload
-        )
-        response.raise_for_status()
-        return response.json()
-
-
-async def call_openai(
-    api_key: str,
-    model: str,
-    prompt: str,
-    max_tokens: int,
-    temperature: float,
-    system_prompt: str = None,
-) -> dict:
-    """Call OpenAI API for completion"""
-    messages = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": prompt})
-
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": model,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-            },
-        )
-        response.raise_for_status()
-        return response.json()
-
-
-async def call_claude(
-    api_key: str,
-    model: str,
-    prompt: str,
-    max_tokens: int,
-    temperature: float,
-    system_prompt: str = None,
-) -> dict:
-    """Call Claude/Anthropic API for completion"""
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": api_key,
-                "Content-Type": "application/json",
-                "anthropic-version": "2023-06-01",
-            },
-            json={
-                "model": model,
-                "max_tokens": max_tokens,
-                "messages": [{"role": "user", "content": prompt}],
-                "system": system_prompt or "",
-                "temperature": temperature,
-            },
-        )
-        response.raise_for_status()
-        return response.json()
-
-
 # =============================================================================
 # Provider Endpoints
 # =============================================================================
@@ -693,6 +653,46 @@ def list_models():
 # =============================================================================
 
 
+def _stream_chat(gateway, spec, chat_request, use_cache, summary) -> Response:
+    """
+    Stream a completion to the browser as server-sent events
+
+    The first event is read before the response starts, so a busy or
+    unsupported provider raises here and chat() answers 503/400 instead
+    of a 200 stream carrying an error event.
+    """
+    stream = gateway.stream(spec, chat_request, use_cache=use_cache)
+    first = next(stream)
+
+    def events():
+        try:
+            for kind, value in itertools.chain([first], stream):
+                if kind == "token":
+                    yield sse_event("token", {"text": value})
+                else:
+                    yield sse_event(
+                        "done",
+                        {"usage": value.usage, "cached": value.cached, **summary},
+                    )
+        except httpx.HTTPStatusError as e:
+            logger.error(f"AI provider HTTP error: {e}")
+            yield sse_event(
+                "error", {"error": f"AI provider error: {e.response.status_code}"}
+            )
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield sse_event("error", {"error": "Chat request failed"})
+        finally:
+            # Releases the provider slot if the client disconnects
+            stream.close()
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @ai_analysis_bp.route("/chat", methods=["POST"])
 @requires_ai_access
 def chat():
@@ -756,89 +756,65 @@ def chat():
         if not has_valid_license():
             max_tokens = min(max_tokens, FREE_TIER_MAX_TOKENS)
 
-        # Call appropriate provider (sync wrapper for async)
-        import asyncio
-
-        if provider.provider_type == "ollama":
-            result = asyncio.run(
-                call_ollama(
-                    provider.endpoint_url,
-                    model,
-                    data.prompt,
-                    max_tokens,
-                    data.temperature,
-                    data.system_prompt,
-                )
-            )
-            response_text = result.get("response", "")
-            usage = {
-                "prompt_tokens": result.get("prompt_eval_count", 0),
-                "completion_tokens": result.get("eval_count", 0),
-                "total_tokens": result.get("prompt_eval_count", 0)
-                + result.get("eval_count", 0),
-            }
-
-        elif provider.provider_type == "openai":
-            result = asyncio.run(
-                call_openai(
-                    provider.api_key,
-                    model,
-                    data.prompt,
-                    max_tokens,
-                    data.temperature,
-                    data.system_prompt,
-                )
-            )
-            response_text = result["choices"][0]["message"]["content"]
-            usage = result.get("usage", {})
-
-        elif provider.provider_type == "claude":
-            result = asyncio.run(
-                call_claude(
-                    provider.api_key,
-                    model,
-                    data.prompt,
-                    max_tokens,
-                    data.temperature,
-                    data.system_prompt,
-                )
-            )
-            response_text = result["content"][0]["text"]
-            usage = {
-                "prompt_tokens": result.get("usage", {}).get("input_tokens", 0),
-                "completion_tokens": result.get("usage", {}).get("output_tokens", 0),
-                "total_tokens": result.get("usage", {}).get("input_tokens", 0)
-                + result.get("usage", {}).get("output_tokens", 0),
-            }
-        else:
-            return (
-                jsonify(
-                    ErrorResponse(
-                        error=f"Unsupported provider type: {provider.provider_type}",
-                        code="UNSUPPORTED_PROVIDER",
-                    ).model_dump()
-                ),
-                400,
-            )
+        spec = ProviderSpec(
+            provider.provider_type, provider.endpoint_url, provider.api_key, model
+        )
+        chat_request = ChatRequest(
+            data.prompt, max_tokens, data.temperature, data.system_prompt
+        )
+        summary = {
+            "model": model,
+            "provider": provider.provider_type,
+            "free_tier": is_free_tier_request(provider.provider_type, model),
+        }
+        gateway = get_ai_gateway()
+
+        if data.stream or request.accept_mimetypes.best == "text/event-stream":
+            return _stream_chat(gateway, spec, chat_request, data.use_cache, summary)
 
+        completion = gateway.complete(spec, chat_request, use_cache=data.use_cache)
         return (
             jsonify(
                 APIResponse(
                     success=True,
                     data={
-                        "response": response_text,
-                        "model": model,
-                        "provider": provider.provider_type,
-                        "usage": usage,
-                        "free_tier": is_free_tier_request(
-                            provider.provider_type, model
-                        ),
+                        "response": completion.text,
+                        "usage": completion.usage,
+                        "cached": completion.cached,
+                        **summary,
                     },
                 ).model_dump()
             ),
             200,
         )
 
+    except UnsupportedProvider as e:
+        return (
+            jsonify(
+                ErrorResponse(error=str(e), code="UNSUPPORTED_PROVIDER").model_dump()
+            ),
+            400,
+        )
+    except GatewayBusy as e:
+        logger.warning(f"AI gateway busy: {e}")
+        return (
+            jsonify(
+                ErrorResponse(
+                    error="AI provider is busy, try again shortly", code="PROVIDER_BUSY"
+                ).model_dump()
+            ),
+            503,
+        )
+    except TimeoutError as e:
+        logger.error(f"AI provider timeout: {e}")
+        return (
+            jsonify(
+                ErrorResponse(
+                    error="AI provider timed out", code="PROVIDER_TIMEOUT"
+                ).model_dump()
+            ),
+            504,
+        )
     except httpx.HTTPStatusError as e:
         logger.error(f"AI provider HTTP error: {e}")
         return (
@@ -1125,30 +1101,37 @@ def get_recommendations():
 
 
 @ai_analysis_bp.route("/anomaly-detection", methods=["POST"])
+@ai_analysis_bp.route("/anomalies", methods=["POST"])
 @requires_licensed_ai
 def detect_anomalies():
-    """POST: Run anomaly detection (requires license)"""
+    """POST: Run anomaly detection over metric rollups (requires license)
+
+    Requests whose detector matrices fit in SYNC_MAX_CELLS cells (inline
+    values plus matching rollups, with padding) are scanned immediately
+    (201 with the completed analysis); larger ones return 202 with a
+    pending analysis that is completed in the background.
+    """
     db = get_pydal_connection()
 
     try:
-        data = request.json or {}
+        data = AIAnomalyRequest(**(request.json or {}))
+    except ValidationError as e:
+        return (
+            jsonify(ErrorResponse(error=str(e), code="VALIDATION_ERROR").model_dump()),
+            400,
+        )
 
-        if not data.get("metrics") or not isinstance(data.get("metrics"), list):
-            return (
-                jsonify(
-                    ErrorResponse(
-                        error="metrics array is required", code="VALIDATION_ERROR"
-                    ).model_dump()
-                ),
-                400,
-            )
+    try:
+        params = data.model_dump()
+        run_inline = count_scan_cells(db, params) <= SYNC_MAX_CELLS
+        # Record the request without the inline values themselves
+        metric_names = [
+            m if isinstance(m, str) else m["name"] for m in params["metrics"]
+        ]
 
         analysis_id = db.ai_analyses.insert(
             analysis_type="anomaly_detection",
-            input_data={
-                "metrics": data["metrics"],
-                "threshold": data.get("threshold", 2.0),
-            },
+            input_data={**params, "metrics": metric_names},
             result=None,
             status="pending",
             error_message=None,
@@ -1157,15 +1140,23 @@ def detect_anomalies():
         )
         db.commit()
 
+        if run_inline:
+            complete_analysis(db, analysis_id, params)
+        else:
+            submit_anomaly_job(analysis_id, params)
+
         analysis = db.ai_analyses[analysis_id].as_dict()
-        return jsonify(APIResponse(success=True, data=analysis).model_dump()), 201
+        return (
+            jsonify(APIResponse(success=True, data=analysis).model_dump()),
+            201 if run_inline else 202,
+        )
 
     except Exception as e:
         logger.error(f"Anomaly detection error: {e}")
         return (
             jsonify(
                 ErrorResponse(
-                    error="Failed to create anomaly detection", code="SERVER_ERROR"
+                    error="Failed to run anomaly detection", code="SERVER_ERROR"
                 ).model_dump()
             ),
             500,
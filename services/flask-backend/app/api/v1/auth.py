@@ -23,6 +23,7 @@ from passlib.hash import bcrypt
 from pydantic import BaseModel, Field, ValidationError, field_validator
 
 from app.models.db_init import get_engine
+from app.services.audit_log import audit
 
 logger = structlog.get_logger()
 
@@ -304,6 +305,7 @@ def login():
 
     if not user or not verify_password(req.password, user["password_hash"]):
         logger.warning("login_failed", email=req.email)
+        audit("auth.login_failed", "user", details={"email": req.email})
         return (
             jsonify(
                 {
@@ -320,6 +322,7 @@ def login():
     refresh_token = create_refresh_token(identity=user["id"])
 
     logger.info("login_success", user_id=user["id"], email=user["email"])
+    audit("auth.login", "user", user["id"], user_id=user["id"])
 
     return (
         jsonify(
@@ -389,6 +392,7 @@ def register():
     user = create_user(db, req.email, req.password, req.name)
 
     logger.info("register_success", user_id=user["id"], email=user["email"])
+    audit("user.register", "user", user["id"], user_id=user["id"])
 
     return (
         jsonify(
@@ -467,6 +471,7 @@ def logout():
 
     user_id = get_jwt_identity()
     logger.info("logout_success", user_id=user_id)
+    audit("auth.logout", "user", user_id)
 
     return (
         jsonify(
@@ -601,6 +606,7 @@ def create_api_key():
     )
 
     logger.info("api_key_created", user_id=user_id, key_id=key_record["id"])
+    audit("api_key.create", "api_key", key_record["id"], {"name": req.name})
 
     return (
         jsonify(
@@ -647,6 +653,7 @@ def delete_api_key(key_id: str):
     db.commit()
 
     logger.info("api_key_deleted", user_id=user_id, key_id=key_id)
+    audit("api_key.delete", "api_key", key_id)
 
     return (
         jsonify(
@@ -726,6 +733,7 @@ def change_password():
     db.commit()
 
     logger.info("password_changed", user_id=user_id, email=user["email"])
+    audit("auth.password_change", "user", user_id)
 
     return (
         jsonify(
@@ -87,29 +87,15 @@ def _get_overview_data() -> Dict[str, Any]:
     total_checks = db(db.sensor_checks).count()
     active_checks = db(db.sensor_checks.is_active == True).count()
 
-    # Get 24h results statistics
-    yesterday = datetime.utcnow() - timedelta(hours=24)
-    total_results_24h = db(db.sensor_results.created_at >= yesterday).count()
-    failed_results_24h = db(
-        (db.sensor_results.created_at >= yesterday)
-        & (db.sensor_results.status.belongs(["down", "timeout", "error"]))
-    ).count()
-
-    # Calculate average response time
-    avg_response = (
-        db(db.sensor_results.created_at >= yesterday)
-        .select(db.sensor_results.response_time_ms.avg())
-        .first()
-    )
-    avg_response_time = float(
-        avg_response[db.sensor_results.response_time_ms.avg()] or 0
-    )
-
-    uptime_pct = 100.0
-    if total_results_24h > 0:
-        uptime_pct = (
-            (total_results_24h - failed_results_24h) / total_results_24h
-        ) * 100
+    # 24h results statistics come from the incrementally maintained status
+    # index instead of count()/avg() scans over sensor_results
+    from app.services.status_index import rolling_counters
+
+    counters = rolling_counters(db)
+    total_results_24h = counters["total_results"]
+    failed_results_24h = counters["failed_results"]
+    avg_response_time = counters["avg_response_time_ms"]
+    uptime_pct = counters["uptime_percentage"]
 
     return {
         "total_services": 7,
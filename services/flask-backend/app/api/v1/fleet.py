@@ -11,7 +11,9 @@ import requests
 from flask import Blueprint, jsonify, request
 
 from app.api.v1.schemas import APIResponse, ErrorResponse
+from app.services.fleet_mirror import get_fleet_mirror
 from shared.licensing.python_client import FeatureNotAvailableError, requires_feature
+from shared.monitoring.fleet_inventory import DEFAULT_PER_PAGE, MAX_PER_PAGE
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +64,20 @@ def _proxy_request(method: str, endpoint: str, data=None, params=None):
         return None, 502, f"Fleet server error: {str(e)}"
 
 
+def _int_arg(name: str):
+    """Optional integer query argument; raises ValueError if malformed."""
+    value = request.args.get(name)
+    return int(value) if value not in (None, "") else None
+
+
+def _ready_mirror():
+    """Fleet mirror if it has completed a full sync, else None."""
+    mirror = get_fleet_mirror()
+    if mirror is not None and mirror.ready:
+        return mirror
+    return None
+
+
 # ============================================================================
 # Status Endpoint
 # ============================================================================
@@ -87,6 +103,18 @@ def fleet_status():
     return jsonify(APIResponse(success=True, data=summary).model_dump()), 200
 
 
+@fleet_bp.route("/mirror", methods=["GET"])
+def mirror_status():
+    """GET: Fleet mirror sync state and staleness."""
+    mirror = get_fleet_mirror()
+    data = (
+        {"enabled": False}
+        if mirror is None
+        else {"enabled": True, **mirror.staleness()}
+    )
+    return jsonify(APIResponse(success=True, data=data).model_dump()), 200
+
+
 # ============================================================================
 # Hosts Endpoints
 # ============================================================================
@@ -94,7 +122,48 @@ def fleet_status():
 
 @fleet_bp.route("/hosts", methods=["GET"])
 def list_hosts():
-    """GET: List all Fleet hosts."""
+    """
+    GET: List Fleet hosts.
+
+    Served from the local mirror once it has synced, with optional filters
+    (status, platform, team_id, label_id, policy_id, policy_response, query),
+    sorting (order_key, order_direction) and paging (page, per_page).
+    """
+    mirror = _ready_mirror()
+    if mirror is not None:
+        try:
+            page = _int_arg("page") or 0
+            per_page = _int_arg("per_page") or DEFAULT_PER_PAGE
+            total, hosts = mirror.query_hosts(
+                status=request.args.get("status"),
+                platform=request.args.get("platform"),
+                team_id=_int_arg("team_id"),
+                label_id=_int_arg("label_id"),
+                policy_id=_int_arg("policy_id"),
+                policy_response=request.args.get("policy_response"),
+                query=request.args.get("query"),
+                order_key=request.args.get("order_key", "hostname"),
+                order_direction=request.args.get("order_direction", "asc"),
+                page=page,
+                per_page=per_page,
+            )
+        except ValueError as e:
+            return (
+                jsonify(
+                    ErrorResponse(error=str(e), code="VALIDATION_ERROR").model_dump()
+                ),
+                400,
+            )
+
+        data = {
+            "hosts": hosts,
+            "total": total,
+            "page": page,
+            "per_page": min(per_page, MAX_PER_PAGE),
+            "mirror": mirror.staleness(),
+        }
+        return jsonify(APIResponse(success=True, data=data).model_dump()), 200
+
     # Parse query parameters for filtering
     params = {}
     if request.args.get("status"):
@@ -115,7 +184,20 @@ def list_hosts():
 
 @fleet_bp.route("/hosts/<int:host_id>", methods=["GET"])
 def get_host(host_id):
-    """GET: Get specific host details."""
+    """GET: Get specific host details (from the mirror unless ?live=true)."""
+    mirror = _ready_mirror()
+    if mirror is not None and request.args.get("live", "").lower() != "true":
+        host = mirror.get_host(host_id)
+        if host is None:
+            return (
+                jsonify(
+                    ErrorResponse(error="Host not found", code="NOT_FOUND").model_dump()
+                ),
+                404,
+            )
+        data = {"host": host, "mirror": mirror.staleness()}
+        return jsonify(APIResponse(success=True, data=data).model_dump()), 200
+
     data, status_code, error = _proxy_request("GET", f"/hosts/{host_id}")
 
     if error:
@@ -215,7 +297,17 @@ def run_query():
 
 @fleet_bp.route("/policies", methods=["GET"])
 def list_policies():
-    """GET: List all Fleet policies."""
+    """GET: List all Fleet policies (from the mirror once it has synced)."""
+    mirror = _ready_mirror()
+    if mirror is not None:
+        policies = mirror.policies()
+        data = {
+            "policies": policies,
+            "total": len(policies),
+            "mirror": mirror.staleness(),
+        }
+        return jsonify(APIResponse(success=True, data=data).model_dump()), 200
+
     params = {}
     if request.args.get("order_key"):
         params["order_key"] = request.args.get("order_key")
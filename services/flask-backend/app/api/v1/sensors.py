@@ -16,6 +16,8 @@ from app.api.v1.schemas import (
     SensorResultSubmit,
 )
 from app.models.database import get_pydal_connection
+from app.services.status_index import record_result
+from shared.database.pagination import keyset_page, parse_limit
 
 sensors_bp = Blueprint("sensors", __name__)
 
@@ -208,26 +210,42 @@ def results_list_submit():
     db = get_pydal_connection()
 
     if request.method == "GET":
-        limit = request.args.get("limit", 100, type=int)
-        results = (
-            db(db.sensor_results)
-            .select(limitby=(0, limit), orderby=~db.sensor_results.created_at)
-            .as_list()
-        )
-        return jsonify(APIResponse(success=True, data=results).model_dump()), 200
+        try:
+            rows, next_cursor = keyset_page(
+                db,
+                db.sensor_results,
+                db.sensor_results.created_at,
+                db.sensor_results.id,
+                parse_limit(request.args.get("limit")),
+                request.args.get("cursor"),
+            )
+        except ValueError as e:
+            return (
+                jsonify(
+                    ErrorResponse(error=str(e), code="INVALID_CURSOR").model_dump()
+                ),
+                400,
+            )
+        body = APIResponse(success=True, data=rows.as_list()).model_dump()
+        body["next_cursor"] = next_cursor
+        return jsonify(body), 200
 
     # POST
     try:
         data = SensorResultSubmit(**request.json)
+        now = datetime.utcnow()
         result_id = db.sensor_results.insert(
             check_id=int(data.check_id),
             agent_id=1,  # TODO: Get from auth context
             status=data.status,
             response_time_ms=int(data.response_time),
             error_message=data.message,
+            created_at=now,
         )
         db.commit()
 
+        record_result(int(data.check_id), 1, data.status, int(data.response_time), now)
+
         result = db.sensor_results[result_id].as_dict()
         return jsonify(APIResponse(success=True, data=result).model_dump()), 201
     except ValidationError as e:
@@ -15,6 +15,8 @@ from passlib.hash import bcrypt
 from pydantic import BaseModel, EmailStr, Field, ValidationError, field_validator
 
 from app.models.db_init import get_engine
+from app.services.audit_log import audit
+from shared.database.pagination import encode_cursor, keyset_page, parse_limit
 
 logger = structlog.get_logger()
 
@@ -115,14 +117,16 @@ def list_users():
     List all users with pagination.
 
     Query params:
-    - page: Page number (default: 1)
+    - cursor: Opaque cursor from a previous response's next_cursor
+    - page: Page number (default: 1, ignored when cursor is given)
     - per_page: Items per page (default: 20, max: 100)
     - role: Filter by role
     - is_active: Filter by active status (true/false)
     """
     try:
+        cursor = request.args.get("cursor")
         page = max(1, request.args.get("page", 1, type=int))
-        per_page = min(100, max(1, request.args.get("per_page", 20, type=int)))
+        per_page = parse_limit(request.args.get("per_page"), default=20, maximum=100)
         role_filter = request.args.get("role")
         is_active_filter = request.args.get("is_active")
 
@@ -141,11 +145,34 @@ def list_users():
         # Get total count
         total = db(query).count()
 
-        # Get paginated results
-        offset = (page - 1) * per_page
-        users = db(query).select(
-            orderby=~db.users.created_at, limitby=(offset, offset + per_page)
-        )
+        if cursor:
+            # Keyset pagination: constant cost regardless of depth
+            try:
+                users, next_cursor = keyset_page(
+                    db, query, db.users.created_at, db.users.id, per_page, cursor
+                )
+            except ValueError as e:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "error": str(e),
+                            "correlation_id": g.get("correlation_id"),
+                        }
+                    ),
+                    400,
+                )
+        else:
+            offset = (page - 1) * per_page
+            users = db(query).select(
+                orderby=~db.users.created_at | ~db.users.id,
+                limitby=(offset, offset + per_page),
+            )
+            next_cursor = (
+                encode_cursor(users.last().created_at, users.last().id)
+                if users and offset + per_page < total
+                else None
+            )
 
         user_list = [
             {
@@ -180,6 +207,7 @@ def list_users():
                         "page": page,
                         "per_page": per_page,
                         "pages": pages,
+                        "next_cursor": next_cursor,
                     },
                     "correlation_id": g.get("correlation_id"),
                 }
@@ -336,6 +364,7 @@ def create_user():
             updated_at=datetime.utcnow(),
         )
         db.commit()
+        audit("user.create", "user", user_id, {"email": req.email, "role": req.role})
 
         user = get_user_by_id(db, user_id)
 
@@ -458,6 +487,12 @@ def update_user(user_id: str):
         # Update user
         db(db.users.id == user_id).update(**update_data)
         db.commit()
+        audit(
+            "user.update",
+            "user",
+            user_id,
+            {"fields": sorted(set(update_data) - {"updated_at"})},
+        )
 
         updated_user = get_user_by_id(db, user_id)
 
@@ -531,6 +566,7 @@ def delete_user(user_id: str):
         # Soft delete - set is_active to False
         db(db.users.id == user_id).update(is_active=False, updated_at=datetime.utcnow())
         db.commit()
+        audit("user.deactivate", "user", user_id)
 
         logger.info(
             "user_deleted", user_id=user_id, correlation_id=g.get("correlation_id")
@@ -351,6 +351,119 @@ class GRPCConfig:
         return cls(port=port, host=host, max_workers=max_workers)
 
 
+@dataclass(slots=True, frozen=True)
+class AIGatewayConfig:
+    """AI provider gateway configuration."""
+
+    max_concurrency: int = 8
+    queue_timeout: float = 30.0
+    request_timeout: float = 120.0
+    max_connections: int = 20
+    cache_ttl: int = 300
+    cache_size: int = 512
+
+    @classmethod
+    def from_env(cls) -> AIGatewayConfig:
+        """Load AI gateway configuration from environment variables.
+
+        Returns:
+            AIGatewayConfig instance with values from environment or defaults.
+
+        Environment Variables:
+            AI_MAX_CONCURRENCY: In-flight requests per provider (default: 8)
+            AI_QUEUE_TIMEOUT: Seconds to wait for a free slot (default: 30)
+            AI_REQUEST_TIMEOUT: Provider request timeout (default: 120)
+            AI_MAX_CONNECTIONS: Pooled connections per provider (default: 20)
+            AI_CACHE_TTL: Response cache lifetime, 0 disables (default: 300)
+            AI_CACHE_SIZE: Cached responses kept (default: 512)
+        """
+        return cls(
+            max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", "8")),
+            queue_timeout=float(os.getenv("AI_QUEUE_TIMEOUT", "30")),
+            request_timeout=float(os.getenv("AI_REQUEST_TIMEOUT", "120")),
+            max_connections=int(os.getenv("AI_MAX_CONNECTIONS", "20")),
+            cache_ttl=int(os.getenv("AI_CACHE_TTL", "300")),
+            cache_size=int(os.getenv("AI_CACHE_SIZE", "512")),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class FleetConfig:
+    """Fleet server and inventory mirror configuration."""
+
+    server_url: str = "http://localhost:8412"
+    api_token: str = ""
+    mirror_enabled: bool = True
+    sync_interval: float = 30.0
+    full_sync_interval: float = 900.0
+    page_size: int = 500
+    max_staleness: float = 300.0
+    timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> FleetConfig:
+        """Load Fleet configuration from environment variables.
+
+        Returns:
+            FleetConfig instance with values from environment or defaults.
+
+        Environment Variables:
+            FLEET_SERVER_URL: Fleet server base URL (default: http://localhost:8412)
+            FLEET_API_TOKEN: Fleet API token (default: "")
+            FLEET_MIRROR_ENABLED: Mirror the host inventory locally (default: true)
+            FLEET_SYNC_INTERVAL: Seconds between incremental syncs (default: 30)
+            FLEET_FULL_SYNC_INTERVAL: Seconds between full syncs (default: 900)
+            FLEET_SYNC_PAGE_SIZE: Hosts per Fleet page (default: 500)
+            FLEET_MIRROR_MAX_STALENESS: Age reported as stale (default: 300)
+            FLEET_TIMEOUT: Fleet request timeout in seconds (default: 30)
+        """
+        mirror_enabled = os.getenv("FLEET_MIRROR_ENABLED", "true").lower() == "true"
+
+        return cls(
+            server_url=os.getenv("FLEET_SERVER_URL", "http://localhost:8412"),
+            api_token=os.getenv("FLEET_API_TOKEN", ""),
+            mirror_enabled=mirror_enabled,
+            sync_interval=float(os.getenv("FLEET_SYNC_INTERVAL", "30")),
+            full_sync_interval=float(os.getenv("FLEET_FULL_SYNC_INTERVAL", "900")),
+            page_size=int(os.getenv("FLEET_SYNC_PAGE_SIZE", "500")),
+            max_staleness=float(os.getenv("FLEET_MIRROR_MAX_STALENESS", "300")),
+            timeout=float(os.getenv("FLEET_TIMEOUT", "30")),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class AuditConfig:
+    """Background audit log writer configuration."""
+
+    queue_size: int = 10000
+    batch_size: int = 500
+    flush_interval: float = 1.0
+    late_after: float = 5.0
+    shutdown_timeout: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> AuditConfig:
+        """Load audit writer configuration from environment variables.
+
+        Returns:
+            AuditConfig instance with values from environment or defaults.
+
+        Environment Variables:
+            AUDIT_QUEUE_SIZE: Events held before new ones are dropped (default: 10000)
+            AUDIT_BATCH_SIZE: Most events per INSERT (default: 500)
+            AUDIT_FLUSH_INTERVAL: Seconds to wait to fill a batch (default: 1)
+            AUDIT_LATE_SECONDS: Queue-to-commit time counted as late (default: 5)
+            AUDIT_SHUTDOWN_TIMEOUT: Seconds allowed for the exit flush (default: 10)
+        """
+        return cls(
+            queue_size=int(os.getenv("AUDIT_QUEUE_SIZE", "10000")),
+            batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("AUDIT_FLUSH_INTERVAL", "1")),
+            late_after=float(os.getenv("AUDIT_LATE_SECONDS", "5")),
+            shutdown_timeout=float(os.getenv("AUDIT_SHUTDOWN_TIMEOUT", "10")),
+        )
+
+
 @dataclass(slots=True, frozen=True)
 class CORSConfig:
     """Cross-Origin Resource Sharing (CORS) configuration."""
@@ -418,6 +531,9 @@ class BaseConfig:
     monitoring: MonitoringConfig = field(default_factory=MonitoringConfig.from_env)
     grpc: GRPCConfig = field(default_factory=GRPCConfig.from_env)
     cors: CORSConfig = field(default_factory=CORSConfig.from_env)
+    ai_gateway: AIGatewayConfig = field(default_factory=AIGatewayConfig.from_env)
+    fleet: FleetConfig = field(default_factory=FleetConfig.from_env)
+    audit: AuditConfig = field(default_factory=AuditConfig.from_env)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert configuration to dictionary for Flask.config.update().
@@ -444,6 +560,9 @@ class BaseConfig:
             "MONITORING": self.monitoring,
             "GRPC": self.grpc,
             "CORS": self.cors,
+            "AI_GATEWAY": self.ai_gateway,
+            "FLEET": self.fleet,
+            "AUDIT": self.audit,
         }
 
 
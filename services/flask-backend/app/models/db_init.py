@@ -850,7 +850,7 @@ def get_pydal_connection():
             Field("error_message", "string", length=1000),
             Field("ssl_valid", "boolean"),
             Field("ssl_expiry", "datetime"),
-            Field("created_at", "datetime"),
+            Field("created_at", "datetime", default=datetime.utcnow),
             migrate=True,  # Create table if it doesn't exist
         )
 
@@ -978,6 +978,22 @@ def get_pydal_connection():
             migrate=True,  # Create table if it doesn't exist
         )
 
+        # Metric rollups (same schema as shared.database.models), read by
+        # the anomaly detection engine
+        db.define_table(
+            "metric_aggregate",
+            Field("name", "string", length=255, notnull=True),
+            Field("interval", "string", length=16, notnull=True),  # 1m, 5m, 1h, 1d
+            Field("timestamp", "datetime", notnull=True),
+            Field("count", "bigint", default=0),
+            Field("sum", "double", default=0.0),
+            Field("min", "double"),
+            Field("max", "double"),
+            Field("avg", "double"),
+            Field("labels", "json"),
+            migrate=True,  # Create table if it doesn't exist
+        )
+
         logger.info(f"PyDAL tables defined successfully. Table Count: {len(db.tables)}")
 
         # IMPORTANT: Force PyDAL to create tables by calling commit()
@@ -990,6 +1006,42 @@ def get_pydal_connection():
             logger.warning(f"PyDAL commit during table creation raised exception: {str(commit_error)}")
             # Continue anyway - this might be expected in some cases
 
+        # Composite indexes backing keyset pagination of results
+        try:
+            from shared.database.models import ensure_index
+
+            results = db.sensor_results
+            ensure_index(
+                db,
+                results,
+                "idx_sensor_results_check_created",
+                results.check_id,
+                results.created_at,
+            )
+            ensure_index(
+                db,
+                results,
+                "idx_sensor_results_agent_created",
+                results.agent_id,
+                results.created_at,
+            )
+        except Exception as index_error:
+            logger.warning(f"Creating sensor_results indexes failed: {str(index_error)}")
+
+        # Index backing rollup range reads for anomaly detection
+        try:
+            rollups = db.metric_aggregate
+            ensure_index(
+                db,
+                rollups,
+                "idx_metric_aggregate_name_interval_ts",
+                rollups.name,
+                rollups.interval,
+                rollups.timestamp,
+            )
+        except Exception as index_error:
+            logger.warning(f"Creating metric_aggregate index failed: {str(index_error)}")
+
     except Exception as e:
         logger.error(
             f"Failed to define PyDAL tables. Error: {str(e)}, Error Type: {type(e).__name__}"
@@ -0,0 +1,448 @@
+"""
+KillKrill Flask Backend - AI Provider Gateway
+
+Long-lived gateway to Ollama, OpenAI and Claude. A single background event
+loop per process owns one pooled httpx.AsyncClient per provider endpoint,
+limits in-flight requests per provider, streams completions token by token
+and caches responses keyed on (provider, model, prompt hash). Flask
+handlers call it through the blocking complete() and stream() bridges.
+"""
+
+import asyncio
+import atexit
+import hashlib
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+import structlog
+
+from app.config import AIGatewayConfig
+
+logger = structlog.get_logger()
+
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+CLAUDE_URL = "https://api.anthropic.com/v1/messages"
+CLAUDE_VERSION = "2023-06-01"
+
+
+class GatewayBusy(Exception):
+    """No provider slot became free within the queue timeout"""
+
+
+class UnsupportedProvider(ValueError):
+    """Provider type the gateway cannot talk to"""
+
+
+@dataclass(slots=True, frozen=True)
+class ProviderSpec:
+    """Provider endpoint and credentials"""
+
+    provider_type: str
+    endpoint_url: str
+    api_key: Optional[str]
+    model: str
+
+    @property
+    def pool_key(self) -> Tuple[str, str]:
+        """Requests sharing this key share a connection pool and slots"""
+        if self.provider_type == "ollama":
+            return ("ollama", self.endpoint_url.rstrip("/"))
+        return (self.provider_type, "")
+
+
+@dataclass(slots=True, frozen=True)
+class ChatRequest:
+    """One completion request"""
+
+    prompt: str
+    max_tokens: int
+    temperature: float
+    system_prompt: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Completion:
+    """Completed response"""
+
+    text: str
+    usage: Dict[str, int] = field(default_factory=dict)
+    cached: bool = False
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, int]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def cache_key(spec: ProviderSpec, request: ChatRequest) -> str:
+    """Cache key for a (provider, model, prompt) combination"""
+    prompt_hash = hashlib.sha256(
+        json.dumps(
+            [
+                request.system_prompt,
+                request.prompt,
+                request.max_tokens,
+                request.temperature,
+            ]
+        ).encode()
+    ).hexdigest()
+    provider, endpoint = spec.pool_key
+    return f"{provider}:{endpoint}:{spec.model}:{prompt_hash}"
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache of completions"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Completion]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Completion]:
+        """Get a fresh completion, if cached"""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return Completion(entry[1].text, dict(entry[1].usage), cached=True)
+
+    def put(self, key: str, completion: Completion) -> None:
+        """Cache a completion"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, completion)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class AIGateway:
+    """
+    Pooled, concurrency-limited AI provider client
+
+    Args:
+        config: Gateway limits, timeouts and cache settings
+    """
+
+    def __init__(self, config: AIGatewayConfig):
+        self.config = config
+        self.cache = ResponseCache(config.cache_ttl, config.cache_size)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="ai-gateway", daemon=True
+        )
+        self._thread.start()
+        # Only touched from the gateway loop
+        self._clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+        self._slots: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+
+    # ------------------------------------------------------------------
+    # Blocking bridges for WSGI handlers
+    # ------------------------------------------------------------------
+
+    def complete(
+        self, spec: ProviderSpec, request: ChatRequest, use_cache: bool = True
+    ) -> Completion:
+        """Run a completion and wait for the full response"""
+        key = cache_key(spec, request)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def run() -> Completion:
+            text = []
+            completion = Completion("")
+            async with aclosing(self._stream(spec, request)) as events:
+                async for kind, value in events:
+                    if kind == "token":
+                        text.append(value)
+                    else:
+                        completion.usage = value
+            completion.text = "".join(text)
+            return completion
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._loop)
+        try:
+            completion = future.result(
+                self.config.queue_timeout + self.config.request_timeout
+            )
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError("AI provider request timed out")
+        if use_cache:
+            self.cache.put(key, completion)
+        return completion
+
+    def stream(
+        self, spec: ProviderSpec, request: ChatRequest, use_cache: bool = True
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Stream a completion
+
+        Yields ("token", text) for each piece of the response and finally
+        ("done", Completion). Closing the iterator cancels the upstream
+        request.
+        """
+        key = cache_key(spec, request)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield "token", cached.text
+                yield "done", cached
+                return
+
+        events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+
+        async def pump() -> None:
+            try:
+                async with aclosing(self._stream(spec, request)) as stream:
+                    async for event in stream:
+                        events.put(event)
+                events.put(("end", None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                events.put(("error", e))
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        text = []
+        completion = Completion("")
+        try:
+            while True:
+                try:
+                    kind, value = events.get(
+                        timeout=self.config.queue_timeout + self.config.request_timeout
+                    )
+                except queue.Empty:
+                    raise TimeoutError("AI provider stream timed out")
+                if kind == "token":
+                    text.append(value)
+                    yield kind, value
+                elif kind == "usage":
+                    completion.usage = value
+                elif kind == "error":
+                    raise value
+                else:
+                    break
+        finally:
+            future.cancel()
+
+        completion.text = "".join(text)
+        if use_cache:
+            self.cache.put(key, completion)
+        yield "done", completion
+
+    def close(self) -> None:
+        """Close all provider connections and stop the loop"""
+        if not self._loop.is_running():
+            return
+
+        async def shutdown() -> None:
+            for client in self._clients.values():
+                await client.aclose()
+            self._clients.clear()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(5)
+        except Exception as e:
+            logger.warning("ai_gateway_close_failed", error=str(e))
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # ------------------------------------------------------------------
+    # Event loop side
+    # ------------------------------------------------------------------
+
+    def _client(self, spec: ProviderSpec) -> httpx.AsyncClient:
+        key = spec.pool_key
+        client = self._clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.config.request_timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_connections,
+                ),
+            )
+            self._clients[key] = client
+            self._slots[key] = asyncio.Semaphore(self.config.max_concurrency)
+        return client
+
+    async def _stream(
+        self, spec: ProviderSpec, request: ChatRequest
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield ("token", text) and ("usage", dict) events from a provider"""
+        if spec.provider_type == "ollama":
+            events = self._stream_ollama
+        elif spec.provider_type == "openai":
+            events = self._stream_openai
+        elif spec.provider_type == "claude":
+            events = self._stream_claude
+        else:
+            raise UnsupportedProvider(
+                f"Unsupported provider type: {spec.provider_type}"
+            )
+
+        client = self._client(spec)
+        slots = self._slots[spec.pool_key]
+        try:
+            await asyncio.wait_for(slots.acquire(), self.config.queue_timeout)
+        except asyncio.TimeoutError:
+            raise GatewayBusy(f"{spec.provider_type} is at capacity")
+        try:
+            async with aclosing(events(client, spec, request)) as stream:
+                async for event in stream:
+                    yield event
+        finally:
+            slots.release()
+
+    async def _stream_ollama(
+        self, client: httpx.AsyncClient, spec: ProviderSpec, request: ChatRequest
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        payload = {
+            "model": spec.model,
+            "prompt": request.prompt,
+            "stream": True,
+            "options": {
+                "num_predict": request.max_tokens,
+                "temperature": request.temperature,
+            },
+        }
+        if request.system_prompt:
+            payload["system"] = request.system_prompt
+
+        url = f"{spec.endpoint_url.rstrip('/')}/api/generate"
+        async with client.stream("POST", url, json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield "token", chunk["response"]
+                if chunk.get("done"):
+                    yield "usage", _usage(
+                        chunk.get("prompt_eval_count", 0), chunk.get("eval_count", 0)
+                    )
+
+    async def _stream_openai(
+        self, client: httpx.AsyncClient, spec: ProviderSpec, request: ChatRequest
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        messages = []
+        if request.system_prompt:
+            messages.append({"role": "system", "content": request.system_prompt})
+        messages.append({"role": "user", "content": request.prompt})
+
+        async with client.stream(
+            "POST",
+            OPENAI_URL,
+            headers={"Authorization": f"Bearer {spec.api_key}"},
+            json={
+                "model": spec.model,
+                "messages": messages,
+                "max_tokens": request.max_tokens,
+                "temperature": request.temperature,
+                "stream": True,
+                "stream_options": {"include_usage": True},
+            },
+        ) as response:
+            response.raise_for_status()
+            async for data in _sse_data(response):
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                for choice in chunk.get("choices") or []:
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        yield "token", content
+                if chunk.get("usage"):
+                    yield "usage", chunk["usage"]
+
+    async def _stream_claude(
+        self, client: httpx.AsyncClient, spec: ProviderSpec, request: ChatRequest
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        input_tokens = 0
+        async with client.stream(
+            "POST",
+            CLAUDE_URL,
+            headers={
+                "x-api-key": spec.api_key or "",
+                "anthropic-version": CLAUDE_VERSION,
+            },
+            json={
+                "model": spec.model,
+                "max_tokens": request.max_tokens,
+                "messages": [{"role": "user", "content": request.prompt}],
+                "system": request.system_prompt or "",
+                "temperature": request.temperature,
+                "stream": True,
+            },
+        ) as response:
+            response.raise_for_status()
+            async for data in _sse_data(response):
+                event = json.loads(data)
+                kind = event.get("type")
+                if kind == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield "token", text
+                elif kind == "message_start":
+                    usage = event.get("message", {}).get("usage", {})
+                    input_tokens = usage.get("input_tokens", 0)
+                elif kind == "message_delta":
+                    output_tokens = event.get("usage", {}).get("output_tokens", 0)
+                    yield "usage", _usage(input_tokens, output_tokens)
+                elif kind == "error":
+                    raise RuntimeError(event.get("error", {}).get("message", data))
+
+
+async def _sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the data field of each server-sent event"""
+    data = []
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip())
+        elif not line and data:
+            yield "\n".join(data)
+            data = []
+    if data:
+        yield "\n".join(data)
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+_gateway: Optional[AIGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_ai_gateway() -> AIGateway:
+    """Get the process-wide AI gateway, starting it on first use"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = AIGateway(AIGatewayConfig.from_env())
+                atexit.register(_gateway.close)
+    return _gateway
@@ -0,0 +1,210 @@
+"""
+KillKrill Flask Backend - Anomaly Detection
+
+Runs the vectorized detectors from shared.monitoring.anomaly over metric
+rollups and inline series. Small scans complete within the request; large
+ones run on a small background pool and update their ai_analyses row when
+done.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from shared.monitoring.anomaly import (
+    DEFAULT_THRESHOLD,
+    DETECTORS,
+    detect_anomalies,
+    matrix_cells,
+)
+
+logger = structlog.get_logger()
+
+# Requests whose detector matrices hold at most this many cells (series x
+# padded points) are answered synchronously
+SYNC_MAX_CELLS = 200000
+
+# Anomalous series recorded in ai_anomalies per analysis
+MAX_RECORDED_ANOMALIES = 500
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def series_key(name: str, labels: Optional[Dict[str, Any]]) -> str:
+    """Series identifier: metric name plus its sorted labels"""
+    if not labels:
+        return name
+    pairs = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{pairs}}}"
+
+
+def _rollup_rows(db, names: List[str], interval: str, hours: int):
+    """Query for the named metrics' rollups within the lookback window"""
+    t = db.metric_aggregate
+    since = datetime.utcnow() - timedelta(hours=hours)
+    return db(t.name.belongs(names) & (t.interval == interval) & (t.timestamp >= since))
+
+
+def load_rollup_series(
+    db, names: List[str], interval: str, hours: int
+) -> Tuple[Dict[str, List[float]], Dict[str, List[datetime]]]:
+    """
+    Read rollup averages for the named metrics in one ordered query
+
+    Rollups are read from metric_aggregate, which has no writer in this
+    tree yet; names without rollups simply produce no series.
+
+    Returns:
+        (series key -> values, series key -> timestamps), oldest first
+    """
+    values: Dict[str, List[float]] = {}
+    timestamps: Dict[str, List[datetime]] = {}
+    if not names:
+        return values, timestamps
+
+    t = db.metric_aggregate
+    rows = _rollup_rows(db, names, interval, hours).select(
+        t.name, t.labels, t.timestamp, t.avg, orderby=t.name | t.timestamp
+    )
+
+    for row in rows:
+        if row.avg is None:
+            continue
+        key = series_key(row.name, row.labels)
+        values.setdefault(key, []).append(row.avg)
+        timestamps.setdefault(key, []).append(row.timestamp)
+    return values, timestamps
+
+
+def count_scan_cells(db, params: Dict[str, Any]) -> int:
+    """
+    Matrix cells a scan would allocate, including padding
+
+    Inline series are measured exactly. Rollup rows are only counted;
+    series of similar length share a matrix, so twice the row count
+    bounds their padded size.
+    """
+    names = [m for m in params["metrics"] if isinstance(m, str)]
+    cells = matrix_cells(
+        [len(m["values"]) for m in params["metrics"] if isinstance(m, dict)]
+    )
+    if names:
+        rows = _rollup_rows(
+            db, names, params.get("interval", "5m"), params.get("hours", 24)
+        ).count()
+        cells += 2 * rows
+    return cells
+
+
+def run_anomaly_detection(db, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Scan the requested series and return the analysis result
+
+    Args:
+        db: PyDAL instance
+        params: Request parameters (metrics, threshold, detectors, period,
+            interval, hours)
+
+    Returns:
+        Result with the anomalous series, highest score first
+    """
+    started = time.perf_counter()
+
+    names = [m for m in params["metrics"] if isinstance(m, str)]
+    series, timestamps = load_rollup_series(
+        db, names, params.get("interval", "5m"), params.get("hours", 24)
+    )
+    for metric in params["metrics"]:
+        if isinstance(metric, dict):
+            series[metric["name"]] = metric["values"]
+
+    # Series keys are the metric name plus "{labels}"
+    matched = {key.split("{", 1)[0] for key in series}
+    unmatched = [name for name in names if name not in matched]
+
+    threshold = params.get("threshold", DEFAULT_THRESHOLD)
+    detectors = params.get("detectors") or list(DETECTORS)
+    anomalies = detect_anomalies(
+        series, threshold=threshold, detectors=detectors, period=params.get("period")
+    )
+
+    for report in anomalies:
+        stamps = timestamps.get(report["series"])
+        if stamps:
+            for point in report["points"]:
+                point["timestamp"] = stamps[point["index"]].isoformat()
+
+    return {
+        "series_scanned": len(series),
+        "points_scanned": sum(len(v) for v in series.values()),
+        "unmatched_metrics": unmatched,
+        "anomalous_series": len(anomalies),
+        "threshold": threshold,
+        "detectors": detectors,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "anomalies": anomalies,
+    }
+
+
+def _severity(score: float) -> str:
+    if score >= 10:
+        return "critical"
+    if score >= 6:
+        return "high"
+    if score >= 4.5:
+        return "medium"
+    return "low"
+
+
+def complete_analysis(db, analysis_id, params: Dict[str, Any]) -> None:
+    """Run a scan and store its result on the ai_analyses row"""
+    try:
+        result = run_anomaly_detection(db, params)
+        now = datetime.utcnow()
+        for report in result["anomalies"][:MAX_RECORDED_ANOMALIES]:
+            db.ai_anomalies.insert(
+                analysis_id=str(analysis_id),
+                anomaly_type="metric",
+                description=(
+                    f"{report['anomaly_count']} anomalous points in "
+                    f"{report['series']}"
+                ),
+                severity=_severity(report["max_score"]),
+                score=report["max_score"],
+                source=report["series"][:128],
+                metadata={"points": report["points"][-10:]},
+                created_at=now,
+            )
+        db(db.ai_analyses.id == analysis_id).update(
+            result=result, status="completed", completed_at=now
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("anomaly_detection_failed", analysis_id=analysis_id, error=str(e))
+        db(db.ai_analyses.id == analysis_id).update(
+            status="failed", error_message=str(e), completed_at=datetime.utcnow()
+        )
+        db.commit()
+
+
+def _run_job(analysis_id, params: Dict[str, Any]) -> None:
+    from app.models.database import get_pydal_connection
+
+    complete_analysis(get_pydal_connection(), analysis_id, params)
+
+
+def submit_anomaly_job(analysis_id, params: Dict[str, Any]) -> None:
+    """Run a large scan in the background"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="anomaly-detection"
+            )
+    _executor.submit(_run_job, analysis_id, params)
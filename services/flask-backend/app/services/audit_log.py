@@ -0,0 +1,240 @@
+"""
+KillKrill Flask Backend - Audit Log Writer
+
+Request handlers queue audit events and return; a daemon thread writes
+them to the audit_log table in multi-row batches. Events still queued at
+interpreter exit are written by an atexit flush.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+from app.config import AuditConfig
+from shared.database.audit import AuditEvent
+from shared.database.models import insert_many
+from shared.monitoring.metrics import metric_prefix
+
+logger = structlog.get_logger()
+
+_writer: Optional["AuditWriter"] = None
+_writer_lock = threading.Lock()
+
+# How often an idle writer checks whether it should stop
+_IDLE_POLL_SECONDS = 0.5
+
+
+def _row(event: AuditEvent) -> Dict[str, Any]:
+    # audit_log.id is the table's auto-increment key, assigned by the database
+    return {
+        "user_id": None if event.user_id is None else str(event.user_id),
+        "audit_action": event.action,
+        "resource_type": event.resource_type,
+        "resource_id": event.resource_id,
+        "details": event.details,
+        "ip_address": event.ip_address,
+        "user_agent": (event.user_agent or "")[:512] or None,
+        "created_at": event.timestamp,
+    }
+
+
+def _write_rows(rows: List[Dict[str, Any]]) -> None:
+    from app.models.db_init import get_engine
+
+    db = get_engine()
+    try:
+        insert_many(db, db.audit_log, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+class AuditWriter:
+    """Bounded audit event queue drained by one background thread"""
+
+    def __init__(
+        self,
+        config: AuditConfig,
+        registry: Optional[CollectorRegistry] = None,
+        write: Callable[[List[Dict[str, Any]]], None] = _write_rows,
+    ):
+        self.config = config
+        self._write = write
+        self._queue: queue.Queue = queue.Queue(maxsize=config.queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="audit-writer", daemon=True
+        )
+
+        prefix = metric_prefix("flask-backend")
+        self._events = Counter(
+            f"{prefix}_audit_events_total",
+            "Audit events by outcome (written, dropped, failed)",
+            ["result"],
+            registry=registry,
+        )
+        self._late = Counter(
+            f"{prefix}_audit_events_late_total",
+            "Audit events written later than AUDIT_LATE_SECONDS after queueing",
+            registry=registry,
+        )
+        self._lag = Histogram(
+            f"{prefix}_audit_event_lag_seconds",
+            "Time from queueing an audit event to committing it",
+            buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+            registry=registry,
+        )
+        self._depth = Gauge(
+            f"{prefix}_audit_queue_depth",
+            "Audit events waiting to be written",
+            registry=registry,
+        )
+        self._depth.set_function(self._queue.qsize)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def record(self, event: AuditEvent) -> bool:
+        """Queue an event; returns False if the queue was full and it was dropped"""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._events.labels(result="dropped").inc()
+            logger.warning("audit_event_dropped", action=event.action)
+            return False
+        return True
+
+    def _next_batch(self) -> List[AuditEvent]:
+        """Wait briefly for one event, then gather more until full or flush_interval"""
+        try:
+            batch = [self._queue.get(timeout=_IDLE_POLL_SECONDS)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.config.flush_interval
+        while len(batch) < self.config.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: List[AuditEvent]) -> None:
+        """Write one batch; a failed batch is logged and counted, not retried"""
+        try:
+            self._write([_row(event) for event in batch])
+        except Exception as e:
+            self._events.labels(result="failed").inc(len(batch))
+            logger.error("audit_batch_write_failed", events=len(batch), error=str(e))
+            return
+
+        self._events.labels(result="written").inc(len(batch))
+        now = time.monotonic()
+        for event in batch:
+            lag = event.lag(now)
+            self._lag.observe(lag)
+            if lag > self.config.late_after:
+                self._late.inc()
+
+    def _run(self) -> None:
+        # The current batch is always written before the stop flag is seen
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+
+    def close(self) -> int:
+        """
+        Stop the writer thread and write every event still queued
+
+        Returns:
+            Number of events written by the final flush
+        """
+        self._stop.set()
+        self._thread.join(self.config.shutdown_timeout)
+
+        pending: List[AuditEvent] = []
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        size = self.config.batch_size
+        for start in range(0, len(pending), size):
+            self._flush(pending[start : start + size])
+        return len(pending)
+
+
+def _current_user_id() -> Optional[Any]:
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None  # No JWT was verified for this request
+
+
+def audit(
+    action: str,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[Any] = None,
+    details: Optional[Dict[str, Any]] = None,
+    user_id: Optional[Any] = None,
+) -> bool:
+    """
+    Queue an audit event for the current request
+
+    The acting user, client IP and user agent are taken from the request
+    when called inside one; user_id overrides the JWT identity.
+
+    Returns:
+        False if the event was not queued
+    """
+    writer = _writer
+    if writer is None:
+        return False
+
+    event = AuditEvent(
+        action=action,
+        user_id=user_id,
+        resource_type=resource_type,
+        resource_id=None if resource_id is None else str(resource_id),
+        details=details,
+    )
+    if has_request_context():
+        if event.user_id is None:
+            event.user_id = _current_user_id()
+        # X-Forwarded-For is client supplied; record the connected peer
+        event.ip_address = request.remote_addr
+        event.user_agent = request.headers.get("User-Agent")
+        if g.get("correlation_id"):
+            event.details = {**(details or {}), "correlation_id": g.correlation_id}
+    return writer.record(event)
+
+
+def init_audit_writer(registry: Optional[CollectorRegistry] = None) -> AuditWriter:
+    """Start the process-wide audit writer once, flushing it at exit"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = AuditWriter(AuditConfig.from_env(), registry)
+                writer.start()
+                atexit.register(writer.close)
+                _writer = writer
+    return _writer
+
+
+def get_audit_writer() -> Optional[AuditWriter]:
+    """Get the audit writer, or None before init_audit_writer()"""
+    return _writer
@@ -0,0 +1,178 @@
+"""
+KillKrill Flask Backend - Fleet Mirror
+
+Process-wide mirror of the Fleet host inventory. A daemon thread merges
+hosts changed since the last ``updated_at`` cursor every sync interval and
+re-reads hosts, label membership and failing-policy hosts every full
+interval; request handlers only read the local indexes.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+import structlog
+
+from app.config import FleetConfig
+from shared.monitoring.fleet_inventory import FleetInventory
+
+logger = structlog.get_logger()
+
+_mirror: Optional["FleetMirror"] = None
+_mirror_lock = threading.Lock()
+
+
+class FleetMirror:
+    """Background Fleet syncer around a lock-guarded FleetInventory"""
+
+    def __init__(self, config: FleetConfig):
+        self.config = config
+        self.inventory = FleetInventory()
+        self.lock = threading.Lock()
+
+        self._base_url = f"{config.server_url.rstrip('/')}/api/v1/fleet"
+        self._session = requests.Session()
+        self._session.headers["Authorization"] = f"Bearer {config.api_token}"
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="fleet-mirror", daemon=True
+        )
+
+    # ------------------------------------------------------------------
+    # Fleet reads (sync thread only)
+    # ------------------------------------------------------------------
+
+    def _get(self, path: str, **params) -> Dict[str, Any]:
+        response = self._session.get(
+            f"{self._base_url}{path}", params=params, timeout=self.config.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _pages(self, path: str, key: str, **params) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        page = 0
+        while True:
+            data = self._get(path, page=page, per_page=self.config.page_size, **params)
+            batch = data.get(key) or []
+            items.extend(batch)
+            if len(batch) < self.config.page_size:
+                return items
+            page += 1
+
+    def _host_ids(self, path: str, **params) -> List[int]:
+        return [h["id"] for h in self._pages(path, "hosts", **params) if "id" in h]
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def sync_incremental(self) -> int:
+        """Merge hosts updated since the cursor; returns hosts merged"""
+        params = {"order_key": "updated_at", "order_direction": "asc"}
+        merged = 0
+        while True:
+            cursor = self.inventory.cursor
+            if cursor:
+                params["after"] = cursor
+            data = self._get("/hosts", per_page=self.config.page_size, **params)
+            batch = data.get("hosts") or []
+            with self.lock:
+                merged += self.inventory.upsert_hosts(batch)
+            # A full page that did not move the cursor would repeat forever
+            if len(batch) < self.config.page_size or self.inventory.cursor == cursor:
+                break
+
+        policies = self._get("/global/policies").get("policies") or []
+        with self.lock:
+            self.inventory.set_policies(policies)
+            self.inventory.mark_synced()
+        return merged
+
+    def sync_full(self) -> int:
+        """Re-read hosts, labels and failing-policy hosts; returns host count"""
+        hosts = self._pages("/hosts", "hosts", order_key="id")
+        labels = self._get("/labels").get("labels") or []
+        membership = {
+            label["id"]: self._host_ids(f"/labels/{label['id']}/hosts")
+            for label in labels
+        }
+        policies = self._get("/global/policies").get("policies") or []
+        failing = {
+            policy["id"]: self._host_ids(
+                "/hosts", policy_id=policy["id"], policy_response="failing"
+            )
+            for policy in policies
+        }
+
+        with self.lock:
+            self.inventory.upsert_hosts(hosts)
+            self.inventory.retain_hosts(h["id"] for h in hosts if "id" in h)
+            self.inventory.set_labels(labels, membership)
+            self.inventory.set_policies(policies, failing)
+            self.inventory.mark_synced(full=True)
+            return len(self.inventory)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            full_synced_at = self.inventory.full_synced_at
+            full = (
+                full_synced_at is None
+                or time.time() - full_synced_at >= self.config.full_sync_interval
+            )
+            kind = "full" if full else "incremental"
+            try:
+                count = self.sync_full() if full else self.sync_incremental()
+                logger.debug("fleet_mirror_synced", kind=kind, hosts=count)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                with self.lock:
+                    self.inventory.last_error = str(e) or type(e).__name__
+                logger.warning("fleet_mirror_sync_failed", kind=kind, error=str(e))
+            self._stop.wait(self.config.sync_interval)
+
+    # ------------------------------------------------------------------
+    # Lifecycle and reads
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._session.close()
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full sync has completed"""
+        return self.inventory.ready
+
+    def staleness(self) -> Dict[str, Any]:
+        with self.lock:
+            return self.inventory.staleness(self.config.max_staleness)
+
+    def query_hosts(self, **filters) -> Tuple[int, List[Dict[str, Any]]]:
+        with self.lock:
+            return self.inventory.query_hosts(**filters)
+
+    def get_host(self, host_id: int) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.inventory.get_host(host_id)
+
+    def policies(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.inventory.policies.values())
+
+
+def get_fleet_mirror() -> Optional[FleetMirror]:
+    """Get the process-wide Fleet mirror, starting it on first use"""
+    global _mirror
+    if _mirror is None:
+        config = FleetConfig.from_env()
+        if not config.mirror_enabled:
+            return None
+        with _mirror_lock:
+            if _mirror is None:
+                _mirror = FleetMirror(config)
+                _mirror.start()
+    return _mirror
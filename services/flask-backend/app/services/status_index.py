@@ -0,0 +1,120 @@
+"""
+KillKrill Flask Backend - Sensor Status Index
+
+Process-wide rolling 24h counters for sensor checks. The index is
+warmed from the database with grouped queries over the window, updated
+incrementally as results are submitted, and re-warmed periodically so
+results written by other workers are picked up.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import structlog
+
+from shared.monitoring.status_index import (
+    FAILED_STATUSES,
+    HourBucket,
+    SensorStatusIndex,
+    hour_bucket,
+)
+
+logger = structlog.get_logger()
+
+# Seconds between database re-warms
+REFRESH_INTERVAL = 60
+
+_index: Optional[SensorStatusIndex] = None
+_warmed_at: float = 0.0
+_lock = threading.Lock()
+
+
+def _build_index(db) -> SensorStatusIndex:
+    """
+    Build fresh rolling counters from sensor_results
+
+    Only the rolling window is read; latest-per-check entries are not
+    loaded because nothing here reads them.
+    """
+    t = db.sensor_results
+    index = SensorStatusIndex()
+    since = datetime.utcnow() - timedelta(hours=index.window_hours)
+
+    # Hourly counters for the rolling window
+    year, month, day, hour = (
+        t.created_at.year(),
+        t.created_at.month(),
+        t.created_at.day(),
+        t.created_at.hour(),
+    )
+    groupby = year | month | day | hour
+    total = t.id.count()
+    rt_sum = t.response_time_ms.sum()
+    rt_count = t.response_time_ms.count()
+
+    failed = {
+        (r[year], r[month], r[day], r[hour]): r[total]
+        for r in db(
+            (t.created_at >= since) & t.status.belongs(list(FAILED_STATUSES))
+        ).select(year, month, day, hour, total, groupby=groupby)
+    }
+    for r in db(t.created_at >= since).select(
+        year, month, day, hour, total, rt_sum, rt_count, groupby=groupby
+    ):
+        key = (r[year], r[month], r[day], r[hour])
+        index.add_bucket(
+            hour_bucket(datetime(*key)),
+            HourBucket(
+                total=r[total] or 0,
+                failed=failed.get(key, 0),
+                response_time_sum=float(r[rt_sum] or 0),
+                response_time_count=r[rt_count] or 0,
+            ),
+        )
+
+    return index
+
+
+def get_status_index(db) -> SensorStatusIndex:
+    """Get the status index, warming or refreshing it from the database"""
+    global _index, _warmed_at
+
+    with _lock:
+        if _index is not None and time.monotonic() - _warmed_at < REFRESH_INTERVAL:
+            return _index
+
+        try:
+            _index = _build_index(db)
+            _warmed_at = time.monotonic()
+            logger.debug("status_index_warmed", entries=len(_index))
+        except Exception as e:
+            logger.warning("status_index_warm_failed", error=str(e))
+            if _index is None:
+                _index = SensorStatusIndex()
+            _warmed_at = time.monotonic()
+
+        return _index
+
+
+def record_result(
+    check_id: Any,
+    agent_id: Any,
+    status: str,
+    response_time_ms: Optional[float],
+    timestamp: datetime,
+) -> None:
+    """Apply a newly stored result to the index (no-op until first warm)"""
+    with _lock:
+        if _index is not None:
+            _index.record(
+                str(check_id), str(agent_id), status, response_time_ms, timestamp
+            )
+
+
+def rolling_counters(db) -> Dict[str, Any]:
+    """Get rolling 24h result counters"""
+    index = get_status_index(db)
+    with _lock:
+        return index.rolling_counters()
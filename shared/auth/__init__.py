@@ -21,6 +21,11 @@ from shared.auth.middleware import (
     verify_ip_access,
     verify_jwt_token,
 )
+from shared.auth.token_cache import (
+    TokenRevoked,
+    configure_token_cache,
+    get_token_cache,
+)
 
 # Conditionally import Quart-specific auth (only if Quart is installed)
 try:
@@ -42,6 +47,7 @@ __all__ = [
     # Exceptions
     "AuthenticationError",
     "AuthorizationError",
+    "TokenRevoked",
     # Utilities
     "generate_api_key",
     "hash_api_key",
@@ -51,6 +57,8 @@ __all__ = [
     "verify_ip_access",
     # Middleware
     "MultiAuthMiddleware",
+    "configure_token_cache",
+    "get_token_cache",
     # py4web decorators
     "require_auth_py4web",
     "require_ip_access_py4web",
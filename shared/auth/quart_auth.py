@@ -14,6 +14,8 @@ import jwt
 from netaddr import AddrFormatError, IPNetwork
 from quart import abort, g, jsonify, request
 
+from shared.auth.token_cache import TokenRevoked, verify_cached
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,6 +52,7 @@ def generate_jwt_token(
     """Generate a JWT token"""
     exp_time = int(time.time()) + (expiry_hours * 3600)
     payload.update({"exp": exp_time, "iat": int(time.time())})
+    payload.setdefault("jti", secrets.token_urlsafe(16))
     return jwt.encode(payload, secret, algorithm="HS256")
 
 
@@ -84,8 +87,10 @@ def verify_ip_access(client_ip: str, allowed_networks: List[str]) -> bool:
 class MultiAuthMiddleware:
     """Multi-method authentication middleware for Quart"""
 
-    def __init__(self, jwt_secret: str):
+    def __init__(self, jwt_secret: str, token_cache: Optional[Any] = None):
         self.jwt_secret = jwt_secret
+        # None uses the process-wide cache from shared.auth.token_cache
+        self.token_cache = token_cache
 
     def authenticate_request(
         self, headers: Dict[str, str], query_params: Dict[str, str]
@@ -131,9 +136,11 @@ class MultiAuthMiddleware:
         }
 
     def _authenticate_jwt(self, token: str) -> Optional[Dict[str, Any]]:
-        """Authenticate via JWT token"""
+        """Authenticate via JWT token (claims cached until the token expires)"""
         try:
-            payload = verify_jwt_token(token, self.jwt_secret)
+            payload = verify_cached(
+                token, self.jwt_secret, verify_jwt_token, self.token_cache
+            )
             return {
                 "method": "jwt",
                 "authenticated": True,
@@ -141,8 +148,9 @@ class MultiAuthMiddleware:
                 "permissions": payload.get("permissions", []),
                 "source": payload.get("source"),
                 "expires": payload.get("exp"),
+                "jti": payload.get("jti"),
             }
-        except AuthenticationError:
+        except (AuthenticationError, TokenRevoked):
             return None
 
     def _authenticate_mtls(self, client_cert: str) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,91 @@
+"""
+Process-wide verified-token cache for the shared auth middleware
+Backed by py_libs.security.token_cache when py_libs is installed; without it
+every token is fully verified on every request.
+"""
+
+import logging
+from threading import RLock
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from py_libs.security.token_cache import (
+        RevocationSet,
+        TokenRevoked,
+        VerifiedTokenCache,
+    )
+except ImportError:
+    RevocationSet = None
+    VerifiedTokenCache = None
+
+    class TokenRevoked(Exception):
+        """The token's ID has been revoked"""
+
+
+logger = logging.getLogger(__name__)
+
+_token_cache: Optional[Any] = None
+_redis_client: Optional[Any] = None
+_lock = RLock()
+
+
+def configure_token_cache(
+    max_entries: int = 10000,
+    redis_client: Optional[Any] = None,
+    sync_interval: float = 2.0,
+) -> Optional[Any]:
+    """
+    Replace the process-wide cache
+
+    Args:
+        max_entries: Most verified tokens held at once
+        redis_client: Synchronous Redis client to sync revoked token IDs from
+        sync_interval: Seconds between revocation syncs
+
+    Returns:
+        The new VerifiedTokenCache, or None if py_libs is not installed
+    """
+    global _token_cache, _redis_client
+
+    if VerifiedTokenCache is None:
+        logger.warning("py_libs not installed; JWT verification is not cached")
+        return None
+
+    with _lock:
+        _token_cache = VerifiedTokenCache(
+            max_entries=max_entries,
+            revocations=RevocationSet(sync_interval=sync_interval),
+        )
+        _redis_client = redis_client
+    return _token_cache
+
+
+def get_token_cache() -> Optional[Any]:
+    """Process-wide cache, created with defaults on first use"""
+    if _token_cache is None and VerifiedTokenCache is not None:
+        with _lock:
+            if _token_cache is None:
+                configure_token_cache()
+    return _token_cache
+
+
+def verify_cached(
+    token: str,
+    secret: str,
+    decode: Callable[[str, str], Dict[str, Any]],
+    token_cache: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Verify a token with decode(token, secret) unless its claims are cached
+
+    Raises:
+        TokenRevoked: If the token's jti has been revoked
+        Whatever decode raises for an invalid token
+    """
+    cache = token_cache if token_cache is not None else get_token_cache()
+    if cache is None:
+        return decode(token, secret)
+
+    if _redis_client is not None and cache is _token_cache:
+        cache.revocations.maybe_sync(_redis_client)
+    return cache.verify(token, lambda t: decode(t, secret), namespace=secret)
@@ -0,0 +1,31 @@
+"""
+Audit events for Killkrill's background audit-log writers.
+
+Handlers record an AuditEvent and return; a writer batches queued events
+into multi-row inserts. Each event carries the monotonic time it was
+queued so writers can report how long events waited to be persisted.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+@dataclass(slots=True)
+class AuditEvent:
+    """One audited action."""
+
+    action: str
+    user_id: Optional[Any] = None
+    resource_type: Optional[str] = None
+    resource_id: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    queued_at: float = field(default_factory=time.monotonic)
+
+    def lag(self, now: Optional[float] = None) -> float:
+        """Seconds since the event was queued."""
+        return (time.monotonic() if now is None else now) - self.queued_at
@@ -5,6 +5,7 @@ All tables are defined here with migrate=True for automatic schema management.
 """
 
 from datetime import datetime
+from typing import Any, Dict, List
 
 from pydal import DAL, Field
 
@@ -23,6 +24,65 @@ def define_all_tables(db: DAL) -> None:
     _define_alert_tables(db)
 
 
+def ensure_index(db: DAL, table, name: str, *fields) -> None:
+    """
+    Create an index if it does not exist yet.
+
+    PyDAL's Table.create_index() fails when the index already exists, so
+    PostgreSQL and SQLite use CREATE INDEX IF NOT EXISTS and other engines
+    fall back to create_index() and ignore the duplicate.
+
+    Args:
+        db: PyDAL instance
+        table: Table to index
+        name: Index name
+        *fields: Indexed fields, in index column order
+    """
+    if db._adapter.dbengine in ("postgres", "sqlite"):
+        columns = ", ".join(field._rname for field in fields)
+        db.executesql(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table._rname} ({columns});"
+        )
+        db.commit()
+        return
+
+    try:
+        table.create_index(name, *fields)
+    except RuntimeError:
+        pass  # Index already exists
+
+
+def insert_many(db: DAL, table, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert rows with a single multi-row INSERT statement.
+
+    PyDAL's bulk_insert() issues one INSERT per row. Values are rendered
+    with the adapter's own escaping, exactly as insert() does. Every row
+    is written with the columns of the first row; missing values are NULL.
+    Does not commit.
+
+    Args:
+        db: PyDAL instance
+        table: Target table
+        rows: Field name -> value mappings
+
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+
+    fields = [table[name] for name in rows[0]]
+    adapter = db._adapter
+    values = ",".join(
+        "(%s)" % ",".join(adapter.expand(row.get(f.name), f.type) for f in fields)
+        for row in rows
+    )
+    columns = ",".join(f._rname for f in fields)
+    db.executesql(f"INSERT INTO {table._rname}({columns}) VALUES {values};")
+    return len(rows)
+
+
 def _define_auth_tables(db: DAL) -> None:
     """Define authentication and authorization tables."""
 
@@ -176,6 +236,13 @@ def _define_log_tables(db: DAL) -> None:
         Field("raw_message", "text"),
         migrate=True,
     )
+    ensure_index(
+        db,
+        db.log_entry,
+        "idx_log_entry_source_ts",
+        db.log_entry.source,
+        db.log_entry.timestamp,
+    )
 
     # Log parsing rules
     db.define_table(
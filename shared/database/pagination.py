@@ -0,0 +1,174 @@
+"""
+Keyset (cursor) pagination for PyDAL queries.
+
+Pages are addressed by the (timestamp, id) of the last row returned rather
+than by an offset, so fetching page N costs the same index range scan as
+fetching page 1. Cursors are opaque URL-safe strings handed back to clients
+as ``next_cursor``.
+
+Rows whose timestamp is NULL sort after every dated row, ordered by id, so
+they are still listed and can be paged past on any database backend.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from pydal.objects import Field, Query, Rows
+
+# Upper bound for client supplied page sizes
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(timestamp: Optional[datetime], row_id: Any) -> str:
+    """
+    Encode the position of a row as an opaque cursor.
+
+    Args:
+        timestamp: Sort timestamp of the last row on the page (may be None)
+        row_id: Primary key of the last row on the page (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    position = timestamp.isoformat() if timestamp is not None else None
+    raw = json.dumps([position, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous page
+
+    Returns:
+        Tuple of (timestamp, row_id); timestamp is None past the dated rows
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if timestamp is None:
+            return None, row_id
+        return datetime.fromisoformat(timestamp), row_id
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def parse_limit(value: Any, default: int = 100, maximum: int = MAX_PAGE_SIZE) -> int:
+    """
+    Clamp a client supplied page size.
+
+    Args:
+        value: Raw limit (string, int or None)
+        default: Limit used when value is missing or not a number
+        maximum: Largest allowed page size
+
+    Returns:
+        Page size between 1 and maximum
+    """
+    try:
+        limit = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def after_cursor(timestamp_field: Field, id_field: Field, cursor: str) -> Query:
+    """
+    Build the condition selecting rows that sort after a cursor.
+
+    Rows are ordered newest first, so "after" means an older timestamp, or
+    the same timestamp with a smaller id. Past the dated rows it means an
+    undated row with a smaller id.
+
+    The redundant ``timestamp <= T`` conjunct gives the planner a range
+    bound, so an index on (filter columns, timestamp) is scanned from the
+    cursor instead of from the newest row.
+
+    Args:
+        timestamp_field: Sort timestamp column
+        id_field: Tie-breaker column
+        cursor: Cursor from a previous page
+
+    Returns:
+        PyDAL query
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    timestamp, row_id = decode_cursor(cursor)
+    if timestamp is None:
+        return (timestamp_field == None) & (id_field < row_id)  # noqa: E711
+    return (timestamp_field <= timestamp) & (
+        (timestamp_field < timestamp)
+        | ((timestamp_field == timestamp) & (id_field < row_id))
+    )
+
+
+def keyset_page(
+    db,
+    query,
+    timestamp_field: Field,
+    id_field: Field,
+    limit: int,
+    cursor: Optional[str] = None,
+    *fields,
+    **select_kwargs,
+) -> Tuple[Rows, Optional[str]]:
+    """
+    Select one page of rows ordered newest first.
+
+    Fetches one extra row to know whether another page exists, so no
+    COUNT(*) is needed.
+
+    Args:
+        db: PyDAL instance
+        query: Filter query (or table) for the listing
+        timestamp_field: Sort timestamp column
+        id_field: Tie-breaker column
+        limit: Page size
+        cursor: Cursor from the previous page, or None for the first page
+        *fields: Optional fields to select
+        **select_kwargs: Extra select() arguments (e.g. left joins)
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+
+    def select(condition, orderby, count):
+        return db(query)(condition).select(
+            *fields, orderby=orderby, limitby=(0, count), **select_kwargs
+        )
+
+    if cursor and decode_cursor(cursor)[0] is None:
+        # Already past the dated rows
+        after = after_cursor(timestamp_field, id_field, cursor)
+        rows = select(after, ~id_field, limit + 1)
+    else:
+        if cursor:
+            after = after_cursor(timestamp_field, id_field, cursor)
+        else:
+            after = timestamp_field != None  # noqa: E711
+        rows = select(after, ~timestamp_field | ~id_field, limit + 1)
+        if len(rows) <= limit:
+            # Undated rows follow the dated ones
+            undated = timestamp_field == None  # noqa: E711
+            rows += select(undated, ~id_field, limit + 1 - len(rows))
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    if timestamp_field.tablename in last:
+        last = last[timestamp_field.tablename]
+    return rows, encode_cursor(last[timestamp_field.name], last[id_field.name])
@@ -0,0 +1,30 @@
+"""
+KillKrill Ingestion Helpers
+Streaming decoding of batch upload bodies for the receivers
+"""
+
+from shared.ingest.body_reader import (
+    BodyError,
+    BodyLimits,
+    BodyReader,
+    MalformedBody,
+    PayloadTooLarge,
+    RecordScanner,
+    UnsupportedEncoding,
+    aiter_batches,
+    iter_batches,
+    read_chunks,
+)
+
+__all__ = [
+    "BodyError",
+    "BodyLimits",
+    "BodyReader",
+    "MalformedBody",
+    "PayloadTooLarge",
+    "RecordScanner",
+    "UnsupportedEncoding",
+    "aiter_batches",
+    "iter_batches",
+    "read_chunks",
+]
@@ -0,0 +1,389 @@
+"""
+Streaming request body reader for batch ingestion.
+
+Request bodies are consumed chunk by chunk: each chunk is decompressed in
+bounded pieces, complete JSON records are parsed out of the pending text
+and handed on in batches, and the parsed text is dropped. Only the record
+currently being received is held in memory, so peak memory per request
+depends on the largest record, not on the payload size.
+
+Accepted bodies:
+- A JSON array of records: [{...}, {...}]
+- A single JSON object
+- Newline-delimited (or concatenated) JSON objects
+
+Usage (Quart):
+    reader = BodyReader.from_headers(request.headers)
+    async for batch in aiter_batches(request.body, reader):
+        store(batch)
+
+Usage (py4web / bottle):
+    reader = BodyReader.from_headers(request.headers)
+    for batch in iter_batches(read_chunks(request.body), reader):
+        store(batch)
+"""
+
+import codecs
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+)
+
+# Chunk size for reading file-like bodies and for each decompressed piece
+CHUNK_SIZE = 64 * 1024
+
+_MIB = 1024 * 1024
+
+_NON_WHITESPACE = re.compile(r"\S")
+
+# Parse errors this close to the end of the pending text may be a token
+# (literal, number, escape) that the next chunk completes
+_TOKEN_TAIL = 8
+
+# Scanner states: between top-level values, after "[", after "," and
+# after an array element, and after the closing "]"
+_TOP, _FIRST, _ELEMENT, _DELIMITER, _DONE = range(5)
+
+
+class BodyError(Exception):
+    """Request body rejected; status is the HTTP status to respond with"""
+
+    status = 400
+
+
+class MalformedBody(BodyError):
+    """Body is not valid JSON records"""
+
+    status = 400
+
+
+class PayloadTooLarge(BodyError):
+    """Body, decoded body or a single record is over its limit"""
+
+    status = 413
+
+
+class UnsupportedEncoding(BodyError):
+    """Content-Encoding the reader cannot decode"""
+
+    status = 415
+
+
+@dataclass(slots=True, frozen=True)
+class BodyLimits:
+    """Size limits for streamed request bodies."""
+
+    max_body_bytes: int = 64 * _MIB
+    max_decoded_bytes: int = 256 * _MIB
+    max_record_bytes: int = 1 * _MIB
+    batch_size: int = 500
+
+    @classmethod
+    def from_env(cls) -> "BodyLimits":
+        """
+        Read limits from the environment:
+            INGEST_MAX_BODY_BYTES - Body size as sent, possibly compressed
+            INGEST_MAX_DECODED_BYTES - Body size after decompression
+            INGEST_MAX_RECORD_BYTES - Size of any one record
+            INGEST_BATCH_SIZE - Records handed on at a time
+        """
+        return cls(
+            max_body_bytes=int(os.getenv("INGEST_MAX_BODY_BYTES", 64 * _MIB)),
+            max_decoded_bytes=int(os.getenv("INGEST_MAX_DECODED_BYTES", 256 * _MIB)),
+            max_record_bytes=int(os.getenv("INGEST_MAX_RECORD_BYTES", _MIB)),
+            batch_size=int(os.getenv("INGEST_BATCH_SIZE", "500")),
+        )
+
+
+class RecordScanner:
+    """
+    Incremental JSON record splitter.
+
+    Each record is parsed by the C JSON scanner straight from the pending
+    text, which is then dropped, so only an incomplete record is carried
+    between chunks. A record cut off by a chunk boundary is retried once
+    the pending text has doubled, keeping the work per record linear.
+    """
+
+    def __init__(self, max_record_bytes: int = _MIB):
+        self.max_record_bytes = max_record_bytes
+        self._text = ""  # Unconsumed body text
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._array: Optional[bool] = None  # Top level is an array
+        self._state = _TOP
+        self._retry_at = 0  # Pending length at which to retry a cut-off record
+
+    def _incomplete(self, pos: int) -> int:
+        self._retry_at = 2 * (len(self._text) - pos)
+        return pos
+
+    def _scan(self, out: List[Any], final: bool) -> int:
+        """Parse complete records; returns the offset of the unconsumed text."""
+        text = self._text
+        size = len(text)
+        pos = 0
+        while True:
+            match = _NON_WHITESPACE.search(text, pos)
+            if match is None:
+                return size
+            pos = match.start()
+            char = text[pos]
+            state = self._state
+
+            if state == _DONE:
+                raise MalformedBody("Unexpected data after JSON array")
+            if state == _DELIMITER:
+                if char not in ",]":
+                    raise MalformedBody("Expected ',' or ']' in JSON array")
+                self._state = _ELEMENT if char == "," else _DONE
+                pos += 1
+                continue
+            if state == _TOP:
+                if char == "[" and self._array is None:
+                    self._array = True
+                    self._state = _FIRST
+                    pos += 1
+                    continue
+                if char != "{":
+                    raise MalformedBody(
+                        "Body must be a JSON array, a JSON object or "
+                        "newline-delimited JSON objects"
+                    )
+                self._array = False
+            elif state == _FIRST and char == "]":
+                self._state = _DONE
+                pos += 1
+                continue
+
+            try:
+                value, end = self._decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                # Running out of text mid-record fails at or near the end
+                cut_off = e.msg.startswith("Unterminated string") or (
+                    e.pos >= size - _TOKEN_TAIL
+                )
+                if cut_off and not final:
+                    return self._incomplete(pos)
+                raise MalformedBody(f"Invalid JSON record: {e}") from None
+
+            # A number at the end of the text may continue in the next chunk
+            if (
+                not final
+                and size - end < _TOKEN_TAIL
+                and isinstance(value, (int, float))
+                and not isinstance(value, bool)
+            ):
+                return self._incomplete(pos)
+
+            out.append(value)
+            self._retry_at = 0
+            self._state = _DELIMITER if self._array else _TOP
+            pos = end
+
+    def _consume(self, text: str, final: bool) -> List[Any]:
+        self._text += text
+        out: List[Any] = []
+        pending = len(self._text)
+        if final or pending >= self._retry_at or pending > self.max_record_bytes:
+            self._text = self._text[self._scan(out, final) :]
+        if len(self._text) > self.max_record_bytes:
+            raise PayloadTooLarge(
+                f"Record exceeds the {self.max_record_bytes} byte limit"
+            )
+        return out
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Add bytes; returns the records they completed."""
+        try:
+            text = self._utf8.decode(data)
+        except UnicodeDecodeError as e:
+            raise MalformedBody(f"Body is not valid UTF-8: {e}") from None
+        return self._consume(text, final=False)
+
+    def close(self) -> List[Any]:
+        """Finish the body; returns the records still pending."""
+        try:
+            text = self._utf8.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            raise MalformedBody(f"Body is not valid UTF-8: {e}") from None
+        out = self._consume(text, final=True)
+        if self._array and self._state != _DONE:
+            raise MalformedBody("Truncated JSON body")
+        return out
+
+
+class _Decompressor:
+    """Decompresses one Content-Encoding in pieces of at most CHUNK_SIZE bytes."""
+
+    _WBITS = {"gzip": 16 + zlib.MAX_WBITS, "x-gzip": 16 + zlib.MAX_WBITS}
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self._wbits = self._WBITS.get(encoding, zlib.MAX_WBITS)
+        self._zlib = zlib.decompressobj(self._wbits)
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        try:
+            while True:
+                piece = self._zlib.decompress(data, CHUNK_SIZE)
+                if piece:
+                    yield piece
+                data = self._zlib.unconsumed_tail
+                if self._zlib.eof:
+                    # gzip bodies may hold several members back to back
+                    data = self._zlib.unused_data + data
+                    if not data:
+                        return
+                    self._zlib = zlib.decompressobj(self._wbits)
+                elif not data and len(piece) < CHUNK_SIZE:
+                    return  # Input used up and no output held back
+        except zlib.error as e:
+            raise MalformedBody(f"Invalid {self.encoding} body: {e}") from None
+
+    def flush(self) -> bytes:
+        tail = self._zlib.flush()
+        if not self._zlib.eof:
+            raise MalformedBody(f"Truncated {self.encoding} body")
+        return tail
+
+
+class BodyReader:
+    """
+    Decodes one request body into JSON records as chunks arrive.
+
+    Args:
+        content_encoding: Content-Encoding header (identity, gzip or deflate)
+        content_length: Content-Length header, checked before any data is read
+        limits: Size limits (default: BodyLimits.from_env())
+
+    Raises:
+        PayloadTooLarge: Declared length is over the limit
+        UnsupportedEncoding: Encoding cannot be decoded
+    """
+
+    def __init__(
+        self,
+        content_encoding: Optional[str] = None,
+        content_length: Optional[int] = None,
+        limits: Optional[BodyLimits] = None,
+    ):
+        self.limits = limits or BodyLimits.from_env()
+        if content_length is not None and content_length > self.limits.max_body_bytes:
+            raise PayloadTooLarge(
+                f"Body of {content_length} bytes exceeds the "
+                f"{self.limits.max_body_bytes} byte limit"
+            )
+
+        encoding = (content_encoding or "identity").strip().lower()
+        if encoding == "identity":
+            self._decompressor = None
+        elif encoding in ("gzip", "x-gzip", "deflate"):
+            self._decompressor = _Decompressor(encoding)
+        else:
+            raise UnsupportedEncoding(f"Unsupported Content-Encoding: {encoding}")
+
+        self._scanner = RecordScanner(self.limits.max_record_bytes)
+        self.bytes_read = 0
+        self.bytes_decoded = 0
+        self.records = 0
+
+    @classmethod
+    def from_headers(
+        cls, headers: Mapping[str, str], limits: Optional[BodyLimits] = None
+    ) -> "BodyReader":
+        """Build a reader from request headers."""
+        length = headers.get("Content-Length")
+        try:
+            content_length = int(length) if length else None
+        except ValueError:
+            raise MalformedBody("Invalid Content-Length") from None
+        return cls(headers.get("Content-Encoding"), content_length, limits)
+
+    def _decoded(self, data: bytes) -> List[Any]:
+        self.bytes_decoded += len(data)
+        if self.bytes_decoded > self.limits.max_decoded_bytes:
+            raise PayloadTooLarge(
+                f"Decoded body exceeds the {self.limits.max_decoded_bytes} byte limit"
+            )
+        records = self._scanner.feed(data)
+        self.records += len(records)
+        return records
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Add one body chunk; returns the records it completed."""
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.limits.max_body_bytes:
+            raise PayloadTooLarge(
+                f"Body exceeds the {self.limits.max_body_bytes} byte limit"
+            )
+        if self._decompressor is None:
+            return self._decoded(chunk)
+
+        records: List[Any] = []
+        for piece in self._decompressor.decompress(chunk):
+            records.extend(self._decoded(piece))
+        return records
+
+    def close(self) -> List[Any]:
+        """Finish the body; returns any records completed by the final bytes."""
+        records: List[Any] = []
+        if self._decompressor is not None:
+            tail = self._decompressor.flush()
+            if tail:
+                records = self._decoded(tail)
+        final = self._scanner.close()
+        self.records += len(final)
+        return records + final
+
+
+def read_chunks(body: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Iterate over a file-like body in chunks."""
+    return iter(lambda: body.read(chunk_size), b"")
+
+
+def iter_batches(chunks: Iterable[bytes], reader: BodyReader) -> Iterator[List[Any]]:
+    """
+    Decode a body into batches of at most limits.batch_size records.
+
+    Each batch is yielded as soon as it fills, before the rest of the body
+    is read.
+    """
+    size = reader.limits.batch_size
+    batch: List[Any] = []
+    for chunk in chunks:
+        batch.extend(reader.feed(chunk))
+        while len(batch) >= size:
+            yield batch[:size]
+            batch = batch[size:]
+    batch.extend(reader.close())
+    for start in range(0, len(batch), size):
+        yield batch[start : start + size]
+
+
+async def aiter_batches(
+    chunks: AsyncIterable[bytes], reader: BodyReader
+) -> AsyncIterator[List[Any]]:
+    """Async version of iter_batches(), e.g. over Quart's request.body."""
+    size = reader.limits.batch_size
+    batch: List[Any] = []
+    async for chunk in chunks:
+        batch.extend(reader.feed(chunk))
+        while len(batch) >= size:
+            yield batch[:size]
+            batch = batch[size:]
+    batch.extend(reader.close())
+    for start in range(0, len(batch), size):
+        yield batch[start : start + size]
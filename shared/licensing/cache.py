@@ -0,0 +1,246 @@
+"""
+KillKrill License Cache
+Async TTL cache of license validation results with single-flight misses,
+stale-while-revalidate refresh and a persistent snapshot, so the license
+server sees at most one request per license key per TTL across all callers
+and restarts start warm.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Fetches the validation payload for a license key. Returns None when the
+# license server rejects the key; raises on transport errors.
+Fetcher = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def license_key_hash(license_key: str) -> str:
+    """Cache key for a license key; raw keys are never stored or persisted"""
+    return hashlib.sha256(license_key.encode()).hexdigest()
+
+
+class LicenseCache:
+    """
+    Async license validation cache
+
+    Valid results are fresh for ``ttl`` seconds (less up to ``jitter`` of
+    it, so entries written together do not expire together) and may then
+    be served for another ``stale_ttl`` seconds while a background refresh
+    runs. Rejected keys are cached as ``None`` for ``negative_ttl`` seconds.
+    Concurrent misses for one key share a single upstream call. Transport
+    errors are not cached.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetcher,
+        ttl: float = 300.0,
+        stale_ttl: float = 3600.0,
+        negative_ttl: float = 30.0,
+        jitter: float = 0.1,
+        max_entries: int = 10000,
+        snapshot_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in [0, 1)")
+        self._fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.jitter = jitter
+        self.max_entries = max_entries
+        self.snapshot_path = snapshot_path
+        self._clock = clock
+
+        # key hash -> {"data", "fetched_at", "expires_at"}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._snapshot_lock = asyncio.Lock()
+        self._stats = {"hits": 0, "stale": 0, "misses": 0, "fetches": 0, "errors": 0}
+
+    # ============== Lookups ==============
+
+    async def get(self, license_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the validation payload for a license key
+
+        Args:
+            license_key: License key (PENG-XXXX-XXXX-XXXX-XXXX-ABCD)
+
+        Returns:
+            Validation payload, or None if the key is invalid or the
+            license server could not be reached
+        """
+        key = license_key_hash(license_key)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            now = self._clock()
+            if now < entry["expires_at"]:
+                self._stats["hits"] += 1
+                self._entries.move_to_end(key)
+                return entry["data"]
+
+            if entry["data"] is not None and now < entry["expires_at"] + self.stale_ttl:
+                self._stats["stale"] += 1
+                self._entries.move_to_end(key)
+                self._load(key, license_key)
+                return entry["data"]
+
+        self._stats["misses"] += 1
+        # Shield so a cancelled request does not cancel the shared fetch
+        return await asyncio.shield(self._load(key, license_key))
+
+    def _load(self, key: str, license_key: str) -> asyncio.Future:
+        """Start, or join, the single in-flight fetch for a key"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_and_store(key, license_key))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    async def _fetch_and_store(
+        self, key: str, license_key: str
+    ) -> Optional[Dict[str, Any]]:
+        self._stats["fetches"] += 1
+        try:
+            data = await self._fetch(license_key)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"License validation fetch failed: {e}")
+            return None
+
+        self._store(key, data, self._clock())
+        if data is not None:
+            await self._persist()
+        return data
+
+    def _store(self, key: str, data: Optional[Dict[str, Any]], fetched_at: float):
+        ttl = self.ttl if data is not None else self.negative_ttl
+        ttl *= 1 - random.uniform(0, self.jitter)
+        self._entries[key] = {
+            "data": data,
+            "fetched_at": fetched_at,
+            "expires_at": fetched_at + ttl,
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, license_key: str) -> bool:
+        """Drop the cached result for a license key"""
+        return self._entries.pop(license_key_hash(license_key), None) is not None
+
+    # ============== Snapshot ==============
+
+    def load_snapshot(self) -> int:
+        """
+        Load valid entries from the snapshot file
+
+        Entries past their stale window are skipped; the rest are served
+        (refreshing in the background if stale) instead of hitting the
+        license server on startup.
+
+        Returns:
+            Number of entries loaded
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable license snapshot: {e}")
+            return 0
+
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return 0
+
+        now = self._clock()
+        loaded = 0
+        for key, entry in snapshot.get("entries", {}).items():
+            if not isinstance(entry.get("data"), dict):
+                continue
+            expires_at = entry.get("expires_at", 0)
+            if now >= expires_at + self.stale_ttl:
+                continue
+            self._entries[key] = {
+                "data": entry["data"],
+                "fetched_at": entry.get("fetched_at", now),
+                "expires_at": expires_at,
+            }
+            loaded += 1
+        return loaded
+
+    def save_snapshot(self) -> int:
+        """
+        Atomically write valid entries to the snapshot file
+
+        Returns:
+            Number of entries written
+        """
+        entries = self._snapshot_entries()
+        self._write_snapshot(entries)
+        return len(entries)
+
+    def _snapshot_entries(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key: dict(entry)
+            for key, entry in self._entries.items()
+            if entry["data"] is not None
+        }
+
+    def _write_snapshot(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        if not self.snapshot_path:
+            return
+
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": SNAPSHOT_VERSION, "entries": entries}, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    async def _persist(self) -> None:
+        """Save the snapshot off the event loop, one writer at a time"""
+        if not self.snapshot_path:
+            return
+        async with self._snapshot_lock:
+            # Copy on the loop; only the file write runs on a thread
+            entries = self._snapshot_entries()
+            try:
+                await asyncio.to_thread(self._write_snapshot, entries)
+            except OSError as e:
+                logger.warning(f"Failed to save license snapshot: {e}")
+
+    # ============== Lifecycle ==============
+
+    async def close(self) -> None:
+        """Wait for in-flight fetches, then persist the snapshot"""
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        await self._persist()
+
+    def stats(self) -> Dict[str, int]:
+        """Get lookup counters and cache size"""
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+        }
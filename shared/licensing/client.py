@@ -5,6 +5,7 @@ Universal licensing integration for KillKrill observability platform
 
 import json
 import logging
+import threading
 import time
 from datetime import datetime, timedelta
 from functools import wraps
@@ -37,6 +38,10 @@ class PenguinTechLicenseClient:
         )
         self._cache: Dict[str, Any] = {}
         self._cache_timeout = 300  # 5 minutes
+        self._refresh_lock = threading.Lock()
+        self._failure: Optional[Dict[str, Any]] = None
+        self._retry_after = 0.0
+        self._retry_backoff = 30  # seconds between refreshes after a failure
 
     def validate(self) -> Dict[str, Any]:
         """Validate license and get server ID for keepalives"""
@@ -65,36 +70,40 @@ class PenguinTechLicenseClient:
 
     def check_feature(self, feature: str, use_cache: bool = True) -> bool:
         """Check if specific feature is enabled"""
-        cache_key = f"feature_{feature}"
-
-        # Check cache first
-        if use_cache and cache_key in self._cache:
-            cached = self._cache[cache_key]
-            if time.time() - cached["timestamp"] < self._cache_timeout:
-                return cached["data"]
-
-        try:
-            response = self.session.post(
-                f"{self.base_url}/api/v2/features",
-                json={"product": self.product, "feature": feature},
-                timeout=15,
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                features = data.get("features", [])
-                enabled = features[0].get("entitled", False) if features else False
-
-                # Cache result
-                self._cache[cache_key] = {"data": enabled, "timestamp": time.time()}
-
-                return enabled
-
+        validation_data = self._get_cached_validation() if use_cache else None
+
+        if validation_data is None:
+            # Single-flight: one validate() call reloads every feature while
+            # other threads serve the previous result or wait for it
+            stale = self._cache.get("validation") if use_cache else None
+            if stale is not None and not self._refresh_lock.acquire(blocking=False):
+                validation_data = stale["data"]
+            else:
+                if stale is None:
+                    self._refresh_lock.acquire()
+                try:
+                    if use_cache:
+                        validation_data = self._get_cached_validation()
+                    backing_off = use_cache and time.time() < self._retry_after
+                    if validation_data is None and backing_off:
+                        # Reuse the recent failure instead of queueing every
+                        # caller behind another slow validate()
+                        validation_data = self._failure
+                    if validation_data is None:
+                        validation_data = self.validate()
+                        if not validation_data.get("valid"):
+                            self._failure = validation_data
+                            self._retry_after = time.time() + self._retry_backoff
+                finally:
+                    self._refresh_lock.release()
+
+        if not validation_data.get("valid"):
             return False
 
-        except Exception as e:
-            logger.warning(f"Feature check error for {feature}: {e}")
-            return False
+        for entry in validation_data.get("features", []):
+            if entry.get("name") == feature:
+                return bool(entry.get("entitled", False))
+        return False
 
     def get_limits(self) -> Dict[str, int]:
         """Get license limits"""
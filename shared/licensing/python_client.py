@@ -9,6 +9,7 @@ import os
 import json
 import time
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
 from functools import wraps
@@ -70,6 +71,9 @@ class PenguinTechLicenseClient:
         self._feature_cache = {}
         self._cache_timestamp = None
         self._cache_ttl = 300  # 5 minutes
+        self._refresh_lock = threading.Lock()
+        self._retry_after = 0.0
+        self._retry_backoff = 30  # seconds between refreshes after a failure
 
     @classmethod
     def from_env(cls, timeout: int = 30) -> Optional["PenguinTechLicenseClient"]:
@@ -149,28 +153,31 @@ class PenguinTechLicenseClient:
             if cached_result is not None:
                 return cached_result
 
-        try:
-            response = self.session.post(
-                f"{self.base_url}/api/v2/features",
-                json={"product": self.product, "feature": feature},
-            )
-            response.raise_for_status()
+        # Single-flight refresh: one validate() call reloads every feature.
+        # While it runs, other threads keep serving the previous value
+        # rather than queueing up behind it or calling the server themselves.
+        stale = self._feature_cache.get(feature) if use_cache else None
+        if stale is not None:
+            if not self._refresh_lock.acquire(blocking=False):
+                return stale
+        else:
+            self._refresh_lock.acquire()
 
-            data = response.json()
-            features = data.get("features", [])
-
-            if features:
-                entitled = features[0].get("entitled", False)
-                # Cache the result
-                self._feature_cache[feature] = entitled
-                self._cache_timestamp = time.time()
-                return entitled
+        try:
+            if use_cache and self._is_cache_valid():
+                return self._feature_cache.get(feature, False)
+            if use_cache and time.time() < self._retry_after:
+                return False
 
-            return False
+            self.validate()
+            return self._feature_cache.get(feature, False)
 
-        except requests.RequestException as e:
+        except LicenseValidationError as e:
+            self._retry_after = time.time() + self._retry_backoff
             logger.error(f"Feature check failed for {feature}: {e}")
             return False
+        finally:
+            self._refresh_lock.release()
 
     def keepalive(self, usage_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
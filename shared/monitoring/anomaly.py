@@ -0,0 +1,338 @@
+"""
+KillKrill Anomaly Detection
+Vectorized detectors that score many metric series at once: robust
+z-score (median/MAD), EWMA and seasonal decomposition. Series of similar
+length are packed into NaN-padded matrices of bounded size so every
+detector is a handful of NumPy operations over many series instead of a
+Python loop per point, and padding never exceeds the real points.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Scale factor that makes the MAD a consistent estimator of the std
+MAD_SCALE = 1.4826
+
+DETECTORS = ("zscore", "ewma", "seasonal")
+DEFAULT_THRESHOLD = 3.5
+
+# Points each series needs before the EWMA detector scores it
+EWMA_WARMUP = 5
+
+# Time steps the EWMA recurrences advance per matrix product
+EWMA_BLOCK = 128
+
+# Cells (series x points) per matrix scored at once; longer series get a
+# matrix of their own
+MATRIX_MAX_CELLS = 1 << 18
+
+
+def length_groups(lengths: Sequence[int]) -> List[List[int]]:
+    """
+    Split series into matrices that waste little space on padding
+
+    Series are grouped by the power of two their length falls under, so
+    within a group no series is more than twice as long as another and
+    padding never exceeds the real points. Groups are then cut into
+    chunks of at most MATRIX_MAX_CELLS cells.
+
+    Returns:
+        Lists of positions into lengths, one per matrix
+    """
+    buckets: Dict[int, List[int]] = {}
+    for position, length in enumerate(lengths):
+        if length:
+            buckets.setdefault(int(length).bit_length(), []).append(position)
+
+    groups = []
+    for members in buckets.values():
+        width = max(lengths[position] for position in members)
+        rows = max(1, MATRIX_MAX_CELLS // width)
+        groups.extend(
+            members[start : start + rows] for start in range(0, len(members), rows)
+        )
+    return groups
+
+
+def matrix_cells(lengths: Sequence[int]) -> int:
+    """Cells detect_anomalies allocates per matrix for series of these lengths"""
+    return sum(
+        len(group) * max(lengths[position] for position in group)
+        for group in length_groups(lengths)
+    )
+
+
+def to_matrix(
+    series: Mapping[str, Sequence[float]],
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Pack series into a right-aligned, NaN-padded matrix
+
+    Returns:
+        (names, matrix of shape (series, points), left padding per series)
+    """
+    names = list(series)
+    lengths = np.array([len(series[name]) for name in names], dtype=np.int64)
+    width = int(lengths.max()) if len(names) else 0
+    matrix = np.full((len(names), width), np.nan)
+    for row, name in enumerate(names):
+        if lengths[row]:
+            matrix[row, width - lengths[row] :] = np.asarray(series[name], float)
+    return names, matrix, width - lengths
+
+
+def nanmedian(values: np.ndarray, axis: int) -> np.ndarray:
+    """
+    NaN-ignoring median that stays vectorized
+
+    ``np.nanmedian`` falls back to a per-row loop whenever NaNs are
+    present, which padded matrices always have. Sorting pushes NaNs to the
+    end, so each row's median can be picked by its count of real values.
+    All-NaN slices give NaN. The reduced axis is kept with length 1.
+    """
+    ordered = np.sort(values, axis=axis)
+    counts = np.sum(~np.isnan(values), axis=axis, keepdims=True)
+    low = np.take_along_axis(ordered, np.maximum(counts - 1, 0) // 2, axis=axis)
+    high = np.take_along_axis(ordered, counts // 2, axis=axis)
+    return np.where(counts > 0, (low + high) / 2, np.nan)
+
+
+def _scale_floor(center: np.ndarray) -> np.ndarray:
+    """Smallest spread used so flat series do not divide by zero"""
+    return 1e-9 * (np.abs(center) + 1.0)
+
+
+def robust_zscore(matrix: np.ndarray) -> np.ndarray:
+    """Score each point by its distance from the series median in MADs"""
+    if matrix.shape[1] == 0:
+        return matrix.copy()
+    median = nanmedian(matrix, axis=1)
+    mad = nanmedian(np.abs(matrix - median), axis=1) * MAD_SCALE
+    scale = np.maximum(mad, _scale_floor(median))
+    return (matrix - median) / scale
+
+
+def _ewm(values: np.ndarray, weight: float, initial: np.ndarray) -> np.ndarray:
+    """
+    Run y[t] = (1 - weight) * y[t-1] + weight * values[t] along axis 1
+
+    The recurrence is linear, so each block of EWMA_BLOCK steps is one
+    product with a lower-triangular matrix of decay weights plus the
+    decayed carry from the previous block. All weights are at most one,
+    so nothing overflows however long the series.
+    """
+    rows, width = values.shape
+    out = np.empty((rows, width))
+    steps = np.arange(min(width, EWMA_BLOCK))
+    decay = (1.0 - weight) ** (steps + 1)
+    lag = steps[:, None] - steps[None, :]
+    kernel = np.where(lag >= 0, weight * (1.0 - weight) ** np.maximum(lag, 0), 0.0)
+
+    carry = initial
+    for start in range(0, width, EWMA_BLOCK):
+        block = values[:, start : start + EWMA_BLOCK]
+        n = block.shape[1]
+        out[:, start : start + n] = (
+            block @ kernel[:n, :n].T + carry[:, None] * decay[:n]
+        )
+        carry = out[:, start + n - 1]
+    return out
+
+
+def ewma_zscore(
+    matrix: np.ndarray, alpha: float = 0.3, variance_alpha: float = 0.05
+) -> np.ndarray:
+    """
+    Score each point against the EWMA forecast from the points before it
+
+    The forecast error variance is smoothed more slowly than the mean so a
+    few quiet points do not make ordinary noise look anomalous; until
+    1 / points seen drops below variance_alpha it is a plain running mean.
+    Missing points leave the state unchanged, so each row's present values
+    are first packed to the left and the recurrences run as blocked matrix
+    products over all series together.
+    """
+    rows, width = matrix.shape
+    scores = np.full((rows, width), np.nan)
+    if width < 2:
+        return scores
+
+    missing = np.isnan(matrix)
+    order = np.argsort(missing, axis=1, kind="stable")
+    counts = width - missing.sum(axis=1)
+    values = np.take_along_axis(matrix, order, axis=1)
+    values[np.arange(width) >= counts[:, None]] = 0.0
+
+    # mean[:, k] is the forecast for point k + 1; the first point seeds it
+    mean = np.empty((rows, width))
+    mean[:, 0] = values[:, 0]
+    mean[:, 1:] = _ewm(values[:, 1:], alpha, values[:, 0])
+    diff = values[:, 1:] - mean[:, :-1]
+
+    # var[:, k - 1] is the variance after k errors; point k is scored on
+    # the variance of the errors before it
+    seen = np.arange(1, width)
+    running = int(np.sum(1.0 / seen >= variance_alpha))
+    squared = diff * diff
+    var = np.empty((rows, width - 1))
+    var[:, :running] = np.cumsum(squared[:, :running], axis=1) / seen[:running]
+    if running < width - 1:
+        var[:, running:] = _ewm(
+            squared[:, running:], variance_alpha, var[:, running - 1]
+        )
+    prior_var = np.concatenate([np.zeros((rows, 1)), var[:, :-1]], axis=1)
+
+    std = np.maximum(np.sqrt(prior_var), _scale_floor(mean[:, :-1]))
+    packed = np.full((rows, width), np.nan)
+    packed[:, 1:] = diff / std
+    packed[:, :EWMA_WARMUP] = np.nan
+    packed[np.arange(width) >= counts[:, None]] = np.nan
+    np.put_along_axis(scores, order, packed, axis=1)
+    return scores
+
+
+def seasonal_zscore(matrix: np.ndarray, period: int) -> np.ndarray:
+    """
+    Score residuals after removing a per-phase seasonal profile
+
+    The most recent whole cycles are folded into shape (series, cycles,
+    period); the mean of each phase is the seasonal component. Residuals
+    are rescaled for the sample they were part of, then scored with the
+    robust z-score. Needs two full cycles.
+    """
+    rows, width = matrix.shape
+    scores = np.full((rows, width), np.nan)
+    cycles = width // period if period > 0 else 0
+    if cycles < 2:
+        return scores
+
+    start = width - cycles * period
+    folded = matrix[:, start:].reshape(rows, cycles, period)
+    counts = np.sum(~np.isnan(folded), axis=1, keepdims=True)
+    profile = np.nansum(folded, axis=1, keepdims=True) / np.maximum(counts, 1)
+    # A point's own value is part of its phase mean; undo the shrinkage
+    correction = np.sqrt(counts / np.maximum(counts - 1, 1))
+    residual = ((folded - profile) * correction).reshape(rows, cycles * period)
+    scores[:, start:] = robust_zscore(residual)
+    return scores
+
+
+def score_matrix(
+    matrix: np.ndarray,
+    detectors: Sequence[str] = DETECTORS,
+    period: Optional[int] = None,
+    alpha: float = 0.3,
+) -> Dict[str, np.ndarray]:
+    """Run the requested detectors; returns detector -> |score| matrix"""
+    scores = {}
+    for detector in detectors:
+        if detector == "zscore":
+            result = robust_zscore(matrix)
+        elif detector == "ewma":
+            result = ewma_zscore(matrix, alpha)
+        elif detector == "seasonal":
+            if not period:
+                continue
+            result = seasonal_zscore(matrix, period)
+        else:
+            raise ValueError(f"Unknown detector: {detector}")
+        scores[detector] = np.abs(result)
+    return scores
+
+
+def _detect_in_matrix(
+    series: Mapping[str, Sequence[float]],
+    threshold: float,
+    detectors: Sequence[str],
+    period: Optional[int],
+    alpha: float,
+    max_points: int,
+) -> List[Dict[str, Any]]:
+    """Anomaly reports for series packed into a single matrix"""
+    names, matrix, padding = to_matrix(series)
+    scores = score_matrix(matrix, detectors, period, alpha)
+    if not scores:
+        return []
+
+    used = list(scores)
+    stacked = np.stack([scores[d] for d in used])
+    # NaN (unscored) compares False
+    flagged = stacked > threshold
+    combined = np.where(flagged.any(axis=0), np.fmax.reduce(stacked, axis=0), 0.0)
+
+    rows, cols = np.nonzero(combined)
+    if rows.size == 0:
+        return []
+
+    # np.nonzero is row-major, so each series' points are contiguous
+    point_scores = combined[rows, cols]
+    series_rows, starts, counts = np.unique(rows, return_index=True, return_counts=True)
+    max_scores = np.maximum.reduceat(point_scores, starts)
+
+    results = []
+    for row, start, count, max_score in zip(
+        series_rows.tolist(), starts.tolist(), counts.tolist(), max_scores.tolist()
+    ):
+        picked = slice(start + max(count - max_points, 0), start + count)
+        points = [
+            {
+                "index": col - int(padding[row]),
+                "value": float(matrix[row, col]),
+                "score": round(score, 3),
+                "detectors": [d for d, hit in zip(used, flagged[:, row, col]) if hit],
+            }
+            for col, score in zip(cols[picked].tolist(), point_scores[picked].tolist())
+        ]
+        results.append(
+            {
+                "series": names[row],
+                "max_score": round(max_score, 3),
+                "anomaly_count": count,
+                "points": points,
+            }
+        )
+    return results
+
+
+def detect_anomalies(
+    series: Mapping[str, Sequence[float]],
+    threshold: float = DEFAULT_THRESHOLD,
+    detectors: Sequence[str] = DETECTORS,
+    period: Optional[int] = None,
+    alpha: float = 0.3,
+    max_points: int = 100,
+) -> List[Dict[str, Any]]:
+    """
+    Find anomalous points across many series
+
+    Args:
+        series: Series name -> values, oldest first
+        threshold: Score above which a point is anomalous
+        detectors: Detectors to run (zscore, ewma, seasonal)
+        period: Points per season; the seasonal detector is skipped without it
+        alpha: EWMA smoothing factor
+        max_points: Most recent anomalous points reported per series
+
+    Returns:
+        One entry per series with anomalies, highest score first. Point
+        indexes refer to positions in that series' own values.
+    """
+    names = list(series)
+    lengths = [len(series[name]) for name in names]
+
+    results = []
+    for group in length_groups(lengths):
+        results.extend(
+            _detect_in_matrix(
+                {names[position]: series[names[position]] for position in group},
+                threshold,
+                detectors,
+                period,
+                alpha,
+                max_points,
+            )
+        )
+
+    results.sort(key=lambda r: r["max_score"], reverse=True)
+    return results
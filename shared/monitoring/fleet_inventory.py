@@ -0,0 +1,294 @@
+"""
+KillKrill Fleet Inventory Mirror
+Indexed in-memory copy of Fleet hosts, labels and policy results, kept
+current by incremental ``updated_at`` syncs, so host list pages are served
+from local indexes instead of a Fleet round trip per request.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Host fields a client may sort by
+ORDER_KEYS = ("hostname", "id", "updated_at", "seen_time", "platform", "status")
+
+# Fields matched by the free-text ``query`` filter
+SEARCH_FIELDS = ("hostname", "computer_name", "primary_ip", "hardware_serial", "uuid")
+
+DEFAULT_PER_PAGE = 100
+MAX_PER_PAGE = 1000
+
+# Host fields that are indexed for equality filters
+_INDEXED_FIELDS = ("status", "platform", "team_id")
+
+
+class FleetInventory:
+    """
+    Indexed mirror of the Fleet host inventory
+
+    Hosts are held by ID with set indexes on status, platform, team, label
+    membership and failing policies. Sorted ID lists are built once per
+    order key and reused until the inventory changes, so a filtered page
+    costs one pass over the sorted IDs with set lookups. ``cursor`` is the
+    newest ``updated_at`` seen and is where the next incremental sync
+    resumes.
+    """
+
+    def __init__(self):
+        self.hosts: Dict[int, Dict[str, Any]] = {}
+        self.labels: Dict[int, Dict[str, Any]] = {}
+        self.policies: Dict[int, Dict[str, Any]] = {}
+        self.cursor: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.full_synced_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        self._indexes: Dict[str, Dict[Any, Set[int]]] = {f: {} for f in _INDEXED_FIELDS}
+        self._label_hosts: Dict[int, Set[int]] = {}
+        self._host_labels: Dict[int, Set[int]] = {}
+        self._policy_failing: Dict[int, Set[int]] = {}
+        self._host_failing: Dict[int, Set[int]] = {}
+        self._sorted: Dict[Tuple[str, bool], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full sync has completed"""
+        return self.full_synced_at is not None
+
+    # ============== Updates ==============
+
+    def _index(self, host_id: int, host: Dict[str, Any]) -> None:
+        for field in _INDEXED_FIELDS:
+            self._indexes[field].setdefault(host.get(field), set()).add(host_id)
+
+    def _unindex(self, host_id: int, host: Dict[str, Any]) -> None:
+        for field in _INDEXED_FIELDS:
+            ids = self._indexes[field].get(host.get(field))
+            if ids is not None:
+                ids.discard(host_id)
+                if not ids:
+                    del self._indexes[field][host.get(field)]
+
+    def upsert_hosts(self, hosts: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or replace hosts and advance the updated_at cursor
+
+        Returns:
+            Number of hosts applied
+        """
+        count = 0
+        for host in hosts:
+            host_id = host.get("id")
+            if host_id is None:
+                continue
+            previous = self.hosts.get(host_id)
+            if previous is not None:
+                self._unindex(host_id, previous)
+            self.hosts[host_id] = host
+            self._index(host_id, host)
+
+            updated_at = host.get("updated_at")
+            # Fleet timestamps are RFC 3339 UTC strings, so they sort as text
+            if updated_at and (self.cursor is None or updated_at > self.cursor):
+                self.cursor = updated_at
+            count += 1
+
+        if count:
+            self._sorted.clear()
+        return count
+
+    def retain_hosts(self, host_ids: Iterable[int]) -> int:
+        """
+        Drop hosts not in host_ids (hosts deleted from Fleet)
+
+        Returns:
+            Number of hosts removed
+        """
+        keep = set(host_ids)
+        removed = [host_id for host_id in self.hosts if host_id not in keep]
+        for host_id in removed:
+            self._unindex(host_id, self.hosts.pop(host_id))
+            for label_id in self._host_labels.pop(host_id, ()):
+                self._label_hosts.get(label_id, set()).discard(host_id)
+            for policy_id in self._host_failing.pop(host_id, ()):
+                self._policy_failing.get(policy_id, set()).discard(host_id)
+        if removed:
+            self._sorted.clear()
+        return len(removed)
+
+    def set_labels(
+        self,
+        labels: Iterable[Dict[str, Any]],
+        membership: Optional[Dict[int, Iterable[int]]] = None,
+    ) -> None:
+        """Replace labels and, if given, label ID -> member host IDs"""
+        self.labels = {label["id"]: label for label in labels if "id" in label}
+        if membership is not None:
+            self._label_hosts = {
+                label_id: set(host_ids) for label_id, host_ids in membership.items()
+            }
+            self._host_labels = _invert(self._label_hosts)
+
+    def set_policies(
+        self,
+        policies: Iterable[Dict[str, Any]],
+        failing: Optional[Dict[int, Iterable[int]]] = None,
+    ) -> None:
+        """Replace policies and, if given, policy ID -> failing host IDs"""
+        self.policies = {p["id"]: p for p in policies if "id" in p}
+        if failing is not None:
+            self._policy_failing = {
+                policy_id: set(host_ids) for policy_id, host_ids in failing.items()
+            }
+            self._host_failing = _invert(self._policy_failing)
+
+    def mark_synced(self, full: bool = False, now: Optional[float] = None) -> None:
+        """Record a successful sync"""
+        now = time.time() if now is None else now
+        self.synced_at = now
+        if full:
+            self.full_synced_at = now
+        self.last_error = None
+
+    # ============== Reads ==============
+
+    def get_host(self, host_id: int) -> Optional[Dict[str, Any]]:
+        """Host with its label IDs and failing policy IDs, or None"""
+        host = self.hosts.get(host_id)
+        if host is None:
+            return None
+        return {
+            **host,
+            "label_ids": sorted(self._host_labels.get(host_id, ())),
+            "failing_policy_ids": sorted(self._host_failing.get(host_id, ())),
+        }
+
+    def _ordered_ids(self, order_key: str, descending: bool) -> List[int]:
+        key = (order_key, descending)
+        ids = self._sorted.get(key)
+        if ids is None:
+            hosts = self.hosts
+            ids = sorted(
+                hosts,
+                key=lambda host_id: (
+                    hosts[host_id].get(order_key) is None,
+                    (
+                        str(hosts[host_id].get(order_key) or "").lower()
+                        if order_key != "id"
+                        else host_id
+                    ),
+                    host_id,
+                ),
+                reverse=descending,
+            )
+            self._sorted[key] = ids
+        return ids
+
+    def query_hosts(
+        self,
+        status: Optional[str] = None,
+        platform: Optional[str] = None,
+        team_id: Optional[int] = None,
+        label_id: Optional[int] = None,
+        policy_id: Optional[int] = None,
+        policy_response: Optional[str] = None,
+        query: Optional[str] = None,
+        order_key: str = "hostname",
+        order_direction: str = "asc",
+        page: int = 0,
+        per_page: int = DEFAULT_PER_PAGE,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Filter, sort and page the mirrored hosts
+
+        Args:
+            status, platform, team_id: Equality filters
+            label_id: Only hosts in this label
+            policy_id: With policy_response "failing", only hosts failing
+                this policy; with "passing", hosts not failing it
+            query: Case-insensitive substring of hostname, IP, serial or UUID
+            order_key: One of ORDER_KEYS
+            order_direction: "asc" or "desc"
+            page: Zero-based page number, as in the Fleet API
+            per_page: Page size, at most MAX_PER_PAGE
+
+        Returns:
+            (total matching hosts, hosts on the requested page)
+        """
+        if order_key not in ORDER_KEYS:
+            raise ValueError(f"order_key must be one of {', '.join(ORDER_KEYS)}")
+        per_page = max(1, min(int(per_page), MAX_PER_PAGE))
+        page = max(0, int(page))
+
+        # Narrow to the smallest matching index set first
+        candidates: Optional[Set[int]] = None
+        for field, value in (
+            ("status", status),
+            ("platform", platform),
+            ("team_id", team_id),
+        ):
+            if value is not None:
+                candidates = _intersect(
+                    candidates, self._indexes[field].get(value, set())
+                )
+        if label_id is not None:
+            candidates = _intersect(candidates, self._label_hosts.get(label_id, set()))
+
+        excluded: Set[int] = set()
+        if policy_id is not None:
+            failing = self._policy_failing.get(policy_id, set())
+            if policy_response == "failing":
+                candidates = _intersect(candidates, failing)
+            elif policy_response == "passing":
+                excluded = failing
+
+        needle = query.lower() if query else None
+        start = page * per_page
+        total = 0
+        matched: List[Dict[str, Any]] = []
+        for host_id in self._ordered_ids(order_key, order_direction == "desc"):
+            if candidates is not None and host_id not in candidates:
+                continue
+            if host_id in excluded:
+                continue
+            host = self.hosts.get(host_id)
+            if host is None:
+                continue  # Removed by a concurrent sync
+            if needle and not any(
+                needle in str(host.get(f) or "").lower() for f in SEARCH_FIELDS
+            ):
+                continue
+            if start <= total < start + per_page:
+                matched.append(host)
+            total += 1
+        return total, matched
+
+    def staleness(self, max_age: float, now: Optional[float] = None) -> Dict[str, Any]:
+        """Age of the mirror and whether it is older than max_age seconds"""
+        now = time.time() if now is None else now
+        age = None if self.synced_at is None else now - self.synced_at
+        return {
+            "hosts": len(self.hosts),
+            "synced_at": self.synced_at,
+            "full_synced_at": self.full_synced_at,
+            "age_seconds": None if age is None else round(age, 1),
+            "stale": age is None or age > max_age,
+            "cursor": self.cursor,
+            "last_error": self.last_error,
+        }
+
+
+def _intersect(current: Optional[Set[int]], ids: Set[int]) -> Set[int]:
+    if current is None:
+        return ids
+    return current & ids if len(current) <= len(ids) else ids & current
+
+
+def _invert(mapping: Dict[int, Set[int]]) -> Dict[int, Set[int]]:
+    inverted: Dict[int, Set[int]] = {}
+    for key, members in mapping.items():
+        for member in members:
+            inverted.setdefault(member, set()).add(key)
+    return inverted
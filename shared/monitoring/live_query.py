@@ -0,0 +1,199 @@
+"""
+KillKrill Fleet Live Query Jobs
+Redis layout and progress tracking for asynchronous Fleet live queries.
+Each job has a metadata hash and a results stream with one entry per host
+that answered, so clients can page or follow results while slow hosts are
+still reporting.
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+KEY_PREFIX = "fleet:live_query"
+
+# Job states; every state but "running" is final
+RUNNING = "running"
+TERMINAL_STATUSES = ("completed", "timed_out", "failed", "cancelled")
+
+
+class LiveQueryError(Exception):
+    """Fleet reported an error for the live query campaign"""
+
+
+def job_key(job_id: str) -> str:
+    """Redis hash holding a job's metadata and counters"""
+    return f"{KEY_PREFIX}:{job_id}"
+
+
+def results_key(job_id: str) -> str:
+    """Redis stream holding a job's per-host results and status changes"""
+    return f"{KEY_PREFIX}:{job_id}:results"
+
+
+def status_fields(status: str, error: Optional[str] = None) -> Dict[str, str]:
+    """Stream entry recording a job status change"""
+    fields = {"type": "status", "status": status}
+    if error:
+        fields["error"] = error
+    return fields
+
+
+class CampaignProgress:
+    """
+    Folds Fleet live query websocket messages into job progress
+
+    ``apply`` takes one decoded message from Fleet's results websocket and
+    returns the stream entry to append for it, if any; ``meta`` returns the
+    counters to store in the job hash.
+    """
+
+    def __init__(self):
+        self.responded = 0
+        self.failed = 0
+        self.rows = 0
+        self.expected: Optional[int] = None
+        self.targeted: Optional[int] = None
+        self.online: Optional[int] = None
+        self.finished = False
+
+    def apply(self, message: Mapping[str, Any]) -> Optional[Dict[str, str]]:
+        """
+        Update progress from one Fleet message
+
+        Returns:
+            Stream fields for a host result, else None
+
+        Raises:
+            LiveQueryError: If Fleet reported a campaign error
+        """
+        kind = message.get("type")
+        data = message.get("data") or {}
+
+        if kind == "result":
+            host = data.get("host") or {}
+            rows = data.get("rows") or []
+            error = data.get("error")
+            self.responded += 1
+            self.rows += len(rows)
+            if error:
+                self.failed += 1
+            return {
+                "type": "result",
+                "host_id": str(host.get("id", "")),
+                "hostname": str(host.get("display_name") or host.get("hostname") or ""),
+                "rows": json.dumps(rows, separators=(",", ":")),
+                "row_count": str(len(rows)),
+                "error": str(error or ""),
+            }
+
+        if kind == "totals":
+            self.targeted = data.get("count", self.targeted)
+            self.online = data.get("online", self.online)
+        elif kind == "status":
+            self.expected = data.get("expected_results", self.expected)
+            self.finished = data.get("status") == "finished"
+        elif kind == "error":
+            raise LiveQueryError(str(data or "Fleet live query error"))
+        return None
+
+    def meta(self) -> Dict[str, str]:
+        """Counters as Redis hash fields"""
+        meta = {
+            "hosts_responded": str(self.responded),
+            "hosts_failed": str(self.failed),
+            "rows_returned": str(self.rows),
+        }
+        for name, value in (
+            ("expected_results", self.expected),
+            ("hosts_targeted", self.targeted),
+            ("hosts_online", self.online),
+        ):
+            if value is not None:
+                meta[name] = str(value)
+        return meta
+
+
+_INT_FIELDS = (
+    "campaign_id",
+    "hosts_responded",
+    "hosts_failed",
+    "rows_returned",
+    "expected_results",
+    "hosts_targeted",
+    "hosts_online",
+    "row_count",
+)
+_FLOAT_FIELDS = ("created_at", "deadline", "finished_at")
+
+
+def decode_job(
+    fields: Mapping[str, str], now: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Job metadata hash as API output
+
+    A job still "running" past its deadline belongs to an API instance
+    that stopped before finishing it, and is reported as timed out.
+    """
+    job = _decode(fields)
+    now = time.time() if now is None else now
+    if job.get("status") == RUNNING and job.get("deadline", now) < now:
+        job["status"] = "timed_out"
+    return job
+
+
+def decode_entry(entry_id: str, fields: Mapping[str, str]) -> Dict[str, Any]:
+    """Results stream entry as API output"""
+    entry = _decode(fields)
+    entry["id"] = entry_id
+    if "rows" in entry:
+        entry["rows"] = json.loads(entry["rows"])
+    if "host_id" in entry:
+        entry["host_id"] = int(entry["host_id"]) if entry["host_id"] else None
+    if entry.get("error") == "":
+        entry["error"] = None
+    return entry
+
+
+def page_results(
+    entries: List[Tuple[str, Mapping[str, str]]], cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Host results from an XRANGE batch
+
+    Status entries are skipped but still advance the cursor, so the next
+    page resumes after everything read here.
+
+    Args:
+        entries: Stream entries after ``cursor``
+        cursor: Cursor the batch was read after
+
+    Returns:
+        (host results, cursor for the next page)
+    """
+    results = [
+        decode_entry(entry_id, fields)
+        for entry_id, fields in entries
+        if fields.get("type") == "result"
+    ]
+    return results, entries[-1][0] if entries else cursor
+
+
+def sse_event(entry_id: str, fields: Mapping[str, str]) -> str:
+    """Server-sent event for one results stream entry"""
+    entry = decode_entry(entry_id, fields)
+    event = entry.pop("type", "message")
+    data = json.dumps(entry, separators=(",", ":"), default=str)
+    return f"id: {entry_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+def _decode(fields: Mapping[str, str]) -> Dict[str, Any]:
+    decoded: Dict[str, Any] = dict(fields)
+    for name in _INT_FIELDS:
+        if decoded.get(name) not in (None, ""):
+            decoded[name] = int(decoded[name])
+    for name in _FLOAT_FIELDS:
+        if decoded.get(name) not in (None, ""):
+            decoded[name] = float(decoded[name])
+    return decoded
@@ -0,0 +1,208 @@
+"""
+KillKrill Log Tail Filters
+Compiled server-side filters and per-subscriber sampling for live log
+tailing. Subscribers with identical filters share one compiled filter, so
+each log entry is matched once per distinct filter rather than once per
+subscriber.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple
+
+# Canonical log levels, least to most severe
+LEVELS = (
+    "debug",
+    "info",
+    "notice",
+    "warning",
+    "error",
+    "critical",
+    "alert",
+    "emergency",
+)
+
+LEVEL_ALIASES = {
+    "trace": "debug",
+    "warn": "warning",
+    "err": "error",
+    "crit": "critical",
+    "fatal": "critical",
+    "emerg": "emergency",
+}
+
+# Longest client supplied glob
+MAX_PATTERN_LENGTH = 256
+
+
+def normalize_level(level: Optional[str]) -> str:
+    """Map a level name or alias to its canonical lowercase form"""
+    level = (level or "info").strip().lower()
+    return LEVEL_ALIASES.get(level, level)
+
+
+def _compile_glob(glob: str) -> Tuple[str, ...]:
+    """Split a glob into the literal parts that must appear in order"""
+    if len(glob) > MAX_PATTERN_LENGTH:
+        raise ValueError("Filter glob is too long")
+    return tuple(part for part in glob.lower().split("*") if part)
+
+
+def _glob_search(parts: Tuple[str, ...], text: str) -> bool:
+    """Whether the parts occur in order in text; linear, no backtracking"""
+    pos = 0
+    for part in parts:
+        pos = text.find(part, pos)
+        if pos < 0:
+            return False
+        pos += len(part)
+    return True
+
+
+def _as_set(value: Any) -> Optional[FrozenSet[str]]:
+    if value in (None, "", []):
+        return None
+    if isinstance(value, str):
+        value = [value]
+    return frozenset(str(v) for v in value)
+
+
+@dataclass(frozen=True)
+class LogFilter:
+    """
+    Compiled log tail filter
+
+    All configured conditions must match. Source and level sets are
+    matched exactly, ``contains`` is a case-insensitive substring of the
+    message, and ``glob`` is a case-insensitive pattern searched in the
+    message where ``*`` matches any run of characters. Filters come from
+    clients and run against every entry, so regular expressions are not
+    accepted: a glob is matched with plain substring searches in time
+    linear in the message length.
+    """
+
+    key: str
+    sources: Optional[FrozenSet[str]] = None
+    levels: Optional[FrozenSet[str]] = None
+    contains: Optional[str] = None
+    glob: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_spec(cls, spec: Optional[Mapping[str, Any]]) -> "LogFilter":
+        """
+        Compile a filter from a subscription request
+
+        Args:
+            spec: Dict with optional source, level (name or list), min_level,
+                contains and glob keys
+
+        Returns:
+            Compiled filter
+
+        Raises:
+            ValueError: If the level or glob is invalid, or a regex is given
+        """
+        spec = spec or {}
+
+        levels = _as_set(spec.get("level"))
+        if levels is not None:
+            levels = frozenset(normalize_level(lvl) for lvl in levels)
+        min_level = spec.get("min_level")
+        if min_level:
+            min_level = normalize_level(min_level)
+            if min_level not in LEVELS:
+                raise ValueError(f"Unknown log level: {min_level}")
+            at_least = frozenset(LEVELS[LEVELS.index(min_level) :])
+            levels = at_least if levels is None else levels & at_least
+
+        if spec.get("regex"):
+            raise ValueError("Regex filters are not supported; use glob")
+        contains = spec.get("contains") or None
+        glob = _compile_glob(str(spec["glob"])) if spec.get("glob") else None
+
+        sources = _as_set(spec.get("source"))
+        key = json.dumps(
+            [
+                sorted(sources) if sources is not None else None,
+                sorted(levels) if levels is not None else None,
+                contains.lower() if contains else None,
+                glob,
+            ]
+        )
+        return cls(
+            key=key,
+            sources=sources,
+            levels=levels,
+            contains=contains.lower() if contains else None,
+            glob=glob or None,
+        )
+
+    def matches(self, entry: Mapping[str, Any]) -> bool:
+        """Check whether a log entry (stream fields) passes the filter"""
+        if self.sources is not None and entry.get("source") not in self.sources:
+            return False
+        if self.levels is not None and (
+            normalize_level(entry.get("level") or entry.get("log_level"))
+            not in self.levels
+        ):
+            return False
+
+        if self.contains is None and self.glob is None:
+            return True
+        message = (entry.get("message") or "").lower()
+        if self.contains is not None and self.contains not in message:
+            return False
+        if self.glob is not None and not _glob_search(self.glob, message):
+            return False
+        return True
+
+
+class TailSampler:
+    """
+    Per-subscriber sampling and rate limiting
+
+    ``sample_rate`` passes that fraction of matching entries, evenly spaced;
+    ``max_per_second`` caps delivery with a token bucket. Entries that are
+    rejected are counted in ``suppressed``.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_per_second: float = 100.0):
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        if max_per_second <= 0:
+            raise ValueError("max_per_second must be positive")
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self.suppressed = 0
+        self._credit = 0.0
+        self._tokens = max_per_second
+        self._updated = time.monotonic()
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Decide whether to deliver the next matching entry"""
+        self._credit += self.sample_rate
+        if self._credit < 1:
+            self.suppressed += 1
+            return False
+        self._credit -= 1
+
+        now = time.monotonic() if now is None else now
+        self._tokens = min(
+            self.max_per_second,
+            self._tokens + max(0.0, now - self._updated) * self.max_per_second,
+        )
+        self._updated = now
+        if self._tokens < 1:
+            self.suppressed += 1
+            return False
+        self._tokens -= 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get sampler settings and suppressed count"""
+        return {
+            "sample_rate": self.sample_rate,
+            "max_per_second": self.max_per_second,
+            "suppressed": self.suppressed,
+        }
@@ -3,47 +3,198 @@ KillKrill Monitoring and Metrics Utilities
 Centralized metrics collection and monitoring setup
 """
 
+import itertools
 import logging
-from typing import Any, Dict, Optional
+import threading
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import structlog
 from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
 
 logger = structlog.get_logger()
 
+# Endpoint label for requests that matched no route, so unknown paths
+# cannot create new series
+UNMATCHED_ENDPOINT = "<unmatched>"
 
-def setup_metrics(service_name: str) -> CollectorRegistry:
-    """Setup standard metrics for a KillKrill service"""
-    registry = CollectorRegistry()
 
-    # Standard service metrics
-    request_counter = Counter(
-        f"killkrill_{service_name}_requests_total",
-        "Total requests processed",
-        ["method", "endpoint", "status"],
-        registry=registry,
-    )
+def metric_prefix(service_name: str) -> str:
+    """Metric name prefix for a service (e.g. flask-backend -> killkrill_flask_backend)"""
+    return f"killkrill_{service_name.replace('-', '_')}"
 
-    request_duration = Histogram(
-        f"killkrill_{service_name}_request_duration_seconds",
-        "Request processing time",
-        ["method", "endpoint"],
-        registry=registry,
-    )
+
+Totals = Dict[Tuple[str, str, str], List[float]]
+
+
+def _add_totals(target: Totals, source: Totals, width: int) -> None:
+    # Copying the items is atomic; the owning thread may keep writing
+    for key, totals in list(source.items()):
+        merged = target.get(key)
+        if merged is None:
+            merged = target[key] = [0] * width
+        for i, value in enumerate(list(totals)):
+            merged[i] += value
+
+
+class _ShardOwner:
+    """Thread-local marker whose finalizer retires the thread's shard"""
+
+    __slots__ = ("__weakref__",)
+
+
+class RequestMetrics:
+    """
+    Request counter and latency histogram with per-thread pre-aggregation
+
+    Each thread accumulates into its own dict of running totals keyed by
+    (method, endpoint, status), so recording a request takes no lock and
+    touches no shared state. Totals are merged into Prometheus metric
+    families only when the registry is scraped. When a thread exits its
+    totals are folded into a shared base, so servers that start a thread
+    per request keep one shard per live thread. Endpoints should be route
+    templates (e.g. /api/v1/users/<int:user_id>), never raw paths.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS,
+    ):
+        self.prefix = prefix
+        self.buckets: Tuple[float, ...] = tuple(buckets)
+        if self.buckets[-1] != float("inf"):
+            self.buckets += (float("inf"),)
+        self._local = threading.local()
+        self._shards: Dict[int, Totals] = {}
+        self._retired: Totals = {}
+        self._shards_lock = threading.RLock()
+        self._shard_ids = itertools.count()
+
+    def _shard(self) -> Totals:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            shard_id = next(self._shard_ids)
+            with self._shards_lock:
+                self._shards[shard_id] = shard
+            # Thread-local values are released when their thread exits
+            owner = self._local.owner = _ShardOwner()
+            weakref.finalize(
+                owner,
+                _retire_shard,
+                self._shards_lock,
+                self._shards,
+                self._retired,
+                shard_id,
+                len(self.buckets) + 2,
+            )
+        return shard
+
+    def observe(self, method: str, endpoint: str, status: str, duration: float):
+        """Record one request"""
+        shard = self._shard()
+        key = (method, endpoint, status)
+        totals = shard.get(key)
+        if totals is None:
+            # Per-bucket counts, then sum, then count
+            totals = shard[key] = [0] * len(self.buckets) + [0.0, 0]
+        totals[bisect_left(self.buckets, duration)] += 1
+        totals[-2] += duration
+        totals[-1] += 1
+
+    def collect(self) -> Iterator[Any]:
+        """Merge thread totals into metric families (called on scrape)"""
+        width = len(self.buckets) + 2
+        merged: Totals = {}
+        # Held throughout so a shard retired mid-scrape is not counted twice
+        with self._shards_lock:
+            _add_totals(merged, self._retired, width)
+            for shard in list(self._shards.values()):
+                _add_totals(merged, shard, width)
+
+        requests = CounterMetricFamily(
+            f"{self.prefix}_requests",
+            "Total requests processed",
+            labels=["method", "endpoint", "status"],
+        )
+        by_route: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0] * width)
+        for (method, endpoint, status), totals in merged.items():
+            requests.add_metric([method, endpoint, status], totals[-1])
+            target = by_route[(method, endpoint)]
+            for i, value in enumerate(totals):
+                target[i] += value
+
+        duration = HistogramMetricFamily(
+            f"{self.prefix}_request_duration_seconds",
+            "Request processing time",
+            labels=["method", "endpoint"],
+        )
+        for (method, endpoint), totals in by_route.items():
+            cumulative, buckets = 0, []
+            for bound, count in zip(self.buckets, totals):
+                cumulative += count
+                buckets.append((_bucket_label(bound), cumulative))
+            duration.add_metric([method, endpoint], buckets, totals[-2])
+
+        yield requests
+        yield duration
+
+
+def _retire_shard(
+    lock: threading.RLock,
+    shards: Dict[int, Totals],
+    retired: Totals,
+    shard_id: int,
+    width: int,
+) -> None:
+    """Fold an exited thread's totals into the retired base"""
+    with lock:
+        shard = shards.pop(shard_id, None)
+        if shard:
+            _add_totals(retired, shard, width)
+
+
+def _bucket_label(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _setup_service_metrics(
+    service_name: str, registry: CollectorRegistry
+) -> Dict[str, Any]:
+    """Create the standard metrics for a service in registry"""
+    prefix = metric_prefix(service_name)
+
+    requests = RequestMetrics(prefix)
+    registry.register(requests)
 
     active_connections = Gauge(
-        f"killkrill_{service_name}_active_connections",
+        f"{prefix}_active_connections",
         "Number of active connections",
         registry=registry,
     )
 
     error_counter = Counter(
-        f"killkrill_{service_name}_errors_total",
+        f"{prefix}_errors_total",
         "Total errors encountered",
         ["error_type"],
         registry=registry,
     )
 
+    return {
+        "requests": requests,
+        "active_connections": active_connections,
+        "errors": error_counter,
+    }
+
+
+def setup_metrics(service_name: str) -> CollectorRegistry:
+    """Setup standard metrics for a KillKrill service"""
+    registry = CollectorRegistry()
+    _setup_service_metrics(service_name, registry)
     return registry
 
 
@@ -110,24 +261,16 @@ class MetricsCollector:
 
     def __init__(self, service_name: str):
         self.service_name = service_name
-        self.registry = setup_metrics(service_name)
+        self.registry = CollectorRegistry()
+        self.service_metrics = _setup_service_metrics(service_name, self.registry)
+        self.requests: RequestMetrics = self.service_metrics["requests"]
         self.redis_metrics = setup_redis_metrics(self.registry)
         self.db_metrics = setup_database_metrics(self.registry)
 
     def record_request(self, method: str, endpoint: str, status: str, duration: float):
-        """Record HTTP request metrics"""
+        """Record HTTP request metrics (endpoint should be the route template)"""
         try:
-            # Find request counter in registry
-            for collector in self.registry._collector_to_names:
-                if hasattr(collector, "_name") and "requests_total" in collector._name:
-                    collector.labels(
-                        method=method, endpoint=endpoint, status=status
-                    ).inc()
-                elif (
-                    hasattr(collector, "_name")
-                    and "request_duration" in collector._name
-                ):
-                    collector.labels(method=method, endpoint=endpoint).observe(duration)
+            self.requests.observe(method, endpoint, status, duration)
         except Exception as e:
             logger.error("Error recording request metrics", error=str(e))
 
@@ -158,23 +301,14 @@ class MetricsCollector:
     def set_active_connections(self, count: int):
         """Set active connections gauge"""
         try:
-            for collector in self.registry._collector_to_names:
-                if (
-                    hasattr(collector, "_name")
-                    and "active_connections" in collector._name
-                ):
-                    collector.set(count)
-                    break
+            self.service_metrics["active_connections"].set(count)
         except Exception as e:
             logger.error("Error setting active connections", error=str(e))
 
     def increment_error(self, error_type: str):
         """Increment error counter"""
         try:
-            for collector in self.registry._collector_to_names:
-                if hasattr(collector, "_name") and "errors_total" in collector._name:
-                    collector.labels(error_type=error_type).inc()
-                    break
+            self.service_metrics["errors"].labels(error_type=error_type).inc()
         except Exception as e:
             logger.error("Error incrementing error counter", error=str(e))
 
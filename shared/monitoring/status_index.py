@@ -0,0 +1,180 @@
+"""
+KillKrill Sensor Status Index
+Incrementally maintained latest-result map and rolling 24h counters for
+uptime checks, so status and overview reads are O(checks) instead of
+scanning sensor_results.
+"""
+
+import calendar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Result statuses counted as failures
+FAILED_STATUSES = frozenset({"down", "error", "timeout"})
+
+
+def hour_bucket(timestamp: datetime) -> int:
+    """Get the epoch hour a (naive UTC) timestamp falls into"""
+    return calendar.timegm(timestamp.utctimetuple()) // 3600
+
+
+@dataclass
+class HourBucket:
+    """Aggregated results for one hour"""
+
+    total: int = 0
+    failed: int = 0
+    response_time_sum: float = 0.0
+    response_time_count: int = 0
+
+    def add(self, status: str, response_time_ms: Optional[float]) -> None:
+        """Count one result"""
+        self.total += 1
+        if status in FAILED_STATUSES:
+            self.failed += 1
+        if response_time_ms is not None:
+            self.response_time_sum += response_time_ms
+            self.response_time_count += 1
+
+
+def summarize_buckets(buckets: Iterable[HourBucket]) -> Dict[str, Any]:
+    """Fold hourly buckets into rolling window counters"""
+    total = failed = rt_count = 0
+    rt_sum = 0.0
+    for bucket in buckets:
+        total += bucket.total
+        failed += bucket.failed
+        rt_sum += bucket.response_time_sum
+        rt_count += bucket.response_time_count
+
+    uptime = ((total - failed) / total) * 100 if total else 100.0
+    return {
+        "total_results": total,
+        "failed_results": failed,
+        "uptime_percentage": round(uptime, 2),
+        "avg_response_time_ms": round(rt_sum / rt_count, 1) if rt_count else 0.0,
+    }
+
+
+class SensorStatusIndex:
+    """
+    In-memory latest-status index for sensor checks
+
+    Keeps the newest result per (check_id, agent_id), the newest result per
+    check across all agents, and hourly buckets covering a rolling window.
+    Every update is O(1); reads are O(checks) and O(window hours).
+    """
+
+    def __init__(self, window_hours: int = 24):
+        self.window_hours = window_hours
+        self._latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._latest_by_check: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[int, HourBucket] = {}
+
+    def record(
+        self,
+        check_id: str,
+        agent_id: str,
+        status: str,
+        response_time_ms: Optional[float] = None,
+        timestamp: Optional[datetime] = None,
+        count: bool = True,
+    ) -> bool:
+        """
+        Apply one check result
+
+        Args:
+            check_id: Check identifier
+            agent_id: Reporting sensor agent
+            status: Result status (up, down, timeout, error, ...)
+            response_time_ms: Response time if measured
+            timestamp: Result time (naive UTC), defaults to now
+            count: Whether to add the result to the rolling counters
+
+        Returns:
+            True if the result became the latest for its (check, agent)
+        """
+        timestamp = timestamp or datetime.utcnow()
+
+        if count:
+            hour = hour_bucket(timestamp)
+            if hour > self._current_hour() - self.window_hours:
+                self._buckets.setdefault(hour, HourBucket()).add(
+                    status, response_time_ms
+                )
+
+        entry = {
+            "check_id": check_id,
+            "agent_id": agent_id,
+            "status": status,
+            "response_time_ms": response_time_ms,
+            "timestamp": timestamp,
+        }
+
+        key = (check_id, agent_id)
+        current = self._latest.get(key)
+        if current is not None and current["timestamp"] > timestamp:
+            return False
+        self._latest[key] = entry
+
+        by_check = self._latest_by_check.get(check_id)
+        if by_check is None or by_check["timestamp"] <= timestamp:
+            self._latest_by_check[check_id] = entry
+
+        return True
+
+    def add_bucket(self, hour: int, bucket: HourBucket) -> None:
+        """Merge pre-aggregated counts for an epoch hour (used for warm-up)"""
+        existing = self._buckets.setdefault(hour, HourBucket())
+        existing.total += bucket.total
+        existing.failed += bucket.failed
+        existing.response_time_sum += bucket.response_time_sum
+        existing.response_time_count += bucket.response_time_count
+
+    def latest(self, check_id: str, agent_id: Optional[str] = None):
+        """Get the latest result for a check, optionally for one agent"""
+        if agent_id is None:
+            return self._latest_by_check.get(check_id)
+        return self._latest.get((check_id, agent_id))
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Get the latest result for every (check, agent) pair"""
+        return list(self._latest.values())
+
+    def latest_by_check(self) -> Dict[str, Dict[str, Any]]:
+        """Get the latest result for every check"""
+        return dict(self._latest_by_check)
+
+    def buckets(self) -> Dict[int, HourBucket]:
+        """Get hourly buckets inside the rolling window"""
+        self._prune()
+        return dict(self._buckets)
+
+    def rolling_counters(self) -> Dict[str, Any]:
+        """Get rolling window totals, failures, uptime and mean response time"""
+        self._prune()
+        return summarize_buckets(self._buckets.values())
+
+    def forget_check(self, check_id: str) -> None:
+        """Drop a deleted check from the index"""
+        self._latest_by_check.pop(check_id, None)
+        for key in [k for k in self._latest if k[0] == check_id]:
+            del self._latest[key]
+
+    def clear(self) -> None:
+        """Reset the index"""
+        self._latest.clear()
+        self._latest_by_check.clear()
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    def _current_hour(self) -> int:
+        return hour_bucket(datetime.utcnow())
+
+    def _prune(self) -> None:
+        cutoff = self._current_hour() - self.window_hours
+        for hour in [h for h in self._buckets if h <= cutoff]:
+            del self._buckets[hour]
@@ -0,0 +1,218 @@
+"""
+KillKrill Structured Logging
+Shared structlog setup for every Python service. Events are rendered to
+JSON (with orjson when installed) and handed to a bounded queue that a
+background thread writes to the output stream, so request and consumer
+threads never block on log I/O. Info and debug events are rate limited
+per event key so per-message diagnostics cannot flood the output under
+load; warnings and errors are never sampled.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Mapping, Optional, TextIO, Tuple
+
+import structlog
+from decouple import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Levels that are always emitted, whatever the sampling limits
+UNSAMPLED_LEVELS = frozenset({"warning", "warn", "error", "critical", "exception"})
+
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+def _dumps(obj: Any, **kwargs) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str)
+
+
+class EventSampler:
+    """
+    structlog processor that rate limits events per event key
+
+    Each distinct event name gets a token bucket refilled at ``rate``
+    events per second, holding at most ``burst`` tokens. Events arriving
+    with no token left are dropped; the next event emitted for that key
+    carries ``sampled_out`` with the number dropped since. ``overrides``
+    sets a different rate for specific event names, and a rate of 0
+    disables limiting for that key (or for every key, as the default).
+    """
+
+    def __init__(
+        self,
+        rate: float = 100.0,
+        burst: Optional[float] = None,
+        overrides: Optional[Mapping[str, float]] = None,
+        clock=time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = dict(overrides or {})
+        self._clock = clock
+        # event -> [tokens, last refill time, dropped since last emitted]
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def _limit(self, event: str) -> Tuple[float, float]:
+        rate = self.overrides.get(event, self.rate)
+        burst = self.burst if self.burst is not None else rate * 2
+        return rate, max(burst, 1.0)
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        if method_name in UNSAMPLED_LEVELS:
+            return event_dict
+
+        event = event_dict.get("event")
+        if not isinstance(event, str):
+            return event_dict
+        rate, burst = self._limit(event)
+        if rate <= 0:
+            return event_dict
+
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(event)
+            if bucket is None:
+                bucket = self._buckets[event] = [burst, now, 0]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                raise structlog.DropEvent
+            bucket[0] -= 1.0
+            dropped, bucket[2] = bucket[2], 0
+
+        if dropped:
+            event_dict["sampled_out"] = dropped
+        return event_dict
+
+    def stats(self) -> Dict[str, int]:
+        """Events currently being dropped, by event key"""
+        with self._lock:
+            return {event: b[2] for event, b in self._buckets.items() if b[2]}
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops records when the queue is full
+
+    Records rendered by structlog are already final strings, so they are
+    queued as-is rather than re-formatted and copied.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info or record.stack_info:
+            return super().prepare(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BlockingStopListener(QueueListener):
+    """QueueListener that can be stopped twice and always gets its sentinel in"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    sample_burst: Optional[float] = None,
+    sample_overrides: Optional[Mapping[str, float]] = None,
+    queue_size: Optional[int] = None,
+    stream: Optional[TextIO] = None,
+) -> QueueListener:
+    """
+    Configure structlog and stdlib logging for a service
+
+    Safe to call more than once; later calls return the running listener.
+    Unset arguments come from the environment:
+        LOG_LEVEL - Minimum level (default: INFO)
+        LOG_SAMPLE_RATE - Info/debug events per second per event key, 0 to
+            disable sampling (default: 100)
+        LOG_SAMPLE_BURST - Events per key allowed in a burst (default: 2x rate)
+        LOG_QUEUE_SIZE - Records buffered for the writer thread before new
+            ones are dropped (default: 10000)
+
+    Args:
+        sample_overrides: Per event key rates, for known hot-path events
+
+    Returns:
+        The background listener writing queued records
+    """
+    global _listener
+
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        level = (level or config("LOG_LEVEL", default="INFO")).upper()
+        if sample_rate is None:
+            sample_rate = config("LOG_SAMPLE_RATE", default=100.0, cast=float)
+        if sample_burst is None:
+            sample_burst = config("LOG_SAMPLE_BURST", default=0.0, cast=float) or None
+        if queue_size is None:
+            queue_size = config("LOG_QUEUE_SIZE", default=10000, cast=int)
+
+        structlog.configure(
+            processors=[
+                structlog.stdlib.filter_by_level,
+                EventSampler(sample_rate, sample_burst, sample_overrides),
+                structlog.stdlib.add_logger_name,
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.PositionalArgumentsFormatter(),
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.processors.StackInfoRenderer(),
+                structlog.processors.format_exc_info,
+                structlog.processors.UnicodeDecoder(),
+                structlog.processors.JSONRenderer(serializer=_dumps),
+            ],
+            wrapper_class=structlog.stdlib.BoundLogger,
+            context_class=dict,
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            cache_logger_on_first_use=True,
+        )
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(logging.Formatter("%(message)s"))
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        root = logging.getLogger()
+        root.handlers = [DroppingQueueHandler(log_queue)]
+        root.setLevel(level)
+
+        _listener = _BlockingStopListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
@@ -8,14 +8,20 @@ import logging
 import time
 import traceback
 import uuid
-from collections import defaultdict
-from dataclasses import dataclass
-from threading import Lock
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
 
 import grpc
 import jwt
 
+from ..security.ratelimit import (
+    RateLimit,
+    RateLimiter,
+    TokenBucketLimiter,
+    client_address,
+    parse_networks,
+)
+from ..security.token_cache import TokenRevoked, VerifiedTokenCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +29,9 @@ class AuthInterceptor(grpc.ServerInterceptor):
     """
     JWT authentication interceptor for gRPC servers.
 
-    Validates JWT tokens in metadata and sets user context.
+    Validates JWT tokens in metadata and sets user context. Verified
+    claims are cached until the token expires, and revoked token IDs are
+    rejected; pass a Redis client to pick up revocations from other servers.
     """
 
     def __init__(
@@ -31,6 +39,8 @@ class AuthInterceptor(grpc.ServerInterceptor):
         secret_key: str,
         algorithms: Optional[list[str]] = None,
         public_methods: Optional[set[str]] = None,
+        token_cache: Optional[VerifiedTokenCache] = None,
+        redis_client: Any = None,
     ):
         """
         Initialize auth interceptor.
@@ -39,10 +49,39 @@ class AuthInterceptor(grpc.ServerInterceptor):
             secret_key: JWT secret key for validation
             algorithms: List of allowed JWT algorithms (default: ['HS256'])
             public_methods: Set of method names that don't require auth
+            token_cache: Verified-token cache (default: a private one)
+            redis_client: Synchronous Redis client to sync revocations from
         """
         self.secret_key = secret_key
         self.algorithms = algorithms or ["HS256"]
         self.public_methods = public_methods or set()
+        self.token_cache = (
+            token_cache if token_cache is not None else VerifiedTokenCache()
+        )
+        self.redis_client = redis_client
+        self._namespace = f"{secret_key}:{','.join(self.algorithms)}"
+
+    def _decode(self, token: str) -> dict[str, Any]:
+        return jwt.decode(token, self.secret_key, algorithms=self.algorithms)
+
+    def verified_claims(
+        self, invocation_metadata: Optional[Sequence[tuple[str, Any]]]
+    ) -> Optional[Mapping[str, Any]]:
+        """
+        Claims of the request's bearer token, or None if it does not verify.
+
+        Shares the verified-token cache, so calling this for a request
+        this interceptor has already authenticated costs a cache lookup.
+        """
+        auth_header = dict(invocation_metadata or ()).get("authorization", "")
+        if not auth_header.startswith("Bearer "):
+            return None
+        try:
+            return self.token_cache.verify(
+                auth_header[7:], self._decode, self._namespace
+            )
+        except (jwt.InvalidTokenError, TokenRevoked):
+            return None
 
     def intercept_service(
         self,
@@ -69,13 +108,12 @@ class AuthInterceptor(grpc.ServerInterceptor):
 
         token = auth_header[7:]  # Remove 'Bearer ' prefix
 
+        if self.redis_client is not None:
+            self.token_cache.revocations.maybe_sync(self.redis_client)
+
         try:
-            # Validate JWT token
-            payload = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=self.algorithms,
-            )
+            # Validate JWT token (signature checked once per distinct token)
+            payload = self.token_cache.verify(token, self._decode, self._namespace)
 
             # Add user info to context (can be retrieved in handlers)
             user_id = payload.get("sub")
@@ -90,6 +128,11 @@ class AuthInterceptor(grpc.ServerInterceptor):
             return self._abort_with_error(
                 grpc.StatusCode.UNAUTHENTICATED, "Token has expired"
             )
+        except TokenRevoked:
+            logger.warning(f"Revoked token for {method}")
+            return self._abort_with_error(
+                grpc.StatusCode.UNAUTHENTICATED, "Token has been revoked"
+            )
         except jwt.InvalidTokenError as e:
             logger.warning(f"Invalid token for {method}: {e}")
             return self._abort_with_error(
@@ -113,37 +156,130 @@ class AuthInterceptor(grpc.ServerInterceptor):
         )
 
 
-@dataclass(slots=True)
-class RateLimitEntry:
-    """Track rate limit for a client."""
+def _peer_address(peer: Optional[str]) -> Optional[str]:
+    """Host part of a gRPC peer string such as ``ipv4:10.0.0.1:5000``."""
+    if not peer:
+        return None
+    kind, _, address = peer.partition(":")
+    if kind == "ipv4":
+        return address.rsplit(":", 1)[0]
+    if kind == "ipv6":
+        return address.rsplit(":", 1)[0].strip("[]")
+    return peer
 
-    count: int = 0
-    window_start: float = 0.0
+
+def _guard_handler(
+    handler: grpc.RpcMethodHandler,
+    check: Callable[[grpc.ServicerContext], None],
+) -> grpc.RpcMethodHandler:
+    """Wrap a handler so check(context) runs before its behavior."""
+    if handler.unary_unary:
+        behavior = handler.unary_unary
+
+        def unary_unary(request: Any, context: grpc.ServicerContext) -> Any:
+            check(context)
+            return behavior(request, context)
+
+        return grpc.unary_unary_rpc_method_handler(
+            unary_unary,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    if handler.unary_stream:
+        behavior = handler.unary_stream
+
+        def unary_stream(request: Any, context: grpc.ServicerContext) -> Any:
+            check(context)
+            yield from behavior(request, context)
+
+        return grpc.unary_stream_rpc_method_handler(
+            unary_stream,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    if handler.stream_unary:
+        behavior = handler.stream_unary
+
+        def stream_unary(requests: Any, context: grpc.ServicerContext) -> Any:
+            check(context)
+            return behavior(requests, context)
+
+        return grpc.stream_unary_rpc_method_handler(
+            stream_unary,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    behavior = handler.stream_stream
+
+    def stream_stream(requests: Any, context: grpc.ServicerContext) -> Any:
+        check(context)
+        yield from behavior(requests, context)
+
+    return grpc.stream_stream_rpc_method_handler(
+        stream_stream,
+        request_deserializer=handler.request_deserializer,
+        response_serializer=handler.response_serializer,
+    )
 
 
 class RateLimitInterceptor(grpc.ServerInterceptor):
     """
-    Rate limiting interceptor with per-client limits.
+    Rate limiting interceptor with per-client token buckets.
+
+    Uses a sharded in-process TokenBucketLimiter by default; pass a
+    RedisTokenBucketLimiter to enforce the limit across all servers.
 
-    Implements sliding window rate limiting.
+    Buckets are keyed only on identities the client cannot choose: the
+    subject of a token verified by ``auth``, otherwise the peer address.
+    x-forwarded-for is honoured only when the peer is a trusted proxy.
     """
 
     def __init__(
         self,
         requests_per_minute: int = 100,
         per_user: bool = True,
+        burst: Optional[int] = None,
+        limiter: Optional[RateLimiter] = None,
+        auth: Optional[AuthInterceptor] = None,
+        trusted_proxies: str | Iterable[str] | None = None,
     ):
         """
         Initialize rate limiter.
 
         Args:
-            requests_per_minute: Maximum requests per minute
+            requests_per_minute: Sustained requests per minute per client
             per_user: Rate limit per user (True) or per IP (False)
+            burst: Maximum burst size (default: requests_per_minute)
+            limiter: Shared limiter (default: in-process token buckets)
+            auth: Interceptor whose verified tokens identify users; without
+                it, or for callers without a valid token, buckets are per IP
+            trusted_proxies: Proxy addresses / CIDRs allowed to set
+                x-forwarded-for
         """
         self.requests_per_minute = requests_per_minute
         self.per_user = per_user
-        self.limits: dict[str, RateLimitEntry] = defaultdict(RateLimitEntry)
-        self.lock = Lock()
+        self.limit = RateLimit.per_minute(requests_per_minute, burst)
+        self.limiter = limiter or TokenBucketLimiter(self.limit)
+        self.auth = auth
+        self.trusted_proxies = parse_networks(trusted_proxies)
+
+    def _client_id(
+        self,
+        handler_call_details: grpc.HandlerCallDetails,
+        context: grpc.ServicerContext,
+    ) -> str:
+        metadata = handler_call_details.invocation_metadata
+        if self.per_user and self.auth is not None:
+            claims = self.auth.verified_claims(metadata)
+            if claims and claims.get("sub"):
+                return f"user:{claims['sub']}"
+
+        address = client_address(
+            _peer_address(context.peer()),
+            dict(metadata or ()).get("x-forwarded-for"),
+            self.trusted_proxies,
+        )
+        return f"ip:{address}"
 
     def intercept_service(
         self,
@@ -151,69 +287,26 @@ class RateLimitInterceptor(grpc.ServerInterceptor):
         handler_call_details: grpc.HandlerCallDetails,
     ) -> grpc.RpcMethodHandler:
         """Intercept and check rate limits."""
-        # Determine client identifier
-        metadata = dict(handler_call_details.invocation_metadata)
-
-        if self.per_user:
-            # Extract user from token
-            auth_header = metadata.get("authorization", "")
-            if auth_header.startswith("Bearer "):
-                try:
-                    token = auth_header[7:]
-                    payload = jwt.decode(token, options={"verify_signature": False})
-                    client_id = payload.get("sub", "anonymous")
-                except Exception:
-                    client_id = "anonymous"
-            else:
-                client_id = "anonymous"
-        else:
-            # Use peer address (IP)
-            client_id = metadata.get("x-forwarded-for", "unknown")
-
-        # Check rate limit
-        current_time = time.time()
-
-        with self.lock:
-            entry = self.limits[client_id]
-
-            # Reset window if expired
-            if current_time - entry.window_start >= 60.0:
-                entry.count = 0
-                entry.window_start = current_time
-
-            # Check limit
-            if entry.count >= self.requests_per_minute:
-                logger.warning(
-                    f"Rate limit exceeded for {client_id}",
-                    extra={
-                        "client_id": client_id,
-                        "requests": entry.count,
-                    },
-                )
-                return self._abort_with_error(
-                    grpc.StatusCode.RESOURCE_EXHAUSTED, "Rate limit exceeded"
-                )
-
-            # Increment counter
-            entry.count += 1
-
-        return continuation(handler_call_details)
-
-    def _abort_with_error(
-        self,
-        code: grpc.StatusCode,
-        details: str,
-    ) -> grpc.RpcMethodHandler:
-        """Return an RPC handler that aborts with error."""
-
-        def abort(request: Any, context: grpc.ServicerContext) -> None:
-            context.abort(code, details)
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        def check(context: grpc.ServicerContext) -> None:
+            client_id = self._client_id(handler_call_details, context)
+            result = self.limiter.acquire(client_id, limit=self.limit)
+            if result.allowed:
+                return
+            logger.warning(
+                f"Rate limit exceeded for {client_id}",
+                extra={"client_id": client_id, "retry_after": result.retry_after},
+            )
+            context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                f"Rate limit exceeded, retry after {result.retry_after:.1f}s",
+            )
 
-        return grpc.unary_unary_rpc_method_handler(
-            abort,
-            request_deserializer=lambda x: x,
-            response_serializer=lambda x: x,
-        )
+        # The peer address is only available on the call context
+        return _guard_handler(handler, check)
 
 
 class AuditInterceptor(grpc.ServerInterceptor):
@@ -5,9 +5,49 @@ Provides:
 - sanitize: XSS/HTML sanitization, SQL parameter escaping
 - headers: Secure headers middleware
 - ratelimit: Rate limiting (in-memory + Redis)
+- token_cache: Verified-token cache and revoked-token set (Redis-synced)
 - csrf: CSRF protection helpers
 - audit: Audit logging
 """
 
-# Placeholder - will be implemented in security utilities phase
-__all__: list[str] = []
+from .ratelimit import (
+    RateLimit,
+    RateLimitExceeded,
+    RateLimitResult,
+    RedisTokenBucketLimiter,
+    TokenBucketLimiter,
+    acquire_async,
+    client_address,
+    flask_rate_limit,
+    hashed_key,
+    parse_networks,
+    quart_rate_limit,
+    too_many_requests,
+)
+from .token_cache import (
+    REVOKED_TOKENS_KEY,
+    RevocationSet,
+    TokenRevoked,
+    VerifiedTokenCache,
+    token_digest,
+)
+
+__all__: list[str] = [
+    "RateLimit",
+    "RateLimitExceeded",
+    "RateLimitResult",
+    "RedisTokenBucketLimiter",
+    "REVOKED_TOKENS_KEY",
+    "RevocationSet",
+    "TokenRevoked",
+    "TokenBucketLimiter",
+    "VerifiedTokenCache",
+    "acquire_async",
+    "client_address",
+    "flask_rate_limit",
+    "hashed_key",
+    "parse_networks",
+    "quart_rate_limit",
+    "token_digest",
+    "too_many_requests",
+]
@@ -0,0 +1,491 @@
+"""
+Token bucket rate limiting.
+
+Provides:
+- RateLimit / RateLimitResult value types
+- TokenBucketLimiter: sharded in-process buckets with idle-entry eviction
+- RedisTokenBucketLimiter: cluster-wide buckets updated atomically by a Lua
+  script, with an optional local fallback when Redis is unavailable
+- flask_rate_limit / quart_rate_limit: before-request hooks returning 429
+- client_address: client IP for keying, trusting X-Forwarded-For only from
+  configured proxies
+
+Buckets hold up to ``burst`` tokens and refill at ``rate`` tokens per
+second. A bucket that has been idle long enough to refill completely is
+indistinguishable from a new one, so it can be evicted without changing
+any decision.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import ipaddress
+import logging
+import math
+import time
+import zlib
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Iterable, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class RateLimit:
+    """
+    Token bucket parameters.
+
+    Attributes:
+        rate: Tokens added per second
+        burst: Bucket capacity (maximum burst size)
+    """
+
+    rate: float
+    burst: int
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0 or self.burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+
+    @classmethod
+    def per_second(cls, count: float, burst: int | None = None) -> RateLimit:
+        """Create a limit of count requests per second."""
+        return cls(rate=count, burst=burst or max(1, math.ceil(count)))
+
+    @classmethod
+    def per_minute(cls, count: float, burst: int | None = None) -> RateLimit:
+        """Create a limit of count requests per minute."""
+        return cls(rate=count / 60.0, burst=burst or max(1, math.ceil(count)))
+
+    @property
+    def refill_seconds(self) -> float:
+        """Time for an empty bucket to refill completely."""
+        return self.burst / self.rate
+
+
+@dataclass(slots=True, frozen=True)
+class RateLimitResult:
+    """
+    Outcome of a rate limit check.
+
+    Attributes:
+        allowed: Whether the request may proceed
+        limit: Bucket capacity
+        remaining: Whole tokens left after this request
+        retry_after: Seconds until the request would be allowed (0 if allowed)
+    """
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+    def headers(self) -> dict[str, str]:
+        """Standard rate limit response headers."""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimitExceeded(Exception):
+    """Exception raised when a rate limit is exceeded."""
+
+    def __init__(self, result: RateLimitResult) -> None:
+        self.result = result
+        super().__init__(f"Rate limit exceeded, retry after {result.retry_after:.1f}s")
+
+
+class RateLimiter(Protocol):
+    """Anything that can make a rate limit decision."""
+
+    def acquire(
+        self, key: str, cost: int = 1, limit: RateLimit | None = None
+    ) -> RateLimitResult: ...
+
+
+def _take(
+    tokens: float, elapsed: float, limit: RateLimit, cost: int
+) -> tuple[bool, float, float]:
+    """Refill a bucket for elapsed seconds and try to take cost tokens."""
+    tokens = min(float(limit.burst), tokens + max(0.0, elapsed) * limit.rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / limit.rate
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "next_sweep")
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        # key -> [tokens, updated, refill_seconds]
+        self.buckets: dict[str, list[float]] = {}
+        self.next_sweep = 0.0
+
+
+class TokenBucketLimiter:
+    """
+    In-process token bucket limiter.
+
+    Keys are spread over independently locked shards so unrelated clients
+    never contend on one lock. Each shard is swept at most once per
+    ``sweep_interval`` and drops buckets that have been idle long enough
+    to be full again, so memory is bounded by the number of recently
+    active keys.
+
+    Example:
+        limiter = TokenBucketLimiter(RateLimit.per_minute(600, burst=100))
+        result = limiter.acquire(f"tenant:{tenant_id}")
+        if not result.allowed:
+            ...
+    """
+
+    def __init__(
+        self,
+        default_limit: RateLimit,
+        shards: int = 16,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize limiter.
+
+        Args:
+            default_limit: Limit used when acquire() is not given one
+            shards: Number of independently locked shards
+            sweep_interval: Minimum seconds between idle sweeps of a shard
+            clock: Monotonic time source
+        """
+        self.default_limit = default_limit
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    def acquire(
+        self, key: str, cost: int = 1, limit: RateLimit | None = None
+    ) -> RateLimitResult:
+        """
+        Take cost tokens from a key's bucket if available.
+
+        Args:
+            key: Client or tenant identifier
+            cost: Tokens to take (e.g. number of records in a batch)
+            limit: Limit for this key (default_limit if None)
+
+        Returns:
+            RateLimitResult describing the decision
+        """
+        limit = limit or self.default_limit
+        shard = self._shard(key)
+        now = self._clock()
+
+        with shard.lock:
+            if now >= shard.next_sweep:
+                self._sweep(shard, now)
+
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = shard.buckets[key] = [float(limit.burst), now, 0.0]
+            allowed, tokens, retry_after = _take(
+                bucket[0], now - bucket[1], limit, cost
+            )
+            bucket[0], bucket[1], bucket[2] = tokens, now, limit.refill_seconds
+
+        return RateLimitResult(allowed, limit.burst, int(tokens), retry_after)
+
+    def _sweep(self, shard: _Shard, now: float) -> None:
+        idle = [
+            key for key, bucket in shard.buckets.items() if now - bucket[1] >= bucket[2]
+        ]
+        for key in idle:
+            del shard.buckets[key]
+        shard.next_sweep = now + self.sweep_interval
+
+    def reset(self, key: str) -> None:
+        """Forget a key's bucket."""
+        shard = self._shard(key)
+        with shard.lock:
+            shard.buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+# Atomic refill-and-take. Uses the Redis server clock so every pod agrees
+# on elapsed time, and expires buckets once they would be full again.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+  tokens = burst
+  ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class RedisTokenBucketLimiter:
+    """
+    Cluster-wide token bucket limiter backed by Redis.
+
+    Every decision is one EVALSHA, so limits hold across all processes
+    and pods sharing the Redis instance. Works with both ``redis.Redis``
+    (use acquire) and ``redis.asyncio.Redis`` (use acquire_async). If Redis
+    fails, decisions fall back to ``fallback`` (per-process limits) or, if
+    no fallback is given, requests are allowed.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        default_limit: RateLimit,
+        prefix: str = "ratelimit:",
+        fallback: TokenBucketLimiter | None = None,
+    ) -> None:
+        """
+        Initialize limiter.
+
+        Args:
+            redis_client: redis.Redis or redis.asyncio.Redis client
+            default_limit: Limit used when acquire() is not given one
+            prefix: Key prefix for bucket hashes
+            fallback: Local limiter used while Redis is unavailable
+        """
+        self.redis = redis_client
+        self.default_limit = default_limit
+        self.prefix = prefix
+        self.fallback = fallback
+        self._script = redis_client.register_script(_TOKEN_BUCKET_LUA)
+
+    def _call_args(self, key: str, cost: int, limit: RateLimit) -> dict[str, Any]:
+        return {
+            "keys": [f"{self.prefix}{key}"],
+            "args": [limit.rate, limit.burst, cost],
+        }
+
+    @staticmethod
+    def _result(reply: Iterable[Any], limit: RateLimit) -> RateLimitResult:
+        allowed, tokens, retry_after = reply
+        return RateLimitResult(
+            bool(int(allowed)), limit.burst, int(float(tokens)), float(retry_after)
+        )
+
+    def _fallback(
+        self, key: str, cost: int, limit: RateLimit, error: Exception
+    ) -> RateLimitResult:
+        logger.warning(f"Redis rate limiter unavailable, using fallback: {error}")
+        if self.fallback is not None:
+            return self.fallback.acquire(key, cost, limit)
+        return RateLimitResult(True, limit.burst, limit.burst)
+
+    def acquire(
+        self, key: str, cost: int = 1, limit: RateLimit | None = None
+    ) -> RateLimitResult:
+        """Take cost tokens using a synchronous Redis client."""
+        limit = limit or self.default_limit
+        try:
+            return self._result(
+                self._script(**self._call_args(key, cost, limit)), limit
+            )
+        except Exception as e:
+            return self._fallback(key, cost, limit, e)
+
+    async def acquire_async(
+        self, key: str, cost: int = 1, limit: RateLimit | None = None
+    ) -> RateLimitResult:
+        """Take cost tokens using an asyncio Redis client."""
+        limit = limit or self.default_limit
+        try:
+            reply = await self._script(**self._call_args(key, cost, limit))
+            return self._result(reply, limit)
+        except Exception as e:
+            return self._fallback(key, cost, limit, e)
+
+
+async def acquire_async(
+    limiter: RateLimiter | RedisTokenBucketLimiter,
+    key: str,
+    cost: int = 1,
+    limit: RateLimit | None = None,
+) -> RateLimitResult:
+    """
+    Take tokens from any limiter inside async code.
+
+    Uses the limiter's acquire_async when it has one (Redis), otherwise
+    the in-process acquire, which only holds a shard lock briefly.
+    """
+    acquire = getattr(limiter, "acquire_async", None)
+    if acquire is not None:
+        return await acquire(key, cost, limit)
+    return limiter.acquire(key, cost, limit)
+
+
+def hashed_key(prefix: str, secret: str) -> str:
+    """Rate limit key for a credential without storing the credential."""
+    return f"{prefix}:{hashlib.sha256(secret.encode()).hexdigest()[:16]}"
+
+
+IPNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def parse_networks(spec: str | Iterable[str] | None) -> tuple[IPNetwork, ...]:
+    """
+    Parse trusted proxy networks.
+
+    Args:
+        spec: Comma-separated string or iterable of addresses / CIDRs
+
+    Raises:
+        ValueError: If an entry is not a valid address or network
+    """
+    if not spec:
+        return ()
+    if isinstance(spec, str):
+        spec = spec.split(",")
+    return tuple(
+        ipaddress.ip_network(item.strip(), strict=False)
+        for item in spec
+        if item.strip()
+    )
+
+
+def _is_trusted(address: str, trusted: tuple[IPNetwork, ...]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def client_address(
+    remote_addr: str | None,
+    forwarded_for: str | None = None,
+    trusted_proxies: tuple[IPNetwork, ...] = (),
+) -> str:
+    """
+    Client IP address to key rate limits on.
+
+    X-Forwarded-For is client supplied, so it is only honoured when the
+    peer is a trusted proxy. The list is then walked from the right,
+    skipping trusted proxies, and the first other address is the client;
+    anything further left could have been sent by the client itself.
+
+    Args:
+        remote_addr: Address of the connected peer
+        forwarded_for: X-Forwarded-For header, if any
+        trusted_proxies: Networks of proxies allowed to set the header
+    """
+    address = remote_addr or "unknown"
+    if not forwarded_for or not _is_trusted(address, trusted_proxies):
+        return address
+    for hop in reversed(forwarded_for.split(",")):
+        hop = hop.strip()
+        if not hop:
+            continue
+        address = hop
+        if not _is_trusted(hop, trusted_proxies):
+            break
+    return address
+
+
+def too_many_requests(
+    result: RateLimitResult,
+) -> tuple[dict[str, Any], int, dict[str, str]]:
+    """
+    429 response parts for a rejected request.
+
+    Returns:
+        (JSON body, status code, headers)
+    """
+    body = {
+        "error": "Too Many Requests",
+        "message": "Rate limit exceeded. Please try again later.",
+        "status_code": 429,
+        "retry_after": round(result.retry_after, 3),
+    }
+    return body, 429, result.headers()
+
+
+def flask_rate_limit(
+    app: Any,
+    limiter: RateLimiter,
+    key_func: Callable[[], str | None],
+    limit_func: Callable[[], RateLimit | None] | None = None,
+) -> None:
+    """
+    Install a Flask before-request hook that enforces a rate limit.
+
+    Args:
+        app: Flask application
+        limiter: TokenBucketLimiter or RedisTokenBucketLimiter
+        key_func: Returns the bucket key for the current request, or None
+            to skip limiting
+        limit_func: Returns the limit for the current request (the
+            limiter's default if None)
+    """
+    from flask import jsonify
+
+    def check_rate_limit() -> Any:
+        key = key_func()
+        if key is None:
+            return None
+        limit = limit_func() if limit_func else None
+        result = limiter.acquire(key, limit=limit)
+        if result.allowed:
+            return None
+        body, status, headers = too_many_requests(result)
+        return jsonify(body), status, headers
+
+    app.before_request(check_rate_limit)
+
+
+def quart_rate_limit(
+    app: Any,
+    limiter: RateLimiter | RedisTokenBucketLimiter,
+    key_func: Callable[[], str | None],
+    limit_func: Callable[[], RateLimit | None] | None = None,
+) -> None:
+    """
+    Install a Quart before-request hook that enforces a rate limit.
+
+    Arguments are the same as flask_rate_limit().
+    """
+    from quart import jsonify
+
+    async def check_rate_limit() -> Any:
+        key = key_func()
+        if key is None:
+            return None
+        limit = limit_func() if limit_func else None
+        result = await acquire_async(limiter, key, limit=limit)
+        if result.allowed:
+            return None
+        body, status, headers = too_many_requests(result)
+        return jsonify(body), status, headers
+
+    app.before_request(check_rate_limit)
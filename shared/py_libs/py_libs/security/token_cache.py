@@ -0,0 +1,296 @@
+"""
+Verified-token cache and revoked-token set.
+
+Provides:
+- RevocationSet: in-memory set of revoked token IDs (``jti``), each kept
+  until the token it names would have expired, synced from a Redis sorted
+  set so a revocation on one server reaches every other within seconds
+- VerifiedTokenCache: LRU-bounded map from token digest to verified claims,
+  valid until the token's ``exp``, consulted before signature verification
+- TokenRevoked: raised for a cached or freshly verified revoked token
+
+Verifying an HS256 token costs a base64 decode, a JSON parse and an HMAC;
+a cache hit costs one hash of the token and a dict lookup. The cache holds
+digests, never raw tokens. Entries are namespaced (e.g. by signing key) so
+a token verified under one key is never accepted under another.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Callable, Iterable, Mapping
+
+logger = logging.getLogger(__name__)
+
+# Redis sorted set of revoked token IDs, scored by token expiry (epoch seconds)
+REVOKED_TOKENS_KEY = "killkrill:auth:revoked"
+
+
+class TokenRevoked(Exception):
+    """The token's ID has been revoked."""
+
+    def __init__(self, jti: str) -> None:
+        super().__init__("Token has been revoked")
+        self.jti = jti
+
+
+@lru_cache(maxsize=16)
+def _namespace_key(namespace: str) -> bytes:
+    return (
+        hashlib.blake2b(namespace.encode(), digest_size=32).digest()
+        if namespace
+        else b""
+    )
+
+
+def token_digest(token: str, namespace: str = "") -> bytes:
+    """Compact cache key for a token under a namespace."""
+    return hashlib.blake2b(
+        token.encode(), digest_size=16, key=_namespace_key(namespace)
+    ).digest()
+
+
+class RevocationSet:
+    """
+    Revoked token IDs, each held until its token would expire anyway.
+
+    Revocations are written to a Redis sorted set (member ``jti``, score
+    ``exp``) and the local set is replaced by the unexpired members at most
+    every ``sync_interval`` seconds. Works with both ``redis.Redis`` (revoke,
+    sync, maybe_sync) and ``redis.asyncio.Redis`` (revoke_async, sync_async).
+    Without Redis the set is process-local.
+    """
+
+    def __init__(
+        self,
+        sync_interval: float = 2.0,
+        key: str = REVOKED_TOKENS_KEY,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.sync_interval = sync_interval
+        self.key = key
+        self._clock = clock
+        self._revoked: dict[str, float] = {}
+        self._lock = Lock()
+        self._synced_at = float("-inf")
+        self._syncing = False
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def __contains__(self, jti: object) -> bool:
+        return isinstance(jti, str) and self.is_revoked(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Whether jti is revoked and its token has not yet expired."""
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > self._clock()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Revoke jti locally until expires_at (epoch seconds)."""
+        if expires_at > self._clock():
+            with self._lock:
+                self._revoked[jti] = max(expires_at, self._revoked.get(jti, 0.0))
+
+    def replace(self, entries: Iterable[tuple[Any, Any]]) -> None:
+        """Replace the local set with (jti, expires_at) pairs from Redis."""
+        now = self._clock()
+        revoked = {}
+        for jti, expires_at in entries:
+            if isinstance(jti, bytes):
+                jti = jti.decode()
+            if float(expires_at) > now:
+                revoked[jti] = float(expires_at)
+        with self._lock:
+            # Keep local revocations that have not reached Redis yet
+            for jti, expires_at in self._revoked.items():
+                if expires_at > now and jti not in revoked:
+                    revoked[jti] = expires_at
+            self._revoked = revoked
+            self._synced_at = self._clock()
+
+    def prune(self) -> int:
+        """Drop entries whose tokens have expired; returns the count dropped."""
+        now = self._clock()
+        with self._lock:
+            expired = [
+                jti for jti, expires_at in self._revoked.items() if expires_at <= now
+            ]
+            for jti in expired:
+                del self._revoked[jti]
+        return len(expired)
+
+    @property
+    def sync_due(self) -> bool:
+        """Whether sync_interval has passed since the last sync."""
+        return self._clock() - self._synced_at >= self.sync_interval
+
+    def revoke(self, redis_client: Any, jti: str, expires_at: float) -> None:
+        """Revoke jti here and in Redis using a synchronous client."""
+        self.add(jti, expires_at)
+        redis_client.zadd(self.key, {jti: expires_at})
+
+    async def revoke_async(
+        self, redis_client: Any, jti: str, expires_at: float
+    ) -> None:
+        """Revoke jti here and in Redis using an asyncio client."""
+        self.add(jti, expires_at)
+        await redis_client.zadd(self.key, {jti: expires_at})
+
+    def sync(self, redis_client: Any) -> None:
+        """Trim expired members in Redis and load the rest."""
+        now = self._clock()
+        redis_client.zremrangebyscore(self.key, "-inf", now)
+        self.replace(redis_client.zrangebyscore(self.key, now, "+inf", withscores=True))
+
+    async def sync_async(self, redis_client: Any) -> None:
+        """Trim expired members in Redis and load the rest (asyncio client)."""
+        now = self._clock()
+        await redis_client.zremrangebyscore(self.key, "-inf", now)
+        self.replace(
+            await redis_client.zrangebyscore(self.key, now, "+inf", withscores=True)
+        )
+
+    def maybe_sync(self, redis_client: Any) -> None:
+        """
+        Sync if due, from whichever caller gets there first.
+
+        Meant for synchronous servers without a background task. A failed
+        sync keeps the previous set and is retried after sync_interval.
+        """
+        if not self.sync_due:
+            return
+        with self._lock:
+            if self._syncing or not self.sync_due:
+                return
+            self._syncing = True
+        try:
+            self.sync(redis_client)
+        except Exception as e:
+            logger.warning(f"Revoked token sync failed: {e}")
+            self._synced_at = self._clock()
+        finally:
+            self._syncing = False
+
+
+class VerifiedTokenCache:
+    """
+    Claims of already verified tokens, keyed by token digest.
+
+    An entry lives until the token's ``exp`` claim (capped at ``max_ttl``
+    seconds when set) and the least recently used entries are dropped past
+    ``max_entries``. Every lookup, hit or miss, checks the token's ``jti``
+    against ``revocations``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_ttl: float | None = None,
+        revocations: RevocationSet | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.revocations = (
+            revocations if revocations is not None else RevocationSet(clock=clock)
+        )
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, Mapping[str, Any]]] = (
+            OrderedDict()
+        )
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str, namespace: str = "") -> Mapping[str, Any] | None:
+        """Cached claims for token, or None if absent or expired."""
+        key = token_digest(token, namespace)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, token: str, claims: Mapping[str, Any], namespace: str = "") -> None:
+        """Cache verified claims until the token expires."""
+        now = self._clock()
+        expires_at = claims.get("exp")
+        if expires_at is None:
+            if self.max_ttl is None:
+                return  # Never expires; do not cache it forever
+            expires_at = now + self.max_ttl
+        elif self.max_ttl is not None:
+            expires_at = min(float(expires_at), now + self.max_ttl)
+        if float(expires_at) <= now:
+            return
+
+        key = token_digest(token, namespace)
+        with self._lock:
+            self._entries[key] = (float(expires_at), claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str, namespace: str = "") -> None:
+        """Drop a token's cached claims."""
+        with self._lock:
+            self._entries.pop(token_digest(token, namespace), None)
+
+    def clear(self) -> None:
+        """Drop all cached claims."""
+        with self._lock:
+            self._entries.clear()
+
+    def verify(
+        self,
+        token: str,
+        decode: Callable[[str], Mapping[str, Any]],
+        namespace: str = "",
+    ) -> Mapping[str, Any]:
+        """
+        Claims for token, calling decode to verify it only on a cache miss.
+
+        Args:
+            token: Encoded token
+            decode: Verifies the signature and returns the claims; its
+                exceptions propagate and failures are not cached
+            namespace: Cache namespace, e.g. an identifier of the signing key
+
+        Raises:
+            TokenRevoked: If the token's jti has been revoked
+        """
+        claims = self.get(token, namespace)
+        if claims is None:
+            self.misses += 1
+            claims = decode(token)
+            self.put(token, claims, namespace)
+        else:
+            self.hits += 1
+
+        jti = claims.get("jti")
+        if jti is not None and self.revocations.is_revoked(jti):
+            raise TokenRevoked(jti)
+        return claims
+
+    def stats(self) -> dict[str, Any]:
+        """Cache size, hit/miss counts and revoked-ID count."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revoked": len(self.revocations),
+        }
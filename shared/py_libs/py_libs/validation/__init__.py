@@ -7,6 +7,7 @@ Provides validators compatible with PyDAL's IS_* pattern:
 - Network validators: IsEmail, IsURL, IsIPAddress
 - DateTime validators: IsDate, IsDateTime, IsTime
 - Password validators: IsStrongPassword
+- Schema: Compiled per-field validators for whole batches of records
 
 Usage:
     from py_libs.validation import IsEmail, IsLength, chain
@@ -18,6 +19,10 @@ Usage:
     # Chained validators
     validators = chain(IsNotEmpty(), IsLength(3, 255), IsEmail())
     result = validators("user@example.com")
+
+    # Batch validation
+    schema = Schema({"email": IsEmail(), "name": IsLength(1, 100)})
+    report = schema.validate_batch(records)
 """
 
 from py_libs.validation.base import (
@@ -59,6 +64,11 @@ from py_libs.validation.password import (
     IsStrongPassword,
     PasswordOptions,
 )
+from py_libs.validation.schema import (
+    BatchReport,
+    FieldErrors,
+    Schema,
+)
 
 __all__ = [
     # Base
@@ -94,4 +104,8 @@ __all__ = [
     # Password
     "IsStrongPassword",
     "PasswordOptions",
+    # Schema
+    "Schema",
+    "BatchReport",
+    "FieldErrors",
 ]
@@ -6,6 +6,7 @@ Provides the foundation for PyDAL-style validators with:
 - ValidationResult dataclass for structured results
 - ValidationError exception for validation failures
 - chain() function for combining multiple validators
+- Validator.compile() for allocation-free checks in batch validation
 """
 
 from __future__ import annotations
@@ -133,6 +134,27 @@ class Validator(ABC, Generic[T, V]):
         """
         ...
 
+    def compile(self) -> Callable[[T], V]:
+        """
+        Compile this validator into a plain check function.
+
+        The check returns the validated value or raises ValidationError,
+        so the success path allocates no ValidationResult. Used by Schema
+        for batch validation; subclasses override it with a direct check.
+
+        Returns:
+            Function taking a value and returning the validated value
+        """
+        validate = self.validate
+
+        def check(value: T) -> V:
+            result = validate(value)
+            if not result.is_valid:
+                raise ValidationError(result.error or "Validation failed")
+            return result.value  # type: ignore[return-value]
+
+        return check
+
     def and_then(self, other: Validator[V, Any]) -> ChainedValidator[T, Any]:
         """
         Chain this validator with another.
@@ -169,6 +191,19 @@ class ChainedValidator(Validator[T, V]):
 
         return ValidationResult.success(current_value)
 
+    def compile(self) -> Callable[[T], V]:
+        """Fuse the compiled checks of every validator into one function."""
+        checks = tuple(validator.compile() for validator in self._validators)
+        if len(checks) == 1:
+            return checks[0]
+
+        def check(value: Any) -> Any:
+            for step in checks:
+                value = step(value)
+            return value
+
+        return check
+
     def and_then(self, other: Validator[V, Any]) -> ChainedValidator[T, Any]:
         """Add another validator to the chain."""
         return ChainedValidator([*self._validators, other])
@@ -12,14 +12,37 @@ Provides:
 
 from __future__ import annotations
 
-from typing import Union
+from typing import Any, Callable, Union
 
-from py_libs.validation.base import ValidationResult, Validator
+from py_libs.validation.base import ValidationError, ValidationResult, Validator
 
 # Type for numeric inputs that can be converted
 NumericInput = Union[int, float, str]
 
 
+def _range_check(
+    convert: Callable[[NumericInput], Any],
+    min_value: float | None,
+    max_value: float | None,
+    error_message: str | None,
+) -> Callable[[NumericInput], Any]:
+    """Compiled conversion followed by an inclusive range check."""
+    low = float("-inf") if min_value is None else min_value
+    high = float("inf") if max_value is None else max_value
+    too_low = error_message or f"Value must be at least {min_value}"
+    too_high = error_message or f"Value must be at most {max_value}"
+
+    def check(value: NumericInput) -> Any:
+        number = convert(value)
+        if number < low:
+            raise ValidationError(too_low)
+        if number > high:
+            raise ValidationError(too_high)
+        return number
+
+    return check
+
+
 class IsInt(Validator[NumericInput, int]):
     """
     Validates that a value is or can be converted to an integer.
@@ -58,6 +81,27 @@ class IsInt(Validator[NumericInput, int]):
 
         return ValidationResult.failure(self.error_message)
 
+    def compile(self) -> Callable[[NumericInput], int]:
+        error_message = self.error_message
+
+        def check(value: NumericInput) -> int:
+            kind = type(value)
+            if kind is int:
+                return value  # type: ignore[return-value]
+            if kind is str:
+                if "." in value or "e" in value or "E" in value:  # type: ignore[operator]
+                    raise ValidationError(error_message)
+                try:
+                    return int(value)
+                except ValueError:
+                    raise ValidationError(error_message) from None
+            result = self.validate(value)
+            if not result.is_valid:
+                raise ValidationError(error_message)
+            return result.value  # type: ignore[return-value]
+
+        return check
+
 
 class IsFloat(Validator[NumericInput, float]):
     """
@@ -89,6 +133,23 @@ class IsFloat(Validator[NumericInput, float]):
 
         return ValidationResult.failure(self.error_message)
 
+    def compile(self) -> Callable[[NumericInput], float]:
+        error_message = self.error_message
+
+        def check(value: NumericInput) -> float:
+            kind = type(value)
+            if kind is float or kind is int or kind is str:
+                try:
+                    return float(value)
+                except ValueError:
+                    raise ValidationError(error_message) from None
+            result = self.validate(value)
+            if not result.is_valid:
+                raise ValidationError(error_message)
+            return result.value  # type: ignore[return-value]
+
+        return check
+
 
 class IsIntInRange(Validator[NumericInput, int]):
     """
@@ -136,6 +197,11 @@ class IsIntInRange(Validator[NumericInput, int]):
 
         return ValidationResult.success(int_value)
 
+    def compile(self) -> Callable[[NumericInput], int]:
+        return _range_check(
+            IsInt().compile(), self.min_value, self.max_value, self.error_message
+        )
+
 
 class IsFloatInRange(Validator[NumericInput, float]):
     """
@@ -183,6 +249,11 @@ class IsFloatInRange(Validator[NumericInput, float]):
 
         return ValidationResult.success(float_value)
 
+    def compile(self) -> Callable[[NumericInput], float]:
+        return _range_check(
+            IsFloat().compile(), self.min_value, self.max_value, self.error_message
+        )
+
 
 class IsPositive(Validator[NumericInput, float]):
     """
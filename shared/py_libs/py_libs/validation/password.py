@@ -14,6 +14,9 @@ from dataclasses import dataclass
 
 from py_libs.validation.base import ValidationResult, Validator
 
+# Common password patterns, as one alternation so scoring runs a single search
+_COMMON_PATTERNS = re.compile(r"^123|abc|qwerty|password|(.)\1{2,}")
+
 
 @dataclass(slots=True, frozen=True)
 class PasswordOptions:
@@ -142,6 +145,7 @@ class IsStrongPassword(Validator[str, str]):
             self.options = PasswordOptions(**opt_dict)  # type: ignore[arg-type]
 
         self.error_message = error_message
+        self._special_set = frozenset(self.options.special_chars)
 
     def validate(self, value: str) -> ValidationResult[str]:
         if not isinstance(value, str):
@@ -172,7 +176,7 @@ class IsStrongPassword(Validator[str, str]):
             errors.append("Password must contain at least one digit")
 
         if opts.require_special:
-            special_set = set(opts.special_chars)
+            special_set = self._special_set
             if not any(c in special_set for c in value):
                 errors.append(
                     f"Password must contain at least one special character ({opts.special_chars[:10]}...)"
@@ -207,7 +211,7 @@ class IsStrongPassword(Validator[str, str]):
         has_lower = any(c in string.ascii_lowercase for c in password)
         has_upper = any(c in string.ascii_uppercase for c in password)
         has_digit = any(c in string.digits for c in password)
-        has_special = any(c in self.options.special_chars for c in password)
+        has_special = any(c in self._special_set for c in password)
 
         variety = sum([has_lower, has_upper, has_digit, has_special])
         score += variety * 10
@@ -218,15 +222,7 @@ class IsStrongPassword(Validator[str, str]):
             score += int(unique_ratio * 20)
 
         # No common patterns bonus (up to 10 points)
-        common_patterns = [
-            r"^123",
-            r"abc",
-            r"qwerty",
-            r"password",
-            r"(.)\1{2,}",  # Repeated characters
-        ]
-        has_common = any(re.search(p, password.lower()) for p in common_patterns)
-        if not has_common:
+        if not _COMMON_PATTERNS.search(password.lower()):
             score += 10
 
         return min(score, 100)
@@ -0,0 +1,319 @@
+"""
+Compiled schemas - validate whole batches of records in one pass.
+
+Provides:
+- Schema: Field validators compiled once into one fused check per field
+- BatchReport: Cleaned valid records plus errors grouped by field and message
+- FieldErrors: One group of identical errors and the rows that produced them
+
+Validation runs column-wise: each field's fused check is applied down the
+whole column before moving to the next field. String values repeated within
+a column (levels, sources, hostnames) are checked once per batch, since
+validators are pure functions of their input.
+
+Usage:
+    from py_libs.validation import IsIn, IsLength, IsNotEmpty, Schema
+
+    schema = Schema(
+        {
+            "level": IsIn(["debug", "info", "warning", "error"]),
+            "message": [IsNotEmpty(), IsLength(1, 65536)],
+        },
+        optional=["source"],
+    )
+    report = schema.validate_batch(payload["logs"])
+    if report.errors:
+        return {"rejected": report.to_dict()}, 400
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+from py_libs.validation.base import (
+    ChainedValidator,
+    ValidationError,
+    ValidationResult,
+    Validator,
+)
+
+# Marks a field absent from a record
+_MISSING = object()
+
+REQUIRED_ERROR = "Field is required"
+RECORD_ERROR = "Record must be an object"
+
+
+@dataclass(slots=True, frozen=True)
+class FieldErrors:
+    """
+    Identical errors reported for one field.
+
+    Attributes:
+        field: Field name, or "" for errors about the record itself
+        error: Error message
+        rows: Indexes of the records with this error, ascending
+    """
+
+    field: str
+    error: str
+    rows: tuple[int, ...]
+
+    @property
+    def count(self) -> int:
+        """Number of records with this error."""
+        return len(self.rows)
+
+
+@dataclass(slots=True)
+class BatchReport:
+    """
+    Result of validating a batch.
+
+    Attributes:
+        total: Number of records in the batch
+        valid: Cleaned records that passed, in input order
+        valid_rows: Index in the batch of each valid record
+        errors: Errors grouped by field and message
+    """
+
+    total: int
+    valid: list[dict[str, Any]]
+    valid_rows: list[int]
+    errors: list[FieldErrors]
+
+    @property
+    def invalid_count(self) -> int:
+        """Number of records that failed at least one check."""
+        return self.total - len(self.valid)
+
+    def invalid_rows(self) -> set[int]:
+        """Indexes of every record that failed."""
+        return {row for group in self.errors for row in group.rows}
+
+    def to_dict(self, max_rows: int = 20) -> dict[str, Any]:
+        """
+        Compact, JSON-serializable error report.
+
+        Args:
+            max_rows: Row indexes listed per error group; counts are exact
+
+        Returns:
+            Totals plus one entry per distinct field error
+        """
+        return {
+            "total": self.total,
+            "valid": len(self.valid),
+            "invalid": self.invalid_count,
+            "errors": [
+                {
+                    "field": group.field,
+                    "error": group.error,
+                    "count": group.count,
+                    "rows": list(group.rows[:max_rows]),
+                }
+                for group in self.errors
+            ],
+        }
+
+
+def _compile_field(
+    validators: Validator[Any, Any] | Sequence[Validator[Any, Any]],
+) -> Callable[[Any], Any]:
+    if isinstance(validators, Validator):
+        return validators.compile()
+    return ChainedValidator(validators).compile()
+
+
+class Schema:
+    """
+    Validates batches of records against per-field validators.
+
+    Each field's validators are compiled and fused into a single check
+    when the schema is built, so build schemas once (e.g. at module level)
+    and reuse them for every batch.
+
+    Args:
+        fields: Field name -> validator or list of validators run in order
+        optional: Fields that may be absent or None; they are then left out
+            of the cleaned record
+        keep_extra: Copy fields without validators into cleaned records
+            unchanged; by default they are dropped
+        dedupe: Check each distinct string value once per column; disable
+            for validators whose result depends on more than the value
+
+    Example:
+        schema = Schema({"name": IsNotEmpty(), "port": IsIntInRange(1, 65535)})
+        report = schema.validate_batch([{"name": "web", "port": "80"}])
+        report.valid  # [{"name": "web", "port": 80}]
+    """
+
+    def __init__(
+        self,
+        fields: Mapping[str, Validator[Any, Any] | Sequence[Validator[Any, Any]]],
+        optional: Iterable[str] = (),
+        keep_extra: bool = False,
+        dedupe: bool = True,
+    ) -> None:
+        self._checks = [(name, _compile_field(v)) for name, v in fields.items()]
+        self._field_set = frozenset(fields)
+        self.optional = frozenset(optional)
+        self.keep_extra = keep_extra
+        self.dedupe = dedupe
+
+        unknown = self.optional - set(fields)
+        if unknown:
+            raise ValueError(f"Optional fields without validators: {sorted(unknown)}")
+
+    @property
+    def fields(self) -> list[str]:
+        """Validated field names, in check order."""
+        return [name for name, _ in self._checks]
+
+    def _check_column(
+        self,
+        name: str,
+        check: Callable[[Any], Any],
+        column: Sequence[Any],
+        failures: dict[tuple[str, str], list[int]],
+    ) -> list[Any]:
+        """Run one field's check down a column; failed rows keep _MISSING."""
+        required = name not in self.optional
+        cache: dict[str, tuple[bool, Any]] | None = {} if self.dedupe else None
+        out = [_MISSING] * len(column)
+
+        for row, value in enumerate(column):
+            if value is _MISSING or value is None:
+                if required:
+                    failures.setdefault((name, REQUIRED_ERROR), []).append(row)
+                continue
+
+            if cache is not None and type(value) is str:
+                outcome = cache.get(value)
+                if outcome is None:
+                    try:
+                        outcome = (True, check(value))
+                    except ValidationError as e:
+                        outcome = (False, e.message)
+                    cache[value] = outcome
+                ok, result = outcome
+            else:
+                try:
+                    ok, result = True, check(value)
+                except ValidationError as e:
+                    ok, result = False, e.message
+
+            if ok:
+                out[row] = result
+            else:
+                failures.setdefault((name, result), []).append(row)
+        return out
+
+    def _report(
+        self,
+        total: int,
+        columns: list[list[Any]],
+        failures: dict[tuple[str, str], list[int]],
+        records: Sequence[Any] | None,
+    ) -> BatchReport:
+        bad = {row for rows in failures.values() for row in rows}
+        names = self.fields
+        valid: list[dict[str, Any]] = []
+        valid_rows: list[int] = []
+
+        for row in range(total):
+            if row in bad:
+                continue
+            if self.keep_extra and records is not None:
+                cleaned = {
+                    k: v for k, v in records[row].items() if k not in self._field_set
+                }
+            else:
+                cleaned = {}
+            for name, column in zip(names, columns):
+                value = column[row]
+                if value is not _MISSING:
+                    cleaned[name] = value
+            valid.append(cleaned)
+            valid_rows.append(row)
+
+        errors = [
+            FieldErrors(field=name, error=error, rows=tuple(rows))
+            for (name, error), rows in failures.items()
+        ]
+        return BatchReport(
+            total=total, valid=valid, valid_rows=valid_rows, errors=errors
+        )
+
+    def validate_batch(self, records: Sequence[Any]) -> BatchReport:
+        """
+        Validate a list of records.
+
+        Args:
+            records: Mappings of field name -> value (e.g. a decoded JSON
+                array); non-mapping entries are reported as invalid
+
+        Returns:
+            BatchReport with the cleaned valid records and grouped errors
+        """
+        failures: dict[tuple[str, str], list[int]] = {}
+        shaped = [r if isinstance(r, Mapping) else None for r in records]
+        not_records = [row for row, r in enumerate(shaped) if r is None]
+        if not_records:
+            failures[("", RECORD_ERROR)] = not_records
+
+        columns = []
+        for name, check in self._checks:
+            column = [_MISSING if r is None else r.get(name, _MISSING) for r in shaped]
+            columns.append(self._check_column(name, check, column, failures))
+
+        return self._report(len(records), columns, failures, shaped)
+
+    def validate_columns(self, columns: Mapping[str, Sequence[Any]]) -> BatchReport:
+        """
+        Validate a batch given column-wise, as field name -> list of values.
+
+        Every column must have the same length; a missing column means the
+        field is absent from every record.
+
+        Returns:
+            BatchReport whose row indexes are positions in the columns
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        total = lengths.pop() if lengths else 0
+
+        failures: dict[tuple[str, str], list[int]] = {}
+        checked = []
+        for name, check in self._checks:
+            column = columns.get(name)
+            if column is None:
+                column = [_MISSING] * total
+            checked.append(self._check_column(name, check, column, failures))
+
+        report = self._report(total, checked, failures, None)
+        if self.keep_extra:
+            extra = [name for name in columns if name not in self._field_set]
+            for cleaned, row in zip(report.valid, report.valid_rows):
+                for name in extra:
+                    cleaned[name] = columns[name][row]
+        return report
+
+    def validate(self, record: Any) -> ValidationResult[dict[str, Any]]:
+        """
+        Validate a single record.
+
+        Returns:
+            ValidationResult with the cleaned record, or every field error
+            joined into one message
+        """
+        report = self.validate_batch([record])
+        if report.valid:
+            return ValidationResult.success(report.valid[0])
+        message = "; ".join(
+            f"{group.field}: {group.error}" if group.field else group.error
+            for group in report.errors
+        )
+        return ValidationResult.failure(message)
@@ -14,9 +14,27 @@ Provides:
 from __future__ import annotations
 
 import re
-from typing import Pattern, Sequence
+from functools import lru_cache
+from typing import Callable, Pattern, Sequence
 
-from py_libs.validation.base import ValidationResult, Validator
+from py_libs.validation.base import ValidationError, ValidationResult, Validator
+
+
+@lru_cache(maxsize=256)
+def shared_pattern(pattern: str, flags: int = 0) -> Pattern[str]:
+    """
+    Compile a regex once per process.
+
+    Validators built with the same pattern (e.g. one IsMatch per request
+    or per schema field) share a single compiled Pattern.
+    """
+    return re.compile(pattern, flags)
+
+
+def _require_str(value: object) -> str:
+    if not isinstance(value, str):
+        raise ValidationError("Value must be a string")
+    return value
 
 
 class IsNotEmpty(Validator[str, str]):
@@ -43,6 +61,17 @@ class IsNotEmpty(Validator[str, str]):
 
         return ValidationResult.success(stripped)
 
+    def compile(self) -> Callable[[str], str]:
+        error_message = self.error_message
+
+        def check(value: str) -> str:
+            stripped = _require_str(value).strip()
+            if not stripped:
+                raise ValidationError(error_message)
+            return stripped
+
+        return check
+
 
 class IsLength(Validator[str, str]):
     """
@@ -90,6 +119,26 @@ class IsLength(Validator[str, str]):
 
         return ValidationResult.success(value)
 
+    def compile(self) -> Callable[[str], str]:
+        min_length = self.min_length
+        max_length = self.max_length if self.max_length is not None else float("inf")
+        too_short = (
+            self.error_message or f"Value must be at least {min_length} characters"
+        )
+        too_long = (
+            self.error_message or f"Value must be at most {self.max_length} characters"
+        )
+
+        def check(value: str) -> str:
+            length = len(_require_str(value))
+            if length < min_length:
+                raise ValidationError(too_short)
+            if length > max_length:
+                raise ValidationError(too_long)
+            return value
+
+        return check
+
 
 class IsMatch(Validator[str, str]):
     """
@@ -112,7 +161,7 @@ class IsMatch(Validator[str, str]):
         error_message: str | None = None,
     ) -> None:
         if isinstance(pattern, str):
-            self._pattern = re.compile(pattern, flags)
+            self._pattern = shared_pattern(pattern, flags)
         else:
             self._pattern = pattern
         self.error_message = error_message or "Value does not match required pattern"
@@ -126,6 +175,17 @@ class IsMatch(Validator[str, str]):
 
         return ValidationResult.success(value)
 
+    def compile(self) -> Callable[[str], str]:
+        match = self._pattern.match
+        error_message = self.error_message
+
+        def check(value: str) -> str:
+            if not match(_require_str(value)):
+                raise ValidationError(error_message)
+            return value
+
+        return check
+
 
 class IsAlphanumeric(Validator[str, str]):
     """
@@ -157,7 +217,7 @@ class IsAlphanumeric(Validator[str, str]):
             chars += "_"
         if allow_dash:
             chars += "-"
-        self._pattern = re.compile(f"^[{chars}]+$")
+        self._pattern = shared_pattern(f"^[{chars}]+$")
 
     def validate(self, value: str) -> ValidationResult[str]:
         if not isinstance(value, str):
@@ -174,6 +234,21 @@ class IsAlphanumeric(Validator[str, str]):
 
         return ValidationResult.success(value)
 
+    def compile(self) -> Callable[[str], str]:
+        match = self._pattern.match
+        error_message = (
+            self.error_message or "Value must contain only alphanumeric characters"
+        )
+
+        def check(value: str) -> str:
+            if not _require_str(value):
+                raise ValidationError("Value cannot be empty")
+            if not match(value):
+                raise ValidationError(error_message)
+            return value
+
+        return check
+
 
 class IsSlug(Validator[str, str]):
     """
@@ -206,6 +281,19 @@ class IsSlug(Validator[str, str]):
 
         return ValidationResult.success(value)
 
+    def compile(self) -> Callable[[str], str]:
+        match = self._SLUG_PATTERN.match
+        error_message = self.error_message
+
+        def check(value: str) -> str:
+            if not _require_str(value):
+                raise ValidationError("Value cannot be empty")
+            if not match(value):
+                raise ValidationError(error_message)
+            return value
+
+        return check
+
 
 class IsIn(Validator[str, str]):
     """
@@ -253,6 +341,22 @@ class IsIn(Validator[str, str]):
 
         return ValidationResult.success(value)
 
+    def compile(self) -> Callable[[str], str]:
+        options = frozenset(self._options)
+        case_sensitive = self.case_sensitive
+        error_message = (
+            self.error_message
+            or f"Value must be one of: {', '.join(self._original_options)}"
+        )
+
+        def check(value: str) -> str:
+            _require_str(value)
+            if (value if case_sensitive else value.lower()) not in options:
+                raise ValidationError(error_message)
+            return value
+
+        return check
+
 
 class IsTrimmed(Validator[str, str]):
     """
@@ -279,3 +383,14 @@ class IsTrimmed(Validator[str, str]):
             return ValidationResult.failure("Value cannot be empty")
 
         return ValidationResult.success(trimmed)
+
+    def compile(self) -> Callable[[str], str]:
+        allow_empty = self.allow_empty
+
+        def check(value: str) -> str:
+            trimmed = _require_str(value).strip()
+            if not trimmed and not allow_empty:
+                raise ValidationError("Value cannot be empty")
+            return trimmed
+
+        return check
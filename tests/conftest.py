@@ -16,6 +16,9 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 # Also add shared to path explicitly
 sys.path.insert(0, os.path.join(project_root, "shared"))
+# py_libs is a package inside shared/py_libs; without this, "py_libs"
+# resolves to the bare shared/py_libs directory as a namespace package
+sys.path.insert(0, os.path.join(project_root, "shared", "py_libs"))
 
 fake = Faker()
 
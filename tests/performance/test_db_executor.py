@@ -0,0 +1,123 @@
+"""
+Event loop responsiveness benchmark for the API database executor.
+
+Runs a batch of slow queries inline on the event loop and then through
+db_run(), while a heartbeat task measures how late the loop wakes up.
+Inline queries stall the loop for their full duration; offloaded queries
+should leave it responsive.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+API_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "apps", "api")
+)
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+from models import database  # noqa: E402
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+# CPU-bound SQLite query; sqlite3 releases the GIL while it runs
+SLOW_QUERY = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c "
+    "WHERE x < 500000) SELECT count(*) FROM c"
+)
+CONCURRENT_QUERIES = 8
+HEARTBEAT_INTERVAL = 0.01
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Database manager on a temporary SQLite database."""
+    monkeypatch.chdir(tmp_path)
+    config = SimpleNamespace(
+        DATABASE_URL=f"sqlite://{tmp_path / 'bench.db'}",
+        DB_POOL_SIZE=1,
+        DB_POOL_TIMEOUT=1.0,
+        DB_POOL_RECYCLE=1800.0,
+        DB_POOL_VALIDATE_IDLE=30.0,
+        DB_MIGRATE=True,
+        DB_EXECUTOR_WORKERS=4,
+        DB_ASYNCPG=False,
+    )
+    manager = database.DatabaseManager(config)
+    monkeypatch.setattr(database, "_db_manager", manager)
+    yield manager
+
+
+async def _max_loop_lag(workload) -> float:
+    """Run workload while sampling event loop wake-up lag."""
+    lags = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            lags.append(time.perf_counter() - start - HEARTBEAT_INTERVAL)
+
+    task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(HEARTBEAT_INTERVAL)
+    await workload()
+    done.set()
+    await task
+    return max(lags)
+
+
+def test_executor_keeps_event_loop_responsive(manager):
+    """Offloaded slow queries do not stall the event loop."""
+
+    async def run():
+        await manager.initialize()
+        db = await manager.get_connection()
+
+        async def inline():
+            for _ in range(CONCURRENT_QUERIES):
+                db.executesql(SLOW_QUERY)
+
+        async def offloaded():
+            await asyncio.gather(
+                *(
+                    database.db_run(lambda db: db.executesql(SLOW_QUERY))
+                    for _ in range(CONCURRENT_QUERIES)
+                )
+            )
+
+        try:
+            inline_lag = await _max_loop_lag(inline)
+            offloaded_lag = await _max_loop_lag(offloaded)
+        finally:
+            await manager.release_connection(db)
+            await manager.close_all()
+
+        print(
+            f"\nmax event loop lag: inline={inline_lag * 1000:.1f}ms "
+            f"offloaded={offloaded_lag * 1000:.1f}ms"
+        )
+        return inline_lag, offloaded_lag
+
+    inline_lag, offloaded_lag = asyncio.run(run())
+
+    assert offloaded_lag < inline_lag / 4
+    assert offloaded_lag < 0.1
+
+
+def test_db_fetch_falls_back_to_pydal(manager):
+    """Raw $n-parameterized reads work without asyncpg."""
+
+    async def run():
+        await manager.initialize()
+        try:
+            return await database.db_fetch("SELECT $2 AS b, $1 AS a", 1, "two")
+        finally:
+            await manager.close_all()
+
+    assert asyncio.run(run()) == [{"b": "two", "a": 1}]
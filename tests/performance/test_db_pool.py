@@ -0,0 +1,131 @@
+"""
+Connection pool behaviour and cold start benchmark for the API database
+manager.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+API_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "apps", "api")
+)
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+from models import database  # noqa: E402
+
+pytestmark = pytest.mark.performance
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch):
+    """Factory for database managers on a temporary SQLite database."""
+    monkeypatch.chdir(tmp_path)
+
+    def make(**overrides):
+        settings = dict(
+            DATABASE_URL=f"sqlite://{tmp_path / 'pool.db'}",
+            DB_POOL_SIZE=2,
+            DB_POOL_TIMEOUT=0.2,
+            DB_POOL_RECYCLE=1800.0,
+            DB_POOL_VALIDATE_IDLE=30.0,
+            DB_MIGRATE=True,
+            DB_EXECUTOR_WORKERS=2,
+            DB_ASYNCPG=False,
+        )
+        settings.update(overrides)
+        return database.DatabaseManager(SimpleNamespace(**settings))
+
+    return make
+
+
+def test_cold_start_opens_one_connection(make_manager):
+    """Startup migrates once and defers the rest of the pool."""
+
+    async def run():
+        manager = make_manager(DB_POOL_SIZE=20)
+        started = time.perf_counter()
+        await manager.initialize()
+        elapsed = time.perf_counter() - started
+        stats = manager.stats()
+        await manager.close_all()
+        return elapsed, stats
+
+    elapsed, stats = asyncio.run(run())
+    print(f"\ncold start: {elapsed * 1000:.1f}ms")
+
+    assert stats["size"] == 1
+    assert stats["max_size"] == 20
+
+
+def test_exhausted_pool_waits_then_times_out(make_manager):
+    """Checkout blocks up to the timeout instead of opening extra connections."""
+
+    async def run():
+        manager = make_manager()
+        await manager.initialize()
+        first = await manager.get_connection()
+        second = await manager.get_connection()
+        assert manager.stats()["in_use"] == 2
+
+        with pytest.raises(database.PoolTimeout):
+            await manager.get_connection()
+
+        # A waiter is handed the next released connection
+        waiter = asyncio.create_task(manager.get_connection())
+        await asyncio.sleep(0.01)
+        await manager.release_connection(first)
+        assert await waiter is first
+
+        await manager.release_connection(first)
+        await manager.release_connection(second)
+        stats = manager.stats()
+        await manager.close_all()
+        return stats
+
+    assert asyncio.run(run()) == {"max_size": 2, "size": 2, "idle": 2, "in_use": 0}
+
+
+def test_old_connections_are_recycled(make_manager):
+    """Connections older than the recycle age are replaced on checkout."""
+
+    async def run():
+        manager = make_manager(DB_POOL_RECYCLE=0.0)
+        await manager.initialize()
+        original = manager._idle[0]
+        db = await manager.get_connection()
+        await manager.release_connection(db)
+        stats = manager.stats()
+        await manager.close_all()
+        return db is original, stats
+
+    reused, stats = asyncio.run(run())
+    assert not reused
+    assert stats["size"] == 1
+
+
+def test_pooled_connections_skip_migrations(make_manager, tmp_path):
+    """Only startup writes migration files; lazily opened connections do not."""
+
+    async def run():
+        manager = make_manager()
+        await manager.initialize()
+        for table_file in tmp_path.glob("*.table"):
+            table_file.unlink()
+
+        first = await manager.get_connection()
+        second = await manager.get_connection()
+        second.health_checks.insert(component="pool")
+        count = second(second.health_checks).count()
+        await manager.release_connection(first)
+        await manager.release_connection(second)
+        await manager.close_all()
+        return count
+
+    assert asyncio.run(run()) == 1
+    assert list(tmp_path.glob("*.table")) == []
@@ -0,0 +1,150 @@
+"""
+API latency benchmark for the password hasher during a login storm.
+
+Runs a burst of concurrent bcrypt verifications inline on the event loop
+and then through the PasswordHasher process pool, while a probe task
+stands in for other API requests and records how long each one waits.
+Inline hashing makes every request queue behind bcrypt; the pool should
+keep p99 latency close to the probe's own sleep.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+API_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "apps", "api")
+)
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+from passlib.hash import bcrypt  # noqa: E402
+
+from services import password_hasher  # noqa: E402
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+ROUNDS = 10
+LOGINS = 24
+PROBE_INTERVAL = 0.005
+PASSWORD = "correct horse battery staple"
+
+
+@pytest.fixture
+def hasher():
+    """Two-worker hasher at benchmark cost."""
+    hasher = password_hasher.PasswordHasher(
+        workers=2, max_pending=LOGINS, rounds=ROUNDS
+    )
+    hasher.start()
+    yield hasher
+    hasher.stop()
+
+
+@pytest.fixture(scope="module")
+def stored_hash():
+    """Stored hash at benchmark cost."""
+    return bcrypt.using(rounds=ROUNDS).hash(PASSWORD)
+
+
+def _p99(samples) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+async def _probe_p99(workload) -> float:
+    """Run workload while timing a stream of short simulated requests."""
+    latencies = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            latencies.append(time.perf_counter() - start)
+
+    task = asyncio.create_task(probe())
+    await asyncio.sleep(PROBE_INTERVAL)
+    await workload()
+    done.set()
+    await task
+    return _p99(latencies)
+
+
+def test_login_storm_keeps_api_latency_low(hasher, stored_hash):
+    """Pooled verification keeps p99 request latency near the baseline."""
+
+    async def run():
+        # Spawn workers before timing
+        await asyncio.gather(*(hasher.hash("warmup") for _ in range(hasher.workers)))
+
+        async def inline():
+            async def login():
+                bcrypt.verify(PASSWORD, stored_hash)
+                await asyncio.sleep(0)
+
+            await asyncio.gather(*(login() for _ in range(LOGINS)))
+
+        async def pooled():
+            await asyncio.gather(
+                *(hasher.verify(PASSWORD, stored_hash) for _ in range(LOGINS))
+            )
+
+        inline_p99 = await _probe_p99(inline)
+        pooled_p99 = await _probe_p99(pooled)
+        print(
+            f"\nprobe p99 during {LOGINS} logins: inline={inline_p99 * 1000:.1f}ms "
+            f"pooled={pooled_p99 * 1000:.1f}ms"
+        )
+        return inline_p99, pooled_p99
+
+    inline_p99, pooled_p99 = asyncio.run(run())
+
+    assert pooled_p99 < inline_p99 / 4
+    assert pooled_p99 < PROBE_INTERVAL + 0.05
+
+
+def test_saturated_hasher_rejects_fast(stored_hash):
+    """Calls past max_pending fail immediately instead of queueing."""
+    hasher = password_hasher.PasswordHasher(workers=1, max_pending=2, rounds=ROUNDS)
+
+    async def run():
+        queued = [
+            asyncio.create_task(hasher.verify(PASSWORD, stored_hash)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        with pytest.raises(password_hasher.HasherBusy):
+            await hasher.verify(PASSWORD, stored_hash)
+        rejected_in = time.perf_counter() - start
+        results = await asyncio.gather(*queued)
+        return rejected_in, results
+
+    try:
+        rejected_in, results = asyncio.run(run())
+    finally:
+        hasher.stop()
+
+    assert rejected_in < 0.01
+    assert results == [(True, None), (True, None)]
+    assert hasher.pending == 0
+
+
+def test_verify_rehashes_on_cost_change(stored_hash):
+    """A valid password hashed at another cost comes back with a new hash."""
+    hasher = password_hasher.PasswordHasher(workers=1, rounds=ROUNDS + 1)
+    try:
+        valid, new_hash = asyncio.run(hasher.verify(PASSWORD, stored_hash))
+        wrong = asyncio.run(hasher.verify("wrong", stored_hash))
+        malformed = asyncio.run(hasher.verify(PASSWORD, "not-a-hash"))
+    finally:
+        hasher.stop()
+
+    assert valid
+    assert bcrypt.verify(PASSWORD, new_hash)
+    assert bcrypt.from_string(new_hash).rounds == ROUNDS + 1
+    assert wrong == (False, None)
+    assert malformed == (False, None)
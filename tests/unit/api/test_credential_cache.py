@@ -0,0 +1,140 @@
+"""Unit tests for the API credential cache."""
+
+import asyncio
+import importlib.util
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pydal import DAL, Field
+
+API_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "apps", "api")
+)
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+from models import database  # noqa: E402
+
+_spec = importlib.util.spec_from_file_location(
+    "api_credential_cache", os.path.join(API_DIR, "services", "credential_cache.py")
+)
+credential_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(credential_cache)
+
+pytestmark = pytest.mark.unit
+
+KEY = {"id": 7, "user_id": 1, "is_active": True}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for cache expiry."""
+    state = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        credential_cache, "time", SimpleNamespace(monotonic=lambda: state.now)
+    )
+    return state
+
+
+@pytest.fixture
+def cache(clock):
+    """Cache with short TTLs and room for three entries."""
+    return credential_cache.CredentialCache(ttl=60, negative_ttl=10, max_entries=3)
+
+
+def test_hits_expire_after_ttl(cache, clock):
+    """Valid credentials are served until their TTL passes."""
+    assert cache.get("api_key", "h1") == (False, None)
+    cache.put("api_key", "h1", KEY)
+    assert cache.get("api_key", "h1") == (True, KEY)
+
+    clock.now += 61
+    assert cache.get("api_key", "h1") == (False, None)
+    assert cache.stats()["entries"] == 0
+
+
+def test_unknown_keys_are_cached_briefly(cache, clock):
+    """Bad keys are negatively cached for the shorter negative TTL."""
+    cache.put("api_key", "bad", None)
+    assert cache.get("api_key", "bad") == (True, None)
+
+    clock.now += 11
+    assert cache.get("api_key", "bad") == (False, None)
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    """Going over max_entries drops the entry used longest ago."""
+    for n in range(3):
+        cache.put("api_key", f"h{n}", {"id": n})
+    cache.get("api_key", "h0")
+    cache.put("api_key", "h3", {"id": 3})
+
+    assert cache.get("api_key", "h1") == (False, None)
+    assert cache.get("api_key", "h0")[0] is True
+    # The evicted entry's record index goes with it
+    cache.invalidate_local("api_key", record_id=1)
+    assert cache.stats()["entries"] == 3
+
+
+def test_invalidate_by_record_id(cache):
+    """Revoking by record ID evicts the entry and its pending usage."""
+    cache.put("api_key", "h1", KEY)
+    cache.put("sensor", "h1", {"id": 7})
+    cache.mark_used("api_key", 7)
+
+    asyncio.run(cache.invalidate("api_key", record_id=7))
+
+    assert cache.get("api_key", "h1") == (False, None)
+    assert cache.get("sensor", "h1")[0] is True
+    assert cache.stats()["pending_usage"] == 0
+
+
+def test_flush_writes_each_records_own_timestamp(cache, monkeypatch):
+    """Coalesced usage keeps per-record times in one UPDATE per second."""
+    db = DAL("sqlite:memory")
+    db.define_table("api_keys", Field("last_used", "datetime"))
+    db.define_table("sensor_agents", Field("last_heartbeat", "datetime"))
+    for _ in range(3):
+        db.api_keys.insert()
+    db.sensor_agents.insert()
+
+    async def get_db():
+        return db
+
+    async def release_db():
+        pass
+
+    monkeypatch.setattr(database, "get_db", get_db)
+    monkeypatch.setattr(database, "release_db", release_db)
+
+    seen = iter(
+        [
+            datetime(2026, 1, 1, 12, 0, 0, 100),
+            datetime(2026, 1, 1, 12, 0, 0, 900),
+            datetime(2026, 1, 1, 12, 0, 4, 500),
+            datetime(2026, 1, 1, 12, 0, 2),
+        ]
+    )
+
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return next(seen)
+
+    monkeypatch.setattr(credential_cache, "datetime", Clock)
+    cache.mark_used("api_key", 1)
+    cache.mark_used("api_key", 2)
+    cache.mark_used("api_key", 3)
+    cache.mark_used("sensor", 1)
+
+    assert asyncio.run(cache.flush()) == 4
+    assert [r.last_used for r in db(db.api_keys).select(orderby=db.api_keys.id)] == [
+        datetime(2026, 1, 1, 12, 0, 0),
+        datetime(2026, 1, 1, 12, 0, 0),
+        datetime(2026, 1, 1, 12, 0, 4),
+    ]
+    assert db.sensor_agents[1].last_heartbeat == datetime(2026, 1, 1, 12, 0, 2)
+    assert asyncio.run(cache.flush()) == 0
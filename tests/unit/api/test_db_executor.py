@@ -0,0 +1,119 @@
+"""Unit tests for the API database executor's worker connections."""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+API_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "apps", "api")
+)
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+from models import executor as executor_module  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+class FakeDAL:
+    """DAL stand-in whose connection can be broken."""
+
+    def __init__(self):
+        self.broken = False
+        self.closed = False
+
+    def executesql(self, sql):
+        if self.broken:
+            raise ConnectionError("server closed the connection")
+        return [(1,)]
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        if self.broken:
+            raise ConnectionError("connection already closed")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for connection age and idle time."""
+    state = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        executor_module, "time", SimpleNamespace(monotonic=lambda: state.now)
+    )
+    return state
+
+
+@pytest.fixture
+def make_executor():
+    """Single-worker executor recording every connection it opens."""
+    opened = []
+
+    def connect():
+        opened.append(FakeDAL())
+        return opened[-1]
+
+    executor = executor_module.DatabaseExecutor(
+        connect, max_workers=1, recycle=60.0, validate_idle=10.0
+    )
+    yield executor, opened
+    asyncio.run(executor.close())
+
+
+def _run(executor, fn):
+    return asyncio.run(executor.run(fn))
+
+
+def test_broken_connection_is_replaced_and_error_kept(make_executor):
+    """A failure that cannot be rolled back drops the worker's connection."""
+    executor, opened = make_executor
+
+    def fail(db):
+        db.broken = True
+        raise ValueError("query failed")
+
+    with pytest.raises(ValueError, match="query failed"):
+        _run(executor, fail)
+    assert opened[0].closed
+
+    assert _run(executor, lambda db: db.executesql("SELECT 1")) == [(1,)]
+    assert len(opened) == 2
+
+
+def test_query_errors_keep_a_healthy_connection(make_executor):
+    """Errors that roll back cleanly do not reconnect."""
+    executor, opened = make_executor
+
+    def fail(db):
+        raise ValueError("constraint violated")
+
+    with pytest.raises(ValueError):
+        _run(executor, fail)
+    _run(executor, lambda db: None)
+    assert len(opened) == 1 and not opened[0].closed
+
+
+def test_idle_connections_are_validated_and_old_ones_recycled(make_executor, clock):
+    """Dead idle connections and ones past the recycle age are reopened."""
+    executor, opened = make_executor
+    _run(executor, lambda db: None)
+
+    clock.now += 5
+    opened[0].broken = True
+    _run(executor, lambda db: None)
+    assert len(opened) == 1
+
+    clock.now += 11
+    _run(executor, lambda db: None)
+    assert len(opened) == 2 and opened[0].closed
+
+    clock.now += 61
+    _run(executor, lambda db: None)
+    assert len(opened) == 3 and opened[1].closed
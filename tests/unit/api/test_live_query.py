@@ -0,0 +1,127 @@
+"""Unit tests for the API Fleet live query job service."""
+
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("websockets")
+
+SERVICE_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "..",
+        "..",
+        "..",
+        "apps",
+        "api",
+        "services",
+        "live_query.py",
+    )
+)
+_spec = importlib.util.spec_from_file_location("api_live_query", SERVICE_PATH)
+live_query = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(live_query)
+
+pytestmark = pytest.mark.unit
+
+
+class FakePipeline:
+    """Pipeline that accepts and discards every command."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    async def execute(self):
+        return []
+
+
+class FakeRedis:
+    """Just enough of an async Redis client for submitting jobs."""
+
+    def pipeline(self, transaction=True):
+        return FakePipeline()
+
+
+class FakeResponse:
+    """Fleet response creating campaign 1."""
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"campaign": {"id": 1}}
+
+
+class SlowFleet:
+    """Fleet client whose campaign creation waits until released."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def post(self, path, json=None):
+        await self.release.wait()
+        if self.fail:
+            raise OSError("fleet unreachable")
+        return FakeResponse()
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    """Live query service with a slow Fleet and jobs that run until stopped."""
+
+    async def run_until_stopped(self, job_id, campaign_id, progress):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(live_query.LiveQueryService, "_stream", run_until_stopped)
+
+    def make(max_jobs):
+        service = live_query.LiveQueryService(
+            FakeRedis(), "http://fleet:8080", "token", max_jobs=max_jobs
+        )
+        service._client = SlowFleet()
+        return service
+
+    return make
+
+
+def test_concurrent_submits_respect_the_job_limit(make_service):
+    """Slots are reserved before Fleet answers, so a burst cannot overshoot."""
+
+    async def run():
+        service = make_service(max_jobs=2)
+        submits = [asyncio.create_task(service.submit("SELECT 1")) for _ in range(5)]
+        await asyncio.sleep(0)
+        service._client.release.set()
+        outcomes = await asyncio.gather(*submits, return_exceptions=True)
+        running = service.stats()["running"]
+        await service.stop()
+        return outcomes, running
+
+    outcomes, running = asyncio.run(run())
+    assert sum(isinstance(o, dict) for o in outcomes) == 2
+    assert sum(isinstance(o, live_query.JobLimitReached) for o in outcomes) == 3
+    assert running == 2
+
+
+def test_failed_submits_release_their_slot(make_service):
+    """A submit that Fleet rejects does not keep holding a slot."""
+
+    async def run():
+        service = make_service(max_jobs=1)
+        service._client.fail = True
+        service._client.release.set()
+        with pytest.raises(OSError):
+            await service.submit("SELECT 1")
+
+        service._client.fail = False
+        job = await service.submit("SELECT 1")
+        await service.stop()
+        return job
+
+    assert asyncio.run(run())["status"] == live_query.RUNNING
@@ -0,0 +1,207 @@
+"""Unit tests for the API WebSocket fan-out hub."""
+
+import asyncio
+import importlib.util
+import json
+import os
+
+import pytest
+
+HUB_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "..",
+        "..",
+        "..",
+        "apps",
+        "api",
+        "services",
+        "ws_hub.py",
+    )
+)
+_spec = importlib.util.spec_from_file_location("api_ws_hub", HUB_PATH)
+ws_hub = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ws_hub)
+
+pytestmark = pytest.mark.unit
+
+
+class FakeRedis:
+    """Records publishes and replays them to pubsub listeners."""
+
+    def __init__(self):
+        self.published = []
+        self.listeners = []
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+        for queue in self.listeners:
+            queue.put_nowait({"type": "message", "data": message})
+
+    def pubsub(self):
+        redis = self
+
+        class PubSub:
+            async def subscribe(self, channel):
+                self.queue = asyncio.Queue()
+                redis.listeners.append(self.queue)
+
+            async def listen(self):
+                while True:
+                    yield await self.queue.get()
+
+            async def unsubscribe(self, channel):
+                pass
+
+            async def close(self):
+                pass
+
+        return PubSub()
+
+
+def _frames(client):
+    return [json.loads(frame)["data"] for frame in client._queue.values()]
+
+
+async def _noop_send(frame):
+    pass
+
+
+def test_full_queue_drops_the_oldest_frame():
+    """A slow client loses its oldest frames, never the newest."""
+
+    async def run():
+        client = ws_hub.ClientConnection(_noop_send, max_queue=2)
+        hub = ws_hub.FanoutHub()
+        hub.subscribe(client, "logs")
+        for n in range(3):
+            await hub.publish("logs", {"n": n})
+        return client
+
+    client = asyncio.run(run())
+    assert _frames(client) == [{"n": 1}, {"n": 2}]
+    assert client.dropped == 1
+
+
+def test_coalesced_frames_replace_queued_state():
+    """A newer frame with the same key replaces the queued one in place."""
+
+    async def run():
+        client = ws_hub.ClientConnection(_noop_send, max_queue=8)
+        hub = ws_hub.FanoutHub()
+        hub.subscribe(client, "sensors")
+        await hub.publish("sensors", {"check": "a", "v": 1}, coalesce_key="a")
+        await hub.publish("sensors", {"check": "b", "v": 1}, coalesce_key="b")
+        await hub.publish("sensors", {"check": "a", "v": 2}, coalesce_key="a")
+        return client
+
+    client = asyncio.run(run())
+    assert _frames(client) == [{"check": "a", "v": 2}, {"check": "b", "v": 1}]
+    assert client.dropped == 0
+
+
+def test_stalled_writer_times_out_and_closes_the_client():
+    """A send that outlasts send_timeout closes the socket and the client."""
+    closed = []
+
+    async def stalled_send(frame):
+        await asyncio.sleep(10)
+
+    async def close(code):
+        closed.append(code)
+
+    async def run():
+        hub = ws_hub.FanoutHub(send_timeout=0.05)
+        client = hub.register(stalled_send, close)
+        hub.subscribe(client, "alerts")
+        await hub.publish("alerts", {"n": 1})
+        await asyncio.sleep(0.2)
+        delivered = await hub.publish("alerts", {"n": 2})
+        stats = hub.stats()["alerts"]
+        await hub.stop()
+        return client, delivered, stats
+
+    client, delivered, stats = asyncio.run(run())
+    assert client.closed and closed == [1011]
+    assert delivered == 0
+    assert stats == {"clients": 0, "queued": 0}
+
+
+def test_batches_are_relayed_in_one_publish():
+    """publish_many sends one Redis message that other instances unpack."""
+    sent = []
+
+    async def send(frame):
+        sent.append(json.loads(frame)["data"])
+
+    async def run():
+        redis = FakeRedis()
+        origin, remote = ws_hub.FanoutHub(), ws_hub.FanoutHub()
+        await origin.start(redis)
+        await remote.start(redis)
+        await asyncio.sleep(0)
+
+        client = remote.register(send)
+        remote.subscribe(client, "sensors")
+        queued = await origin.publish_many(
+            "sensors", [({"n": n}, f"check:{n}") for n in range(3)]
+        )
+        await asyncio.sleep(0.05)
+
+        await origin.stop()
+        await remote.stop()
+        return redis, queued
+
+    redis, queued = asyncio.run(run())
+    assert len(redis.published) == 1
+    assert queued == 0
+    assert sent == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+
+def test_relay_listener_resubscribes_after_redis_errors(monkeypatch):
+    """A dropped subscription is retried instead of silently ending."""
+    monkeypatch.setattr(ws_hub, "RELAY_RETRY_INITIAL", 0.01)
+    sent = []
+
+    async def send(frame):
+        sent.append(json.loads(frame)["data"])
+
+    class FlakyRedis(FakeRedis):
+        """Fails the first two subscriptions."""
+
+        def __init__(self):
+            super().__init__()
+            self.failures = 2
+
+        def pubsub(self):
+            pubsub = super().pubsub()
+            subscribe = pubsub.subscribe
+
+            async def flaky_subscribe(channel):
+                if self.failures:
+                    self.failures -= 1
+                    raise ConnectionError("redis down")
+                await subscribe(channel)
+
+            pubsub.subscribe = flaky_subscribe
+            return pubsub
+
+    async def run():
+        redis = FlakyRedis()
+        origin, remote = ws_hub.FanoutHub(), ws_hub.FanoutHub()
+        await remote.start(redis)
+        client = remote.register(send)
+        remote.subscribe(client, "alerts")
+        await asyncio.sleep(0.1)
+
+        await origin.start(redis)
+        await origin.publish("alerts", {"n": 1})
+        await asyncio.sleep(0.05)
+
+        await origin.stop()
+        await remote.stop()
+        return redis
+
+    redis = asyncio.run(run())
+    assert redis.failures == 0
+    assert sent == [{"n": 1}]
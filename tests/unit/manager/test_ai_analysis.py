@@ -0,0 +1,102 @@
+"""Unit tests for the manager's AI analysis quantization and caches."""
+
+import asyncio
+import math
+from types import SimpleNamespace
+
+import pytest
+from pydal import DAL
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def ai_analysis(tmp_path, monkeypatch):
+    """The manager AI analysis module, backed by a throwaway SQLite file."""
+    pytest.importorskip("py4web")
+    monkeypatch.setenv("DATABASE_URL", f"sqlite://{tmp_path / 'manager.db'}")
+    monkeypatch.chdir(tmp_path)
+    return pytest.importorskip("apps.manager.apps.manager.ai_analysis")
+
+
+@pytest.fixture
+def clock(ai_analysis, monkeypatch):
+    """Controllable monotonic clock for cache expiry."""
+    state = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        ai_analysis, "time", SimpleNamespace(monotonic=lambda: state.now)
+    )
+    return state
+
+
+@pytest.fixture
+def analyzer(ai_analysis, clock):
+    """Analyzer over an in-memory database."""
+    return ai_analysis.AIMetricsAnalyzer(DAL("sqlite:memory"))
+
+
+def test_quantize_zero_and_non_finite(ai_analysis):
+    """Zero, NaN and infinities pass through for every metric kind."""
+    for name in ("cpu_usage", "log_ingestion_rate"):
+        assert ai_analysis.quantize_metric(name, 0) == 0
+        assert math.isnan(ai_analysis.quantize_metric(name, float("nan")))
+        assert ai_analysis.quantize_metric(name, float("inf")) == float("inf")
+
+
+def test_quantize_percentages_to_five_point_steps(ai_analysis):
+    """Percentages snap to the nearest 5, including negative readings."""
+    assert ai_analysis.quantize_metric("cpu_usage", 42.4) == 40.0
+    assert ai_analysis.quantize_metric("cpu_usage", 43.0) == 45.0
+    assert ai_analysis.quantize_metric("memory_usage", 99.9) == 100.0
+    assert ai_analysis.quantize_metric("disk_usage", -3.0) == -5.0
+
+
+def test_quantize_other_metrics_to_two_significant_figures(ai_analysis):
+    """Other metrics keep two significant figures whatever their sign."""
+    assert ai_analysis.quantize_metric("log_ingestion_rate", 1234.5) == 1200
+    assert ai_analysis.quantize_metric("log_ingestion_rate", -1234.5) == -1200
+    assert ai_analysis.quantize_metric("error_rate", 0.012345) == 0.012
+
+
+def test_metrics_digest_ignores_small_fluctuations(ai_analysis):
+    """Nearby readings share a digest; a real change or NaN does not."""
+    digest = ai_analysis.metrics_digest({"cpu_usage": 41.0, "error_rate": 0.0121})
+    assert digest == ai_analysis.metrics_digest(
+        {"error_rate": 0.0119, "cpu_usage": 39.0}
+    )
+    assert digest != ai_analysis.metrics_digest(
+        {"cpu_usage": 47.6, "error_rate": 0.0121}
+    )
+    assert digest != ai_analysis.metrics_digest(
+        {"cpu_usage": float("nan"), "error_rate": 0.0121}
+    )
+
+
+def test_analysis_cache_expires_and_stays_bounded(ai_analysis, analyzer, clock):
+    """Cached analyses expire after their TTL and old digests are evicted."""
+    analyzer._remember_analysis("state", {"severity": "low"})
+    clock.now += ai_analysis.AI_ANALYSIS_CACHE_SECONDS - 1
+    assert analyzer._cached_analysis("state") == {"severity": "low"}
+
+    clock.now += 1
+    assert analyzer._cached_analysis("state") is None
+
+    for n in range(ai_analysis.AI_ANALYSIS_CACHE_SIZE + 1):
+        analyzer._remember_analysis(f"state-{n}", {"n": n})
+    assert analyzer._cached_analysis("state-0") is None
+    assert len(analyzer._analysis_cache) == ai_analysis.AI_ANALYSIS_CACHE_SIZE
+
+
+def test_metrics_cache_is_reused_until_it_expires(
+    ai_analysis, analyzer, clock, monkeypatch
+):
+    """Prometheus is queried again only after PROMETHEUS_CACHE_SECONDS."""
+    monkeypatch.setenv("PROMETHEUS_URL", "http://127.0.0.1:9")
+    analyzer._metrics_cache = (clock.now, {"cpu_usage": 12.0})
+
+    clock.now += ai_analysis.PROMETHEUS_CACHE_SECONDS - 1
+    assert asyncio.run(analyzer.collect_prometheus_metrics()) == {"cpu_usage": 12.0}
+
+    # Expired: the refresh fails against a closed port and returns nothing
+    clock.now += 1
+    assert asyncio.run(analyzer.collect_prometheus_metrics()) == {}
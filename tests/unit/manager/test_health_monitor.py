@@ -0,0 +1,94 @@
+"""Unit tests for the manager's background health monitor."""
+
+import asyncio
+import importlib.util
+import os
+import time
+
+import pytest
+
+MONITOR_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "..",
+        "..",
+        "..",
+        "apps",
+        "manager",
+        "health_monitor.py",
+    )
+)
+_spec = importlib.util.spec_from_file_location("manager_health_monitor", MONITOR_PATH)
+health_monitor = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(health_monitor)
+
+pytestmark = pytest.mark.unit
+
+
+async def _failing_check():
+    raise ConnectionError("redis down")
+
+
+def test_probes_run_concurrently():
+    """One round takes about one timeout, not one timeout per service."""
+
+    async def run():
+        server = await asyncio.start_server(
+            lambda reader, writer: writer.close(), "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+
+        async def slow_check():
+            await asyncio.sleep(0.2)
+
+        services = {"up": {"port": port, "type": "cache"}}
+        services.update({f"slow-{i}": {"port": port, "type": "x"} for i in range(10)})
+        monitor = health_monitor.HealthMonitor(
+            services,
+            components={f"c{i}": slow_check for i in range(10)},
+            host="127.0.0.1",
+            timeout=1.0,
+        )
+        started = time.perf_counter()
+        snapshot = await monitor.snapshot()
+        elapsed = time.perf_counter() - started
+        server.close()
+        return snapshot, elapsed
+
+    snapshot, elapsed = asyncio.run(run())
+    assert elapsed < 1.0
+    assert snapshot["services"]["up"] == {
+        "status": "healthy",
+        "port": snapshot["services"]["up"]["port"],
+        "type": "cache",
+    }
+    assert set(snapshot["system"]) == {
+        "cpu_percent",
+        "memory_percent",
+        "disk_percent",
+        "uptime",
+    }
+
+
+def test_component_failures_and_staleness():
+    """Failed checks are reported and the snapshot ages between rounds."""
+
+    async def run():
+        monitor = health_monitor.HealthMonitor(
+            {},
+            components={"redis": _failing_check, "database": lambda: None},
+            interval=0.01,
+            timeout=0.01,
+        )
+        await monitor.start()
+        snapshot = await monitor.snapshot()
+        await monitor.stop()
+        await asyncio.sleep(0.1)
+        return snapshot, monitor.is_stale
+
+    snapshot, stale = asyncio.run(run())
+    assert snapshot["components"] == {
+        "redis": {"status": "error", "error": "redis down"},
+        "database": {"status": "ok"},
+    }
+    assert stale
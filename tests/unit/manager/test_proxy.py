@@ -0,0 +1,251 @@
+"""Unit tests for the manager reverse proxy engine."""
+
+import asyncio
+import importlib.util
+import os
+
+import httpx
+import pytest
+from quart import Quart
+
+from shared.auth.quart_auth import generate_jwt_token
+
+PROXY_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "apps", "manager", "proxy.py"
+    )
+)
+_spec = importlib.util.spec_from_file_location("manager_proxy", PROXY_PATH)
+proxy = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(proxy)
+
+_routes_spec = importlib.util.spec_from_file_location(
+    "manager_proxy_routes",
+    os.path.join(os.path.dirname(PROXY_PATH), "routes", "proxy.py"),
+)
+proxy_routes = importlib.util.module_from_spec(_routes_spec)
+_routes_spec.loader.exec_module(proxy_routes)
+
+SECRET = "test-secret"
+
+pytestmark = pytest.mark.unit
+
+DOCUMENT = (
+    b"<!doctype html><html><HEAD lang=en><title>t</title></head><body>x</body></html>"
+)
+
+
+async def _stream(data):
+    yield data
+
+
+async def _read(response):
+    return b"".join([chunk async for chunk in response.body])
+
+
+@pytest.fixture
+def upstream_calls():
+    """Requests seen by the fake upstream."""
+    return []
+
+
+@pytest.fixture
+def engine(upstream_calls):
+    """Proxy engine talking to an in-process upstream."""
+
+    async def handler(request):
+        upstream_calls.append(request)
+        if request.url.path.endswith(".css"):
+            return httpx.Response(
+                200,
+                headers={"etag": '"c1"', "set-cookie": "grafana_session=abc"},
+                content=_stream(b"body {}"),
+            )
+        if request.url.path.endswith(".js"):
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200,
+                headers={"etag": '"v1"', "content-type": "application/javascript"},
+                content=_stream(b"var a = 1;"),
+            )
+        return httpx.Response(
+            200, headers={"content-type": "text/html"}, content=_stream(DOCUMENT)
+        )
+
+    engine = proxy.ProxyEngine({"grafana": proxy.Upstream("grafana", "http://g")})
+    engine._clients["grafana"] = httpx.AsyncClient(
+        base_url="http://g", transport=httpx.MockTransport(handler)
+    )
+    return engine
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, len(DOCUMENT)])
+def test_rewriter_handles_split_tags(chunk_size):
+    """Base tag and styles land in the head however the document is chunked."""
+    rewriter = proxy.HTMLRewriter("/proxy/grafana/", styles=b"<style></style>")
+    out = b"".join(
+        rewriter.feed(DOCUMENT[i : i + chunk_size])
+        for i in range(0, len(DOCUMENT), chunk_size)
+    )
+    out += rewriter.flush()
+    assert out == (
+        b'<!doctype html><html><HEAD lang=en><base href="/proxy/grafana/" '
+        b'target="_self"><title>t</title><style></style></head><body>x</body></html>'
+    )
+
+
+def test_rewriter_without_head():
+    """Documents without a head get one before the body."""
+    rewriter = proxy.HTMLRewriter("/p/", styles=b"<s/>")
+    out = rewriter.feed(b"<body>x</body>") + rewriter.flush()
+    assert out == b'<head><base href="/p/" target="_self"><s/></head><body>x</body>'
+
+
+def test_asset_cache_is_byte_bounded():
+    """Least recently used assets are evicted once over the byte budget."""
+    cache = proxy.AssetCache(max_bytes=10, max_entry_bytes=6)
+
+    def asset(size):
+        return proxy.CachedAsset(200, (), b"x" * size, None, None, 0.0)
+
+    assert not cache.put("big", asset(7))
+    cache.put("a", asset(5))
+    cache.put("b", asset(5))
+    cache.get("a")
+    cache.put("c", asset(5))
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 10
+
+
+def test_static_assets_are_cached_and_revalidated(engine, upstream_calls):
+    """Assets are served from cache, then revalidated with their ETag."""
+
+    async def run():
+        first = await engine.forward("grafana", "GET", "app.js", b"", {})
+        assert await _read(first) == b"var a = 1;"
+        second = await engine.forward("grafana", "GET", "app.js", b"", {})
+        assert await _read(second) == b"var a = 1;"
+        assert len(upstream_calls) == 1
+
+        engine.cache.fresh_for = 0
+        third = await engine.forward(
+            "grafana", "GET", "app.js", b"", {"If-None-Match": '"v1"'}
+        )
+        assert third.status == 304
+        assert upstream_calls[-1].headers["if-none-match"] == '"v1"'
+        await engine.close()
+
+    asyncio.run(run())
+
+
+def test_html_is_rewritten_with_proxy_base(engine):
+    """HTML responses get the proxy base href."""
+
+    async def run():
+        response = await engine.forward("grafana", "GET", "", b"", {"Host": "m"})
+        body = await _read(response)
+        await engine.close()
+        return body
+
+    assert b'<base href="/proxy/grafana/"' in asyncio.run(run())
+
+
+def test_cached_assets_do_not_replay_cookies(engine):
+    """Set-Cookie reaches the first client but is not stored with the asset."""
+
+    async def run():
+        first = await engine.forward("grafana", "GET", "app.css", b"", {})
+        await _read(first)
+        second = await engine.forward("grafana", "GET", "app.css", b"", {})
+        await _read(second)
+        await engine.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.headers["set-cookie"] == "grafana_session=abc"
+    assert "set-cookie" not in {key.lower() for key in second.headers}
+
+
+def test_read_only_upstreams_allow_only_read_methods():
+    """Read-only upstreams refuse writes; others forward every method."""
+    es = proxy.Upstream("elasticsearch", "http://es", read_only=True)
+    grafana = proxy.Upstream("grafana", "http://g")
+
+    assert es.allows("GET") and es.allows("head")
+    assert not any(es.allows(m) for m in ("POST", "PUT", "DELETE", "PATCH"))
+    assert grafana.allows("DELETE")
+
+
+@pytest.fixture
+def client(upstream_calls):
+    """Test client for the proxy routes with a recording upstream."""
+
+    async def handler(request):
+        upstream_calls.append(request)
+        return httpx.Response(200, content=_stream(b"ok"))
+
+    engine = proxy.ProxyEngine(
+        {
+            "grafana": proxy.Upstream("grafana", "http://g", "admin", "pw"),
+            "elasticsearch": proxy.Upstream(
+                "elasticsearch", "http://es", read_only=True
+            ),
+        }
+    )
+    for name, client in engine._clients.items():
+        engine._clients[name] = httpx.AsyncClient(
+            base_url=str(client.base_url), transport=httpx.MockTransport(handler)
+        )
+
+    app = Quart(__name__)
+    app.config.update(
+        proxy_engine=engine, JWT_SECRET=SECRET, SESSION_COOKIE="killkrill_token"
+    )
+    app.register_blueprint(proxy_routes.bp)
+    return app.test_client()
+
+
+def test_proxy_requires_a_valid_session(client, upstream_calls):
+    """Anonymous and forged requests are refused before reaching an upstream."""
+    forged = generate_jwt_token({"user_id": "u1"}, "other-secret")
+
+    async def run():
+        anonymous = await client.get("/proxy/grafana/api/users")
+        bad = await client.get(
+            "/proxy/grafana/api/users", headers={"Authorization": f"Bearer {forged}"}
+        )
+        return anonymous.status_code, bad.status_code
+
+    assert asyncio.run(run()) == (401, 401)
+    assert upstream_calls == []
+
+
+def test_proxy_forwards_authenticated_requests_without_session(client, upstream_calls):
+    """Session cookies are accepted and never forwarded upstream."""
+    token = generate_jwt_token({"user_id": "u1"}, SECRET)
+
+    async def run():
+        response = await client.get(
+            "/proxy/grafana/api/users",
+            headers={"Cookie": f"killkrill_token={token}; grafana_session=s"},
+        )
+        return response.status_code, await response.get_data()
+
+    assert asyncio.run(run()) == (200, b"ok")
+    sent = upstream_calls[0].headers
+    assert sent["cookie"] == "grafana_session=s"
+    assert sent["authorization"].startswith("Basic ")
+
+
+def test_proxy_refuses_writes_to_elasticsearch(client, upstream_calls):
+    """Elasticsearch is read-only through the proxy, even when authenticated."""
+    headers = {"Authorization": f"Bearer {generate_jwt_token({}, SECRET)}"}
+
+    async def run():
+        write = await client.delete("/proxy/elasticsearch/logs-*", headers=headers)
+        read = await client.get("/proxy/elasticsearch/_cat/indices", headers=headers)
+        return write.status_code, read.status_code
+
+    assert asyncio.run(run()) == (405, 200)
+    assert [r.method for r in upstream_calls] == ["GET"]
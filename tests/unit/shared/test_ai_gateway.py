@@ -0,0 +1,231 @@
+"""Unit tests for the Flask backend AI provider gateway."""
+
+import asyncio
+import functools
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+FLASK_BACKEND_DIR = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "services", "flask-backend"
+    )
+)
+if FLASK_BACKEND_DIR not in sys.path:
+    sys.path.insert(0, FLASK_BACKEND_DIR)
+
+ai_gateway = pytest.importorskip("app.services.ai_gateway")
+app_config = pytest.importorskip("app.config")
+
+pytestmark = pytest.mark.unit
+
+OLLAMA = ai_gateway.ProviderSpec("ollama", "http://ollama:11434", None, "tinyllama")
+OPENAI = ai_gateway.ProviderSpec("openai", "", "sk-test", "gpt-4o-mini")
+CLAUDE = ai_gateway.ProviderSpec("claude", "", "key", "claude-haiku")
+
+
+def _request(prompt: str = "hello") -> "ai_gateway.ChatRequest":
+    return ai_gateway.ChatRequest(prompt, 64, 0.2)
+
+
+def _sse(*events) -> bytes:
+    return "".join(
+        f"data: {e if isinstance(e, str) else json.dumps(e)}\n\n" for e in events
+    ).encode()
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route the gateway's provider clients to a mock transport."""
+    state = SimpleNamespace(calls=0, handler=None)
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        state.calls += 1
+        return await state.handler(request)
+
+    monkeypatch.setattr(
+        ai_gateway.httpx,
+        "AsyncClient",
+        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handle)),
+    )
+    return state
+
+
+@pytest.fixture
+def make_gateway():
+    """Factory for gateways that are closed after the test."""
+    gateways = []
+
+    def make(**overrides):
+        settings = dict(queue_timeout=1.0, request_timeout=5.0)
+        settings.update(overrides)
+        gateway = ai_gateway.AIGateway(app_config.AIGatewayConfig(**settings))
+        gateways.append(gateway)
+        return gateway
+
+    yield make
+    for gateway in gateways:
+        gateway.close()
+
+
+def test_ollama_ndjson_stream(upstream, make_gateway):
+    """Ollama's NDJSON lines become tokens and a usage summary."""
+    lines = [
+        {"response": "Hel"},
+        {"response": "lo"},
+        {"done": True, "prompt_eval_count": 3, "eval_count": 2},
+    ]
+
+    async def handler(request):
+        assert request.url.path == "/api/generate"
+        assert json.loads(request.content)["stream"] is True
+        body = "\n".join(json.dumps(line) for line in lines) + "\n\n"
+        return httpx.Response(200, content=body.encode())
+
+    upstream.handler = handler
+    events = list(make_gateway().stream(OLLAMA, _request(), use_cache=False))
+
+    assert [v for k, v in events if k == "token"] == ["Hel", "lo"]
+    kind, completion = events[-1]
+    assert kind == "done" and completion.text == "Hello"
+    assert completion.usage == {
+        "prompt_tokens": 3,
+        "completion_tokens": 2,
+        "total_tokens": 5,
+    }
+
+
+def test_openai_sse_stream(upstream, make_gateway):
+    """OpenAI data events are joined and stop at [DONE]."""
+    usage = {"prompt_tokens": 4, "completion_tokens": 2, "total_tokens": 6}
+
+    async def handler(request):
+        assert request.headers["authorization"] == "Bearer sk-test"
+        return httpx.Response(
+            200,
+            content=_sse(
+                {"choices": [{"delta": {"role": "assistant"}}]},
+                {"choices": [{"delta": {"content": "Hi"}}]},
+                {"choices": [{"delta": {"content": " there"}}]},
+                {"choices": [], "usage": usage},
+                "[DONE]",
+                {"choices": [{"delta": {"content": "ignored"}}]},
+            ),
+        )
+
+    upstream.handler = handler
+    completion = make_gateway().complete(OPENAI, _request(), use_cache=False)
+
+    assert completion.text == "Hi there"
+    assert completion.usage == usage
+
+
+def test_claude_sse_stream(upstream, make_gateway):
+    """Claude events carry text deltas and split input/output usage."""
+
+    async def handler(request):
+        return httpx.Response(
+            200,
+            content=_sse(
+                {"type": "message_start", "message": {"usage": {"input_tokens": 7}}},
+                {"type": "content_block_delta", "delta": {"text": "Ok"}},
+                {"type": "message_delta", "usage": {"output_tokens": 1}},
+                {"type": "message_stop"},
+            ),
+        )
+
+    upstream.handler = handler
+    completion = make_gateway().complete(CLAUDE, _request(), use_cache=False)
+
+    assert completion.text == "Ok"
+    assert completion.usage["total_tokens"] == 8
+
+
+def test_cache_key_covers_provider_model_and_prompt():
+    """Keys differ by endpoint, model and prompt but not by API key."""
+    key = ai_gateway.cache_key(OLLAMA, _request())
+    assert key == ai_gateway.cache_key(OLLAMA, _request())
+    assert key != ai_gateway.cache_key(OLLAMA, _request("other"))
+    assert key != ai_gateway.cache_key(
+        ai_gateway.ProviderSpec("ollama", "http://other:11434", None, "tinyllama"),
+        _request(),
+    )
+    assert ai_gateway.cache_key(OPENAI, _request()) == ai_gateway.cache_key(
+        ai_gateway.ProviderSpec("openai", "", "sk-other", "gpt-4o-mini"), _request()
+    )
+    assert ai_gateway.cache_key(OPENAI, _request()) != ai_gateway.cache_key(
+        ai_gateway.ProviderSpec("openai", "", "sk-test", "gpt-4o"), _request()
+    )
+
+
+def test_response_cache_ttl_and_lru(monkeypatch):
+    """Entries expire after the TTL and the least recently used is evicted."""
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(
+        ai_gateway, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    cache = ai_gateway.ResponseCache(ttl=10, max_entries=2)
+
+    cache.put("a", ai_gateway.Completion("A"))
+    cache.put("b", ai_gateway.Completion("B"))
+    assert cache.get("a").cached is True
+    cache.put("c", ai_gateway.Completion("C"))
+    assert cache.get("b") is None
+    assert cache.get("a").text == "A"
+
+    clock.now += 10
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_completions_are_served_from_cache(upstream, make_gateway):
+    """A repeated prompt is answered without calling the provider."""
+
+    async def handler(request):
+        return httpx.Response(200, content=b'{"response":"cached","done":true}\n')
+
+    upstream.handler = handler
+    gateway = make_gateway()
+
+    first = gateway.complete(OLLAMA, _request())
+    second = gateway.complete(OLLAMA, _request())
+    assert (first.cached, second.cached) == (False, True)
+    assert second.text == "cached"
+    assert upstream.calls == 1
+
+
+def test_busy_provider_times_out_and_cancel_frees_the_slot(upstream, make_gateway):
+    """A full provider raises GatewayBusy until the open stream is closed."""
+    release = asyncio.Event()
+
+    async def hold():
+        yield b'{"response":"first"}\n'
+        await release.wait()
+
+    async def handler(request):
+        if json.loads(request.content)["prompt"] == "hold":
+            return httpx.Response(200, content=hold())
+        return httpx.Response(200, content=b'{"response":"ok","done":true}\n')
+
+    upstream.handler = handler
+    gateway = make_gateway(max_concurrency=1, queue_timeout=0.3)
+
+    held = gateway.stream(OLLAMA, _request("hold"), use_cache=False)
+    assert next(held) == ("token", "first")
+
+    with pytest.raises(ai_gateway.GatewayBusy):
+        gateway.complete(OLLAMA, _request(), use_cache=False)
+
+    held.close()
+    assert gateway.complete(OLLAMA, _request(), use_cache=False).text == "ok"
+
+
+def test_unsupported_provider_is_rejected(make_gateway):
+    """Unknown provider types raise before any request is made."""
+    spec = ai_gateway.ProviderSpec("bard", "", None, "model")
+    with pytest.raises(ai_gateway.UnsupportedProvider):
+        next(make_gateway().stream(spec, _request(), use_cache=False))
@@ -0,0 +1,183 @@
+"""Unit tests for the vectorized anomaly detectors."""
+
+import importlib.util
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from pydal import DAL, Field
+
+from shared.monitoring.anomaly import (
+    EWMA_WARMUP,
+    detect_anomalies,
+    ewma_zscore,
+    length_groups,
+    matrix_cells,
+    nanmedian,
+    robust_zscore,
+    seasonal_zscore,
+)
+
+SERVICE_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "..",
+        "..",
+        "..",
+        "services",
+        "flask-backend",
+        "app",
+        "services",
+        "anomaly_detection.py",
+    )
+)
+_spec = importlib.util.spec_from_file_location("flask_anomaly_detection", SERVICE_PATH)
+anomaly_detection = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(anomaly_detection)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def noise() -> np.ndarray:
+    """Daily-seasonal series with Gaussian noise, three days of 5m points."""
+    rng = np.random.default_rng(7)
+    t = np.arange(288 * 3)
+    return 10 + 5 * np.sin(t * 2 * np.pi / 288) + rng.normal(0, 0.3, (200, t.size))
+
+
+def test_nanmedian_ignores_padding():
+    """Medians skip NaNs and all-NaN rows give NaN."""
+    values = np.array([[np.nan, 1, 3, 2.0], [np.nan] * 4, [4, 1, 2, 3.0]])
+    result = nanmedian(values, axis=1).ravel()
+    assert result[0] == 2.0 and np.isnan(result[1]) and result[2] == 2.5
+
+
+def test_scores_are_calibrated(noise):
+    """On plain noise each detector's scores have roughly unit spread."""
+    residual = noise - (10 + 5 * np.sin(np.arange(noise.shape[1]) * 2 * np.pi / 288))
+    assert np.nanstd(robust_zscore(residual)) == pytest.approx(1.0, abs=0.1)
+    assert np.nanstd(ewma_zscore(residual)) == pytest.approx(1.0, abs=0.15)
+    assert np.nanstd(seasonal_zscore(noise, 288)) == pytest.approx(1.0, abs=0.1)
+
+
+def test_seasonal_needs_two_cycles(noise):
+    """Too little history leaves the seasonal scores empty."""
+    assert np.isnan(seasonal_zscore(noise[:, :300], 288)).all()
+
+
+def test_spike_is_found_in_its_series(noise):
+    """A spike is reported with its own index, ahead of noise."""
+    series = {f"host-{i}": row for i, row in enumerate(noise)}
+    series["host-42"] = series["host-42"].copy()
+    series["host-42"][700] += 15
+    series["short"] = [1.0, 1.1, 0.9, 1.0, 1.0, 1.05, 8.0]
+    series["empty"] = []
+
+    reports = detect_anomalies(series, period=288)
+
+    top = {report["series"]: report for report in reports[:2]}
+    assert set(top) == {"host-42", "short"}
+    spike = [p for p in top["host-42"]["points"] if p["index"] == 700][0]
+    # Within the daily swing, so only the time-aware detectors catch it
+    assert {"ewma", "seasonal"} <= set(spike["detectors"])
+    assert top["short"]["points"][-1]["index"] == 6
+
+
+def _ewma_reference(values, alpha=0.3, variance_alpha=0.05):
+    """Point-by-point EWMA scores for one series, skipping NaNs."""
+    scores = [np.nan] * len(values)
+    mean = var = 0.0
+    seen = 0
+    for i, x in enumerate(values):
+        if np.isnan(x):
+            continue
+        if seen == 0:
+            mean = x
+        else:
+            diff = x - mean
+            if seen >= EWMA_WARMUP:
+                scores[i] = diff / max(np.sqrt(var), 1e-9 * (abs(mean) + 1.0))
+            mean += alpha * diff
+            var += max(variance_alpha, 1.0 / seen) * (diff * diff - var)
+        seen += 1
+    return scores
+
+
+def test_blocked_ewma_matches_point_by_point():
+    """Blocked matrix products give the same scores as the plain recurrence."""
+    rng = np.random.default_rng(3)
+    matrix = rng.normal(10, 2, (6, 300))
+    matrix[rng.random(matrix.shape) < 0.2] = np.nan
+    matrix[0, :200] = np.nan
+    matrix[1, :] = np.nan
+
+    expected = np.array([_ewma_reference(row) for row in matrix])
+    np.testing.assert_allclose(ewma_zscore(matrix), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_padding_never_exceeds_points():
+    """Short series are not padded to the length of a long one."""
+    lengths = [1] * 5000 + [5000]
+    assert sum(len(group) for group in length_groups(lengths)) == len(lengths)
+    assert matrix_cells(lengths) == 10000
+    assert matrix_cells([3, 4, 5, 9, 0]) == 3 + 2 * 5 + 9
+
+    series = {f"flat-{i}": [1.0] for i in range(5000)}
+    series["long"] = np.r_[np.zeros(4999), 50.0]
+    reports = detect_anomalies(series)
+    assert [r["series"] for r in reports] == ["long"]
+    assert reports[0]["points"][-1]["index"] == 4999
+
+
+def test_unknown_detector_is_rejected():
+    """Typos in detector names are errors, not silently skipped."""
+    with pytest.raises(ValueError):
+        detect_anomalies({"a": [1.0, 2.0]}, detectors=["median"])
+
+
+@pytest.fixture
+def rollup_db():
+    """In-memory metric_aggregate with two labelled cpu series."""
+    db = DAL("sqlite:memory")
+    db.define_table(
+        "metric_aggregate",
+        Field("name", "string"),
+        Field("interval", "string"),
+        Field("timestamp", "datetime"),
+        Field("avg", "double"),
+        Field("labels", "json"),
+    )
+    start = datetime.utcnow() - timedelta(hours=1)
+    for host in ("a", "b"):
+        for i in range(10):
+            db.metric_aggregate.insert(
+                name="cpu",
+                interval="5m",
+                timestamp=start + timedelta(minutes=5 * i),
+                avg=1.0,
+                labels={"host": host},
+            )
+    return db
+
+
+def test_scan_reports_metrics_without_rollups(rollup_db):
+    """Names that match no rollups are listed rather than silently skipped."""
+    result = anomaly_detection.run_anomaly_detection(
+        rollup_db, {"metrics": ["cpu", "memory"]}
+    )
+    assert result["series_scanned"] == 2
+    assert result["unmatched_metrics"] == ["memory"]
+
+
+def test_scan_cells_bound_rollups_and_inline_values(rollup_db):
+    """The inline bound covers padded rollup rows and inline series."""
+    params = {
+        "metrics": [
+            "cpu",
+            {"name": "inline", "values": [1.0] * 7},
+            {"name": "short", "values": [1.0] * 5},
+        ]
+    }
+    assert anomaly_detection.count_scan_cells(rollup_db, params) == 2 * 20 + 14
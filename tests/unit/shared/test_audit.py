@@ -0,0 +1,137 @@
+"""Unit tests for audit events and multi-row inserts."""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pydal import DAL, Field
+
+from shared.database.audit import AuditEvent
+from shared.database.models import insert_many
+
+pytestmark = pytest.mark.unit
+
+FLASK_BACKEND_DIR = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "services", "flask-backend"
+    )
+)
+
+
+@pytest.fixture
+def db():
+    """In-memory SQLite DAL with an audit_log table."""
+    dal = DAL("sqlite:memory")
+    dal.define_table(
+        "audit_log",
+        Field("timestamp", "datetime"),
+        Field("user_id", "integer"),
+        Field("action", "string", length=100),
+        Field("details", "json"),
+    )
+    yield dal
+    dal.close()
+
+
+def test_insert_many_writes_every_row_in_one_statement(db):
+    """All rows land with a single INSERT, including quoting and NULLs."""
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    rows = [
+        {"timestamp": now, "user_id": 1, "action": "user.create", "details": {"a": 1}},
+        {"timestamp": now, "user_id": None, "action": "it's quoted", "details": None},
+        {"timestamp": now, "user_id": 3, "action": "user.delete", "details": [1, 2]},
+    ]
+
+    statements = []
+    execute = db.executesql
+    db.executesql = lambda sql, *a, **kw: statements.append(sql) or execute(sql)
+
+    assert insert_many(db, db.audit_log, rows) == 3
+    assert len(statements) == 1
+
+    stored = db(db.audit_log).select(orderby=db.audit_log.id)
+    assert [r.action for r in stored] == ["user.create", "it's quoted", "user.delete"]
+    assert [r.user_id for r in stored] == [1, None, 3]
+    assert stored[0].details == {"a": 1}
+    assert stored[1].details is None
+    assert stored[2].timestamp == now
+
+
+def test_insert_many_fills_missing_columns_with_null(db):
+    """Columns absent from later rows are written as NULL."""
+    insert_many(
+        db,
+        db.audit_log,
+        [{"action": "a", "user_id": 1}, {"action": "b"}],
+    )
+
+    stored = db(db.audit_log).select(orderby=db.audit_log.id)
+    assert [(r.action, r.user_id) for r in stored] == [("a", 1), ("b", None)]
+
+
+def test_insert_many_empty_is_a_no_op(db):
+    """No rows means no statement and nothing written."""
+    assert insert_many(db, db.audit_log, []) == 0
+    assert db(db.audit_log).count() == 0
+
+
+def test_audit_event_lag_measures_time_since_queueing():
+    """Lag is measured from the monotonic time the event was created."""
+    event = AuditEvent(action="user.create", queued_at=100.0)
+
+    assert event.lag(now=102.5) == pytest.approx(2.5)
+    assert event.timestamp <= datetime.utcnow()
+
+
+@pytest.fixture
+def flask_db(tmp_path, monkeypatch):
+    """The Flask backend's own PyDAL tables on a temporary SQLite file."""
+    if FLASK_BACKEND_DIR not in sys.path:
+        sys.path.insert(0, FLASK_BACKEND_DIR)
+    db_init = pytest.importorskip("app.models.db_init")
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setenv("DB_TYPE", "sqlite")
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "killkrill.db"))
+    monkeypatch.setattr(db_init, "_pydal_connection", None)
+    dal = db_init.get_pydal_connection()
+    yield dal
+    dal.close()
+
+
+def test_flask_audit_rows_insert_into_the_real_table(flask_db):
+    """Writer rows fit the Flask audit_log table; the database assigns ids."""
+    audit_log = pytest.importorskip("app.services.audit_log")
+    events = [
+        AuditEvent(action="user.create", user_id=7, details={"email": "a@b.c"}),
+        AuditEvent(action="user.delete", resource_type="user", resource_id="9"),
+    ]
+
+    rows = [audit_log._row(event) for event in events]
+    assert insert_many(flask_db, flask_db.audit_log, rows) == 2
+    flask_db.commit()
+
+    stored = flask_db(flask_db.audit_log).select(orderby=flask_db.audit_log.id)
+    assert [r.audit_action for r in stored] == ["user.create", "user.delete"]
+    assert [r.user_id for r in stored] == ["7", None]
+    assert stored[0].details == {"email": "a@b.c"}
+    assert stored[0].id != stored[1].id
+
+
+def test_flask_audit_records_the_connected_peer(monkeypatch):
+    """A client-supplied X-Forwarded-For never reaches the audit trail."""
+    if FLASK_BACKEND_DIR not in sys.path:
+        sys.path.insert(0, FLASK_BACKEND_DIR)
+    flask = pytest.importorskip("flask")
+    audit_log = pytest.importorskip("app.services.audit_log")
+    recorded = []
+    monkeypatch.setattr(audit_log, "_writer", SimpleNamespace(record=recorded.append))
+
+    with flask.Flask(__name__).test_request_context(
+        headers={"X-Forwarded-For": "6.6.6.6"},
+        environ_base={"REMOTE_ADDR": "198.51.100.7"},
+    ):
+        audit_log.audit("user.login", user_id=1)
+
+    assert recorded[0].ip_address == "198.51.100.7"
@@ -0,0 +1,240 @@
+"""Unit tests for the streaming ingestion body reader."""
+
+import asyncio
+import gzip
+import io
+import json
+import random
+import zlib
+
+import pytest
+
+from shared.ingest import (
+    BodyLimits,
+    BodyReader,
+    MalformedBody,
+    PayloadTooLarge,
+    UnsupportedEncoding,
+    aiter_batches,
+    body_reader,
+    iter_batches,
+    read_chunks,
+)
+
+pytestmark = pytest.mark.unit
+
+RECORDS = [
+    {"message": "plain", "level": "info"},
+    {"message": 'quotes " and \\ backslashes \\"', "level": "error"},
+    {"message": "brackets ] } [ { , inside strings", "n": [1, [2, {"x": "]"}]]},
+    {"message": "unicode é中\U0001f600", "tags": {}},
+    {"message": "", "empty": [], "nested": {"a": {"b": {"c": None}}}},
+    {"n": -1.5e3, "t": True, "f": False},
+]
+
+
+def split(data, rng, max_size=7):
+    """Cut bytes into random small chunks."""
+    chunks, i = [], 0
+    while i < len(data):
+        size = rng.randint(1, max_size)
+        chunks.append(data[i : i + size])
+        i += size
+    return chunks
+
+
+def decode(chunks, encoding=None, limits=None):
+    """All records of a body, via iter_batches."""
+    reader = BodyReader(encoding, limits=limits or BodyLimits(batch_size=4))
+    return [r for batch in iter_batches(chunks, reader) for r in batch]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        json.dumps(RECORDS),
+        json.dumps(RECORDS, indent=2),
+        "\n".join(json.dumps(r) for r in RECORDS) + "\n",
+        " ".join(json.dumps(r) for r in RECORDS),
+    ],
+    ids=["array", "indented-array", "ndjson", "concatenated"],
+)
+def test_records_match_json_loads_at_any_chunking(body):
+    """Records decode identically however the body is split."""
+    data = body.encode()
+    rng = random.Random(3)
+
+    for _ in range(20):
+        assert decode(split(data, rng)) == RECORDS
+    assert decode([data]) == RECORDS
+
+
+def test_single_object_and_empty_array():
+    """A lone object is one record; an empty array is none."""
+    assert decode([b'{"message": "one"}']) == [{"message": "one"}]
+    assert decode([b"  [ ]  "]) == []
+    assert decode([b""]) == []
+
+
+def test_array_elements_need_not_be_objects():
+    """Array elements of any type are passed on for the caller to validate."""
+    assert decode([b'[1, "a,b", null, [2, 3]]']) == [1, "a,b", None, [2, 3]]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b'[{"a": 1},]', b"[,]", b'{"a": 1} 42', b'"text"', b'[{"a": 1}] {"b": 2}'],
+)
+def test_malformed_bodies_are_rejected(body):
+    """Trailing commas, scalars and data after an array are errors."""
+    with pytest.raises(MalformedBody):
+        decode([body])
+
+
+@pytest.mark.parametrize("body", [b'[{"a": 1}', b'{"a": "unterminated', b'{"a": 1'])
+def test_truncated_bodies_are_rejected(body):
+    """A body ending inside a record is an error."""
+    with pytest.raises(MalformedBody):
+        decode([body])
+
+
+def test_invalid_record_json_is_rejected():
+    """Records with bad JSON inside balanced brackets are errors."""
+    with pytest.raises(MalformedBody):
+        decode([b'[{"a": tru}]'])
+
+
+@pytest.mark.parametrize(
+    "encoding, compress",
+    [
+        ("gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        ("gzip", lambda d: gzip.compress(d[:40]) + gzip.compress(d[40:])),
+    ],
+    ids=["gzip", "deflate", "gzip-multi-member"],
+)
+def test_compressed_bodies_decompress_on_the_fly(encoding, compress):
+    """gzip and deflate bodies decode at any chunking."""
+    data = compress(json.dumps(RECORDS).encode())
+
+    assert decode(split(data, random.Random(1), 50), encoding) == RECORDS
+
+
+def test_truncated_and_corrupt_compressed_bodies_are_rejected():
+    """Cut-off or garbled compressed data is an error."""
+    data = gzip.compress(json.dumps(RECORDS).encode())
+
+    with pytest.raises(MalformedBody):
+        decode([data[:-10]], "gzip")
+    with pytest.raises(MalformedBody):
+        decode([b"not gzip at all"], "gzip")
+
+
+def test_unsupported_encoding_is_rejected_before_reading():
+    """Unknown encodings fail when the reader is created."""
+    with pytest.raises(UnsupportedEncoding) as e:
+        BodyReader("br")
+    assert e.value.status == 415
+
+
+def test_declared_length_over_limit_is_rejected_before_reading():
+    """An oversize Content-Length fails without reading the body."""
+    limits = BodyLimits(max_body_bytes=100)
+
+    with pytest.raises(PayloadTooLarge) as e:
+        BodyReader.from_headers({"Content-Length": "101"}, limits)
+    assert e.value.status == 413
+    with pytest.raises(MalformedBody):
+        BodyReader.from_headers({"Content-Length": "abc"}, limits)
+
+
+def test_body_over_limit_is_rejected_while_streaming():
+    """Bodies without a Content-Length are cut off at the limit."""
+    body = json.dumps([{"n": i} for i in range(100)]).encode()
+    reader = BodyReader(limits=BodyLimits(max_body_bytes=200))
+
+    with pytest.raises(PayloadTooLarge):
+        list(iter_batches(split(body, random.Random(0), 64), reader))
+
+
+def test_decompression_bomb_is_stopped_at_decoded_limit():
+    """Highly compressed bodies stop at the decoded size limit."""
+    bomb = gzip.compress(b"[" + b" " * (50 * 1024 * 1024) + b"]")
+    reader = BodyReader("gzip", limits=BodyLimits(max_decoded_bytes=1024 * 1024))
+
+    with pytest.raises(PayloadTooLarge):
+        reader.feed(bomb)
+    assert reader.bytes_decoded <= 1024 * 1024 + body_reader.CHUNK_SIZE
+
+
+def test_oversize_record_is_rejected():
+    """One record over the record limit fails, even mid-stream."""
+    limits = BodyLimits(max_record_bytes=100)
+    big = json.dumps([{"m": "x" * 50}, {"m": "x" * 200}]).encode()
+
+    with pytest.raises(PayloadTooLarge):
+        decode(split(big, random.Random(0), 16), limits=limits)
+
+
+def test_records_just_under_the_limit_are_accepted_in_small_chunks():
+    """Retrying cut-off records never counts two records against the limit."""
+    limits = BodyLimits(max_record_bytes=1000)
+    body = json.dumps([{"m": "x" * 900}] * 5).encode()
+
+    assert len(decode(split(body, random.Random(0), 50), limits=limits)) == 5
+
+
+def test_buffer_holds_only_the_record_in_progress():
+    """Memory use stays bounded by record size, not by body size."""
+    record = json.dumps({"message": "x" * 500, "level": "info"}).encode()
+    body = b"[" + b",".join([record] * 5000) + b"]"
+    reader = BodyReader(limits=BodyLimits(batch_size=100))
+
+    peak = 0
+    for chunk in read_chunks(io.BytesIO(body), 4096):
+        reader.feed(chunk)
+        peak = max(peak, len(reader._scanner._text))
+    reader.close()
+
+    assert reader.records == 5000
+    assert peak < len(record) + 4096
+    assert len(body) > 100 * peak
+
+
+def test_batches_are_yielded_before_the_body_ends():
+    """Full batches are handed on while later chunks are still unread."""
+    body = b"\n".join(json.dumps({"n": i}).encode() for i in range(10))
+    read = []
+
+    def chunks():
+        for chunk in split(body, random.Random(2), 8):
+            read.append(chunk)
+            yield chunk
+
+    reader = BodyReader(limits=BodyLimits(batch_size=3))
+    batches = []
+    for batch in iter_batches(chunks(), reader):
+        batches.append((batch, len(read)))
+
+    assert [b for b, _ in batches] == [
+        [{"n": 0}, {"n": 1}, {"n": 2}],
+        [{"n": 3}, {"n": 4}, {"n": 5}],
+        [{"n": 6}, {"n": 7}, {"n": 8}],
+        [{"n": 9}],
+    ]
+    assert batches[0][1] < len(split(body, random.Random(2), 8))
+
+
+def test_async_batches_match_sync_batches():
+    """aiter_batches decodes an async chunk stream the same way."""
+    data = gzip.compress(json.dumps(RECORDS).encode())
+
+    async def chunks():
+        for chunk in split(data, random.Random(4), 30):
+            yield chunk
+
+    async def collect():
+        reader = BodyReader("gzip", limits=BodyLimits(batch_size=4))
+        return [batch async for batch in aiter_batches(chunks(), reader)]
+
+    assert asyncio.run(collect()) == [RECORDS[:4], RECORDS[4:]]
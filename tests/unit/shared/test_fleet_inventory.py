@@ -0,0 +1,135 @@
+"""Unit tests for the indexed Fleet inventory mirror."""
+
+import pytest
+
+from shared.monitoring.fleet_inventory import MAX_PER_PAGE, FleetInventory
+
+pytestmark = pytest.mark.unit
+
+
+def host(host_id, hostname, updated_at, **fields):
+    """Fleet host record with the fields the mirror indexes."""
+    record = {
+        "id": host_id,
+        "hostname": hostname,
+        "updated_at": updated_at,
+        "status": "online",
+        "platform": "ubuntu",
+        "team_id": 1,
+        "primary_ip": f"10.0.0.{host_id}",
+    }
+    record.update(fields)
+    return record
+
+
+@pytest.fixture
+def inventory():
+    """Inventory with four hosts, one label and one failing policy."""
+    inv = FleetInventory()
+    inv.upsert_hosts(
+        [
+            host(1, "web-1", "2026-01-01T00:00:01Z"),
+            host(2, "web-2", "2026-01-01T00:00:03Z", status="offline"),
+            host(3, "db-1", "2026-01-01T00:00:02Z", platform="darwin", team_id=2),
+            host(4, "cache-1", "2026-01-01T00:00:04Z"),
+        ]
+    )
+    inv.set_labels([{"id": 10, "name": "web"}], {10: [1, 2]})
+    inv.set_policies([{"id": 20, "name": "disk"}], {20: [2, 3]})
+    inv.mark_synced(full=True, now=1000.0)
+    return inv
+
+
+def test_upsert_advances_cursor_and_reindexes(inventory):
+    """Upserts move the updated_at cursor and replace index entries."""
+    assert inventory.cursor == "2026-01-01T00:00:04Z"
+    assert len(inventory) == 4
+
+    inventory.upsert_hosts([host(1, "web-1", "2026-01-01T00:00:09Z", status="offline")])
+    assert inventory.cursor == "2026-01-01T00:00:09Z"
+    total, hosts = inventory.query_hosts(status="offline")
+    assert total == 2
+    assert {h["id"] for h in hosts} == {1, 2}
+    assert inventory.query_hosts(status="online")[0] == 2
+
+
+def test_filters_combine(inventory):
+    """Equality, label, policy and text filters intersect."""
+    assert inventory.query_hosts(platform="darwin")[0] == 1
+    assert inventory.query_hosts(team_id=1, status="online")[0] == 2
+    assert [h["id"] for h in inventory.query_hosts(label_id=10)[1]] == [1, 2]
+    assert inventory.query_hosts(label_id=99)[0] == 0
+
+    failing = inventory.query_hosts(policy_id=20, policy_response="failing")[1]
+    assert [h["id"] for h in failing] == [3, 2]
+    passing = inventory.query_hosts(policy_id=20, policy_response="passing")[1]
+    assert [h["id"] for h in passing] == [4, 1]
+
+    assert [h["id"] for h in inventory.query_hosts(query="WEB")[1]] == [1, 2]
+    assert [h["id"] for h in inventory.query_hosts(query="10.0.0.3")[1]] == [3]
+
+
+def test_ordering_and_paging(inventory):
+    """Pages follow the requested order and report the full match count."""
+    total, page = inventory.query_hosts(order_key="updated_at", per_page=3)
+    assert total == 4
+    assert [h["id"] for h in page] == [1, 3, 2]
+
+    total, page = inventory.query_hosts(
+        order_key="updated_at", order_direction="desc", page=1, per_page=3
+    )
+    assert total == 4
+    assert [h["id"] for h in page] == [1]
+
+    assert inventory.query_hosts(page=5)[1] == []
+    with pytest.raises(ValueError):
+        inventory.query_hosts(order_key="memory")
+
+
+def test_per_page_is_capped():
+    """per_page above MAX_PER_PAGE is clamped."""
+    inv = FleetInventory()
+    inv.upsert_hosts(
+        host(i, f"h-{i:05d}", "2026-01-01T00:00:00Z") for i in range(MAX_PER_PAGE + 5)
+    )
+    total, page = inv.query_hosts(per_page=MAX_PER_PAGE * 2)
+    assert total == MAX_PER_PAGE + 5
+    assert len(page) == MAX_PER_PAGE
+
+
+def test_retain_drops_deleted_hosts(inventory):
+    """Hosts missing from a full sync leave every index."""
+    assert inventory.retain_hosts([1, 3, 4]) == 1
+
+    assert inventory.get_host(2) is None
+    assert inventory.query_hosts(status="offline")[0] == 0
+    assert [h["id"] for h in inventory.query_hosts(label_id=10)[1]] == [1]
+    failing = inventory.query_hosts(policy_id=20, policy_response="failing")[1]
+    assert [h["id"] for h in failing] == [3]
+
+
+def test_get_host_includes_memberships(inventory):
+    """Host detail carries its label and failing-policy IDs."""
+    detail = inventory.get_host(2)
+    assert detail["hostname"] == "web-2"
+    assert detail["label_ids"] == [10]
+    assert detail["failing_policy_ids"] == [20]
+    assert "label_ids" not in inventory.hosts[2]
+
+
+def test_staleness():
+    """Staleness reports age against max_age and the last sync error."""
+    inv = FleetInventory()
+    assert not inv.ready
+    assert inv.staleness(60, now=0)["stale"] is True
+
+    inv.mark_synced(full=True, now=1000.0)
+    assert inv.ready
+    state = inv.staleness(60, now=1030.0)
+    assert state["age_seconds"] == 30.0
+    assert state["stale"] is False
+
+    inv.last_error = "timeout"
+    state = inv.staleness(60, now=1090.0)
+    assert state["stale"] is True
+    assert state["last_error"] == "timeout"
@@ -0,0 +1,144 @@
+"""Unit tests for the async license validation cache."""
+
+import asyncio
+import json
+
+import pytest
+
+from shared.licensing.cache import LicenseCache, license_key_hash
+
+pytestmark = pytest.mark.unit
+
+LICENSE_KEY = "PENG-AAAA-BBBB-CCCC-DDDD-EEEE"
+VALID = {"valid": True, "tier": "enterprise"}
+
+
+class Clock:
+    """Manually advanced clock."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Fetcher:
+    """Counting license server stand-in."""
+
+    def __init__(self, result=VALID, delay=0.01):
+        self.calls = 0
+        self.result = result
+        self.delay = delay
+        self.error = None
+
+    async def __call__(self, license_key):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def clock():
+    """Clock starting at t=1000."""
+    return Clock()
+
+
+@pytest.fixture
+def fetcher():
+    """Fetcher returning a valid enterprise license."""
+    return Fetcher()
+
+
+def make_cache(fetcher, clock, **kwargs):
+    kwargs.setdefault("jitter", 0)
+    return LicenseCache(fetcher, ttl=60, stale_ttl=600, clock=clock, **kwargs)
+
+
+def test_concurrent_misses_share_one_fetch(fetcher, clock):
+    """A burst of lookups for one key makes a single upstream call."""
+
+    async def run():
+        cache = make_cache(fetcher, clock)
+        return await asyncio.gather(*(cache.get(LICENSE_KEY) for _ in range(50)))
+
+    results = asyncio.run(run())
+    assert fetcher.calls == 1
+    assert all(r == VALID for r in results)
+
+
+def test_fresh_hit_and_stale_while_revalidate(fetcher, clock):
+    """Expired entries are served immediately and refreshed in the background."""
+
+    async def run():
+        cache = make_cache(fetcher, clock)
+        await cache.get(LICENSE_KEY)
+        await cache.get(LICENSE_KEY)
+        assert fetcher.calls == 1
+
+        clock.now += 120
+        fetcher.result = {"valid": True, "tier": "professional"}
+        stale = await cache.get(LICENSE_KEY)
+        assert stale["tier"] == "enterprise"
+        await asyncio.sleep(0.05)
+        return await cache.get(LICENSE_KEY), cache.stats()
+
+    result, stats = asyncio.run(run())
+    assert result["tier"] == "professional"
+    assert fetcher.calls == 2
+    assert stats["hits"] == 2 and stats["stale"] == 1 and stats["misses"] == 1
+
+
+def test_rejected_keys_cached_but_errors_are_not(fetcher, clock):
+    """Invalid keys are cached negatively; transport errors retry."""
+    rejecting = Fetcher(result=None)
+
+    async def run():
+        cache = make_cache(rejecting, clock, negative_ttl=30)
+        assert await cache.get(LICENSE_KEY) is None
+        assert await cache.get(LICENSE_KEY) is None
+
+        fetcher.error = RuntimeError("connection refused")
+        cache = make_cache(fetcher, clock)
+        assert await cache.get(LICENSE_KEY) is None
+        fetcher.error = None
+        return await cache.get(LICENSE_KEY)
+
+    assert asyncio.run(run()) == VALID
+    assert rejecting.calls == 1
+    assert fetcher.calls == 2
+
+
+def test_snapshot_round_trip(fetcher, clock, tmp_path):
+    """Valid entries survive a restart without calling the server again."""
+    path = str(tmp_path / "license.json")
+
+    async def run():
+        cache = make_cache(fetcher, clock, snapshot_path=path)
+        await cache.get(LICENSE_KEY)
+        await cache.close()
+
+        restarted = make_cache(fetcher, clock, snapshot_path=path)
+        assert restarted.load_snapshot() == 1
+        return await restarted.get(LICENSE_KEY)
+
+    assert asyncio.run(run())["tier"] == "enterprise"
+    assert fetcher.calls == 1
+
+    with open(path) as f:
+        snapshot = json.load(f)
+    assert list(snapshot["entries"]) == [license_key_hash(LICENSE_KEY)]
+    assert LICENSE_KEY not in json.dumps(snapshot)
+
+
+def test_snapshot_skips_entries_past_stale_window(fetcher, clock, tmp_path):
+    """Entries too old to serve are not loaded."""
+    path = str(tmp_path / "license.json")
+    cache = make_cache(fetcher, clock, snapshot_path=path)
+    asyncio.run(cache.get(LICENSE_KEY))
+    cache.save_snapshot()
+
+    clock.now += 60 + 600
+    assert make_cache(fetcher, clock, snapshot_path=path).load_snapshot() == 0
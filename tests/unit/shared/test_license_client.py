@@ -0,0 +1,60 @@
+"""Tests for the synchronous license client's feature checks."""
+
+import pytest
+
+from shared.licensing.client import PenguinTechLicenseClient
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """License client whose validate() is counted and controllable."""
+    client = PenguinTechLicenseClient("PENG-TEST", "killkrill")
+    client.calls = 0
+    client.result = {"valid": False, "message": "Validation error: timed out"}
+
+    def validate():
+        client.calls += 1
+        if client.result.get("valid"):
+            client._cache["validation"] = {
+                "data": client.result,
+                "timestamp": client.now,
+            }
+        return client.result
+
+    client.now = 1000.0
+    monkeypatch.setattr(client, "validate", validate)
+    monkeypatch.setattr("shared.licensing.client.time.time", lambda: client.now)
+    return client
+
+
+def test_failed_validation_backs_off(client):
+    """A failed validation is not retried by every caller."""
+    assert client.check_feature("sso") is False
+    assert client.check_feature("sso") is False
+    assert client.check_feature("ai_analysis") is False
+    assert client.calls == 1
+
+    client.now += client._retry_backoff + 1
+    client.result = {
+        "valid": True,
+        "features": [{"name": "sso", "entitled": True}],
+    }
+    assert client.check_feature("sso") is True
+    assert client.calls == 2
+
+
+def test_failure_is_cached_over_an_expired_validation(client):
+    """A failed refresh of an expired validation is also not retried."""
+    client.result = {
+        "valid": True,
+        "features": [{"name": "sso", "entitled": True}],
+    }
+    assert client.check_feature("sso") is True
+
+    client.now += client._cache_timeout + 1
+    client.result = {"valid": False, "message": "Validation error: timed out"}
+    assert client.check_feature("sso") is False
+    assert client.check_feature("sso") is False
+    assert client.calls == 2
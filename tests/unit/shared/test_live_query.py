@@ -0,0 +1,115 @@
+"""Unit tests for Fleet live query job progress and result decoding."""
+
+import json
+
+import pytest
+
+from shared.monitoring.live_query import (
+    CampaignProgress,
+    LiveQueryError,
+    decode_job,
+    page_results,
+    sse_event,
+    status_fields,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def result_message(host_id, rows, error=None):
+    """Fleet results-websocket message for one host."""
+    return {
+        "type": "result",
+        "data": {
+            "host": {"id": host_id, "hostname": f"host-{host_id}"},
+            "rows": rows,
+            "error": error,
+        },
+    }
+
+
+def test_progress_counts_results_and_finishes():
+    """Results become stream entries; totals and status update counters."""
+    progress = CampaignProgress()
+
+    assert progress.apply({"type": "totals", "data": {"count": 3, "online": 2}}) is None
+    entry = progress.apply(result_message(1, [{"version": "14.4"}]))
+    assert entry["type"] == "result"
+    assert entry["host_id"] == "1"
+    assert entry["hostname"] == "host-1"
+    assert json.loads(entry["rows"]) == [{"version": "14.4"}]
+
+    progress.apply(result_message(2, [], error="no such table"))
+    progress.apply(
+        {"type": "status", "data": {"expected_results": 2, "status": "finished"}}
+    )
+
+    assert progress.finished
+    assert progress.meta() == {
+        "hosts_responded": "2",
+        "hosts_failed": "1",
+        "rows_returned": "1",
+        "expected_results": "2",
+        "hosts_targeted": "3",
+        "hosts_online": "2",
+    }
+    assert all(isinstance(v, str) for v in entry.values())
+
+
+def test_progress_raises_on_campaign_error():
+    """A Fleet error message fails the job."""
+    with pytest.raises(LiveQueryError):
+        CampaignProgress().apply({"type": "error", "data": "campaign not found"})
+
+
+def test_decode_job_marks_orphaned_jobs_timed_out():
+    """Running jobs past their deadline are reported as timed out."""
+    fields = {
+        "job_id": "abc",
+        "status": "running",
+        "campaign_id": "7",
+        "hosts_responded": "4",
+        "created_at": "100.0",
+        "deadline": "400.0",
+    }
+
+    job = decode_job(fields, now=200.0)
+    assert job["status"] == "running"
+    assert job["campaign_id"] == 7
+    assert job["hosts_responded"] == 4
+    assert decode_job(fields, now=401.0)["status"] == "timed_out"
+    assert decode_job({**fields, "status": "completed"}, now=401.0)["status"] == (
+        "completed"
+    )
+
+
+def test_page_results_skips_status_entries():
+    """Pages hold host results only, and the cursor passes status entries."""
+    progress = CampaignProgress()
+    entries = [
+        ("1-0", status_fields("running")),
+        ("2-0", progress.apply(result_message(1, [{"a": "1"}]))),
+        ("3-0", progress.apply(result_message(2, [], error="timeout"))),
+        ("4-0", status_fields("completed")),
+    ]
+
+    results, cursor = page_results(entries)
+    assert [r["host_id"] for r in results] == [1, 2]
+    assert results[0]["rows"] == [{"a": "1"}]
+    assert results[0]["error"] is None
+    assert results[1]["error"] == "timeout"
+    assert cursor == "4-0"
+
+    assert page_results([], cursor="4-0") == ([], "4-0")
+
+
+def test_sse_event_format():
+    """Each stream entry becomes one event with its stream ID."""
+    frame = sse_event("5-0", status_fields("failed", "websocket closed"))
+    lines = frame.splitlines()
+
+    assert frame.endswith("\n\n")
+    assert lines[0] == "id: 5-0"
+    assert lines[1] == "event: status"
+    payload = json.loads(lines[2].removeprefix("data: "))
+    assert payload == {"status": "failed", "error": "websocket closed", "id": "5-0"}
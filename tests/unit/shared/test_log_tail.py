@@ -0,0 +1,84 @@
+"""Unit tests for live log tail filters and sampling."""
+
+import time
+
+import pytest
+
+from shared.monitoring.log_tail import LogFilter, TailSampler, normalize_level
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def entry():
+    """A log stream entry as read from logs:raw."""
+    return {
+        "source": "nginx",
+        "level": "WARN",
+        "message": "Upstream timed out while reading response",
+    }
+
+
+def test_empty_filter_matches_everything(entry):
+    """No conditions means every entry passes."""
+    assert LogFilter.from_spec(None).matches(entry)
+
+
+def test_filter_conditions(entry):
+    """Source, level, substring and glob must all match."""
+    assert LogFilter.from_spec(
+        {"source": ["nginx", "haproxy"], "min_level": "warning", "contains": "TIMED"}
+    ).matches(entry)
+    assert LogFilter.from_spec({"glob": "upstream*TIMED*response"}).matches(entry)
+    assert not LogFilter.from_spec({"glob": "response*upstream"}).matches(entry)
+    assert not LogFilter.from_spec({"source": "postgres"}).matches(entry)
+    assert not LogFilter.from_spec({"min_level": "error"}).matches(entry)
+    assert not LogFilter.from_spec({"level": "info"}).matches(entry)
+
+
+def test_equivalent_specs_share_a_key():
+    """Subscribers with the same filter are grouped together."""
+    a = LogFilter.from_spec({"source": ["b", "a"], "level": "warn"})
+    b = LogFilter.from_spec({"level": ["warning"], "source": ["a", "b"]})
+    assert a.key == b.key
+
+
+def test_invalid_filters_raise_value_error():
+    """Bad levels, overlong globs and regexes are rejected."""
+    with pytest.raises(ValueError):
+        LogFilter.from_spec({"min_level": "loud"})
+    with pytest.raises(ValueError):
+        LogFilter.from_spec({"glob": "a" * 257})
+    with pytest.raises(ValueError):
+        LogFilter.from_spec({"regex": "timed.*out"})
+
+
+def test_glob_matching_stays_linear():
+    """Patterns that backtrack catastrophically as regexes match quickly."""
+    log_filter = LogFilter.from_spec({"glob": "*a*a*a*a*a*a*a*a*b"})
+    entry = {"message": "a" * 100_000}
+
+    start = time.perf_counter()
+    assert not log_filter.matches(entry)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_normalize_level_aliases():
+    """Common level aliases map to canonical names."""
+    assert normalize_level("ERR") == "error"
+    assert normalize_level(None) == "info"
+
+
+def test_sampler_sample_rate():
+    """A 0.25 sample rate passes every fourth entry."""
+    sampler = TailSampler(sample_rate=0.25, max_per_second=1000)
+    passed = [sampler.allow(now=0.0) for _ in range(8)]
+    assert passed.count(True) == 2
+    assert sampler.suppressed == 6
+
+
+def test_sampler_rate_limit_refills():
+    """The per-second cap refills over time."""
+    sampler = TailSampler(max_per_second=2)
+    assert [sampler.allow(now=100.0) for _ in range(3)] == [True, True, False]
+    assert sampler.allow(now=100.5)
@@ -0,0 +1,113 @@
+"""Unit tests for the shared request metrics collector."""
+
+import threading
+
+import pytest
+from prometheus_client import generate_latest
+
+from shared.monitoring.metrics import MetricsCollector, RequestMetrics
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def collector():
+    """Metrics collector for a hyphenated service name."""
+    return MetricsCollector("flask-backend")
+
+
+def sample(collector, name, labels):
+    """Read one sample value from the collector's registry."""
+    return collector.registry.get_sample_value(name, labels)
+
+
+def test_record_request_counts_and_observes(collector):
+    """Requests land in the counter and the latency histogram."""
+    collector.record_request("GET", "/api/v1/users/<int:user_id>", "200", 0.02)
+    collector.record_request("GET", "/api/v1/users/<int:user_id>", "404", 3.0)
+
+    route = {"method": "GET", "endpoint": "/api/v1/users/<int:user_id>"}
+    assert (
+        sample(
+            collector,
+            "killkrill_flask_backend_requests_total",
+            {**route, "status": "200"},
+        )
+        == 1
+    )
+    assert (
+        sample(
+            collector, "killkrill_flask_backend_request_duration_seconds_count", route
+        )
+        == 2
+    )
+    assert (
+        sample(
+            collector,
+            "killkrill_flask_backend_request_duration_seconds_bucket",
+            {**route, "le": "0.025"},
+        )
+        == 1
+    )
+    assert (
+        sample(
+            collector,
+            "killkrill_flask_backend_request_duration_seconds_bucket",
+            {**route, "le": "+Inf"},
+        )
+        == 2
+    )
+
+
+def test_thread_totals_are_merged_on_scrape():
+    """Each thread aggregates locally; a scrape sees the sum."""
+    metrics = RequestMetrics("test_service")
+
+    def worker():
+        for _ in range(1000):
+            metrics.observe("POST", "/ingest", "202", 0.001)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    families = {family.name: family for family in metrics.collect()}
+    (requests,) = families["test_service_requests"].samples
+    assert requests.value == 4000
+
+
+def test_exited_threads_do_not_keep_shards():
+    """A thread per request leaves no shard behind, only its totals."""
+    metrics = RequestMetrics("test_service")
+    metrics.observe("GET", "/health", "200", 0.001)
+
+    for _ in range(200):
+        thread = threading.Thread(
+            target=metrics.observe, args=("GET", "/health", "200", 0.001)
+        )
+        thread.start()
+        thread.join()
+
+    assert len(metrics._shards) == 1
+    families = {family.name: family for family in metrics.collect()}
+    (requests,) = families["test_service_requests"].samples
+    assert requests.value == 201
+
+
+def test_errors_and_connections_use_direct_references(collector):
+    """Error counter and connection gauge are updated without registry scans."""
+    collector.increment_error("timeout")
+    collector.set_active_connections(7)
+
+    assert (
+        sample(
+            collector, "killkrill_flask_backend_errors_total", {"error_type": "timeout"}
+        )
+        == 1
+    )
+    assert sample(collector, "killkrill_flask_backend_active_connections", {}) == 7
+    assert b"killkrill_flask_backend_requests_total" in generate_latest(
+        collector.registry
+    )
@@ -0,0 +1,140 @@
+"""Unit tests for keyset pagination."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from pydal import DAL, Field
+
+from shared.database.models import ensure_index
+from shared.database.pagination import (
+    after_cursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+    parse_limit,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def db():
+    """In-memory database with timestamp ties between rows."""
+    db = DAL("sqlite:memory")
+    db.define_table(
+        "results",
+        Field("check_id", "string"),
+        Field("timestamp", "datetime"),
+    )
+    base = datetime(2026, 1, 1)
+    for i in range(25):
+        db.results.insert(
+            check_id="c1" if i % 2 else "c2",
+            timestamp=base - timedelta(minutes=i // 3),
+        )
+    yield db
+    db.close()
+
+
+def test_cursor_round_trip():
+    """Cursors decode to the position they were built from."""
+    ts = datetime(2026, 1, 1, 12, 30, 15, 250)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_invalid_cursor_raises_value_error():
+    """Malformed cursors are rejected with ValueError."""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_pages_cover_every_row_once(db):
+    """Walking all pages yields each row exactly once, newest first."""
+    seen, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(
+            db, db.results, db.results.timestamp, db.results.id, 7, cursor
+        )
+        seen.extend((r.timestamp, r.id) for r in rows)
+        if cursor is None:
+            break
+
+    assert len(seen) == 25
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_cursor_round_trip_without_timestamp():
+    """Rows with a NULL sort timestamp still get a cursor."""
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+def test_undated_rows_follow_dated_rows(db):
+    """NULL timestamps are listed last, by id, and can be paged past."""
+    for _ in range(5):
+        db.results.insert(check_id="c3", timestamp=None)
+    undated = [r.id for r in db(db.results.timestamp == None).select()]  # noqa: E711
+
+    seen, cursor = [], None
+    for page_size in (4, 20, 3, 3):
+        rows, cursor = keyset_page(
+            db, db.results, db.results.timestamp, db.results.id, page_size, cursor
+        )
+        seen.extend(r.id for r in rows)
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert len(seen) == len(set(seen)) == 30
+    assert seen[-5:] == sorted(undated, reverse=True)
+
+
+def test_filtered_pages(db):
+    """Filters combine with the cursor condition."""
+    rows, cursor = keyset_page(
+        db, db.results.check_id == "c1", db.results.timestamp, db.results.id, 10
+    )
+    rest, last = keyset_page(
+        db,
+        db.results.check_id == "c1",
+        db.results.timestamp,
+        db.results.id,
+        10,
+        cursor,
+    )
+
+    assert len(rows) == 10 and len(rest) == 2
+    assert last is None
+    assert {r.check_id for r in rows} | {r.check_id for r in rest} == {"c1"}
+
+
+def test_cursor_condition_bounds_the_index_range(db):
+    """The cursor condition is a range on the timestamp, not only an OR."""
+    cursor = encode_cursor(datetime(2026, 1, 1), 7)
+    condition = after_cursor(db.results.timestamp, db.results.id, cursor)
+
+    assert str(condition).startswith(
+        """(("results"."timestamp" <= '2026-01-01 00:00:00') AND """
+    )
+
+
+def test_ensure_index_is_idempotent(db):
+    """Creating the same index twice is a no-op."""
+    for _ in range(2):
+        ensure_index(
+            db,
+            db.results,
+            "idx_results_check_ts",
+            db.results.check_id,
+            db.results.timestamp,
+        )
+
+    names = [r[0] for r in db.executesql("SELECT name FROM sqlite_master")]
+    assert "idx_results_check_ts" in names
+
+
+def test_parse_limit_clamps():
+    """Limits are clamped and fall back to the default."""
+    assert parse_limit(None) == 100
+    assert parse_limit("abc", default=20) == 20
+    assert parse_limit("0") == 1
+    assert parse_limit("5000") == 1000
@@ -0,0 +1,212 @@
+"""Unit tests for the py_libs token bucket rate limiter."""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+PY_LIBS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "shared", "py_libs")
+)
+if PY_LIBS_DIR not in sys.path:
+    sys.path.insert(0, PY_LIBS_DIR)
+
+from py_libs.security.ratelimit import (  # noqa: E402
+    RateLimit,
+    RedisTokenBucketLimiter,
+    TokenBucketLimiter,
+    acquire_async,
+    client_address,
+    parse_networks,
+)
+
+pytestmark = pytest.mark.unit
+
+GRPC_SECRET = "grpc-rate-limit-test-secret-0123456789"
+
+
+class Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenRedis:
+    """Redis client whose scripts always fail."""
+
+    def register_script(self, script):
+        def call(keys, args):
+            raise ConnectionError("redis down")
+
+        return call
+
+
+@pytest.fixture
+def clock():
+    """Clock starting at t=0."""
+    return Clock()
+
+
+@pytest.fixture
+def limiter(clock):
+    """10 requests per second with a burst of 3."""
+    return TokenBucketLimiter(
+        RateLimit.per_second(10, burst=3), shards=4, sweep_interval=1.0, clock=clock
+    )
+
+
+def test_burst_then_refill(limiter, clock):
+    """A full bucket allows the burst, then refills at the configured rate."""
+    assert [limiter.acquire("tenant").allowed for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+
+    rejected = limiter.acquire("tenant")
+    assert rejected.retry_after == pytest.approx(0.1)
+    assert rejected.headers()["Retry-After"] == "1"
+
+    clock.now += 0.1
+    assert limiter.acquire("tenant").allowed
+    assert limiter.acquire("other").allowed
+
+
+def test_cost_and_per_call_limits(limiter):
+    """Batches take several tokens and callers may override the limit."""
+    assert not limiter.acquire("batch", cost=5).allowed
+    big = RateLimit.per_minute(6000, burst=1000)
+    result = limiter.acquire("ingest", cost=500, limit=big)
+    assert result.allowed and result.remaining == 500
+
+
+def test_idle_buckets_are_evicted(limiter, clock):
+    """Buckets idle long enough to be full again are dropped on sweep."""
+    for i in range(100):
+        limiter.acquire(f"client-{i}")
+    assert len(limiter) == 100
+
+    clock.now += 1.0
+    limiter.acquire("fresh")
+    for i in range(100):
+        limiter.acquire(f"other-{i}")
+    assert len(limiter) == 101
+    assert all(
+        key.startswith("other-") or key == "fresh"
+        for shard in limiter._shards
+        for key in shard.buckets
+    )
+
+
+def test_redis_failure_falls_back_to_local(limiter):
+    """Redis errors use the local limiter, or fail open without one."""
+    limit = RateLimit.per_second(10, burst=3)
+    with_fallback = RedisTokenBucketLimiter(BrokenRedis(), limit, fallback=limiter)
+    assert [with_fallback.acquire("t").allowed for _ in range(4)][-1] is False
+
+    fail_open = RedisTokenBucketLimiter(BrokenRedis(), limit)
+    assert all(fail_open.acquire("t").allowed for _ in range(10))
+
+
+def test_acquire_async_uses_local_limiter(limiter):
+    """Local limiters work from async hooks."""
+    result = asyncio.run(acquire_async(limiter, "tenant", cost=3))
+    assert result.allowed and result.remaining == 0
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers():
+    """Clients cannot pick their own key by sending X-Forwarded-For."""
+    assert client_address("203.0.113.9", "1.2.3.4") == "203.0.113.9"
+    assert client_address("203.0.113.9", "1.2.3.4", parse_networks("10.0.0.0/8")) == (
+        "203.0.113.9"
+    )
+    assert client_address(None) == "unknown"
+
+
+def test_forwarded_for_from_trusted_proxies_skips_proxy_hops():
+    """The client is the rightmost address not belonging to a trusted proxy."""
+    trusted = parse_networks("10.0.0.0/8, 192.168.1.5")
+
+    # A spoofed left-most entry does not change the key
+    assert client_address("10.0.0.2", "6.6.6.6, 198.51.100.7, 10.0.0.1", trusted) == (
+        "198.51.100.7"
+    )
+    assert client_address("192.168.1.5", "198.51.100.7", trusted) == "198.51.100.7"
+    with pytest.raises(ValueError):
+        parse_networks("not-a-network")
+
+
+class AbortCalled(Exception):
+    """Raised by FakeContext.abort, as grpc does."""
+
+
+class FakeContext:
+    """Subset of grpc.ServicerContext used by the rate limit interceptor."""
+
+    def __init__(self, peer):
+        self._peer = peer
+
+    def peer(self):
+        return self._peer
+
+    def abort(self, code, details):
+        raise AbortCalled(code)
+
+
+def _grpc_call(interceptor, metadata, peer="ipv4:203.0.113.9:5000"):
+    grpc = pytest.importorskip("grpc")
+    details = SimpleNamespace(method="/svc/Call", invocation_metadata=metadata)
+    handler = interceptor.intercept_service(
+        lambda _: grpc.unary_unary_rpc_method_handler(lambda req, ctx: "ok"),
+        details,
+    )
+    try:
+        return handler.unary_unary(None, FakeContext(peer))
+    except AbortCalled:
+        return "limited"
+
+
+def test_grpc_buckets_ignore_forged_tokens_and_headers():
+    """Unverified subjects and forwarded-for headers do not mint buckets."""
+    interceptors = pytest.importorskip("py_libs.grpc.interceptors")
+    jwt = pytest.importorskip("jwt")
+    auth = interceptors.AuthInterceptor(GRPC_SECRET)
+    limiter = interceptors.RateLimitInterceptor(requests_per_minute=1, auth=auth)
+
+    def bearer(sub, key=GRPC_SECRET):
+        return [("authorization", f"Bearer {jwt.encode({'sub': sub}, key)}")]
+
+    assert _grpc_call(limiter, bearer("alice")) == "ok"
+    assert _grpc_call(limiter, bearer("alice")) == "limited"
+    assert _grpc_call(limiter, bearer("bob")) == "ok"
+
+    # Forged tokens and spoofed hops fall back to the peer's own bucket
+    assert _grpc_call(limiter, bearer("mallory", key=GRPC_SECRET[::-1])) == "ok"
+    assert _grpc_call(limiter, bearer("eve", key=GRPC_SECRET[::-1])) == "limited"
+    assert _grpc_call(limiter, [("x-forwarded-for", "1.2.3.4")]) == "limited"
+    assert _grpc_call(limiter, [], peer="ipv6:[2001:db8::1]:5000") == "ok"
+
+
+def test_grpc_ip_buckets_trust_forwarded_for_only_from_proxies():
+    """Per-IP mode uses the peer address unless the peer is a trusted proxy."""
+    interceptors = pytest.importorskip("py_libs.grpc.interceptors")
+    limiter = interceptors.RateLimitInterceptor(
+        requests_per_minute=1, per_user=False, trusted_proxies="10.0.0.0/8"
+    )
+    proxy = "ipv4:10.0.0.2:443"
+
+    assert _grpc_call(limiter, [("x-forwarded-for", "198.51.100.7")], proxy) == "ok"
+    assert _grpc_call(limiter, [("x-forwarded-for", "198.51.100.8")], proxy) == "ok"
+    assert (
+        _grpc_call(limiter, [("x-forwarded-for", "6.6.6.6, 198.51.100.7")], proxy)
+        == "limited"
+    )
+    assert _grpc_call(limiter, [("x-forwarded-for", "1.1.1.1")]) == "ok"
+    assert _grpc_call(limiter, [("x-forwarded-for", "2.2.2.2")]) == "limited"
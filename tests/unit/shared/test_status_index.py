@@ -0,0 +1,88 @@
+"""Unit tests for the sensor status index."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from shared.monitoring.status_index import (
+    HourBucket,
+    SensorStatusIndex,
+    hour_bucket,
+    summarize_buckets,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def index() -> SensorStatusIndex:
+    """Create an empty status index."""
+    return SensorStatusIndex()
+
+
+def test_record_tracks_latest_per_check_and_agent(index):
+    """Newest result wins per (check, agent) and per check."""
+    now = datetime.utcnow()
+    index.record("c1", "a1", "up", 10, now - timedelta(minutes=2))
+    index.record("c1", "a2", "down", 20, now - timedelta(minutes=1))
+
+    assert index.latest("c1", "a1")["status"] == "up"
+    assert index.latest("c1")["agent_id"] == "a2"
+    assert index.latest_by_check()["c1"]["status"] == "down"
+    assert len(index) == 2
+
+
+def test_out_of_order_result_does_not_replace_latest(index):
+    """A late-arriving older result is counted but not made latest."""
+    now = datetime.utcnow()
+    index.record("c1", "a1", "up", 10, now)
+
+    assert index.record("c1", "a1", "down", 10, now - timedelta(minutes=5)) is False
+    assert index.latest("c1", "a1")["status"] == "up"
+    assert index.rolling_counters()["total_results"] == 2
+
+
+def test_rolling_counters(index):
+    """Counters aggregate failures, uptime and mean response time."""
+    now = datetime.utcnow()
+    index.record("c1", "a1", "up", 10, now)
+    index.record("c1", "a1", "timeout", None, now)
+    index.record("c2", "a1", "up", 30, now - timedelta(hours=2))
+    index.record("c2", "a1", "error", 20, now - timedelta(hours=2))
+
+    counters = index.rolling_counters()
+    assert counters["total_results"] == 4
+    assert counters["failed_results"] == 2
+    assert counters["uptime_percentage"] == 50.0
+    assert counters["avg_response_time_ms"] == 20.0
+
+
+def test_results_outside_window_are_not_counted(index):
+    """Results older than the window only update latest state."""
+    old = datetime.utcnow() - timedelta(hours=30)
+    index.record("c1", "a1", "down", 10, old)
+
+    assert index.rolling_counters()["total_results"] == 0
+    assert index.latest("c1")["status"] == "down"
+
+
+def test_add_bucket_and_forget_check(index):
+    """Warm-up buckets merge into counters; deleted checks are dropped."""
+    now = datetime.utcnow()
+    index.add_bucket(hour_bucket(now), HourBucket(total=10, failed=1))
+    index.record("c1", "a1", "up", 5, now)
+    index.forget_check("c1")
+
+    assert index.rolling_counters()["total_results"] == 11
+    assert index.latest("c1") is None
+    assert index.entries() == []
+
+
+def test_summarize_empty_buckets():
+    """An empty window reports full uptime."""
+    assert summarize_buckets([]) == {
+        "total_results": 0,
+        "failed_results": 0,
+        "uptime_percentage": 100.0,
+        "avg_response_time_ms": 0.0,
+    }
@@ -0,0 +1,103 @@
+"""Unit tests for log event sampling and the non-blocking queue handler."""
+
+import logging
+import queue
+
+import pytest
+import structlog
+
+from shared.monitoring.structured_logging import DroppingQueueHandler, EventSampler
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def emit(sampler, event, level="info"):
+    """Run one event through the sampler; None if it was dropped."""
+    try:
+        return sampler(None, level, {"event": event})
+    except structlog.DropEvent:
+        return None
+
+
+def test_sampler_allows_a_burst_then_drops():
+    """A key gets burst events at once, then is limited to its rate."""
+    clock = FakeClock()
+    sampler = EventSampler(rate=1.0, burst=3, clock=clock)
+
+    results = [emit(sampler, "batch_done") for _ in range(5)]
+
+    assert [r is not None for r in results] == [True, True, True, False, False]
+    assert sampler.stats() == {"batch_done": 2}
+
+
+def test_sampler_reports_dropped_count_on_next_event():
+    """The next emitted event carries how many were dropped before it."""
+    clock = FakeClock()
+    sampler = EventSampler(rate=1.0, burst=1, clock=clock)
+    emit(sampler, "batch_done")
+    for _ in range(9):
+        assert emit(sampler, "batch_done") is None
+
+    clock.now = 1.0
+    event = emit(sampler, "batch_done")
+
+    assert event["sampled_out"] == 9
+    assert sampler.stats() == {}
+
+
+def test_sampler_limits_each_key_separately():
+    """One noisy event does not use up another event's budget."""
+    sampler = EventSampler(rate=1.0, burst=1, clock=FakeClock())
+    emit(sampler, "noisy")
+
+    assert emit(sampler, "noisy") is None
+    assert emit(sampler, "quiet") is not None
+
+
+def test_sampler_never_drops_warnings_or_errors():
+    """Warning and error events bypass the rate limit."""
+    sampler = EventSampler(rate=1.0, burst=1, clock=FakeClock())
+
+    emit(sampler, "failure")
+
+    for level in ("warning", "error", "exception", "critical"):
+        assert all(emit(sampler, "failure", level) for _ in range(10))
+    assert emit(sampler, "failure") is None
+
+
+def test_sampler_overrides_and_zero_rate():
+    """Overrides set a per-key rate; a rate of 0 disables limiting."""
+    sampler = EventSampler(
+        rate=0, overrides={"log_submitted": 1.0}, burst=1, clock=FakeClock()
+    )
+
+    assert all(emit(sampler, "anything") for _ in range(100))
+    assert emit(sampler, "log_submitted") is not None
+    assert emit(sampler, "log_submitted") is None
+
+
+def test_queue_handler_drops_when_full_instead_of_blocking():
+    """A full queue drops new records and counts them."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test_structured_logging.drop")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.warning("event %d", i)
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().msg == "event 0"
+    assert handler.queue.get_nowait().args is None
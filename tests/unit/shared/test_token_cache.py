@@ -0,0 +1,209 @@
+"""Unit tests for the verified-token cache and revoked-token set."""
+
+import asyncio
+
+import jwt
+import pytest
+from py_libs.security.token_cache import (
+    RevocationSet,
+    TokenRevoked,
+    VerifiedTokenCache,
+)
+
+from shared.auth.middleware import MultiAuthMiddleware, generate_jwt_token
+
+pytestmark = pytest.mark.unit
+
+SECRET = "test-secret"
+
+
+class Clock:
+    """Manually advanced wall clock."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Sorted-set subset of a synchronous Redis client."""
+
+    def __init__(self):
+        self.zsets = {}
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zremrangebyscore(self, key, low, high):
+        members = self.zsets.get(key, {})
+        for member, score in list(members.items()):
+            if score <= float(high):
+                del members[member]
+
+    def zrangebyscore(self, key, low, high, withscores=False):
+        return [
+            (member, score)
+            for member, score in self.zsets.get(key, {}).items()
+            if score >= float(low)
+        ]
+
+
+class FakeAsyncRedis(FakeRedis):
+    """Asyncio flavour of FakeRedis."""
+
+    async def zadd(self, key, mapping):
+        FakeRedis.zadd(self, key, mapping)
+
+    async def zremrangebyscore(self, key, low, high):
+        FakeRedis.zremrangebyscore(self, key, low, high)
+
+    async def zrangebyscore(self, key, low, high, withscores=False):
+        return FakeRedis.zrangebyscore(self, key, low, high, withscores)
+
+
+@pytest.fixture
+def clock():
+    """Clock shared by a cache and its revocation set."""
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    """Small cache on the manual clock."""
+    return VerifiedTokenCache(
+        max_entries=3, revocations=RevocationSet(clock=clock), clock=clock
+    )
+
+
+def counting_decoder(claims):
+    """Decoder returning fixed claims and counting its calls."""
+    calls = []
+
+    def decode(token):
+        calls.append(token)
+        return dict(claims)
+
+    return decode, calls
+
+
+def test_verified_claims_are_reused_until_exp(cache, clock):
+    """A token is decoded once, then served from cache until exp."""
+    decode, calls = counting_decoder({"sub": "u1", "exp": clock.now + 60})
+
+    assert cache.verify("token-a", decode)["sub"] == "u1"
+    assert cache.verify("token-a", decode)["sub"] == "u1"
+    assert len(calls) == 1
+
+    clock.now += 61
+    cache.verify("token-a", decode)
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_namespaces_and_failures_are_not_shared(cache, clock):
+    """Namespaces get separate entries and failed verifications are not cached."""
+    decode, calls = counting_decoder({"exp": clock.now + 60})
+    cache.verify("token-a", decode, namespace="key-1")
+    cache.verify("token-a", decode, namespace="key-2")
+    assert len(calls) == 2
+
+    def reject(token):
+        raise ValueError("bad signature")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.verify("token-b", reject)
+    assert cache.get("token-b") is None
+
+
+def test_cache_is_bounded_lru(cache, clock):
+    """Past max_entries the least recently used token is dropped."""
+    decode, _ = counting_decoder({"exp": clock.now + 60})
+    for token in ("t1", "t2", "t3"):
+        cache.verify(token, decode)
+    cache.get("t1")
+    cache.verify("t4", decode)
+
+    assert len(cache) == 3
+    assert cache.get("t2") is None
+    assert cache.get("t1") is not None
+
+
+def test_tokens_without_exp_are_not_cached(cache):
+    """Tokens that never expire are verified every time."""
+    decode, calls = counting_decoder({"sub": "u1"})
+    cache.verify("token-a", decode)
+    cache.verify("token-a", decode)
+    assert len(calls) == 2
+
+
+def test_revoked_jti_is_rejected_even_when_cached(cache, clock):
+    """Revocation applies to cached claims and ends when the token expires."""
+    decode, _ = counting_decoder({"jti": "j1", "exp": clock.now + 60})
+    cache.verify("token-a", decode)
+
+    cache.revocations.add("j1", clock.now + 60)
+    with pytest.raises(TokenRevoked):
+        cache.verify("token-a", decode)
+
+    clock.now += 61
+    cache.revocations.prune()
+    assert len(cache.revocations) == 0
+
+
+def test_revocations_sync_between_instances(clock):
+    """Revocations reach other instances through Redis once a sync is due."""
+    redis = FakeRedis()
+    here = RevocationSet(clock=clock)
+    there = RevocationSet(sync_interval=5, clock=clock)
+
+    here.revoke(redis, "j1", clock.now + 60)
+    here.revoke(redis, "old", clock.now - 1)
+    there.maybe_sync(redis)
+    assert there.is_revoked("j1")
+    assert not there.is_revoked("old")
+
+    # Not due again until sync_interval passes
+    here.revoke(redis, "j2", clock.now + 60)
+    there.maybe_sync(redis)
+    assert not there.is_revoked("j2")
+    clock.now += 5
+    there.maybe_sync(redis)
+    assert there.is_revoked("j2")
+
+
+def test_async_revocation_sync(clock):
+    """The asyncio client path writes and loads the same sorted set."""
+    redis = FakeAsyncRedis()
+    here = RevocationSet(clock=clock)
+    there = RevocationSet(clock=clock)
+
+    async def run():
+        await here.revoke_async(redis, "j1", clock.now + 60)
+        await there.sync_async(redis)
+
+    asyncio.run(run())
+    assert "j1" in there
+    assert list(redis.zsets.values()) == [{"j1": clock.now + 60}]
+
+
+def test_middleware_rejects_revoked_token():
+    """MultiAuthMiddleware caches verification and honours revocations."""
+    token_cache = VerifiedTokenCache()
+    middleware = MultiAuthMiddleware(SECRET, token_cache=token_cache)
+    token = generate_jwt_token({"user_id": 7}, SECRET)
+
+    result = middleware._authenticate_jwt(token)
+    assert result["user_id"] == 7
+    assert middleware._authenticate_jwt(token)["jti"] == result["jti"]
+    assert token_cache.stats()["hits"] == 1
+
+    claims = jwt.decode(token, SECRET, algorithms=["HS256"])
+    token_cache.revocations.add(claims["jti"], claims["exp"])
+    assert middleware._authenticate_jwt(token) is None
+
+    # A different signing key never reuses the cached verification
+    other = MultiAuthMiddleware("other-secret", token_cache=token_cache)
+    assert other._authenticate_jwt(token) is None
@@ -0,0 +1,228 @@
+"""Unit tests for compiled validators and batch schema validation in py_libs."""
+
+import os
+import sys
+
+import pytest
+
+PY_LIBS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "shared", "py_libs")
+)
+if PY_LIBS_DIR not in sys.path:
+    sys.path.insert(0, PY_LIBS_DIR)
+
+from py_libs.validation import (  # noqa: E402
+    IsAlphanumeric,
+    IsEmail,
+    IsFloat,
+    IsFloatInRange,
+    IsIn,
+    IsInt,
+    IsIntInRange,
+    IsLength,
+    IsMatch,
+    IsNotEmpty,
+    IsSlug,
+    IsTrimmed,
+    Schema,
+    ValidationError,
+    ValidationResult,
+    Validator,
+    chain,
+)
+
+pytestmark = pytest.mark.unit
+
+SAMPLES = [
+    "",
+    "   ",
+    " padded ",
+    "abc",
+    "ABC-123",
+    "my-slug",
+    "info",
+    "INFO",
+    "42",
+    "4.2",
+    "1e3",
+    "-7",
+    "user@example.com",
+    "x" * 300,
+    42,
+    4.0,
+    4.5,
+    True,
+    None,
+    ["list"],
+]
+
+VALIDATORS = [
+    IsNotEmpty(),
+    IsLength(2, 10),
+    IsMatch(r"^[a-z]+$"),
+    IsAlphanumeric(allow_dash=True),
+    IsSlug(),
+    IsIn(["info", "error"]),
+    IsIn(["info", "error"], case_sensitive=False),
+    IsTrimmed(),
+    IsInt(),
+    IsFloat(),
+    IsIntInRange(0, 100),
+    IsFloatInRange(-1.0, 10.0),
+    IsEmail(),
+    chain(IsNotEmpty(), IsLength(3, 5)),
+]
+
+
+def run_compiled(validator, value):
+    """Run a compiled check, shaped like a ValidationResult for comparison."""
+    try:
+        return ValidationResult.success(validator.compile()(value))
+    except ValidationError as e:
+        return ValidationResult.failure(e.message)
+    except (AttributeError, TypeError):
+        return "raised"
+
+
+def run_validate(validator, value):
+    """Run validate(), mapping crashes on bad input to a comparable marker."""
+    try:
+        return validator(value)
+    except (AttributeError, TypeError):
+        return "raised"
+
+
+@pytest.mark.parametrize("validator", VALIDATORS, ids=lambda v: type(v).__name__)
+def test_compiled_check_matches_validate(validator):
+    """A compiled check accepts, converts and rejects exactly like validate()."""
+    for value in SAMPLES:
+        assert run_compiled(validator, value) == run_validate(validator, value), value
+
+
+def test_validate_batch_cleans_valid_records_and_groups_errors():
+    """Valid records come back converted; errors are grouped per field and message."""
+    schema = Schema(
+        {
+            "level": IsIn(["info", "error"]),
+            "message": [IsNotEmpty(), IsLength(1, 20)],
+            "port": IsIntInRange(1, 65535),
+        }
+    )
+    records = [
+        {"level": "info", "message": " hello ", "port": "80"},
+        {"level": "bogus", "message": "x", "port": 1},
+        {"level": "error", "message": "", "port": 99999},
+        {"level": "bogus", "port": 443},
+        "not a record",
+        {"level": "error", "message": "ok", "port": 8080, "extra": 1},
+    ]
+
+    report = schema.validate_batch(records)
+
+    assert report.valid == [
+        {"level": "info", "message": "hello", "port": 80},
+        {"level": "error", "message": "ok", "port": 8080},
+    ]
+    assert report.valid_rows == [0, 5]
+    assert report.invalid_count == 4
+    assert report.invalid_rows() == {1, 2, 3, 4}
+    groups = {(g.field, g.error): g.rows for g in report.errors}
+    assert groups == {
+        ("", "Record must be an object"): (4,),
+        ("level", "Value must be one of: info, error"): (1, 3),
+        ("message", "Value cannot be empty"): (2,),
+        ("message", "Field is required"): (3, 4),
+        ("level", "Field is required"): (4,),
+        ("port", "Value must be at most 65535"): (2,),
+        ("port", "Field is required"): (4,),
+    }
+
+
+def test_optional_and_extra_fields():
+    """Optional fields may be absent; extra fields are kept only on request."""
+    fields = {"name": IsNotEmpty(), "source": IsSlug()}
+    records = [{"name": "a", "labels": {"x": 1}}, {"name": "b", "source": None}]
+
+    dropped = Schema(fields, optional=["source"]).validate_batch(records)
+    kept = Schema(fields, optional=["source"], keep_extra=True).validate_batch(records)
+
+    assert dropped.valid == [{"name": "a"}, {"name": "b"}]
+    assert kept.valid == [{"name": "a", "labels": {"x": 1}}, {"name": "b"}]
+
+
+def test_repeated_strings_are_checked_once_per_batch():
+    """Deduplication runs a field's check once per distinct string value."""
+    calls = []
+
+    class Recording(Validator[str, str]):
+        def validate(self, value):
+            calls.append(value)
+            return ValidationResult.success(value.upper())
+
+    records = [{"level": level} for level in ["info", "error", "info"] * 100]
+
+    report = Schema({"level": Recording()}).validate_batch(records)
+    assert sorted(calls) == ["error", "info"]
+    assert report.valid[2] == {"level": "INFO"}
+
+    calls.clear()
+    Schema({"level": Recording()}, dedupe=False).validate_batch(records)
+    assert len(calls) == 300
+
+
+def test_validate_columns_matches_validate_batch():
+    """Column-wise input gives the same report as the equivalent records."""
+    schema = Schema({"a": IsInt(), "b": IsLength(1, 3)}, optional=["b"])
+    records = [{"a": "1", "b": "x"}, {"a": "z", "b": "y"}, {"a": 3, "b": "long"}]
+    columns = {"a": ["1", "z", 3], "b": ["x", "y", "long"]}
+
+    by_rows = schema.validate_batch(records)
+    by_columns = schema.validate_columns(columns)
+
+    assert by_columns.valid == by_rows.valid == [{"a": 1, "b": "x"}]
+    assert by_columns.errors == by_rows.errors
+    with pytest.raises(ValueError):
+        schema.validate_columns({"a": [1, 2], "b": ["x"]})
+
+
+def test_error_report_is_compact():
+    """The report lists a bounded number of rows per group with exact counts."""
+    schema = Schema({"n": IsInt()})
+
+    report = schema.validate_batch([{"n": "bad"}] * 50).to_dict(max_rows=3)
+
+    assert report == {
+        "total": 50,
+        "valid": 0,
+        "invalid": 50,
+        "errors": [
+            {
+                "field": "n",
+                "error": "Value must be an integer",
+                "count": 50,
+                "rows": [0, 1, 2],
+            }
+        ],
+    }
+
+
+def test_validate_single_record():
+    """A single record validates to a ValidationResult."""
+    schema = Schema({"name": IsNotEmpty(), "port": IsInt()})
+
+    assert schema.validate({"name": " a ", "port": "1"}).value == {
+        "name": "a",
+        "port": 1,
+    }
+    assert schema.validate({"name": ""}).error == (
+        "name: Value cannot be empty; port: Field is required"
+    )
+
+
+def test_patterns_are_compiled_once_and_shared():
+    """Validators built from the same pattern share one compiled regex."""
+    assert IsMatch(r"^\d+$")._pattern is IsMatch(r"^\d+$")._pattern
+    assert (
+        IsAlphanumeric(allow_dash=True)._pattern
+        is IsAlphanumeric(allow_dash=True)._pattern
+    )